@@ -68,7 +68,7 @@ class AppState:
         Consolidated helper to get credentials.
         Prioritizes integration-specific credentials from UserIntegration table.
         """
-        from src.core.credential_provider import CredentialProvider
+        from src.core.client_registry import get_client_registry
         from src.auth.oauth import GMAIL_SCOPES, CALENDAR_SCOPES, TASKS_SCOPES, DRIVE_SCOPES, LOGIN_SCOPES
         
         # Map provider to specific scopes
@@ -80,12 +80,11 @@ class AppState:
         }
         target_scopes = scopes_map.get(provider)
 
-        # Priority 1: CredentialProvider (specific integration tokens with correct scopes)
+        # Priority 1: Integration tokens with correct scopes (cached per user)
         try:
-            creds = CredentialProvider.get_integration_credentials(
+            creds = get_client_registry().get_credentials(
                 user_id=user_id,
-                provider=provider,
-                auto_refresh=True
+                provider=provider
             )
             if creds:
                 return creds
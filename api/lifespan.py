@@ -106,6 +106,41 @@ async def lifespan(app: FastAPI):
                 await relationship_manager.start_decay_job()
         except Exception as e:
             logger.warning(f"Could not start relationship decay job: {e}")
+
+        # Start durable push ingestion queue (Gmail / Slack webhooks)
+        try:
+            from src.services.ingestion.push_queue import start_push_queue
+            from api.routers.gmail_push import process_gmail_batch
+            from api.routers.slack_events import process_slack_batch
+            await start_push_queue({'gmail': process_gmail_batch, 'slack': process_slack_batch})
+            logger.info("[OK] Push ingestion queue started")
+        except Exception as e:
+            logger.warning(f"Could not start push ingestion queue: {e}")
+
+        # Start reminder dispatcher (due-time timer queue)
+        try:
+            from src.services.reminders.timer_queue import start_reminder_dispatcher
+            await start_reminder_dispatcher()
+            logger.info("[OK] Reminder dispatcher started")
+        except Exception as e:
+            logger.warning(f"Could not start reminder dispatcher: {e}")
+
+        # Start notification outbox worker (email / push delivery)
+        try:
+            from src.services.notifications.outbox import start_notification_outbox
+            await start_notification_outbox()
+            logger.info("[OK] Notification outbox worker started")
+        except Exception as e:
+            logger.warning(f"Could not start notification outbox worker: {e}")
+
+        # Start interval flush of in-process relationship interactions
+        try:
+            from src.features.ghost.interaction_aggregator import start_interaction_flusher
+            from src.services.indexing.graph import KnowledgeGraphManager
+            await start_interaction_flusher(KnowledgeGraphManager(AppState.get_config()))
+            logger.info("[OK] Relationship interaction flusher started")
+        except Exception as e:
+            logger.warning(f"Could not start relationship interaction flusher: {e}")
         
     except Exception as e:
         logger.error(f"[ERROR] Failed to initialize database: {e}", exc_info=True)
@@ -120,6 +155,27 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Error stopping Unified Indexer: {e}")
     
+    try:
+        from src.services.ingestion.push_queue import stop_push_queue
+        await stop_push_queue()
+        logger.info("[OK] Push ingestion queue stopped")
+    except Exception as e:
+        logger.warning(f"Error stopping push ingestion queue: {e}")
+
+    try:
+        from src.services.reminders.timer_queue import stop_reminder_dispatcher
+        await stop_reminder_dispatcher()
+        logger.info("[OK] Reminder dispatcher stopped")
+    except Exception as e:
+        logger.warning(f"Error stopping reminder dispatcher: {e}")
+
+    try:
+        from src.services.notifications.outbox import stop_notification_outbox
+        await stop_notification_outbox()
+        logger.info("[OK] Notification outbox worker stopped")
+    except Exception as e:
+        logger.warning(f"Error stopping notification outbox worker: {e}")
+
     try:
         from src.services.profile_service import stop_profile_service
         await stop_profile_service()
@@ -137,6 +193,14 @@ async def lifespan(app: FastAPI):
             await relationship_manager.stop_decay_job()
     except Exception as e:
         logger.warning(f"Error stopping relationship decay job: {e}")
+
+    # Apply relationship interactions still buffered in this process
+    try:
+        from src.features.ghost.interaction_aggregator import stop_interaction_flusher
+        await stop_interaction_flusher()
+        logger.info("[OK] Relationship interaction flusher stopped")
+    except Exception as e:
+        logger.warning(f"Error stopping relationship interaction flusher: {e}")
     
     # Close database connections gracefully
     try:
@@ -202,17 +202,29 @@ class SessionMiddleware(BaseHTTPMiddleware):
     
     Performance optimizations:
     - Uses async database operations (non-blocking)
-    - In-memory LRU cache with 60-second TTL to reduce DB queries
+    - Sessions and users are read through the shared user data cache
+      (per-process LRU + Redis, see src/services/user_cache.py), so an
+      active session is looked up in the database once, not once per
+      worker or per request
+    - last_active_at is written at most every 30 seconds per session
     """
     
-    # Session cache: {hashed_token: (session_data, user_data, timestamp)}
-    _session_cache: dict = {}
+    # Minimum interval between last_active_at writes for a session
+    TOUCH_INTERVAL = timedelta(seconds=30)
     
     def __init__(self, app, ttl_minutes: int = 60, cache_ttl_seconds: int = 60, cache_max_size: int = 1000):
+        from src.services.user_cache import get_user_cache
+        
         super().__init__(app)
         self.ttl_minutes = ttl_minutes
         self.cache_ttl_seconds = cache_ttl_seconds
         self.cache_max_size = cache_max_size
+        self._sessions = get_user_cache('session')
+        self._users = get_user_cache('user')
+        # cache_ttl_seconds/cache_max_size size the per-process tier
+        for cache in (self._sessions, self._users):
+            cache.near_ttl_seconds = cache_ttl_seconds
+            cache.near_max_size = cache_max_size
     
     def _extract_bearer_token(self, request: Request) -> Optional[str]:
         """Extract Bearer token from Authorization header"""
@@ -221,37 +233,59 @@ class SessionMiddleware(BaseHTTPMiddleware):
             return auth_header[7:]  # Remove 'Bearer ' prefix
         return None
     
-    def _get_cached_session(self, hashed_token: str):
-        """Get session from cache if valid"""
-        if hashed_token in self._session_cache:
-            session_data, user_data, cached_at = self._session_cache[hashed_token]
-            if (datetime.now() - cached_at).total_seconds() < self.cache_ttl_seconds:
-                return session_data, user_data
-            else:
-                del self._session_cache[hashed_token]
-        return None, None
+    async def _load_session(self, hashed_token: str) -> Optional[dict]:
+        """Session row snapshot from the database (cache loader)"""
+        from sqlalchemy import select
+        from src.database.async_database import get_async_session_local
+        from src.services.user_cache import snapshot_row
+        
+        AsyncSessionLocal = get_async_session_local()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(DBSession).where(DBSession.session_token == hashed_token))
+            db_session = result.scalar_one_or_none()
+            return snapshot_row(db_session) if db_session else None
     
-    def _cache_session(self, hashed_token: str, session_data, user_data):
-        """Store session in cache with eviction if needed"""
-        if len(self._session_cache) >= self.cache_max_size:
-            sorted_entries = sorted(
-                self._session_cache.items(),
-                key=lambda x: x[1][2]
-            )
-            for key, _ in sorted_entries[:self.cache_max_size // 10]:
-                del self._session_cache[key]
+    async def _load_user(self, user_id: int) -> Optional[dict]:
+        """User row snapshot from the database (cache loader)"""
+        from sqlalchemy import select
+        from src.database.async_database import get_async_session_local
+        from src.services.user_cache import snapshot_row
         
-        self._session_cache[hashed_token] = (session_data, user_data, datetime.now())
+        AsyncSessionLocal = get_async_session_local()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(User).where(User.id == user_id))
+            user = result.scalar_one_or_none()
+            return snapshot_row(user) if user else None
     
-    def _invalidate_cache(self, hashed_token: str):
-        """Remove session from cache"""
-        if hashed_token in self._session_cache:
-            del self._session_cache[hashed_token]
+    async def _delete_session(self, hashed_token: str):
+        """Delete an inactive session and drop it from the cache"""
+        from sqlalchemy import delete
+        from src.database.async_database import get_async_session_local
+        
+        AsyncSessionLocal = get_async_session_local()
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(DBSession).where(DBSession.session_token == hashed_token))
+            await db.commit()
+        await self._sessions.invalidate(hashed_token)
+    
+    async def _touch_session(self, hashed_token: str, session_data: dict, now: datetime):
+        """Record activity in the database and write it through to the cache"""
+        from sqlalchemy import update
+        from src.database.async_database import get_async_session_local
+        
+        AsyncSessionLocal = get_async_session_local()
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(DBSession)
+                .where(DBSession.session_token == hashed_token)
+                .values(last_active_at=now)
+            )
+            await db.commit()
+        await self._sessions.set(hashed_token, {**session_data, 'last_active_at': now.isoformat()})
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Process request and attach session if available (ASYNC with caching)"""
-        from sqlalchemy import select
-        from src.database.async_database import get_async_session_local
+        from src.services.user_cache import restore_row
         
         # Get session token from multiple sources (header, cookie, or Authorization Bearer)
         raw_session_token = None
@@ -281,107 +315,78 @@ class SessionMiddleware(BaseHTTPMiddleware):
                 token_preview = f"{token_preview[:10]}...{token_preview[-10:]}"
             logger.info(f"Middleware received RAW token from [{token_source}]: '{token_preview}' (len={len(raw_session_token)}) -> Hash: {hashed_token[:10]}...")
             
-            # Check cache first (fast path)
-            cached_session, cached_user = self._get_cached_session(hashed_token)
+            request.state.session = None
+            request.state.user = None
+            request.state.user_id = None
+            request.state.session_id = None
             
-            if cached_session and cached_user:
-                # Use cached data
-                request.state.session = cached_session
-                request.state.user = cached_user
-                request.state.user_id = cached_user.id
-                request.state.session_id = raw_session_token
-                logger.debug(f"Session cache HIT: user_id={cached_user.id}")
-            else:
-                # Cache miss - query database asynchronously
-                try:
-                    AsyncSessionLocal = get_async_session_local()
-                    async with AsyncSessionLocal() as db:
-                        # Query for session using hashed token
-                        stmt = select(DBSession).where(
-                            DBSession.session_token == hashed_token,
-                            DBSession.expires_at > datetime.utcnow()
+            try:
+                now = datetime.utcnow()
+                session_data = await self._sessions.get_or_load(
+                    hashed_token, lambda: self._load_session(hashed_token)
+                )
+                db_session = restore_row(DBSession, session_data) if session_data else None
+                
+                if db_session and db_session.expires_at and db_session.expires_at > now:
+                    # CHECK INACTIVITY TIMEOUT (60 MINUTES)
+                    last_active = db_session.last_active_at or db_session.created_at
+                    
+                    if (now - last_active) > timedelta(minutes=self.ttl_minutes):
+                        # Session expired due to inactivity
+                        logger.warning(f"Session expired due to inactivity (>{self.ttl_minutes}m): user_id={db_session.user_id}")
+                        await self._delete_session(hashed_token)
+                    else:
+                        # Session is valid - get user
+                        user_data = await self._users.get_or_load(
+                            db_session.user_id, lambda: self._load_user(db_session.user_id)
                         )
-                        result = await db.execute(stmt)
-                        db_session = result.scalar_one_or_none()
                         
-                        if db_session:
-                            # CHECK INACTIVITY TIMEOUT (60 MINUTES)
-                            now = datetime.utcnow()
-                            last_active = db_session.last_active_at or db_session.created_at
-                            
-                            if (now - last_active) > timedelta(minutes=self.ttl_minutes):
-                                # Session expired due to inactivity
-                                logger.warning(f"Session expired due to inactivity (>{self.ttl_minutes}m): user_id={db_session.user_id}")
-                                await db.delete(db_session)
-                                await db.commit()
-                                self._invalidate_cache(hashed_token)
-                                
-                                # Detach session
-                                request.state.session = None
-                                request.state.user = None
-                                request.state.user_id = None
-                                request.state.session_id = None
-                            else:
-                                # Session is valid - get user
-                                user_stmt = select(User).where(User.id == db_session.user_id)
-                                user_result = await db.execute(user_stmt)
-                                user = user_result.scalar_one_or_none()
-                                
-                                if user:
-                                    # Update last_active_at if more than 30 seconds have passed
-                                    if (now - last_active) > timedelta(seconds=30):
-                                        db_session.last_active_at = now
-                                        await db.commit()
-                                    
-                                    # Cache the session and user for future requests
-                                    self._cache_session(hashed_token, db_session, user)
-                                    
-                                    # Attach to request state
-                                    request.state.session = db_session
-                                    request.state.user = user
-                                    request.state.user_id = db_session.user_id
-                                    request.state.session_id = raw_session_token
-                                    logger.debug(f"Session cache MISS, loaded from DB: user_id={db_session.user_id}")
-                                else:
-                                    logger.warning(f"Session found but user not found: {db_session.user_id}")
-                                    request.state.session = None
-                                    request.state.user = None
-                                    request.state.user_id = None
-                                    request.state.session_id = None
-                        else:
-                            # No valid session
-                            logger.info(f"Invalid session token found: {hashed_token[:10]}")
-                            request.state.session = None
-                            request.state.user = None
-                            request.state.user_id = None
-                            request.state.session_id = None
+                        if user_data:
+                            user = restore_row(User, user_data)
                             
-                            # Process request but mark/clear cookie on response
-                            response = await call_next(request)
+                            # Update last_active_at if more than 30 seconds have passed
+                            if (now - last_active) > self.TOUCH_INTERVAL:
+                                await self._touch_session(hashed_token, session_data, now)
+                                db_session.last_active_at = now
                             
-                            # NUCLEAR COOKIE DELETION - Kill it everywhere
-                            # But SKIP if we are on the callback route (which sets a new cookie)
-                            is_callback = "/auth/google/callback" in request.url.path
-                            
-                            if token_source == "cookie" and not is_callback and "session_token" not in response.headers.get("set-cookie", "").lower():
-                                logger.info(f"🔥 Nuke invalid cookie at multiple paths/domains (Path: {request.url.path})")
-                                # Standard delete
-                                response.delete_cookie("session_token")
-                                response.delete_cookie("session_token", path="/")
-                                response.delete_cookie("session_token", path="/api")
-                                # Domain specific deletes (fixes localhost vs 127.0.0.1 issues)
-                                response.delete_cookie("session_token", domain="localhost")
-                                response.delete_cookie("session_token", domain="localhost", path="/")
-                                response.delete_cookie("session_token", domain="127.0.0.1")
-                                response.delete_cookie("session_token", domain="127.0.0.1", path="/")
-                            return response
-                            
-                except Exception as e:
-                    logger.error(f"Error in async session lookup: {e}", exc_info=True)
-                    request.state.session = None
-                    request.state.user = None
-                    request.state.user_id = None
-                    request.state.session_id = None
+                            # Attach to request state
+                            request.state.session = db_session
+                            request.state.user = user
+                            request.state.user_id = db_session.user_id
+                            request.state.session_id = raw_session_token
+                            logger.debug(f"Session resolved: user_id={db_session.user_id}")
+                        else:
+                            logger.warning(f"Session found but user not found: {db_session.user_id}")
+                else:
+                    # No valid session
+                    logger.info(f"Invalid session token found: {hashed_token[:10]}")
+                    
+                    # Process request but mark/clear cookie on response
+                    response = await call_next(request)
+                    
+                    # NUCLEAR COOKIE DELETION - Kill it everywhere
+                    # But SKIP if we are on the callback route (which sets a new cookie)
+                    is_callback = "/auth/google/callback" in request.url.path
+                    
+                    if token_source == "cookie" and not is_callback and "session_token" not in response.headers.get("set-cookie", "").lower():
+                        logger.info(f"🔥 Nuke invalid cookie at multiple paths/domains (Path: {request.url.path})")
+                        # Standard delete
+                        response.delete_cookie("session_token")
+                        response.delete_cookie("session_token", path="/")
+                        response.delete_cookie("session_token", path="/api")
+                        # Domain specific deletes (fixes localhost vs 127.0.0.1 issues)
+                        response.delete_cookie("session_token", domain="localhost")
+                        response.delete_cookie("session_token", domain="localhost", path="/")
+                        response.delete_cookie("session_token", domain="127.0.0.1")
+                        response.delete_cookie("session_token", domain="127.0.0.1", path="/")
+                    return response
+                    
+            except Exception as e:
+                logger.error(f"Error in async session lookup: {e}", exc_info=True)
+                request.state.session = None
+                request.state.user = None
+                request.state.user_id = None
+                request.state.session_id = None
         else:
             # No session token provided
             logger.debug(f"No authentication token provided in request to {request.url.path}")
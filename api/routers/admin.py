@@ -685,3 +685,138 @@ async def mark_user_profile_for_refresh(
             detail=f"Failed to mark profile for refresh: {str(e)}"
         )
 
+
+# ============================================
+# PUSH INGESTION QUEUE MONITORING
+# ============================================
+
+@router.get("/push-queue/stats")
+async def get_push_queue_stats(
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Get durable push ingestion queue statistics (admin only)
+    
+    **Returns:**
+    - Queue depth (total and per source) and oldest pending event age
+    - Coalescing ratio (events per processed batch)
+    - Notification-to-indexed latency percentiles
+    - Failure and dead-letter counts
+    """
+    try:
+        import asyncio
+        from src.services.ingestion.push_queue import get_push_queue
+        
+        stats = await asyncio.to_thread(get_push_queue().get_stats)
+        
+        return {
+            "success": True,
+            "stats": stats,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting push queue stats: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get push queue stats: {str(e)}"
+        )
+
+
+# ============================================
+# GOOGLE CLIENT REGISTRY MONITORING
+# ============================================
+
+@router.get("/google-clients/stats")
+async def get_google_client_stats(
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Get per-user Google client registry statistics (admin only)
+    
+    **Returns:**
+    - Credential hits, misses, reloads and token refreshes
+    - API resource hits, misses and evictions
+    - Cache sizes and hit ratios
+    """
+    try:
+        from src.core.client_registry import get_client_registry
+        
+        return {
+            "success": True,
+            "stats": get_client_registry().get_stats(),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting Google client stats: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get Google client stats: {str(e)}"
+        )
+
+
+# ============================================
+# LLM GATEWAY MONITORING
+# ============================================
+
+@router.get("/llm-gateway/stats")
+async def get_llm_gateway_stats(
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Get LLM gateway statistics (admin only)
+    
+    **Returns:**
+    - Per-caller calls, cache hits, coalesced calls and errors
+    - Per-caller prompt/completion tokens and queue/call latency
+    - In-flight calls per provider and queued calls per priority lane
+    """
+    try:
+        from src.ai.llm_gateway import get_llm_gateway
+        
+        return {
+            "success": True,
+            "stats": get_llm_gateway().get_stats(),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting LLM gateway stats: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get LLM gateway stats: {str(e)}"
+        )
+
+
+# ============================================
+# INTENT CLASSIFICATION CACHE MONITORING
+# ============================================
+
+@router.get("/intent-cache/stats")
+async def get_intent_cache_stats(
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Get intent classification cache statistics (admin only)
+    
+    **Returns:**
+    - Exact and near-hit counts, misses and overall hit rate per classifier version
+    - Near-hits rejected because entities did not match
+    - Storage backend (redis or in-process) and index sizes
+    """
+    try:
+        from src.ai.classification_cache import get_all_classification_cache_stats
+        
+        return {
+            "success": True,
+            "stats": get_all_classification_cache_stats(),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting intent cache stats: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get intent cache stats: {str(e)}"
+        )
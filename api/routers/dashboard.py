@@ -6,8 +6,8 @@ Provides overview statistics for:
 - Today's calendar events count  
 - Outstanding tasks count
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Dict, Any, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
@@ -216,7 +216,7 @@ async def get_dashboard_overview(
                 overview["services"]["email"]["available"] = True
                 
                 # Get recent emails (last 5)
-                recent_emails = email_service.search_emails(limit=5, folder="inbox")
+                recent_emails = await email_service.search_emails_async(limit=5, folder="inbox")
                 overview["recent_activity"]["recent_emails"] = [
                     {
                         "subject": email.get("subject", "No subject"),
@@ -273,6 +273,47 @@ async def get_dashboard_overview(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch dashboard overview: {str(e)}"
         )
+
+
+def _build_brief_service(config, db: Session, user_id: int):
+    """Create a BriefService with the user's integrations (sync DB ops, run in a thread)."""
+    from src.services.dashboard.brief_service import BriefService
+    from src.core.credential_provider import CredentialFactory
+
+    factory = CredentialFactory(config)
+
+    # Create services using factory (prioritizes UserIntegration -> falls back to Session)
+    try:
+        e_svc = factory.create_service('email', user_id=user_id, db_session=db)
+    except Exception as e:
+        logger.error(f"[BRIEFS] Failed to init EmailService: {e}")
+        e_svc = None
+        
+    try:
+        t_svc = factory.create_service('task', user_id=user_id, db_session=db)
+    except Exception as e:
+        logger.error(f"[BRIEFS] Failed to init TaskService: {e}")
+        t_svc = None
+        
+    try:
+        c_svc = factory.create_service('calendar', user_id=user_id, db_session=db)
+    except Exception as e:
+        logger.error(f"[BRIEFS] Failed to init CalendarService: {e}")
+        c_svc = None
+
+    logger.info(f"[BRIEFS] BriefService created. Calendar Svc available: {c_svc is not None}")
+    return BriefService(
+        config=config,
+        email_service=e_svc,
+        task_service=t_svc,
+        calendar_service=c_svc
+    )
+
+
+def _brief_user_name(user: User) -> str:
+    return user.name or (user.email.split('@')[0] if user.email else "there")
+
+
 @router.get("/briefs")
 async def get_briefs(
     current_user: User = Depends(get_current_user_required),
@@ -287,56 +328,39 @@ async def get_briefs(
     - Todos: High priority from Tasks/Notion
     - Meetings: Today's schedule
     - Reminders: Proactive bills/appointments
+    
+    Served from the materialized snapshot (refreshed in the background when
+    sources change). 'meta.stale' flags a snapshot that is being refreshed;
+    only the very first load aggregates inline.
     """
-    from src.services.dashboard.brief_service import BriefService
-    from src.core.credential_provider import CredentialFactory
+    from src.services.dashboard.brief_cache import (
+        BRIEF_SECTIONS, get_brief_store, load_cached_briefs, schedule_brief_refresh
+    )
     
     logger.info(f"[BRIEFS] Fetching briefs for user {current_user.id}")
     
     try:
-        # Helper to initialize services via factory in a thread (since it involves sync DB ops)
-        def init_services():
-            factory = CredentialFactory(config)
-            
-            # Create services using factory (prioritizes UserIntegration -> falls back to Session)
-            try:
-                e_svc = factory.create_service('email', user_id=current_user.id, db_session=db)
-            except Exception as e:
-                logger.error(f"[BRIEFS] Failed to init EmailService: {e}")
-                e_svc = None
-                
-            try:
-                t_svc = factory.create_service('task', user_id=current_user.id, db_session=db)
-            except Exception as e:
-                logger.error(f"[BRIEFS] Failed to init TaskService: {e}")
-                t_svc = None
-                
-            try:
-                c_svc = factory.create_service('calendar', user_id=current_user.id, db_session=db)
-            except Exception as e:
-                logger.error(f"[BRIEFS] Failed to init CalendarService: {e}")
-                c_svc = None
-                
-            return e_svc, t_svc, c_svc
+        cached = await asyncio.to_thread(load_cached_briefs, current_user.id)
+        refresh_sections = None
+        if cached:
+            meta = cached['meta']
+            if not meta['stale']:
+                return cached
+            # Stale sections are refreshed as marked; an aged-out snapshot refreshes everything
+            refresh_sections = None if meta['stale_sections'] else list(BRIEF_SECTIONS)
+            if await asyncio.to_thread(lambda: get_brief_store().is_shared):
+                await asyncio.to_thread(
+                    schedule_brief_refresh, current_user.id, sections=refresh_sections, countdown=0
+                )
+                return cached
 
-        # Run sync initialization in thread pool
-        loop = asyncio.get_event_loop()
-        email_svc, task_svc, cal_svc = await loop.run_in_executor(None, init_services)
-
-        # 3. Aggregation
-        brief_service = BriefService(
-            config=config,
-            email_service=email_svc,
-            task_service=task_svc,
-            calendar_service=cal_svc
-        )
-        logger.info(f"[BRIEFS] BriefService created. Calendar Svc available: {cal_svc is not None}")
-        
-        briefs = await brief_service.get_dashboard_briefs(
+        # No snapshot yet (or no shared store for a worker to refresh): build inline
+        brief_service = await asyncio.to_thread(_build_brief_service, config, db, current_user.id)
+        return await brief_service.refresh_briefs(
             user_id=current_user.id,
-            user_name=current_user.name or current_user.email.split('@')[0] if current_user.email else "there"
+            user_name=_brief_user_name(current_user),
+            sections=refresh_sections
         )
-        return briefs
         
     except Exception as e:
         logger.error(f"[BRIEFS] Error fetching briefs: {e}", exc_info=True)
@@ -346,6 +370,43 @@ async def get_briefs(
         )
 
 
+@router.post("/briefs/refresh")
+async def refresh_briefs(
+    sections: Optional[List[str]] = Body(None, embed=True),
+    current_user: User = Depends(get_current_user_required),
+    config = Depends(get_config),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Refresh selected brief sections now and return the updated briefs.
+    
+    Body: {"sections": ["meetings", "todos"]} (omit to refresh stale sections only).
+    The reminder summary is regenerated only if its inputs changed.
+    """
+    from src.services.dashboard.brief_cache import BRIEF_SECTIONS
+    
+    unknown = sorted(set(sections or ()) - set(BRIEF_SECTIONS))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown brief sections: {', '.join(unknown)}. Valid: {', '.join(BRIEF_SECTIONS)}"
+        )
+    
+    try:
+        brief_service = await asyncio.to_thread(_build_brief_service, config, db, current_user.id)
+        return await brief_service.refresh_briefs(
+            user_id=current_user.id,
+            user_name=_brief_user_name(current_user),
+            sections=sections
+        )
+    except Exception as e:
+        logger.error(f"[BRIEFS] Error refreshing briefs: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to refresh briefs: {str(e)}"
+        )
+
+
 from pydantic import BaseModel
 
 class DraftReplyRequest(BaseModel):
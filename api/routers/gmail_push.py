@@ -1,19 +1,21 @@
 """
 Gmail Push Notifications API Router
 
-Receives push notifications from Gmail when new emails arrive
-and triggers immediate indexing.
+Receives push notifications from Gmail when new emails arrive and
+appends them to the durable push queue, which coalesces bursts per
+mailbox into a single indexing run.
 """
 import os
 import json
 import hmac
 import hashlib
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, Request, HTTPException, Header, status, Body, BackgroundTasks, Depends
 from pydantic import BaseModel
 
 from src.utils.logger import setup_logger
 from src.services.indexing.event_stream import EventStreamHandler
+from src.services.ingestion.push_queue import QueuedEvent
 from src.database.webhook_models import WebhookEventType
 from api.dependencies import get_event_stream_handler
 
@@ -98,19 +100,24 @@ async def receive_gmail_push_notification(
                     # Convert to int
                     user_id_int = int(user_id) if str(user_id).isdigit() else 1  # Default to 1 on failure
                     
-                    if event_handler:
+                    payload = {
+                        "historyId": x_goog_resource_id,
+                        "channelId": x_goog_channel_id,
+                        "resourceState": x_goog_resource_state,
+                        "messageNumber": x_goog_message_number,
+                    }
+                    if await _enqueue_push_event(user_id_int, payload):
+                        logger.info(f"✅ Gmail event queued for user {user_id}")
+                    elif event_handler:
+                        # Durable queue unavailable - process in-process as before
                         background_tasks.add_task(
                             _process_gmail_event,
                             event_handler=event_handler,
-                            payload={
-                                "historyId": x_goog_resource_id,
-                                "channelId": x_goog_channel_id,
-                                "resourceState": x_goog_resource_state
-                            },
+                            payload=payload,
                             user_id=user_id_int,
                             event_id=x_goog_channel_id or "gmail_push",
                         )
-                        logger.info(f"✅ Gmail event queued for user {user_id}")
+                        logger.info(f"✅ Gmail event queued in-process for user {user_id}")
                     else:
                          logger.error("EventStreamHandler not available")
                          
@@ -145,16 +152,60 @@ async def receive_gmail_push_notification(
         }
 
 
+async def _enqueue_push_event(user_id: int, payload: Dict[str, Any]) -> bool:
+    """Append a notification to the durable push queue; False if unavailable."""
+    try:
+        import asyncio
+        from src.services.ingestion.push_queue import get_push_queue
+
+        queue = get_push_queue()
+        if not queue.is_running:
+            return False
+        await asyncio.to_thread(queue.enqueue, "gmail", user_id, payload)
+        return True
+    except Exception as e:
+        logger.error(f"[GmailPush] Failed to enqueue push event: {e}")
+        return False
+
+
+async def process_gmail_batch(user_id: int, events: List[QueuedEvent]):
+    """
+    Push queue handler: a burst of notifications for one mailbox becomes a
+    single delta sync, webhook and brief refresh.
+
+    Failures propagate so the queue retries the burst (and dead-letters it
+    after repeated failures).
+    """
+    event_handler = get_event_stream_handler()
+    if event_handler is None:
+        raise RuntimeError("EventStreamHandler not available")
+
+    latest = events[-1].payload
+    await _process_gmail_event(
+        event_handler=event_handler,
+        payload={**latest, "coalesced": len(events)},
+        user_id=user_id,
+        event_id=latest.get("channelId") or "gmail_push",
+        raise_errors=True,
+    )
+
+
 async def _process_gmail_event(
     event_handler: EventStreamHandler,
     payload: Dict[str, Any],
     user_id: int,
     event_id: str,
+    raise_errors: bool = False,
 ):
     """
-    Background processing for a Gmail push notification:
+    Processing for a Gmail push notification (or a coalesced burst):
     1. Route through EventStreamHandler for immediate indexing.
     2. Trigger outbound email.received webhook via Celery.
+    3. Schedule a (debounced) refresh of the user's dashboard briefs.
+
+    With raise_errors, indexing and webhook failures are raised for the
+    queue to retry; otherwise (in-process fallback) they are only logged.
+    The brief refresh is best-effort either way.
     """
     # 1. Real-time indexing
     try:
@@ -165,6 +216,8 @@ async def _process_gmail_event(
         )
     except Exception as e:
         logger.error(f"[GmailPush] EventStreamHandler error: {e}")
+        if raise_errors:
+            raise
 
     # 2. Outbound webhook delivery
     try:
@@ -179,6 +232,17 @@ async def _process_gmail_event(
         logger.info(f"[GmailPush] Queued email.received webhook for user {user_id}")
     except Exception as e:
         logger.error(f"[GmailPush] Failed to queue webhook: {e}")
+        if raise_errors:
+            raise
+
+    # 3. Materialized dashboard briefs
+    try:
+        import asyncio
+        from src.services.dashboard.brief_cache import schedule_brief_refresh
+
+        await asyncio.to_thread(schedule_brief_refresh, user_id, sources=['email'])
+    except Exception as e:
+        logger.error(f"[GmailPush] Failed to schedule brief refresh: {e}")
 
 
 def _extract_user_id_from_token(token: Optional[str]) -> Optional[str]:
@@ -119,34 +119,28 @@ async def get_user_profile(
     """
     cache = get_profile_cache()
     
-    try:
-        # Try cache first
-        cached_profile = await cache.get(user.id)
-        if cached_profile:
-            logger.debug(f"Cache hit for user {user.id} profile")
-            return ProfileResponse(**cached_profile)
-        
-        # Cache miss - fetch from database
+    async def load_profile():
         logger.debug(f"Cache miss for user {user.id} profile, fetching from DB")
         stmt = select(UserWritingProfile).where(
             UserWritingProfile.user_id == user.id
         )
         result = await db.execute(stmt)
         profile = result.scalar_one_or_none()
-        
         if not profile:
+            return None
+        return ProfileResponse.from_orm(profile).model_dump(mode='json')
+    
+    try:
+        # Served from cache when possible; concurrent misses share one DB read
+        cached_profile = await cache.get_or_load(user.id, load_profile)
+        
+        if not cached_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Profile not found. Build a profile first using POST /api/profile/build"
             )
         
-        # Build response
-        profile_response = ProfileResponse.from_orm(profile)
-        
-        # Cache for future requests
-        await cache.set(user.id, profile_response.model_dump())
-        
-        return profile_response
+        return ProfileResponse(**cached_profile)
         
     except HTTPException:
         raise
@@ -3,9 +3,10 @@ Slack Events Router
 
 Handles incoming Slack events via HTTP (Events API).
 Supports url_verification, event_callback for messages, reactions, and channels.
-Routes events through EventStreamHandler for indexing and triggers outbound webhooks.
+Events are appended to the durable push queue, whose worker routes them
+through EventStreamHandler for indexing and triggers outbound webhooks.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import hmac
 import hashlib
 import time
@@ -15,6 +16,7 @@ from pydantic import BaseModel
 
 from src.utils.logger import setup_logger
 from src.services.indexing.event_stream import EventStreamHandler, EventType
+from src.services.ingestion.push_queue import BatchFailure, QueuedEvent
 from src.services.user_mapping import UserMappingService
 from src.database.webhook_models import WebhookEventType
 from api.dependencies import get_event_stream_handler, get_config
@@ -108,11 +110,16 @@ async def _process_slack_event(
     payload: Dict[str, Any],
     event_handler: Optional[EventStreamHandler],
     user_id: int,
+    raise_errors: bool = False,
 ):
     """
-    Background processing for a Slack event:
+    Processing for a single Slack event:
     1. Route through EventStreamHandler for indexing.
     2. Trigger outbound webhooks via Celery.
+    3. Dispatch reactions and mentions to the Autonomous Bridge.
+
+    With raise_errors, the first failure is raised for the push queue to
+    retry the event; otherwise (in-process fallback) failures are logged.
     """
     event_data = payload.get("event", {})
     inner_type = event_data.get("type", "")
@@ -122,8 +129,10 @@ async def _process_slack_event(
 
     # --- 1. Real-time indexing ---
     stream_type = routing.get("stream_type")
-    if stream_type and event_handler:
+    if stream_type:
         try:
+            if event_handler is None:
+                raise RuntimeError("EventStreamHandler not available")
             await event_handler.handle_event(
                 event_type=stream_type,
                 payload=payload,
@@ -131,6 +140,8 @@ async def _process_slack_event(
             )
         except Exception as e:
             logger.error(f"[SlackEvents] EventStreamHandler error for {inner_type}: {e}")
+            if raise_errors:
+                raise
 
     # --- 2. Outbound webhook delivery ---
     webhook_type: Optional[WebhookEventType] = routing.get("webhook_type")
@@ -149,6 +160,8 @@ async def _process_slack_event(
             )
         except Exception as e:
             logger.error(f"[SlackEvents] Failed to queue webhook for {inner_type}: {e}")
+            if raise_errors:
+                raise
 
     # --- 3. Autonomous Bridge dispatch ---
     if inner_type in ("reaction_added", "app_mention"):
@@ -162,6 +175,51 @@ async def _process_slack_event(
             )
         except Exception as e:
             logger.error(f"[SlackEvents] Bridge dispatch error for {inner_type}: {e}")
+            if raise_errors:
+                raise
+
+
+async def _enqueue_slack_event(payload: Dict[str, Any], user_id: int) -> bool:
+    """
+    Append an event to the durable push queue; False if unavailable.
+
+    Slack retries unacknowledged deliveries with the same event_id, so it
+    doubles as the queue's dedup key.
+    """
+    try:
+        import asyncio
+        from src.services.ingestion.push_queue import get_push_queue
+
+        queue = get_push_queue()
+        if not queue.is_running:
+            return False
+        await asyncio.to_thread(queue.enqueue, "slack", user_id, payload, payload.get("event_id"))
+        return True
+    except Exception as e:
+        logger.error(f"[SlackEvents] Failed to enqueue event: {e}")
+        return False
+
+
+async def process_slack_batch(user_id: int, events: List[QueuedEvent]):
+    """
+    Push queue handler: process a user's queued Slack events in order.
+
+    Slack events carry their own content, so they are not merged; the
+    batch shares one handler lookup. Events that fail are reported to the
+    queue, which retries (or dead-letters) only those.
+    """
+    event_handler = get_event_stream_handler()
+    failed, errors = [], []
+    for event in events:
+        try:
+            await _process_slack_event(
+                payload=event.payload, event_handler=event_handler, user_id=user_id, raise_errors=True
+            )
+        except Exception as e:
+            failed.append(event)
+            errors.append(f"{event.payload.get('event_id', event.id)}: {e}")
+    if failed:
+        raise BatchFailure(failed, "; ".join(errors))
 
 
 @router.post("/slack/events", status_code=status.HTTP_200_OK)
@@ -219,13 +277,14 @@ async def handle_slack_event(
             logger.debug(f"Ignoring bot message in event {event_id}")
             return {"status": "ok"}
 
-        # Process in background (Slack requires response < 3s)
-        background_tasks.add_task(
-            _process_slack_event,
-            payload=payload,
-            event_handler=event_handler,
-            user_id=user_id,
-        )
+        # Queue durably and process in the background (Slack requires response < 3s)
+        if not await _enqueue_slack_event(payload, user_id):
+            background_tasks.add_task(
+                _process_slack_event,
+                payload=payload,
+                event_handler=event_handler,
+                user_id=user_id,
+            )
 
         return {"status": "ok"}
 
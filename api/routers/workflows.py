@@ -7,7 +7,7 @@ from typing import Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from pydantic import BaseModel, Field
 
-from src.workflows.engine import WorkflowExecutor, StateManager, EventEmitter
+from src.workflows.engine import WorkflowExecutor, PersistentStateManager, EventEmitter
 from src.workflows.definitions import (
     MorningBriefingWorkflow,
     EmailToActionWorkflow,
@@ -27,7 +27,7 @@ router = APIRouter(prefix="/workflows", tags=["workflows"])
 
 # Global workflow executor instance
 _executor: Optional[WorkflowExecutor] = None
-_state_manager: Optional[StateManager] = None
+_state_manager: Optional[PersistentStateManager] = None
 _event_emitter: Optional[EventEmitter] = None
 
 
@@ -36,7 +36,8 @@ def get_executor() -> WorkflowExecutor:
     global _executor, _state_manager, _event_emitter
     
     if _executor is None:
-        _state_manager = StateManager()
+        # Runs are executed by Celery workers; status/history read the shared store
+        _state_manager = PersistentStateManager()
         _event_emitter = EventEmitter()
         _executor = WorkflowExecutor(
             state_manager=_state_manager,
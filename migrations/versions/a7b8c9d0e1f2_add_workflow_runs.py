@@ -0,0 +1,45 @@
+"""Add workflow_runs for durable, resumable workflow state
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-18
+
+PersistentStateManager stores each WorkflowContext (with step checkpoints)
+here; workers take a lease on a run while executing it and orphaned runs are
+found off (status, lease_expires_at).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'a7b8c9d0e1f2'
+down_revision = 'f6a7b8c9d0e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'workflow_runs',
+        sa.Column('workflow_id', sa.String(36), primary_key=True),
+        sa.Column('workflow_name', sa.String(100), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('context', sa.Text(), nullable=False),  # EncryptedJSON
+        sa.Column('lease_owner', sa.String(64), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('compacted', sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.create_index('idx_workflow_run_status_lease', 'workflow_runs', ['status', 'lease_expires_at'])
+    op.create_index('idx_workflow_run_user_created', 'workflow_runs', ['user_id', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('idx_workflow_run_user_created', table_name='workflow_runs')
+    op.drop_index('idx_workflow_run_status_lease', table_name='workflow_runs')
+    op.drop_table('workflow_runs')
@@ -0,0 +1,46 @@
+"""Add full-text search index for conversation messages
+
+Revision ID: c3d4e5f6a7b8
+Revises: e09c3cf16eae
+Create Date: 2026-10-18
+
+Conversation content is encrypted, so the index stores per-user blind
+(HMAC) tokens in a tsvector rather than plaintext. Rows are written by
+ConversationMemory.add_message; run ConversationSearchIndex.backfill()
+once to index existing history.
+"""
+from alembic import op
+
+
+# revision identifiers
+revision = 'c3d4e5f6a7b8'
+down_revision = 'e09c3cf16eae'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS conversation_message_search (
+            message_id INTEGER PRIMARY KEY REFERENCES conversation_messages(id) ON DELETE CASCADE,
+            user_id INTEGER NOT NULL,
+            session_id VARCHAR(255) NOT NULL,
+            role VARCHAR(50) NOT NULL,
+            timestamp TIMESTAMP NOT NULL,
+            search_vector TSVECTOR NOT NULL
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_conv_search_vector "
+        "ON conversation_message_search USING GIN (search_vector)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_conv_search_user_time "
+        "ON conversation_message_search (user_id, timestamp DESC)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS idx_conv_search_user_time")
+    op.execute("DROP INDEX IF EXISTS idx_conv_search_vector")
+    op.execute("DROP TABLE IF EXISTS conversation_message_search")
@@ -0,0 +1,31 @@
+"""Add status to conversation_summaries for batched summarization
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-18
+
+Tiering stages 'pending' summaries with set-based SQL; the batched
+summarizer marks them 'completed' before raw messages are deleted.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'd4e5f6a7b8c9'
+down_revision = 'c3d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'conversation_summaries',
+        sa.Column('status', sa.String(20), nullable=False, server_default='completed')
+    )
+    op.create_index('ix_conversation_summaries_status', 'conversation_summaries', ['status'])
+
+
+def downgrade():
+    op.drop_index('ix_conversation_summaries_status', table_name='conversation_summaries')
+    op.drop_column('conversation_summaries', 'status')
@@ -0,0 +1,45 @@
+"""Add reminder_timers queue for due-time reminders
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18
+
+Reminder fire times are computed when an actionable item is written and
+claimed by the dispatcher off the (status, fire_at) index. Timers for items
+that already exist are backfilled when the dispatcher starts.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'reminder_timers',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('item_id', sa.String(), sa.ForeignKey('actionable_items.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('fire_at', sa.DateTime(), nullable=False),
+        sa.Column('offset_label', sa.String(20), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('claim_token', sa.String(64), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('fired_at', sa.DateTime(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_reminder_timers_item_id', 'reminder_timers', ['item_id'])
+    op.create_index('ix_reminder_timers_claim_token', 'reminder_timers', ['claim_token'])
+    op.create_index('idx_reminder_timer_status_fire', 'reminder_timers', ['status', 'fire_at'])
+
+
+def downgrade():
+    op.drop_index('idx_reminder_timer_status_fire', table_name='reminder_timers')
+    op.drop_index('ix_reminder_timers_claim_token', table_name='reminder_timers')
+    op.drop_index('ix_reminder_timers_item_id', table_name='reminder_timers')
+    op.drop_table('reminder_timers')
@@ -0,0 +1,49 @@
+"""Add notification_outbox for transactional email/push delivery
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-18
+
+NotificationService writes email/push deliveries here in the caller's
+transaction; the outbox worker claims rows off (status, available_at) and
+fans them out to channels in batches.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'f6a7b8c9d0e1'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('idempotency_key', sa.String(128), nullable=True, unique=True),
+        sa.Column('payload', sa.Text(), nullable=False),  # EncryptedJSON
+        sa.Column('channels', sa.JSON(), nullable=False),
+        sa.Column('delivered_channels', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('available_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('claim_token', sa.String(64), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('delivered_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_notification_outbox_user_id', 'notification_outbox', ['user_id'])
+    op.create_index('ix_notification_outbox_claim_token', 'notification_outbox', ['claim_token'])
+    op.create_index('idx_outbox_status_available', 'notification_outbox', ['status', 'available_at'])
+
+
+def downgrade():
+    op.drop_index('idx_outbox_status_available', table_name='notification_outbox')
+    op.drop_index('ix_notification_outbox_claim_token', table_name='notification_outbox')
+    op.drop_index('ix_notification_outbox_user_id', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
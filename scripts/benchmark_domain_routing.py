@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Domain Routing Benchmark
+Compares the per-pattern keyword scan previously used for domain detection
+and intent scoring with the compiled MultiPatternMatcher, optionally with
+synthetic vocabulary added to show how each scales as domains grow.
+
+Usage:
+    python scripts/benchmark_domain_routing.py --iterations 2000 --extra-terms 2000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+from datetime import datetime
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.constants import INTENT_KEYWORDS
+from src.ai.intent.domain_detector import DomainDetector
+from src.ai.intent.multi_matcher import MultiPatternMatcher
+
+
+QUERIES = [
+    "what meetings do I have tomorrow?",
+    "show my unread emails from bob about the budget",
+    "add a task to send the quarterly report before friday's deadline",
+    "who have i been emailing the most this week",
+    "reschedule my 3pm appointment and let the team know by email",
+    "find the google doc with the launch plan",
+    "how much did I spend on travel last month",
+    "remind me to call mom",
+]
+
+
+def build_vocabularies(extra_terms: int):
+    """Domain and intent vocabularies, padded with synthetic domains."""
+    vocabularies = dict(DomainDetector.vocabularies())
+    for domain, categories in INTENT_KEYWORDS.items():
+        for intent, keywords in categories.items():
+            vocabularies[(domain, intent)] = list(keywords)
+
+    rng = random.Random(0)
+    for n in range(extra_terms):
+        term = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 14)))
+        vocabularies.setdefault((f"synthetic{n % 20}", "any"), []).append(term)
+    return vocabularies
+
+
+def legacy_scan(vocabularies, query: str):
+    """One substring check per term, as the detector and classifier did."""
+    query_lower = query.lower()
+    matches = {}
+    for label, terms in vocabularies.items():
+        found = []
+        for term in terms:
+            if term in query_lower and term not in found:
+                found.append(term)
+        if found:
+            matches[label] = found
+    return matches
+
+
+def time_per_query(fn, iterations: int) -> float:
+    """Best-of-three mean time per query in microseconds."""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for query in QUERIES:
+                fn(query)
+        best = min(best, time.perf_counter() - started)
+    return best / (iterations * len(QUERIES)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--extra-terms", type=int, default=0,
+                        help="Synthetic terms added on top of the real vocabularies")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("DOMAIN ROUTING BENCHMARK")
+    print("=" * 80)
+    print(f"Timestamp:     {datetime.now().isoformat()}")
+
+    for extra in sorted({0, args.extra_terms}):
+        vocabularies = build_vocabularies(extra)
+        started = time.perf_counter()
+        matcher = MultiPatternMatcher(vocabularies)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        for query in QUERIES:
+            expected = {k: sorted(v) for k, v in legacy_scan(vocabularies, query).items()}
+            actual = {k: sorted(v) for k, v in matcher.match(query).items()}
+            if expected != actual:
+                print(f"  WARNING: results differ for {query!r}")
+
+        legacy_us = time_per_query(lambda q: legacy_scan(vocabularies, q), args.iterations)
+        compiled_us = time_per_query(matcher.match, args.iterations)
+
+        print(f"\nVocabulary:    {len(matcher):,} terms ({extra:,} synthetic)")
+        print(f"  Build:       {build_ms:.1f}ms (once at startup)")
+        print(f"  Per-pattern: {legacy_us:.1f}us per query")
+        print(f"  Compiled:    {compiled_us:.1f}us per query")
+        print(f"  Speedup:     {legacy_us / compiled_us:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Output Redaction Benchmark
+Compares time-to-first-token of a streamed LLM response with redaction
+enabled: the buffered path (wait for the full response, scan for leaks,
+then one re.subn pass per pattern) against DataGuard.stream(), which
+redacts chunk by chunk. Also reports the CPU cost of redacting a complete
+response with the per-pattern passes and with the single-pass engine.
+
+Usage:
+    python scripts/benchmark_redaction.py --tokens 400 --token-ms 15
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.security.detectors.data_guard import DataGuard
+
+
+SENTENCES = [
+    "Here is a summary of your inbox for today. ",
+    "Bob asked whether the budget review can move to Thursday at 3pm. ",
+    "The invoice lists card 4111 1111 1111 1111 and is due on the 14th. ",
+    "Contact alice.smith@example.com if the shipment is late. ",
+    "Your calendar has 3 meetings and 2 focus blocks tomorrow. ",
+    "The deploy key sk-proj-abcdefghijklmnopqrstuvwx was rotated last week. ",
+    "Remember to follow up with the design team about the launch plan. ",
+]
+
+
+def build_tokens(count: int):
+    """Response split into LLM-sized tokens (1-6 chars)."""
+    rng = random.Random(0)
+    text = ""
+    while len(text) < count * 4:
+        text += rng.choice(SENTENCES)
+    tokens, i = [], 0
+    while i < len(text) and len(tokens) < count:
+        n = rng.randint(1, 6)
+        tokens.append(text[i:i + n])
+        i += n
+    return tokens
+
+
+def legacy_sanitize(text: str) -> str:
+    """Leak scan plus one re.subn pass per pattern, as DataGuard did."""
+    patterns = DataGuard.PATTERNS
+    if len(text) > 5000 and len(re.findall(patterns['EMAIL'], text)) > 10:
+        return DataGuard.BLOCK_MESSAGE
+    text = re.subn(patterns['CREDIT_CARD'], '[REDACTED_CC]', text)[0]
+    text = re.subn(patterns['SSN'], '[REDACTED_SSN]', text)[0]
+    return re.subn(patterns['API_KEY_SK'], '[REDACTED_KEY]', text)[0]
+
+
+def buffered_ttft(tokens, token_s: float) -> float:
+    started = time.perf_counter()
+    text = ""
+    for token in tokens:
+        time.sleep(token_s)
+        text += token
+    legacy_sanitize(text)
+    return time.perf_counter() - started
+
+
+def streaming_ttft(guard: DataGuard, tokens, token_s: float):
+    started = time.perf_counter()
+    stream = guard.stream()
+    first = None
+    for token in tokens:
+        time.sleep(token_s)
+        if stream.feed(token) and first is None:
+            first = time.perf_counter() - started
+    stream.close()
+    return first, time.perf_counter() - started
+
+
+def time_per_call(fn, arg, iterations: int) -> float:
+    """Best-of-three mean time per call in microseconds."""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn(arg)
+        best = min(best, time.perf_counter() - started)
+    return best / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=400)
+    parser.add_argument("--token-ms", type=float, default=15.0, help="Simulated delay between LLM tokens")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    guard = DataGuard({})
+    tokens = build_tokens(args.tokens)
+    text = "".join(tokens)
+
+    print("=" * 80)
+    print("OUTPUT REDACTION BENCHMARK")
+    print("=" * 80)
+    print(f"Timestamp:     {datetime.now().isoformat()}")
+    print(f"Response:      {len(tokens)} tokens, {len(text):,} chars, {args.token_ms}ms/token")
+
+    stream = guard.stream()
+    streamed = "".join(stream.feed(t) for t in tokens) + stream.close()
+    if streamed != legacy_sanitize(text) or streamed != guard.engine.redact(text).text:
+        print("  WARNING: streamed output differs from buffered redaction")
+
+    token_s = args.token_ms / 1000
+    buffered = buffered_ttft(tokens, token_s)
+    first, total = streaming_ttft(guard, tokens, token_s)
+    print("\nTime to first token (redaction enabled)")
+    print(f"  Buffered:    {buffered * 1000:.0f}ms")
+    print(f"  Streaming:   {first * 1000:.0f}ms (full response {total * 1000:.0f}ms)")
+
+    def stream_all(chunks):
+        s = guard.engine.stream()
+        for chunk in chunks:
+            s.feed(chunk)
+        s.close()
+
+    legacy_us = time_per_call(legacy_sanitize, text, args.iterations)
+    engine_us = time_per_call(lambda t: guard.engine.redact(t), text, args.iterations)
+    stream_us = time_per_call(stream_all, tokens, max(args.iterations // 10, 1))
+    print("\nCPU per response")
+    print(f"  Per-pattern: {legacy_us:.1f}us")
+    print(f"  Single-pass: {engine_us:.1f}us")
+    print(f"  Streaming:   {stream_us:.1f}us ({stream_us / len(tokens):.2f}us per token)")
+
+
+if __name__ == "__main__":
+    main()
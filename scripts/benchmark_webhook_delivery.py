@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Webhook Delivery Benchmark
+Compares serial per-delivery webhook dispatch with the concurrent pooled
+delivery engine against local stub HTTP endpoints.
+
+Usage:
+    python scripts/benchmark_webhook_delivery.py --subscriptions 2000 --hosts 25 --latency-ms 20
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base
+from src.database.webhook_models import (
+    WebhookDelivery,
+    WebhookDeliveryStatus,
+    WebhookEventType,
+    WebhookSubscription,
+    WebhookSubscriptionEvent,
+)
+from src.features.webhook_service import WebhookService
+
+
+def start_stub_servers(count: int, latency: float):
+    """Start *count* local HTTP endpoints that answer 200 after *latency* seconds."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    servers = []
+    for _ in range(count):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def make_session(subscriptions: int, servers, noise: int):
+    """In-memory database with matching subscriptions plus non-matching noise."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        WebhookSubscription.__table__,
+        WebhookSubscriptionEvent.__table__,
+        WebhookDelivery.__table__,
+    ])
+    db = sessionmaker(bind=engine, expire_on_commit=False)()
+    service = WebhookService(db)
+    for i in range(subscriptions + noise):
+        port = servers[i % len(servers)].server_address[1]
+        event_types = ["email.received"] if i < subscriptions else ["task.completed"]
+        service.create_subscription(
+            user_id=i, url=f"http://127.0.0.1:{port}/hook", event_types=event_types, secret="bench"
+        )
+    return db
+
+
+async def run_serial(db, sample: int) -> float:
+    """Previous behaviour: full scan, one client and two commits per delivery."""
+    service = WebhookService(db)
+    started = time.perf_counter()
+    subscriptions = [
+        s for s in db.query(WebhookSubscription).filter(WebhookSubscription.is_active == True).all()
+        if "email.received" in (s.event_types or [])
+    ][:sample]
+    for sub in subscriptions:
+        delivery = WebhookDelivery(
+            subscription_id=sub.id, event_type="email.received", event_id="bench",
+            payload={"n": sub.id}, status=WebhookDeliveryStatus.PENDING,
+            attempt_count=0, max_attempts=sub.retry_count,
+        )
+        db.add(delivery)
+        db.commit()
+        delivery.subscription = sub
+        await service._deliver_webhook(delivery)
+    return time.perf_counter() - started
+
+
+async def run_engine(db) -> float:
+    service = WebhookService(db)
+    started = time.perf_counter()
+    deliveries = await service.trigger_webhook_event(WebhookEventType.EMAIL_RECEIVED, "bench", {"n": 1})
+    elapsed = time.perf_counter() - started
+    failed = sum(1 for d in deliveries if d.status != WebhookDeliveryStatus.SUCCESS)
+    if failed:
+        print(f"  WARNING: {failed} deliveries did not succeed")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscriptions", type=int, default=2000)
+    parser.add_argument("--noise", type=int, default=2000, help="Non-matching subscriptions")
+    parser.add_argument("--hosts", type=int, default=25)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--serial-sample", type=int, default=200,
+                        help="Deliveries timed on the serial path (extrapolated)")
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    print("=" * 80)
+    print("WEBHOOK DELIVERY BENCHMARK")
+    print("=" * 80)
+    print(f"Timestamp:     {datetime.now().isoformat()}")
+    print(f"Subscriptions: {args.subscriptions:,} matching + {args.noise:,} other")
+    print(f"Endpoints:     {args.hosts} hosts, {args.latency_ms:.0f}ms latency")
+
+    servers = start_stub_servers(args.hosts, args.latency_ms / 1000)
+    try:
+        sample = min(args.serial_sample, args.subscriptions)
+        serial = asyncio.run(run_serial(make_session(args.subscriptions, servers, args.noise), sample))
+        serial_rate = sample / serial
+        engine = asyncio.run(run_engine(make_session(args.subscriptions, servers, args.noise)))
+        engine_rate = args.subscriptions / engine
+
+        print(f"\nSerial (sample of {sample:,})")
+        print(f"  Throughput:  {serial_rate:,.0f} deliveries/s")
+        print(f"  Projected:   {args.subscriptions / serial_rate:.1f}s for {args.subscriptions:,}")
+        print(f"\nConcurrent engine ({args.subscriptions:,})")
+        print(f"  Throughput:  {engine_rate:,.0f} deliveries/s")
+        print(f"  Elapsed:     {engine:.1f}s")
+        print(f"\nSpeedup:       {engine_rate / serial_rate:.1f}x")
+    finally:
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import List, Dict, Any, Optional, Tuple
 from langchain_core.tools import BaseTool
 
@@ -14,7 +16,9 @@ from .constants import (
     DEFAULT_FAST_MODEL,
     DEFAULT_LLM_MAX_TOKENS,
     DEFAULT_LLM_TEMPERATURE,
-    ERROR_TOOL_NOT_AVAILABLE
+    ERROR_SECURITY_BLOCKED,
+    ERROR_TOOL_NOT_AVAILABLE,
+    READ_ONLY_TOOL_ACTIONS
 )
 from src.ai.prompts.agent_prompts import PARAMETER_EXTRACTION_SYSTEM_PROMPT
 from src.events import WorkflowEventType, WorkflowEvent
@@ -25,6 +29,24 @@ from src.memory.domain_context import DomainContext
 from ..utils.performance import LatencyMonitor
 from src.memory.orchestrator import get_memory_orchestrator
 
+# Pending security verdict (a task resolving to bool) for an agent run that
+# was started before the guard finished; see security_gate()
+_security_gate: ContextVar[Optional["asyncio.Future"]] = ContextVar("agent_security_gate", default=None)
+
+
+@contextmanager
+def security_gate(verdict: "asyncio.Future"):
+    """
+    Make agent runs started in this scope hold every non-read-only tool call
+    until verdict resolves, and refuse it if the guard vetoed the query.
+    """
+    token = _security_gate.set(verdict)
+    try:
+        yield
+    finally:
+        _security_gate.reset(token)
+
+
 class BaseAgent(ABC):
     """
     Abstract base class for domain-specific agents.
@@ -583,6 +605,19 @@ class BaseAgent(ABC):
         except Exception:
             return {}
 
+    async def _passes_security_gate(self, tool_name: str, action: str) -> bool:
+        """Wait for a pending security verdict unless the action only reads."""
+        gate = _security_gate.get()
+        if gate is None or action in READ_ONLY_TOOL_ACTIONS:
+            return True
+        logger.debug(f"[{self.name}] {tool_name}.{action or 'run'} waiting for security verdict")
+        try:
+            # shield: cancelling this run must not cancel the shared guard task
+            return bool(await asyncio.shield(gate))
+        except Exception as e:
+            logger.warning(f"[{self.name}] Security verdict failed, refusing {tool_name}: {e}")
+            return False
+
     async def _safe_tool_execute(
         self,
         alias_list: List[str],
@@ -602,6 +637,10 @@ class BaseAgent(ABC):
         
         # Identify if this is a "write" action for enhanced event logging
         action_name = tool_input.get("action", "").lower()
+
+        # A speculative run may only read before the security verdict
+        if not await self._passes_security_gate(tool.name, action_name):
+            return ERROR_SECURITY_BLOCKED
         is_write_action = any(
             x in action_name for x in ["create", "send", "update", "delete", "schedule", "archive", "trash"]
         )
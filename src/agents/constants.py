@@ -33,6 +33,7 @@ TOOL_ALIASES_ASANA = ["asana", "asana_tool"]
 
 # Common Errors
 ERROR_TOOL_NOT_AVAILABLE = "I'm sorry, that tool is currently unavailable."
+ERROR_SECURITY_BLOCKED = "I cannot process that request due to security restrictions."
 ERROR_MISSING_PARAMS = "I didn't capture all the details needed. Could you please provide {missing}?"
 
 # Intent Keywords (Centralized)
@@ -81,6 +82,30 @@ INTENT_KEYWORDS = {
         'projects': ['project', 'projects', 'boards']
     }
 }
+
+# Intents in INTENT_KEYWORDS that change user data. The supervisor only starts an
+# agent speculatively (before the security guard has passed the query) when none
+# of these match for the routed domain.
+SIDE_EFFECT_INTENTS = {'send', 'manage', 'schedule', 'update', 'create', 'complete', 'delete', 'quick'}
+
+# Minimum fast-classifier confidence for starting an agent speculatively
+SPECULATIVE_ROUTING_MIN_CONFIDENCE = 0.85
+
+# Tool actions that only read user data. A speculatively started agent runs
+# these before the security verdict; every other action (including tools
+# called without an action) waits for it.
+READ_ONLY_TOOL_ACTIONS = frozenset({
+    'list', 'search', 'get', 'read', 'count', 'overdue', 'projects',
+    'find_free_time', 'find_gap', 'aggregate_spending', 'get_last_transaction',
+})
+
+# Multi-step plan scheduling: steps of one domain running at once (the agents
+# share a per-user API client and rate limit), with per-domain overrides
+PLAN_DOMAIN_CONCURRENCY_DEFAULT = 2
+PLAN_DOMAIN_CONCURRENCY = {
+    'research': 1,  # Long-running web research; one at a time per plan
+}
+
 ERROR_LLM_NOT_AVAILABLE = "Error: Language model not available."
 
 # Response Formatting Keywords (moved from SynthesisConfig)
@@ -0,0 +1,304 @@
+"""
+Plan Scheduler
+
+Runs a supervisor plan as a dependency DAG:
+
+- Each step starts as soon as every step it depends_on has succeeded, so
+  independent chains progress side by side instead of one after another.
+- A step whose upstream failed (or was skipped) is skipped without running.
+- Steps of the same domain share a concurrency limit.
+- Every step gets its own timeout, capped by what is left of the plan budget.
+
+The returned PlanTrace records when each step became ready, started and
+finished, and derives the critical path (the chain of steps that determined
+the plan's total latency).
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .constants import PLAN_DOMAIN_CONCURRENCY, PLAN_DOMAIN_CONCURRENCY_DEFAULT
+from .state import StepResult
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# run_step(step, step_num, context_text) -> StepResult
+StepRunner = Callable[[Dict[str, Any], int, str], Awaitable[StepResult]]
+
+# Budget left below which a step is not started
+MIN_STEP_BUDGET_SECONDS = 2.0
+
+
+def parse_dependencies(steps: List[Dict[str, Any]]) -> List[List[int]]:
+    """
+    Resolve each step's depends_on into indices of other steps.
+
+    The planner refers to steps by their 1-based "step" number; ints, "2" and
+    "step_2" are all accepted. Unknown and self references are dropped.
+    """
+    numbers = {}
+    for index, step in enumerate(steps):
+        number = step.get("step", index + 1)
+        numbers[str(number)] = index
+
+    graph = []
+    for index, step in enumerate(steps):
+        deps = []
+        for ref in step.get("depends_on") or []:
+            key = str(ref).strip().lower().replace("step_", "").replace("step ", "")
+            dep = numbers.get(key)
+            if dep is None or dep == index:
+                logger.debug(f"[PlanScheduler] Ignoring dependency {ref!r} of step {index + 1}")
+                continue
+            if dep not in deps:
+                deps.append(dep)
+        graph.append(deps)
+    return graph
+
+
+def find_cycle_members(graph: List[List[int]]) -> List[int]:
+    """Indices of steps that can never run because their dependencies form a cycle."""
+    remaining = {i: set(deps) for i, deps in enumerate(graph)}
+    ready = [i for i, deps in remaining.items() if not deps]
+    resolved = set()
+    while ready:
+        node = ready.pop()
+        resolved.add(node)
+        for other, deps in remaining.items():
+            if node in deps:
+                deps.discard(node)
+                if not deps and other not in resolved:
+                    ready.append(other)
+    return sorted(set(remaining) - resolved)
+
+
+@dataclass
+class StepTiming:
+    """When a step became ready, started and finished (seconds from plan start)."""
+    index: int
+    domain: str
+    deps: List[int]
+    status: str = "pending"  # ok, failed, timeout, upstream_failed, budget_exceeded, dependency_cycle
+    ready_at: Optional[float] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    @property
+    def queued(self) -> float:
+        """Time spent waiting for a domain slot after dependencies resolved."""
+        if self.ready_at is None or self.started_at is None:
+            return 0.0
+        return self.started_at - self.ready_at
+
+
+@dataclass
+class PlanTrace:
+    """Execution trace of one plan."""
+    steps: List[StepTiming] = field(default_factory=list)
+    total_seconds: float = 0.0
+
+    def critical_path(self) -> List[StepTiming]:
+        """
+        Steps that determined plan latency, in execution order.
+
+        Starts from the step that finished last and walks back through the
+        dependency that resolved last (the one it was actually waiting on).
+        """
+        finished = [t for t in self.steps if t.finished_at is not None]
+        if not finished:
+            return []
+        by_index = {t.index: t for t in self.steps}
+        node = max(finished, key=lambda t: t.finished_at)
+        path = [node]
+        while node.deps:
+            deps = [by_index[d] for d in node.deps if by_index[d].finished_at is not None]
+            if not deps:
+                break
+            node = max(deps, key=lambda t: t.finished_at)
+            path.append(node)
+        return list(reversed(path))
+
+    def to_dict(self) -> Dict[str, Any]:
+        path = self.critical_path()
+        dominant = max(path, key=lambda t: t.duration) if path else None
+        return {
+            "total_ms": round(self.total_seconds * 1000),
+            "critical_path": [
+                {"step": t.index + 1, "domain": t.domain, "ms": round(t.duration * 1000)}
+                for t in path
+            ],
+            "dominant_domain": dominant.domain if dominant else None,
+            "steps": [
+                {
+                    "step": t.index + 1,
+                    "domain": t.domain,
+                    "depends_on": [d + 1 for d in t.deps],
+                    "status": t.status,
+                    "queued_ms": round(t.queued * 1000),
+                    "start_ms": round((t.started_at or 0) * 1000),
+                    "ms": round(t.duration * 1000),
+                }
+                for t in self.steps
+            ],
+        }
+
+    def format(self) -> str:
+        """One-line critical path summary for logs."""
+        path = self.critical_path()
+        if not path:
+            return f"no steps ran ({self.total_seconds:.2f}s)"
+        chain = " -> ".join(f"step_{t.index + 1} ({t.domain} {t.duration:.2f}s)" for t in path)
+        dominant = max(path, key=lambda t: t.duration)
+        return f"{chain}; total {self.total_seconds:.2f}s, dominated by {dominant.domain}"
+
+
+def skipped_result(index: int, domain: str, result: str, error: str, execution_time: float = 0) -> StepResult:
+    """StepResult for a step that did not (fully) run."""
+    return StepResult(
+        step_id=f"step_{index + 1}", tool="", domain=domain,
+        success=False, result=result,
+        execution_time=execution_time, error=error,
+        timestamp=datetime.utcnow().isoformat()
+    )
+
+
+class PlanScheduler:
+    """
+    Executes plan steps in dependency order with bounded per-domain concurrency.
+
+    Example:
+        scheduler = PlanScheduler(run_step, step_timeout=30.0, budget_seconds=45.0)
+        results, trace = await scheduler.run(steps)
+    """
+
+    def __init__(
+        self,
+        run_step: StepRunner,
+        step_timeout: float,
+        budget_seconds: float,
+        domain_of: Optional[Callable[[Dict[str, Any]], str]] = None,
+        format_result: Optional[Callable[[StepResult], str]] = None,
+        on_step_done: Optional[Callable[[int, StepResult], Awaitable[None]]] = None,
+        domain_concurrency: Optional[Dict[str, int]] = None,
+        default_concurrency: int = PLAN_DOMAIN_CONCURRENCY_DEFAULT,
+    ):
+        self.run_step = run_step
+        self.step_timeout = step_timeout
+        self.budget_seconds = budget_seconds
+        self.domain_of = domain_of or (lambda step: step.get("domain", "general").lower())
+        self.format_result = format_result or (lambda sr: f"{sr.get('result', '')}\n")
+        self.on_step_done = on_step_done
+        self.domain_concurrency = PLAN_DOMAIN_CONCURRENCY if domain_concurrency is None else domain_concurrency
+        self.default_concurrency = default_concurrency
+
+    async def run(self, steps: List[Dict[str, Any]]) -> Tuple[List[StepResult], PlanTrace]:
+        """
+        Run every step of the plan.
+
+        Returns:
+            (StepResults in plan order, execution trace)
+        """
+        start = time.monotonic()
+        graph = parse_dependencies(steps)
+        domains = [self.domain_of(step) for step in steps]
+        trace = PlanTrace(steps=[StepTiming(i, domains[i], graph[i]) for i in range(len(steps))])
+        results: List[Optional[StepResult]] = [None] * len(steps)
+        done = [asyncio.Event() for _ in steps]
+        semaphores = {
+            domain: asyncio.Semaphore(self.domain_concurrency.get(domain, self.default_concurrency))
+            for domain in set(domains)
+        }
+
+        for index in find_cycle_members(graph):
+            trace.steps[index].status = "dependency_cycle"
+            results[index] = skipped_result(
+                index, domains[index], "Skipped (circular step dependencies).", "dependency_cycle"
+            )
+            done[index].set()
+
+        def ancestors(index: int) -> List[int]:
+            seen, stack = set(), list(graph[index])
+            while stack:
+                node = stack.pop()
+                if node not in seen:
+                    seen.add(node)
+                    stack.extend(graph[node])
+            return sorted(seen)
+
+        async def finish(index: int, sr: StepResult, status: str):
+            results[index] = sr
+            trace.steps[index].status = status
+            trace.steps[index].finished_at = time.monotonic() - start
+            done[index].set()
+            if self.on_step_done:
+                try:
+                    await self.on_step_done(index, sr)
+                except Exception as e:
+                    logger.debug(f"[PlanScheduler] on_step_done failed for step {index + 1}: {e}")
+
+        async def run_one(index: int):
+            timing = trace.steps[index]
+            domain = domains[index]
+            for dep in graph[index]:
+                await done[dep].wait()
+
+            failed = [d + 1 for d in graph[index] if not results[d].get("success")]
+            if failed:
+                await finish(index, skipped_result(
+                    index, domain, f"Skipped (depends on failed step {', '.join(map(str, failed))}).",
+                    "upstream_failed"
+                ), "upstream_failed")
+                return
+
+            timing.ready_at = time.monotonic() - start
+            async with semaphores[domain]:
+                elapsed = time.monotonic() - start
+                remaining = self.budget_seconds - elapsed
+                if remaining <= MIN_STEP_BUDGET_SECONDS:
+                    logger.warning(
+                        f"[PlanScheduler] Step {index + 1} skipped — budget exhausted ({elapsed:.1f}s used)"
+                    )
+                    await finish(index, skipped_result(
+                        index, domain, f"Skipped (budget of {self.budget_seconds}s exceeded).",
+                        "budget_exceeded"
+                    ), "budget_exceeded")
+                    return
+
+                context_text = "".join(self.format_result(results[a]) for a in ancestors(index))
+                timeout = min(steps[index].get("timeout_seconds") or self.step_timeout, remaining)
+                timing.started_at = elapsed
+                try:
+                    sr = await asyncio.wait_for(
+                        self.run_step(steps[index], index + 1, context_text), timeout=timeout
+                    )
+                    status = "ok" if sr.get("success") else "failed"
+                except asyncio.TimeoutError:
+                    sr = skipped_result(index, domain, "Timed out.", "timeout", execution_time=timeout)
+                    status = "timeout"
+                except Exception as e:
+                    sr = skipped_result(index, domain, str(e), str(e),
+                                        execution_time=time.monotonic() - start - elapsed)
+                    status = "failed"
+            await finish(index, sr, status)
+
+        tasks = [
+            asyncio.create_task(run_one(i)) for i in range(len(steps)) if not done[i].is_set()
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        trace.total_seconds = time.monotonic() - start
+        return results, trace
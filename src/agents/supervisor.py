@@ -15,6 +15,7 @@ from typing import Dict, Any, Optional, List, TYPE_CHECKING
 import json
 import re
 import asyncio
+from dataclasses import dataclass, field
 
 if TYPE_CHECKING:
     from src.events import WorkflowEventEmitter
@@ -23,7 +24,8 @@ from langchain_core.tools import BaseTool
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from .state import StepResult
-from .base import BaseAgent
+from .plan_scheduler import PlanScheduler
+from .base import BaseAgent, security_gate
 from .email.agent import EmailAgent
 from .tasks.agent import TaskAgent
 from .calendar.agent import CalendarAgent
@@ -39,6 +41,7 @@ from .finance.agent import FinanceAgent
 from ..utils.logger import setup_logger
 from ..ai.llm_factory import LLMFactory
 from ..ai.interactions_client import InteractionsClient
+from ..ai.llm_gateway import llm_call_context, PRIORITY_INTERACTIVE
 from ..utils.performance import LatencyMonitor
 
 logger = setup_logger(__name__)
@@ -58,7 +61,10 @@ from .constants import (
     DOMAIN_ALIASES,
     DOMAIN_DISPLAY_NAMES,
     PROVIDER_MAPPINGS,
-    DOMAIN_START_MESSAGES
+    DOMAIN_START_MESSAGES,
+    INTENT_KEYWORDS,
+    SIDE_EFFECT_INTENTS,
+    SPECULATIVE_ROUTING_MIN_CONFIDENCE
 )
 
 from ..ai.prompts.conversational_prompts import get_conversational_enhancement_prompt
@@ -94,6 +100,67 @@ except ImportError:
     get_entity_extractor = None  # type: ignore
     init_entity_extractor = None  # type: ignore
 
+# Compiled keyword matching (side-effect detection for speculative routing,
+# keyword fast path when no FastClassifier is available)
+try:
+    from src.ai.intent.multi_matcher import MultiPatternMatcher
+    from src.ai.intent.domain_detector import get_domain_detector
+except ImportError:
+    MultiPatternMatcher = None  # type: ignore
+    get_domain_detector = None  # type: ignore
+
+# DomainDetector labels that differ from agent names
+_DETECTOR_DOMAINS = {'task': 'tasks'}
+
+_side_effect_matcher: Optional[Any] = None
+
+
+def _get_side_effect_matcher() -> Optional[Any]:
+    """Matcher over the side-effecting intent keywords, labelled by domain (built once)"""
+    global _side_effect_matcher
+    if _side_effect_matcher is None and MultiPatternMatcher:
+        _side_effect_matcher = MultiPatternMatcher({
+            domain: [kw for intent, keywords in intents.items()
+                     if intent in SIDE_EFFECT_INTENTS for kw in keywords]
+            for domain, intents in INTENT_KEYWORDS.items()
+        })
+    return _side_effect_matcher
+
+
+@dataclass
+class KeywordRoute:
+    """
+    Fast-path route from the compiled domain vocabularies.
+    
+    Stands in for a FastClassifier result (same attributes) when none is
+    available, so confident keyword routes still skip the planner and can
+    start speculatively.
+    """
+    domain: str
+    confidence: float
+    keywords: List[str]
+    needs_llm: bool = False
+    is_ambiguous: bool = False
+    skill_matches: List[Any] = field(default_factory=list)
+    skill_name: Optional[str] = None
+
+    @property
+    def reason(self) -> str:
+        return f"keywords: {', '.join(self.keywords)}"
+
+
+@dataclass
+class PreRouting:
+    """Outcome of the pre-routing stages for one turn."""
+    query: str
+    security: "asyncio.Task"  # resolves to True when the guard passes the query
+    active_providers: set = field(default_factory=set)
+    extracted_entities: Optional[Any] = None
+    fast_result: Optional[Any] = None
+    nlp_context: Dict[str, Any] = field(default_factory=dict)
+    speculative_agent: Optional["asyncio.Task"] = None
+    agent_started_at: Optional[float] = None
+
 
 class SupervisorAgent:
     """
@@ -122,6 +189,8 @@ class SupervisorAgent:
         self.config = config
         self.memory = memory
         self.db = db
+        # Pre-routing stages run concurrently but share one DB session
+        self._db_lock = asyncio.Lock()
         self.event_emitter = event_emitter
         self.user_id = user_id
         
@@ -221,13 +290,7 @@ class SupervisorAgent:
         
         from sqlalchemy import select
         from src.database.models import UserIntegration
-        
-        # Proactively rollback any aborted transaction state
-        # This prevents "current transaction is aborted" errors
-        try:
-            await self.db.rollback()
-        except Exception:
-            pass  # Ignore if no transaction to rollback
+        from src.services.user_cache import get_user_cache
         
         # Only get integrations that are enabled (is_active=True)
         stmt = select(UserIntegration.provider).where(
@@ -235,9 +298,21 @@ class SupervisorAgent:
             UserIntegration.is_active == True
         )
         
+        async def load_providers():
+            async with self._db_lock:
+                # Proactively rollback any aborted transaction state
+                # This prevents "current transaction is aborted" errors
+                try:
+                    await self.db.rollback()
+                except Exception:
+                    pass  # Ignore if no transaction to rollback
+                
+                result = await self.db.execute(stmt)
+            return sorted(set(result.scalars().all()))
+        
         try:
-            result = await self.db.execute(stmt)
-            providers = set(result.scalars().all())
+            # Cached across turns and workers; integration writes invalidate it
+            providers = set(await get_user_cache('providers').get_or_load(user_id, load_providers))
             logger.info(f"_get_active_providers: user_id={user_id}, found providers={providers}")
             return providers
         except Exception as e:
@@ -631,6 +706,26 @@ CRITICAL ROUTING RULES:
             logger.debug(f"Sanitization failed: {e}")
             return response
 
+    def _open_output_stream(self, user_id: Optional[int]):
+        """Streaming counterpart of _sanitize_response (None if the security layer is unavailable)."""
+        try:
+            from src.security.cor_layer import CORLayer
+            return CORLayer.get_instance(self.config).open_output_stream(user_id)
+        except ImportError:
+            return None
+        except Exception as e:
+            logger.debug(f"Output stream unavailable: {e}")
+            return None
+
+    async def _emit_content_chunk(self, stream, content: str, final: bool = False):
+        """Emit a content_chunk, redacted through stream when there is one (final flushes it)."""
+        if stream is not None:
+            content = stream.feed(content)
+            if final:
+                content += stream.close()
+        if content:
+            await self._emit_event('content_chunk', content, data={'chunk': content})
+
     async def _is_service_enabled(self, domain: str, active_providers: set) -> bool:
         """Check if a domain's provider is enabled for the user."""
         if domain == 'research' or domain == 'general':
@@ -803,7 +898,7 @@ CRITICAL ROUTING RULES:
                 }
                 
                 with LatencyMonitor(f"Agent Execution: {domain}", threshold_ms=30000):
-                    res = await agent.run(step_query, context=ctx)
+                    res = await self._run_agent(agent, step_query, context=ctx)
         except Exception as e:
             res = f"Error executing {domain}: {e}"
             error_msg = str(e)
@@ -826,7 +921,8 @@ CRITICAL ROUTING RULES:
         self, 
         query: str, 
         response: str, 
-        user_name: Optional[str] = None
+        user_name: Optional[str] = None,
+        user_id: Optional[int] = None
     ) -> Optional[str]:
         """Enhance response conversationally using LLM with real-time streaming.
         
@@ -861,12 +957,15 @@ CRITICAL ROUTING RULES:
                 def _generate():
                     return self.llm.stream(prompt)
 
+                # Chunks are redacted as they stream; only a possible partial match is held back
+                output_stream = self._open_output_stream(user_id)
                 with LatencyMonitor("Response Enhancement (stream)", threshold_ms=10000):
                     async for chunk in ThreadedStreamer.stream_from_sync(_generate, logger_context="Enhancer"):
                         content = chunk.content if hasattr(chunk, 'content') else str(chunk)
                         if content:
                             full_content += content
-                            await self._emit_event('content_chunk', content, data={'chunk': content})
+                            await self._emit_content_chunk(output_stream, content)
+                await self._emit_content_chunk(output_stream, "", final=True)
 
                 if len(full_content) > 10:
                     logger.info(f"[Enhancement] Streaming succeeded: {len(full_content)} chars")
@@ -888,7 +987,7 @@ CRITICAL ROUTING RULES:
                 if fallback_content and len(fallback_content) > 10:
                     logger.info(f"[Enhancement] Fallback succeeded: {len(fallback_content)} chars")
                     # Emit as a single content chunk for the streaming path
-                    await self._emit_event('content_chunk', fallback_content, data={'chunk': fallback_content})
+                    await self._emit_content_chunk(self._open_output_stream(user_id), fallback_content, final=True)
                     return fallback_content
                     
                 logger.warning(f"[Enhancement] Fallback also produced insufficient content")
@@ -902,11 +1001,213 @@ CRITICAL ROUTING RULES:
             logger.error(f"[Enhancement] Complete failure: {e}")
             return None
 
+    async def _pre_route(
+        self,
+        query: str,
+        user_id: int,
+        user_name: Optional[str],
+        session_id: Optional[str],
+        metrics: Dict[str, Any],
+        start_ts: float,
+    ) -> PreRouting:
+        """
+        Run the pre-routing stages, overlapping the independent ones.
+        
+        The security guard and the active-provider lookup start immediately and
+        run alongside follow-up resolution (skipped unless the query has
+        anaphora), entity extraction, NLP analysis and fast classification.
+        The guard verdict is left pending for the caller to await before any
+        side-effecting work. On a confident read-only fast classification (or
+        keyword route, without a FastClassifier) the agent is started
+        speculatively and cancelled if the guard vetoes.
+        """
+        pre = PreRouting(query=query, security=asyncio.create_task(self._check_security(query, user_id)))
+        providers_task = asyncio.create_task(self._get_active_providers(user_id))
+
+        await self._emit_event('reasoning_start', "Understanding your request...")
+
+        # Follow-Up Reference Resolution (before any classification)
+        # Rewrite vague references ("the email", "it", "that meeting") using recent
+        # conversation history BEFORE the planner/router sees the query.
+        if self._has_followup_reference(query):
+            pre.query = await self._resolve_followup_references(query, user_id, session_id)
+        else:
+            metrics["followup_skipped"] = True
+
+        # Entity Extraction (pre-routing — resolve names before classification)
+        entities_task = asyncio.create_task(self._extract_entities(pre.query, user_id, metrics))
+
+        # NLP Analysis (CPU-bound; overlaps the lookups in flight)
+        if self.nlp:
+            pre.nlp_context = self.nlp.process_query(pre.query)
+            if pre.nlp_context.get('is_complex'):
+                logger.info(f"Complex query detected: {pre.nlp_context['complexity_score']:.2f}")
+
+        # Fast-Path Classification (sub-5ms, no LLM call)
+        pre.active_providers = await providers_task
+        if self.fast_classifier:
+            fast_result = self.fast_classifier.classify(pre.query, pre.active_providers, user_id=user_id)
+            logger.info(
+                f"[SupervisorAgent] FastClassifier: skill={fast_result.skill_name}, "
+                f"confidence={fast_result.confidence:.2f}, needs_llm={fast_result.needs_llm}, "
+                f"reason={fast_result.reason}"
+            )
+            metrics["fast_classifier_confidence"] = fast_result.confidence
+            metrics["fast_classifier_skill"] = fast_result.skill_name
+            pre.fast_result = fast_result
+        else:
+            pre.fast_result = self._keyword_route(pre.query)
+            if pre.fast_result:
+                metrics["keyword_route"] = pre.fast_result.domain
+
+        pre.extracted_entities = await entities_task
+
+        domain = await self._speculative_domain(pre)
+        if domain:
+            start_msg = DOMAIN_START_MESSAGES.get(domain, f"Working on {domain}...")
+            await self._emit_event('domain_selected', start_msg, data={'domain': domain})
+            pre.speculative_agent = self._start_agent(
+                pre, self.agents[domain],
+                self._agent_context(user_id, user_name, session_id, pre.extracted_entities),
+                metrics, start_ts,
+            )
+            metrics["speculative"] = True
+        return pre
+
+    def _start_agent(
+        self,
+        pre: PreRouting,
+        agent: BaseAgent,
+        context: Dict[str, Any],
+        metrics: Dict[str, Any],
+        start_ts: float,
+    ) -> "asyncio.Task":
+        """
+        Start an agent run as a task and record time-to-first-agent-start.
+
+        The run may start before the security verdict, so it carries the
+        pending guard task: every tool call that is not read-only waits for
+        the verdict and is refused if the guard vetoes the query.
+        """
+        import time as _time
+        pre.agent_started_at = _time.monotonic()
+        metrics["first_agent_start_ms"] = round((pre.agent_started_at - start_ts) * 1000)
+        with security_gate(pre.security):
+            return asyncio.create_task(self._run_agent(agent, pre.query, context=context))
+
+    async def _speculative_domain(self, pre: PreRouting) -> Optional[str]:
+        """
+        Domain whose agent may start before the security verdict, if any.
+        
+        Only confident, unambiguous fast-path routes qualify, and routes whose
+        keywords suggest a change to user data are skipped to avoid wasted
+        runs. The keyword check is not the safety boundary: the run's write
+        tools wait for the verdict (see _start_agent).
+        """
+        fast_result = pre.fast_result
+        if not fast_result or fast_result.needs_llm or not fast_result.domain:
+            return None
+        if fast_result.confidence < SPECULATIVE_ROUTING_MIN_CONFIDENCE:
+            return None
+        if fast_result.is_ambiguous and len(fast_result.skill_matches) >= 2:
+            return None
+        if ResearchAgent.is_research_query(pre.query):
+            return None
+
+        domain = fast_result.domain
+        if domain not in self.agents or not await self._is_service_enabled(domain, pre.active_providers):
+            return None
+        if self._has_side_effects(pre.query, domain):
+            return None
+        return domain
+
+    @staticmethod
+    def _keyword_route(query: str) -> Optional[KeywordRoute]:
+        """
+        Route from domain keywords alone, if the match is confident.
+        
+        Only a single-domain match at SPECULATIVE_ROUTING_MIN_CONFIDENCE or
+        above qualifies; anything weaker is left to the LLM planner.
+        """
+        if not get_domain_detector:
+            return None
+        result = get_domain_detector().detect(query)
+        if not result.primary_domain or result.is_cross_domain:
+            return None
+        if result.confidence < SPECULATIVE_ROUTING_MIN_CONFIDENCE:
+            return None
+        return KeywordRoute(
+            domain=_DETECTOR_DOMAINS.get(result.primary_domain, result.primary_domain),
+            confidence=result.confidence,
+            keywords=result.keyword_matches[result.primary_domain],
+        )
+
+    @staticmethod
+    def _has_side_effects(query: str, domain: str) -> bool:
+        """True if the query may ask the domain's agent to change user data."""
+        matcher = _get_side_effect_matcher()
+        if matcher is None:
+            return True  # Can't tell - never speculate
+        return DOMAIN_ALIASES.get(domain, domain) in matcher.match(query)
+
+    async def _cancel_speculation(self, task: "asyncio.Task", metrics: Dict[str, Any]) -> None:
+        """Cancel a speculatively started agent run vetoed by a later stage."""
+        task.cancel()
+        try:
+            await task
+        except BaseException:
+            pass  # Cancelled (or failed) - the result is discarded either way
+        metrics["speculation_wasted"] = True
+        logger.info("[SupervisorAgent] Speculative agent run cancelled")
+
+    async def _extract_entities(self, query: str, user_id: int, metrics: Dict[str, Any]) -> Optional[Any]:
+        """Resolve names in the query to contacts (non-critical)."""
+        if not self.entity_extractor:
+            return None
+        try:
+            extracted_entities = await self.entity_extractor.extract(query, user_id)
+            if extracted_entities and extracted_entities.has_entities:
+                logger.info(
+                    f"[SupervisorAgent] Pre-resolved entities: "
+                    f"{extracted_entities.resolved_count} contacts, "
+                    f"{len(extracted_entities.unresolved_names)} unresolved"
+                )
+                metrics["entities_resolved"] = extracted_entities.resolved_count
+            return extracted_entities
+        except Exception as e:
+            logger.debug(f"[SupervisorAgent] Entity extraction failed (non-critical): {e}")
+            return None
+
+    @staticmethod
+    def _agent_context(
+        user_id: int, user_name: Optional[str], session_id: Optional[str], extracted_entities: Optional[Any]
+    ) -> Dict[str, Any]:
+        """Build the context passed to a domain agent's run()."""
+        agent_context = {'user_id': user_id, 'user_name': user_name, 'session_id': session_id}
+        # Inject pre-resolved entities into agent context
+        if extracted_entities and extracted_entities.has_entities:
+            agent_context['resolved_entities'] = extracted_entities
+            agent_context['resolved_contacts'] = extracted_entities.get_emails()
+        return agent_context
+
     async def route_and_execute(self, query: str, user_id: Optional[int] = None, user_name: Optional[str] = None, session_id: Optional[str] = None) -> str:
         """
         Main entry point: Route query and execute agents.
         Now with structured observability for latency, routing, and error tracking.
+
+        LLM calls made while handling the query are interactive traffic of
+        the user's tenant for the LLM gateway's limits and accounting.
         """
+        with llm_call_context(caller="supervisor", tenant=user_id, priority=PRIORITY_INTERACTIVE):
+            return await self._route_and_execute(query, user_id, user_name, session_id)
+
+    @staticmethod
+    async def _run_agent(agent: BaseAgent, query: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """Run a domain agent with its LLM calls accounted to that agent."""
+        with llm_call_context(caller=getattr(agent, 'name', type(agent).__name__)):
+            return await agent.run(query, context=context)
+
+    async def _route_and_execute(self, query: str, user_id: Optional[int], user_name: Optional[str], session_id: Optional[str]) -> str:
         import time as _time
         _start_ts = _time.monotonic()
         _metrics: Dict[str, Any] = {
@@ -927,66 +1228,37 @@ CRITICAL ROUTING RULES:
             logger.warning("[SupervisorAgent] route_and_execute called without user_id - authentication may be missing")
             return "I cannot process your request because your session is not authenticated. Please log in again."
         
-        # 1. Security Check
-        if not await self._check_security(query, user_id):
+        # 1-3. Pre-routing: security guard, follow-up resolution, entity extraction,
+        # provider lookup, NLP analysis and fast classification (overlapped where
+        # independent). A confident read-only route may already be running.
+        pre = await self._pre_route(query, user_id, user_name, session_id, _metrics, _start_ts)
+        query = pre.query
+        active_providers = pre.active_providers
+        extracted_entities = pre.extracted_entities
+        fast_result = pre.fast_result
+        nlp_context = pre.nlp_context
+        
+        # Security verdict gates everything not already running speculatively
+        if not await pre.security:
+            if pre.speculative_agent:
+                await self._cancel_speculation(pre.speculative_agent, _metrics)
             _metrics["error"] = "security_blocked"
             self._record_metrics(_metrics, _start_ts)
             return "I cannot process that request due to security restrictions."
 
-        await self._emit_event('reasoning_start', "Understanding your request...")
-        
-        # 2. Follow-Up Reference Resolution (before any classification)
-        # Detect and rewrite vague references ("the email", "it", "that meeting") 
-        # using recent conversation history BEFORE the planner/router sees the query.
-        query = await self._resolve_followup_references(query, user_id, session_id)
-
-        # 2.5 Entity Extraction (pre-routing — resolve names before classification)
-        extracted_entities = None
-        if self.entity_extractor:
-            try:
-                extracted_entities = await self.entity_extractor.extract(query, user_id)
-                if extracted_entities and extracted_entities.has_entities:
-                    logger.info(
-                        f"[SupervisorAgent] Pre-resolved entities: "
-                        f"{extracted_entities.resolved_count} contacts, "
-                        f"{len(extracted_entities.unresolved_names)} unresolved"
-                    )
-                    _metrics["entities_resolved"] = extracted_entities.resolved_count
-            except Exception as e:
-                logger.debug(f"[SupervisorAgent] Entity extraction failed (non-critical): {e}")
-
         # 2.7 Research Bypass (Fast Path)
         if ResearchAgent.is_research_query(query):
             logger.info(f"Supervisor routing -> RESEARCH")
             _metrics["route"] = "research"
             await self._emit_event('domain_selected', DOMAIN_START_MESSAGES['research'], data={'domain': 'research'})
             _exec_start = _time.monotonic()
-            res = await self.agents["research"].run(query)
+            _metrics["first_agent_start_ms"] = round((_exec_start - _start_ts) * 1000)
+            res = await self._run_agent(self.agents["research"], query)
             _metrics["execution_ms"] = round((_time.monotonic() - _exec_start) * 1000)
             self._record_metrics(_metrics, _start_ts)
             return self._sanitize_response(res, user_id)
         
-        # 3. Fast-Path Classification (sub-5ms, no LLM call)
-        active_providers = await self._get_active_providers(user_id)
-        
-        fast_result = None
         _skip_enhancement = False
-        if self.fast_classifier:
-            fast_result = self.fast_classifier.classify(query, active_providers, user_id=user_id)
-            logger.info(
-                f"[SupervisorAgent] FastClassifier: skill={fast_result.skill_name}, "
-                f"confidence={fast_result.confidence:.2f}, needs_llm={fast_result.needs_llm}, "
-                f"reason={fast_result.reason}"
-            )
-            _metrics["fast_classifier_confidence"] = fast_result.confidence
-            _metrics["fast_classifier_skill"] = fast_result.skill_name
-        
-        # 3.5. NLP Analysis
-        nlp_context = {}
-        if self.nlp:
-            nlp_context = self.nlp.process_query(query)
-            if nlp_context.get('is_complex'):
-                logger.info(f"Complex query detected: {nlp_context['complexity_score']:.2f}")
 
         # 4. Routing Decision: Fast-Path vs LLM Planner
         #    - If FastClassifier resolved with high confidence → skip LLM entirely
@@ -1028,17 +1300,17 @@ CRITICAL ROUTING RULES:
                 agent = self.agents.get(domain)
             
             if agent and await self._is_service_enabled(domain, active_providers):
-                start_msg = DOMAIN_START_MESSAGES.get(domain, f"Working on {domain}...")
-                await self._emit_event('domain_selected', start_msg, data={'domain': domain})
+                agent_task = pre.speculative_agent
+                if agent_task is None:
+                    start_msg = DOMAIN_START_MESSAGES.get(domain, f"Working on {domain}...")
+                    await self._emit_event('domain_selected', start_msg, data={'domain': domain})
+                    agent_task = self._start_agent(
+                        pre, agent, self._agent_context(user_id, user_name, session_id, extracted_entities),
+                        _metrics, _start_ts
+                    )
                 
-                _exec_start = _time.monotonic()
                 try:
-                    agent_context = {'user_id': user_id, 'user_name': user_name, 'session_id': session_id}
-                    # Inject pre-resolved entities into agent context
-                    if extracted_entities and extracted_entities.has_entities:
-                        agent_context['resolved_entities'] = extracted_entities
-                        agent_context['resolved_contacts'] = extracted_entities.get_emails()
-                    final_result = await agent.run(query, context=agent_context)
+                    final_result = await agent_task
                     
                     # Phase 5: Record successful skill usage for personalization
                     if self.skill_tracker and fast_result.skill_name and user_id:
@@ -1046,7 +1318,7 @@ CRITICAL ROUTING RULES:
                 except Exception as e:
                     logger.error(f"[SupervisorAgent] Fast-path agent {domain} failed: {e}")
                     final_result = f"I encountered an error while processing your request: {str(e)}"
-                _metrics["execution_ms"] = round((_time.monotonic() - _exec_start) * 1000)
+                _metrics["execution_ms"] = round((_time.monotonic() - pre.agent_started_at) * 1000)
             elif not await self._is_service_enabled(domain, active_providers):
                 display_name = self._get_service_display_name(domain)
                 final_result = f"To help with that, you'll need to connect {display_name} in Settings → Integrations."
@@ -1084,6 +1356,7 @@ CRITICAL ROUTING RULES:
                     
                 # 5. Execution Logic
                 _exec_start = _time.monotonic()
+                _metrics["first_agent_start_ms"] = round((_exec_start - _start_ts) * 1000)
                 if steps:
                     _metrics["route"] = "multi_step"
                     final_result = await self._execute_multi_step_plan(
@@ -1099,7 +1372,7 @@ CRITICAL ROUTING RULES:
         # 6. Response Enhancement & Sanitation
         _enhance_start = _time.monotonic()
         if not _skip_enhancement:
-            enhanced = await self._enhance_response_stream(query, final_result, user_name)
+            enhanced = await self._enhance_response_stream(query, final_result, user_name, user_id)
         else:
             enhanced = None
             logger.info("[SupervisorAgent] Skipping enhancement for system-generated response")
@@ -1192,6 +1465,7 @@ CRITICAL ROUTING RULES:
         - routing distribution
         - error rate
         - average step count
+        - time to first agent start and speculative routing waste
         """
         metrics = getattr(self, "_obs_metrics", [])
         if not metrics:
@@ -1204,6 +1478,10 @@ CRITICAL ROUTING RULES:
         errors = 0
         total_steps = 0
 
+        agent_starts = [m["first_agent_start_ms"] for m in metrics if "first_agent_start_ms" in m]
+        speculative = sum(1 for m in metrics if m.get("speculative"))
+        wasted = sum(1 for m in metrics if m.get("speculation_wasted"))
+
         for m in metrics:
             route = m.get("route", "unknown")
             routing_dist[route] = routing_dist.get(route, 0) + 1
@@ -1228,6 +1506,14 @@ CRITICAL ROUTING RULES:
             "avg_execution_ms": round(
                 sum(m.get("execution_ms", 0) for m in metrics) / n
             ) if n else 0,
+            "avg_time_to_first_agent_ms": round(
+                sum(agent_starts) / len(agent_starts)
+            ) if agent_starts else 0,
+            "followup_skip_rate": round(
+                sum(1 for m in metrics if m.get("followup_skipped")) / n, 3
+            ) if n else 0,
+            "speculative_starts": speculative,
+            "speculation_waste_rate": round(wasted / speculative, 3) if speculative else 0,
         }
 
     # --- Follow-Up Reference Resolution ---
@@ -1249,6 +1535,21 @@ CRITICAL ROUTING RULES:
         re.IGNORECASE
     )
     
+    # Anaphora and answer-like replies that may depend on the previous turn.
+    # Queries matching neither this nor _FOLLOWUP_PATTERNS skip resolution.
+    _ANAPHORA_PATTERNS = re.compile(
+        r"\b(it|its|they|them|their|he|him|his|she|her|hers|one|ones|same)\b|"
+        r"\b(this|that|these|those)\s*(?:[?.!,]|$)|"
+        r"^\s*(yes|yeah|yep|no|nope|ok|okay|sure)\b|"
+        r"\b(?:email|address) is\b|"
+        r"[\w.+-]+@[\w-]+\.[\w.]+",
+        re.IGNORECASE
+    )
+    
+    def _has_followup_reference(self, query: str) -> bool:
+        """True if the query may refer back to the conversation (cheap, no I/O)."""
+        return bool(self._FOLLOWUP_PATTERNS.search(query) or self._ANAPHORA_PATTERNS.search(query))
+    
     async def _resolve_followup_references(
         self, query: str, user_id: Optional[int], session_id: Optional[str]
     ) -> str:
@@ -1270,11 +1571,12 @@ CRITICAL ROUTING RULES:
         # This catches the case where user is providing info the agent requested
         if not has_vague_reference and self.memory and user_id and session_id:
             try:
-                recent = await self.memory.get_recent_messages(
-                    user_id=user_id,
-                    session_id=session_id,
-                    limit=2
-                )
+                async with self._db_lock:
+                    recent = await self.memory.get_recent_messages(
+                        user_id=user_id,
+                        session_id=session_id,
+                        limit=2
+                    )
                 if recent:
                     # Find the last assistant message
                     last_assistant_msg = None
@@ -1325,11 +1627,12 @@ CRITICAL ROUTING RULES:
         conversation_history = ""
         try:
             if self.memory and user_id and session_id:
-                recent = await self.memory.get_recent_messages(
-                    user_id=user_id,
-                    session_id=session_id,
-                    limit=4
-                )
+                async with self._db_lock:
+                    recent = await self.memory.get_recent_messages(
+                        user_id=user_id,
+                        session_id=session_id,
+                        limit=4
+                    )
                 if recent:
                     history_lines = []
                     for msg in recent[-4:]:
@@ -1513,6 +1816,7 @@ CRITICAL ROUTING RULES:
         ]
         
         full_response = ""
+        output_stream = self._open_output_stream(user_id)
         try:
             # Stream the response using robust sync-to-async wrap
             for chunk in self.llm.stream(messages):
@@ -1520,8 +1824,9 @@ CRITICAL ROUTING RULES:
                 if content:
                     full_response += content
                     # Emit chunk to the event emitter for real-time streaming
-                    await self._emit_event('content_chunk', content, data={'chunk': content})
+                    await self._emit_content_chunk(output_stream, content)
                 await asyncio.sleep(0) # Yield control
+            await self._emit_content_chunk(output_stream, "", final=True)
             
             return full_response
         except Exception as e:
@@ -1562,104 +1867,37 @@ CRITICAL ROUTING RULES:
         summary = ", ".join([s.get('domain', 'general').title() for s in steps])
         await self._emit_event('supervisor_plan_created', f"I'll check: {summary}", data={'steps': steps})
         
-        # Identify dependencies (uses explicit depends_on from planner)
-        dep_indices = []
-        ind_indices = []
-        for i, s in enumerate(steps):
-            if s.get("depends_on", []):
-                dep_indices.append(i)
-            else:
-                ind_indices.append(i)
-        
-        step_results: List[StepResult] = []
-        context_text = ""  # Accumulated text for dependent steps
-        
-        # Run independent steps in parallel (budget-aware)
-        if ind_indices:
-            elapsed = _time.monotonic() - budget_start
-            remaining = self.EXECUTION_BUDGET_SECONDS - elapsed
-            
-            if remaining > 2.0:
-                with LatencyMonitor("Parallel Steps", threshold_ms=30000):
-                    tasks = [
-                        asyncio.wait_for(
-                            self._execute_single_step(
-                                steps[i], i+1, "", user_id, user_name, session_id, active_providers
-                            ),
-                            timeout=min(self.PER_STEP_TIMEOUT_SECONDS, remaining)
-                        ) for i in ind_indices
-                    ]
-                    raw_results = await asyncio.gather(*tasks, return_exceptions=True)
-                    for i, r in zip(ind_indices, raw_results):
-                        if isinstance(r, asyncio.TimeoutError):
-                            sr = StepResult(
-                                step_id=f"step_{i+1}", tool="", domain=steps[i].get("domain", "unknown"),
-                                success=False, result="Timed out.",
-                                execution_time=self.PER_STEP_TIMEOUT_SECONDS, error="timeout",
-                                timestamp=datetime.utcnow().isoformat()
-                            )
-                        elif isinstance(r, Exception):
-                            sr = StepResult(
-                                step_id=f"step_{i+1}", tool="", domain=steps[i].get("domain", "unknown"),
-                                success=False, result=str(r),
-                                execution_time=0, error=str(r),
-                                timestamp=datetime.utcnow().isoformat()
-                            )
-                        else:
-                            sr = r
-                        step_results.append(sr)
-                        context_text += self._format_step_result(sr)
-            else:
-                context_text += "\n[Budget exceeded before parallel steps could run]\n"
+        async def run_step(step: Dict[str, Any], step_num: int, context_str: str) -> StepResult:
+            return await self._execute_single_step(
+                step, step_num, context_str, user_id, user_name, session_id, active_providers
+            )
         
-        # Run dependent steps sequentially (budget-aware)
-        for i in dep_indices:
-            elapsed = _time.monotonic() - budget_start
-            remaining = self.EXECUTION_BUDGET_SECONDS - elapsed
-            
-            if remaining <= 2.0:
-                sr = StepResult(
-                    step_id=f"step_{i+1}", tool="", domain=steps[i].get("domain", "unknown"),
-                    success=False, result=f"Skipped (budget of {self.EXECUTION_BUDGET_SECONDS}s exceeded).",
-                    execution_time=0, error="budget_exceeded",
-                    timestamp=datetime.utcnow().isoformat()
-                )
-                step_results.append(sr)
-                context_text += self._format_step_result(sr)
-                logger.warning(f"[SupervisorAgent] Step {i+1} skipped — budget exhausted ({elapsed:.1f}s used)")
-                continue
-            
-            try:
-                sr = await asyncio.wait_for(
-                    self._execute_single_step(
-                        steps[i], i+1, context_text, user_id, user_name, session_id, active_providers
-                    ),
-                    timeout=min(self.PER_STEP_TIMEOUT_SECONDS, remaining)
-                )
-            except asyncio.TimeoutError:
-                sr = StepResult(
-                    step_id=f"step_{i+1}", tool="", domain=steps[i].get("domain", "unknown"),
-                    success=False, result="Timed out.",
-                    execution_time=remaining, error="timeout",
-                    timestamp=datetime.utcnow().isoformat()
-                )
-            except Exception as e:
-                sr = StepResult(
-                    step_id=f"step_{i+1}", tool="", domain=steps[i].get("domain", "unknown"),
-                    success=False, result=str(e),
-                    execution_time=0, error=str(e),
-                    timestamp=datetime.utcnow().isoformat()
-                )
-            step_results.append(sr)
-            context_text += self._format_step_result(sr)
-            
+        async def preview(index: int, sr: StepResult):
             # Stream step result preview to frontend
             if self.event_emitter:
-                preview = sr.get("result", "")[:200]
-                await self._emit_event('step_result_preview', preview, data={
-                    'step': i+1, 'domain': sr.get('domain'), 'success': sr.get('success')
+                await self._emit_event('step_result_preview', str(sr.get("result", ""))[:200], data={
+                    'step': index + 1, 'domain': sr.get('domain'), 'success': sr.get('success')
                 })
         
+        # Run the plan as a DAG (uses explicit depends_on from planner): each step
+        # starts once its dependencies succeed; dependents of a failed step are skipped
+        scheduler = PlanScheduler(
+            run_step,
+            step_timeout=self.PER_STEP_TIMEOUT_SECONDS,
+            budget_seconds=self.EXECUTION_BUDGET_SECONDS - (_time.monotonic() - budget_start),
+            domain_of=lambda s: DOMAIN_ALIASES.get(s.get("domain", "general").lower(), s.get("domain", "general").lower()),
+            format_result=self._format_step_result,
+            on_step_done=preview,
+        )
+        with LatencyMonitor("Plan Steps", threshold_ms=30000):
+            step_results, trace = await scheduler.run(steps)
+        
+        context_text = "".join(self._format_step_result(sr) for sr in step_results)
+        
+        # Plan trace: which chain of agents set the plan's latency
+        logger.info(f"[PlanTrace] Critical path: {trace.format()}")
+        await self._emit_event('supervisor_plan_trace', f"Plan finished in {trace.total_seconds:.1f}s", data=trace.to_dict())
+        
         # Step-level observability (#11)
         failed_count = 0
         for sr in step_results:
@@ -1786,7 +2024,7 @@ CRITICAL ROUTING RULES:
                 logger.debug(f"[SupervisorAgent] Could not fetch context for single routing: {e}")
         
             with LatencyMonitor(f"Agent Execution: {target_agent}"):
-                final_result = await agent.run(query, context=ctx)
+                final_result = await self._run_agent(agent, query, context=ctx)
             
             await self._emit_event('tool_complete', f"Done with {target_agent}", data={'tool': target_agent})
             return final_result
@@ -5,6 +5,7 @@ Provides AI/ML capabilities for the Clavr platform.
 
 Core Components:
 - LLM Factory: Create and manage LLM instances (Gemini via LangChain)
+- LLM Gateway: Concurrency/rate limits, coalescing and caching for all LLM calls
 - Prompts: Centralized prompt templates for all domains
 - RAG: Retrieval-Augmented Generation for context-aware responses
 - Query Classifier: LLM-based query intent classification
@@ -23,6 +24,9 @@ Example Usage:
 # LLM Factory
 from .llm_factory import LLMFactory
 
+# LLM Gateway
+from .llm_gateway import LLMGateway, get_llm_gateway, llm_call_context
+
 # LLM Constants
 from .llm_constants import (
     DEFAULT_TEMPERATURE,
@@ -39,6 +43,9 @@ from .conversation_memory import ConversationMemory
 # Profile Builder
 from .profile_builder import ProfileBuilder
 
+# Local token counting (context budgets)
+from .token_counter import TokenCounter, get_token_counter
+
 # Context Assembler (unified context for agents)
 from .context_assembler import (
     ContextAssembler,
@@ -61,6 +68,9 @@ from .rag import (
 __all__ = [
     # LLM
     "LLMFactory",
+    "LLMGateway",
+    "get_llm_gateway",
+    "llm_call_context",
     "DEFAULT_TEMPERATURE",
     "DEFAULT_PRIMARY_LLM",
     "SUPPORTED_PROVIDERS",
@@ -88,6 +98,8 @@ __all__ = [
     "AssembledContext",
     "get_context_assembler",
     "init_context_assembler",
+    "TokenCounter",
+    "get_token_counter",
 ]
 
 # ============================================================================
@@ -0,0 +1,386 @@
+"""
+Shared Intent Classification Cache
+
+Cross-request, cross-process cache for QueryClassifier results, so repeat
+and near-repeat queries skip the LLM classification call.
+
+Tiers:
+- Exact: keyed on the normalized query text (case, whitespace, quotes and
+  trailing punctuation folded). Stored in Redis so API and Celery workers
+  share it; degrades to a bounded per-process LRU when Redis is down.
+- Near-hit (optional): embedding similarity against recently classified
+  queries in this process. Only classifications at or above a confidence
+  threshold are reused, and only if the two queries agree on entities and
+  filters in both directions: every extracted entity value must appear in
+  the new query, the new query may add nothing but filler words (so it
+  cannot carry an extra or different entity), and filter flags (unread,
+  important, ...) must match. "emails from John" never answers
+  "emails from Jane" or "unread emails from John and Jane".
+
+Keys carry a classifier version (hash of the prompt, output schema and
+model), so changing the classification prompt invalidates old entries.
+
+Usage:
+    cache = get_classification_cache(version, embedder_factory=lambda: provider)
+    result = cache.get(query)
+    if result is None:
+        result = classify(query)
+        cache.put(query, result)
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.logger import setup_logger
+from src.utils.urls import URLs
+
+logger = setup_logger(__name__)
+
+# How long a classification is reused
+INTENT_CACHE_TTL_SECONDS = 60 * 60 * 24
+# In-process fallback entries when Redis is unavailable
+INTENT_CACHE_LOCAL_SIZE = 5000
+# Recently classified queries searchable by embedding similarity
+INTENT_NEAR_HIT_INDEX_SIZE = 2000
+# Cosine similarity a near-hit must reach
+INTENT_NEAR_HIT_THRESHOLD = 0.92
+# Only confident classifications are reused for rephrased queries
+INTENT_NEAR_HIT_MIN_CONFIDENCE = 0.8
+
+_REDIS_RETRY_SECONDS = 60
+_CACHE_KEY = "intent:cls:{version}:{digest}"
+
+# Embeddings of recent misses, reused when the classification is put
+_PENDING_VECTORS_SIZE = 256
+
+# Words a rephrasing may add without changing entities or filters
+_FILLER_WORDS = frozenset("""
+a an the my me i i'm you your we us our it its this that these those
+please pls could would can will should may might just also now then
+hey hi hello thanks thank show list find get give see check tell pull up
+what what's whats which is are was were be do does did have has there
+any some all of for on in at about kindly quickly
+""".split())
+
+# Filter flags (classification 'filters') and the words that express them
+_FILTER_TERMS: Dict[str, Tuple[str, ...]] = {
+    'unread': ('unread', 'new', 'unopened'),
+    'important': ('important', 'priority', 'urgent'),
+    'attachment': ('attachment', 'attachments', 'attached'),
+    'flag': ('flag', 'flagged', 'starred', 'star'),
+}
+
+_QUOTES = str.maketrans({'‘': "'", '’': "'", '“': '"', '”': '"'})
+_TRAILING_PUNCT_RE = re.compile(r"[\s?!.,;:]+$")
+
+
+def normalize_query(query: str) -> str:
+    """Fold case, unicode forms, quotes, whitespace and trailing punctuation."""
+    text = unicodedata.normalize("NFKC", query or "").translate(_QUOTES).casefold()
+    text = " ".join(text.split())
+    return _TRAILING_PUNCT_RE.sub("", text)
+
+
+def classifier_version(*parts: str) -> str:
+    """Short, stable hash of everything that changes classification output."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part.encode("utf-8", errors="replace"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:12]
+
+
+def _entity_values(entities: Any) -> List[str]:
+    """Flatten extracted entity values to strings."""
+    if isinstance(entities, dict):
+        return [v for value in entities.values() for v in _entity_values(value)]
+    if isinstance(entities, (list, tuple, set)):
+        return [v for value in entities for v in _entity_values(value)]
+    if isinstance(entities, str):
+        return [entities]
+    return []
+
+
+def _filter_flags(normalized: str) -> set:
+    """Filter flags expressed by the words of a normalized query."""
+    words = set(normalized.split())
+    return {flag for flag, terms in _FILTER_TERMS.items() if words.intersection(terms)}
+
+
+class ClassificationCache:
+    """
+    Bounded, versioned classification cache with an optional near-hit tier.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        redis_url: Optional[str] = None,
+        ttl_seconds: int = INTENT_CACHE_TTL_SECONDS,
+        local_size: int = INTENT_CACHE_LOCAL_SIZE,
+        embedder_factory: Optional[Callable[[], Any]] = None,
+        similarity_threshold: float = INTENT_NEAR_HIT_THRESHOLD,
+        min_confidence: float = INTENT_NEAR_HIT_MIN_CONFIDENCE,
+        index_size: int = INTENT_NEAR_HIT_INDEX_SIZE,
+    ):
+        self.version = version
+        self.redis_url = redis_url or URLs.REDIS
+        self.ttl_seconds = ttl_seconds
+        self.local_size = local_size
+        self.similarity_threshold = similarity_threshold
+        self.min_confidence = min_confidence
+        self.index_size = index_size
+
+        self._client = None
+        self._retry_at = 0.0
+        self._local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Near-hit index: ring buffer of unit vectors + (normalized query, expires_at, classification)
+        self._embedder_factory = embedder_factory
+        self._embedder = None
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Optional[Tuple[str, float, Dict[str, Any]]]] = []
+        self._next_slot = 0
+        # normalized query -> embedding computed by a missed get(), for put()
+        self._pending_vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+        self._stats = {
+            'exact_hits': 0,
+            'near_hits': 0,
+            'near_rejected': 0,
+            'misses': 0,
+            'writes': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Cached classification for query (exact, then near-hit), or None."""
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+
+        raw = self._get_raw(self._key(normalized))
+        if raw is not None:
+            try:
+                classification = json.loads(raw)
+                self._count('exact_hits')
+                return classification
+            except ValueError:
+                pass
+
+        classification = self._near_hit(normalized)
+        self._count('near_hits' if classification is not None else 'misses')
+        return classification
+
+    def put(self, query: str, classification: Dict[str, Any]) -> None:
+        """Store a classification for query (and index it for near-hits)."""
+        normalized = normalize_query(query)
+        if not normalized or not classification:
+            return
+        try:
+            raw = json.dumps(classification, default=str)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"[ClassificationCache] Unserializable classification: {e}")
+            return
+        self._put_raw(self._key(normalized), raw)
+        self._count('writes')
+
+        if float(classification.get('confidence') or 0.0) >= self.min_confidence:
+            self._index(normalized, classification)
+
+    def _key(self, normalized: str) -> str:
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        return _CACHE_KEY.format(version=self.version, digest=digest)
+
+    # ------------------------------------------------------------------
+    # Exact tier storage (Redis with in-process fallback)
+    # ------------------------------------------------------------------
+
+    def _redis(self):
+        if self._client is None and time.time() >= self._retry_at:
+            try:
+                import redis
+                client = redis.from_url(self.redis_url, decode_responses=True, socket_timeout=1)
+                client.ping()
+                self._client = client
+            except Exception as e:
+                logger.warning(f"[ClassificationCache] Redis unavailable, using in-process cache: {e}")
+                self._retry_at = time.time() + _REDIS_RETRY_SECONDS
+        return self._client
+
+    def _get_raw(self, key: str) -> Optional[str]:
+        client = self._redis()
+        if client is not None:
+            try:
+                return client.get(key)
+            except Exception as e:
+                logger.warning(f"[ClassificationCache] Read failed: {e}")
+                return None
+        with self._lock:
+            entry = self._local.get(key)
+            if entry and entry[0] > time.time():
+                self._local.move_to_end(key)
+                return entry[1]
+        return None
+
+    def _put_raw(self, key: str, raw: str) -> None:
+        client = self._redis()
+        if client is not None:
+            try:
+                client.set(key, raw, ex=self.ttl_seconds)
+                return
+            except Exception as e:
+                logger.warning(f"[ClassificationCache] Write failed: {e}")
+        with self._lock:
+            self._local[key] = (time.time() + self.ttl_seconds, raw)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Near-hit tier
+    # ------------------------------------------------------------------
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        if self._embedder is None:
+            if self._embedder_factory is None:
+                return None
+            try:
+                self._embedder = self._embedder_factory()
+            except Exception as e:
+                logger.warning(f"[ClassificationCache] Near-hit tier disabled, no embedder: {e}")
+            # Only try to build the embedder once
+            self._embedder_factory = None
+            if self._embedder is None:
+                return None
+        try:
+            encode = getattr(self._embedder, "encode_query", None) or self._embedder.encode
+            vector = np.asarray(encode(text), dtype=np.float32)
+        except Exception as e:
+            logger.debug(f"[ClassificationCache] Embedding failed: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def _index(self, normalized: str, classification: Dict[str, Any]) -> None:
+        with self._lock:
+            vector = self._pending_vectors.pop(normalized, None)
+        if vector is None:
+            vector = self._embed(normalized)
+        if vector is None:
+            return
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._vectors = np.zeros((self.index_size, vector.shape[0]), dtype=np.float32)
+                self._entries = [None] * self.index_size
+                self._next_slot = 0
+            slot = self._next_slot
+            self._vectors[slot] = vector
+            self._entries[slot] = (normalized, time.time() + self.ttl_seconds, classification)
+            self._next_slot = (slot + 1) % self.index_size
+
+    def _near_hit(self, normalized: str) -> Optional[Dict[str, Any]]:
+        if self._vectors is None:
+            return None
+        vector = self._embed(normalized)
+        if vector is None:
+            return None
+
+        with self._lock:
+            # A miss is followed by put() for the same query: keep its embedding
+            self._pending_vectors[normalized] = vector
+            self._pending_vectors.move_to_end(normalized)
+            while len(self._pending_vectors) > _PENDING_VECTORS_SIZE:
+                self._pending_vectors.popitem(last=False)
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                return None
+            similarities = self._vectors @ vector
+            # Most similar first; stop at the threshold
+            for slot in np.argsort(-similarities)[:5]:
+                if similarities[slot] < self.similarity_threshold:
+                    break
+                entry = self._entries[slot]
+                if entry is None or entry[1] <= time.time():
+                    continue
+                if self._compatible(entry[0], entry[2], normalized):
+                    self._pending_vectors.pop(normalized, None)
+                    return entry[2]
+                self._stats['near_rejected'] += 1
+        return None
+
+    @staticmethod
+    def _compatible(cached_query: str, classification: Dict[str, Any], normalized: str) -> bool:
+        """
+        A near-hit is only valid if both queries have the same entities and
+        filters: the cached entities occur in the new query, the new query
+        adds no non-filler words, and both express the same filter flags.
+        """
+        for value in _entity_values(classification.get('entities')):
+            value = normalize_query(value)
+            if len(value) >= 2 and value not in normalized:
+                return False
+
+        added = set(normalized.split()) - set(cached_query.split()) - _FILLER_WORDS
+        if added:
+            return False
+
+        flags = _filter_flags(cached_query) | {
+            str(flag).lower() for flag in classification.get('filters') or [] if str(flag).lower() in _FILTER_TERMS
+        }
+        return flags == _filter_flags(normalized)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['local_entries'] = len(self._local)
+            stats['indexed_queries'] = sum(1 for entry in self._entries if entry is not None)
+        lookups = stats['exact_hits'] + stats['near_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['exact_hits'] + stats['near_hits']) / lookups, 3) if lookups else 0.0
+        stats['version'] = self.version
+        stats['backend'] = 'redis' if self._client is not None else 'local'
+        return stats
+
+
+# Shared caches, one per classifier version
+_caches: Dict[str, ClassificationCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_classification_cache(
+    version: str,
+    embedder_factory: Optional[Callable[[], Any]] = None
+) -> ClassificationCache:
+    """Get the process-wide cache for a classifier version."""
+    cache = _caches.get(version)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(version)
+            if cache is None:
+                cache = _caches[version] = ClassificationCache(version, embedder_factory=embedder_factory)
+    return cache
+
+
+def get_all_classification_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every classifier version used in this process."""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {version: cache.get_stats() for version, cache in caches.items()}
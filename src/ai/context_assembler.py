@@ -20,15 +20,9 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, TYPE_CHECKING, Tuple
 from dataclasses import dataclass, field
 
-# Attempt to import tiktoken for accurate budget management
-try:
-    import tiktoken
-    HAS_TIKTOKEN = True
-except ImportError:
-    HAS_TIKTOKEN = False
-
 from src.utils.logger import setup_logger
 from src.utils.config import Config
+from src.ai.token_counter import TokenCounter, TokenLedger, get_token_counter
 
 if TYPE_CHECKING:
     from src.ai.conversation_memory import ConversationMemory
@@ -168,19 +162,8 @@ class AssembledContext:
         )
     
     def get_token_count(self, model: str = "gpt-4") -> int:
-        """Estimate token count for the assembled context."""
-        if not HAS_TIKTOKEN:
-            return len(self.to_prompt_context()) // 4
-        
-        try:
-            if "gemini" in model.lower():
-                encoding = tiktoken.get_encoding("cl100k_base")
-            else:
-                encoding = tiktoken.encoding_for_model(model)
-            return len(encoding.encode(self.to_prompt_context()))
-        except Exception:
-            # Fallback to character-based approximation if encoding fails
-            return len(self.to_prompt_context()) // 4
+        """Token count for the assembled context (local, calibrated per model family)."""
+        return get_token_counter(model).count(self.to_prompt_context())
 
 
 class ContextPruner:
@@ -188,18 +171,10 @@ class ContextPruner:
     Intelligent filter that deduplicates and prunes context to fit a token budget.
     """
     
-    def __init__(self, model: str = "gpt-4"):
+    def __init__(self, model: str = "gpt-4", counter: Optional[TokenCounter] = None):
         self.model = model
-        self.encoding = None
-        if HAS_TIKTOKEN:
-            try:
-                if "gemini" in model.lower():
-                    self.encoding = tiktoken.get_encoding("cl100k_base")
-                else:
-                    self.encoding = tiktoken.encoding_for_model(model)
-            except Exception:
-                # Model not recognized, use no encoding (will fallback to char count)
-                pass
+        # Shared per model family; counts are cached by content hash across passes
+        self.counter = counter or get_token_counter(model)
 
     def prune(
         self, 
@@ -321,16 +296,21 @@ class ContextPruner:
 
     def _pack_to_budget(self, context: AssembledContext, items: List[Dict[str, Any]], budget: int):
         """Selects items until budget is full."""
-        current_tokens = self._count_tokens(context.to_prompt_context())
+        # Base context (Conversation and Insights) always stays; count it once
+        # without the prunable sections, then add accepted items incrementally.
+        has_graph = bool(context.graph_context.get('results'))
+        context.semantic_facts = []
+        if has_graph:
+            context.graph_context['results'] = []
+        ledger = TokenLedger(self.counter)
+        ledger.add('base', context.to_prompt_context())
         
-        # Base context (Conversation and Insights) usually stays
-        # We prune the rest:
         final_facts = []
         final_graph = []
         final_cross: Dict[str, List[Dict[str, Any]]] = {}
         
-        for item in items:
-            if current_tokens + item['tokens'] > budget:
+        for index, item in enumerate(items):
+            if ledger.total + item['tokens'] > budget:
                 continue
                 
             if item['type'] == 'facts':
@@ -344,18 +324,16 @@ class ContextPruner:
                     final_cross[app_name] = []
                 final_cross[app_name].append(item['data'])
             
-            current_tokens += item['tokens']
+            ledger.add(index, item['data'].get('content', ''))
             
         context.semantic_facts = final_facts
-        if context.graph_context.get('results'):
+        if has_graph:
             context.graph_context['results'] = final_graph
         if final_cross:
             context.cross_app_content = final_cross
 
     def _count_tokens(self, text: str) -> int:
-        if self.encoding:
-            return len(self.encoding.encode(text))
-        return len(text) // 4
+        return self.counter.count(text)
 
 
 class ContextAssembler:
@@ -408,6 +386,8 @@ class ContextAssembler:
         self.insight_service = insight_service
         self.temporal_indexer = temporal_indexer
         self.temporal_reasoner = temporal_reasoner
+        self._genai_model = None
+        self._calibration_tasks: set = set()
         
     async def assemble_context(
         self,
@@ -490,27 +470,42 @@ class ContextAssembler:
                 
         # --- NEW: Pruning & Reranking Stage ---
         try:
-            # use_approx=True ensures we use fast local counting (cl100k_base) for the intensive loop
+            # Local counting only: budgeting never waits on the network
             pruner = ContextPruner(model=self.config.ai.model)
             context = pruner.prune(context, budget=token_budget, intent=intent)
             
-            # --- HYBRID APPROACH ---
-            # Use SDK for precise final count if it's a Gemini model
-            # This follows the "once or twice per query" rule for SDK usage
-            if "gemini" in self.config.ai.model.lower() and self.config.ai.api_key:
-                context.token_count = await self._count_tokens_exact(context.to_prompt_context())
-            else:
-                context.token_count = context.get_token_count(model=self.config.ai.model)
+            prompt = context.to_prompt_context()
+            context.token_count = pruner.counter.count(prompt)
+            
+            # Occasionally compare with the provider's count to keep the
+            # local calibration within its error bound (off the critical path)
+            if ("gemini" in self.config.ai.model.lower() and self.config.ai.api_key
+                    and pruner.counter.should_sample()):
+                self._calibrate_in_background(pruner.counter, prompt)
                 
         except Exception as prune_err:
             logger.error(f"[ContextAssembler] Pruning/Counting failed: {prune_err}")
             
         return context
     
-    async def _count_tokens_exact(self, text: str) -> int:
+    def _calibrate_in_background(self, counter: TokenCounter, text: str) -> None:
+        """Fetch the provider's count for text and feed it to the counter's calibration."""
+        async def _calibrate():
+            exact = await self._count_tokens_exact(text)
+            if exact:
+                counter.calibrate(text, exact)
+        
+        try:
+            task = asyncio.get_running_loop().create_task(_calibrate())
+        except RuntimeError:
+            return
+        self._calibration_tasks.add(task)
+        task.add_done_callback(self._calibration_tasks.discard)
+
+    async def _count_tokens_exact(self, text: str) -> Optional[int]:
         """
         Get exact token count using Google GenAI SDK.
-        This involves a network call, so use sparingly (e.g. final prompt check).
+        This involves a network call - only used for calibration sampling.
         """
         if not text:
             return 0
@@ -518,29 +513,17 @@ class ContextAssembler:
         try:
             import google.generativeai as genai
             
-            # Ensure configured (idempotent-ish check)
-            if not getattr(genai, 'configure', None):
-                 return len(text) // 4 # Fallback
-            
-            # We assume configure was called in LLMFactory or EmbeddingProvider, 
-            # but to be safe/independent:
-            if not genai._client: # Rough check if configured
-                 genai.configure(api_key=self.config.ai.api_key)
-            
-            model = genai.GenerativeModel(self.config.ai.model)
-            response = await model.count_tokens_async(text)
+            if self._genai_model is None:
+                # We assume configure was called in LLMFactory or EmbeddingProvider, 
+                # but to be safe/independent:
+                if not genai._client: # Rough check if configured
+                    genai.configure(api_key=self.config.ai.api_key)
+                self._genai_model = genai.GenerativeModel(self.config.ai.model)
+            response = await self._genai_model.count_tokens_async(text)
             return response.total_tokens
         except Exception as e:
-            logger.warning(f"Failed to get exact token count from SDK: {e}. Falling back to approximation.")
-            # Fallback to local approximation logic
-            if HAS_TIKTOKEN:
-                try:
-                    enc = tiktoken.get_encoding("cl100k_base")
-                    return len(enc.encode(text))
-                except Exception:
-                    # Encoding failed, use character approximation
-                    pass
-            return len(text) // 4
+            logger.debug(f"Provider token count for calibration failed: {e}")
+            return None
         
     async def _fetch_conversation(
         self,
@@ -22,10 +22,12 @@ import re
 from typing import List, Dict, Any, Optional, TYPE_CHECKING
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, and_, func, or_
+from sqlalchemy import select, delete, insert, exists, literal, and_, func, or_
 
 from ..database.models import ConversationMessage
 from ..utils.logger import setup_logger
+from .conversation_search import ConversationSearchIndex
+from .conversation_summarizer import ConversationSummarizer
 from .rag.query.rules import SEARCH_STOPWORDS
 from .memory.semantic_memory import SemanticMemory
 from .memory.extractor import FactExtractor
@@ -35,7 +37,9 @@ from .memory_constants import (
     DEFAULT_MESSAGE_LIMIT, DEFAULT_MAX_AGE_MINUTES, DEFAULT_CLEANUP_DAYS,
     DEFAULT_CONTEXT_LIMIT, SESSION_ID_DISPLAY_LENGTH, ENTITY_TYPES,
     DEFAULT_CONVERSATION_LIST_LIMIT, DEFAULT_CONVERSATION_MESSAGES_LIMIT,
-    PREVIEW_MESSAGE_LENGTH, DEFAULT_PREVIEW_TEXT
+    PREVIEW_MESSAGE_LENGTH, DEFAULT_PREVIEW_TEXT,
+    SUMMARY_STATUS_PENDING, SUMMARY_STATUS_COMPLETED,
+    TIERING_BATCH_SIZE, WARM_TIER_RETENTION_DAYS
 )
 
 
@@ -118,6 +122,9 @@ class ConversationMemory:
         # Initialize Semantic Memory (Fact Store)
         self.semantic = SemanticMemory(db, rag_engine)
         self.extractor = FactExtractor()
+
+        # Full-text keyword index (maintained on insert)
+        self.search_index = ConversationSearchIndex(db)
     
     async def add_message(
         self,
@@ -232,6 +239,8 @@ class ConversationMemory:
             )
             
             self.db.add(message)
+            await self.db.flush()
+            await self._index_message_for_search(message)
             await self.db.commit()
             await self.db.refresh(message)
             
@@ -343,7 +352,9 @@ class ConversationMemory:
     
     async def clear_old_messages(
         self,
-        days: int = DEFAULT_CLEANUP_DAYS
+        days: int = DEFAULT_CLEANUP_DAYS,
+        batch_size: int = TIERING_BATCH_SIZE,
+        summarizer: Optional[ConversationSummarizer] = None
     ) -> int:
         """
         Tiered conversation retention: summarize → then delete raw messages.
@@ -353,8 +364,17 @@ class ConversationMemory:
         - Warm (30-180 days): Summarized into ConversationSummary (1 row per session)
         - Cold (180+ days): Only Qdrant vectors survive for semantic recall
         
+        Runs as set-based SQL over all eligible sessions rather than per session:
+        1. Stage a 'pending' summary for every old session without one (INSERT ... SELECT)
+        2. Fill pending summaries with the batched summarizer (several sessions per LLM call)
+        3. Delete old messages whose session summary is 'completed', in bounded batches
+        
+        Every batch commits, so an interrupted run resumes where it stopped.
+        
         Args:
             days: Summarize and delete messages older than N days (default: 30)
+            batch_size: Sessions staged / messages deleted per statement
+            summarizer: Optional summarizer (defaults to LLM-backed ConversationSummarizer)
             
         Returns:
             Number of messages deleted (0 on error)
@@ -362,110 +382,12 @@ class ConversationMemory:
         try:
             cutoff = datetime.utcnow() - timedelta(days=days)
             
-            # 1. Find sessions with messages about to be deleted
-            from sqlalchemy import func, distinct
-            
-            session_query = (
-                select(
-                    ConversationMessage.session_id,
-                    ConversationMessage.user_id,
-                    func.count(ConversationMessage.id).label('msg_count'),
-                    func.min(ConversationMessage.timestamp).label('first_msg'),
-                    func.max(ConversationMessage.timestamp).label('last_msg'),
-                )
-                .where(ConversationMessage.timestamp < cutoff)
-                .group_by(ConversationMessage.session_id, ConversationMessage.user_id)
-            )
-            
-            result = await self.db.execute(session_query)
-            sessions_to_summarize = result.fetchall()
-            
-            # 2. For each session, create a warm-tier summary
-            from src.database.models import ConversationSummary
-            
-            for row in sessions_to_summarize:
-                session_id = row.session_id
-                user_id = row.user_id
-                
-                # Check if summary already exists
-                existing = await self.db.execute(
-                    select(ConversationSummary).where(
-                        ConversationSummary.user_id == user_id,
-                        ConversationSummary.session_id == session_id
-                    )
-                )
-                if existing.scalar_one_or_none():
-                    continue  # Already summarized
-                
-                # Fetch messages for this session to build summary
-                msgs_result = await self.db.execute(
-                    select(ConversationMessage)
-                    .where(
-                        ConversationMessage.session_id == session_id,
-                        ConversationMessage.user_id == user_id,
-                        ConversationMessage.timestamp < cutoff
-                    )
-                    .order_by(ConversationMessage.timestamp)
-                    .limit(50)
-                )
-                messages = msgs_result.scalars().all()
-                
-                if not messages:
-                    continue
-                
-                # Build text summary (lightweight — no LLM needed for the basic version)
-                conversation_lines = []
-                key_facts = []
-                agents_used = {}
-                
-                for msg in messages:
-                    role_label = "User" if msg.role == "user" else "Assistant"
-                    content_preview = (msg.content or "")[:150]
-                    conversation_lines.append(f"{role_label}: {content_preview}")
-                    
-                    # Track agents used
-                    if msg.active_agent:
-                        agents_used[msg.active_agent] = agents_used.get(msg.active_agent, 0) + 1
-                    
-                    # Extract intents as key facts
-                    if msg.intent and msg.intent not in key_facts:
-                        key_facts.append(f"Intent: {msg.intent}")
-                
-                # Determine primary agent
-                primary_agent = max(agents_used, key=agents_used.get) if agents_used else None
-                
-                # Build summary text
-                summary_text = f"Conversation with {len(messages)} messages. "
-                if key_facts:
-                    summary_text += f"Topics: {', '.join(key_facts[:5])}. "
-                summary_text += "Excerpt: " + " | ".join(conversation_lines[:5])
-                
-                # Create warm-tier summary
-                summary = ConversationSummary(
-                    user_id=user_id,
-                    session_id=session_id,
-                    summary=summary_text[:2000],
-                    key_facts=key_facts[:20],
-                    message_count=row.msg_count,
-                    primary_agent=primary_agent,
-                    first_message_at=row.first_msg,
-                    last_message_at=row.last_msg,
-                    expires_at=datetime.utcnow() + timedelta(days=180),
-                )
-                self.db.add(summary)
-            
-            # 3. Now delete the raw messages (they're preserved in summaries)
-            stmt = delete(ConversationMessage).where(
-                ConversationMessage.timestamp < cutoff
-            )
-            
-            result = await self.db.execute(stmt)
-            await self.db.commit()
-            
-            deleted = result.rowcount
+            staged = await self._stage_pending_summaries(cutoff, batch_size)
+            summarized = await (summarizer or ConversationSummarizer()).summarize_pending(self.db, cutoff)
+            deleted = await self._delete_summarized_messages(cutoff, batch_size)
             
             logger.info(
-                f"{LOG_INFO} Tiered cleanup: summarized {len(sessions_to_summarize)} sessions, "
+                f"{LOG_INFO} Tiered cleanup: staged {staged} sessions, summarized {summarized}, "
                 f"deleted {deleted} old messages (older than {days} days)"
             )
             return deleted
@@ -479,7 +401,77 @@ class ConversationMemory:
             await self.db.rollback()
             return 0
     
-    async def clear_warm_tier(self, max_age_days: int = 180) -> int:
+    async def _stage_pending_summaries(self, cutoff: datetime, batch_size: int) -> int:
+        """Create one 'pending' warm-tier summary per old, unsummarized session."""
+        from src.database.models import ConversationSummary
+        
+        now = datetime.utcnow()
+        already_summarized = exists().where(
+            ConversationSummary.user_id == ConversationMessage.user_id,
+            ConversationSummary.session_id == ConversationMessage.session_id
+        )
+        sessions = (
+            select(
+                ConversationMessage.user_id,
+                ConversationMessage.session_id,
+                literal(''),
+                literal(SUMMARY_STATUS_PENDING),
+                func.count(ConversationMessage.id),
+                func.min(ConversationMessage.timestamp),
+                func.max(ConversationMessage.timestamp),
+                literal(now),
+                literal(now + timedelta(days=WARM_TIER_RETENTION_DAYS)),
+            )
+            .where(ConversationMessage.timestamp < cutoff, ~already_summarized)
+            .group_by(ConversationMessage.user_id, ConversationMessage.session_id)
+            .limit(batch_size)
+        )
+        stmt = insert(ConversationSummary).from_select(
+            ['user_id', 'session_id', 'summary', 'status', 'message_count',
+             'first_message_at', 'last_message_at', 'created_at', 'expires_at'],
+            sessions
+        )
+        
+        staged = 0
+        while True:
+            result = await self.db.execute(stmt)
+            await self.db.commit()
+            if not result.rowcount or result.rowcount <= 0:
+                break
+            staged += result.rowcount
+        return staged
+    
+    async def _delete_summarized_messages(self, cutoff: datetime, batch_size: int) -> int:
+        """Delete old messages of completed sessions (and their index entries) in batches."""
+        from src.database.models import ConversationSummary
+        
+        summarized = exists().where(
+            ConversationSummary.user_id == ConversationMessage.user_id,
+            ConversationSummary.session_id == ConversationMessage.session_id,
+            ConversationSummary.status == SUMMARY_STATUS_COMPLETED
+        )
+        batch_query = (
+            select(ConversationMessage.id)
+            .where(ConversationMessage.timestamp < cutoff, summarized)
+            .limit(batch_size)
+        )
+        
+        deleted = 0
+        while True:
+            ids = (await self.db.execute(batch_query)).scalars().all()
+            if not ids:
+                break
+            try:
+                async with self.db.begin_nested():
+                    await self.search_index.delete_messages(ids)
+            except Exception as e:
+                logger.debug(f"{LOG_INFO} Full-text index cleanup skipped: {e}")
+            await self.db.execute(delete(ConversationMessage).where(ConversationMessage.id.in_(ids)))
+            await self.db.commit()
+            deleted += len(ids)
+        return deleted
+    
+    async def clear_warm_tier(self, max_age_days: int = WARM_TIER_RETENTION_DAYS) -> int:
         """
         Cold-tier transition: delete warm summaries older than max_age_days.
         After this, only Qdrant vectors survive for semantic recall.
@@ -834,9 +826,56 @@ class ConversationMemory:
         session_id_filter: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Fallback keyword-based search for conversation messages - async.
-        Used when RAG is unavailable or fails.
+        Indexed full-text keyword search over the user's messages - async.
+        
+        Used when RAG is unavailable or fails. Backed by ConversationSearchIndex
+        (Postgres tsvector/GIN or SQLite FTS5), ranked by text relevance and
+        recency. Supports "quoted phrases".
+        
+        Falls back to a table scan if the search index is unavailable.
         """
+        try:
+            hits = await self.search_index.search(
+                query, user_id=user_id, k=k, session_id=session_id_filter
+            )
+        except Exception as e:
+            logger.warning(f"{LOG_WARNING} Full-text index unavailable, using scan search: {e}")
+            await self.db.rollback()
+            return await self._search_conversations_scan(query, user_id, k, session_id_filter)
+        
+        if not hits:
+            return []
+        
+        try:
+            scores = dict(hits)
+            result = await self.db.execute(
+                select(ConversationMessage).where(ConversationMessage.id.in_(list(scores)))
+            )
+            messages = sorted(result.scalars().all(), key=lambda m: scores[m.id], reverse=True)
+            top_score = max(scores.values()) or 1.0
+            
+            return [{
+                'message_id': msg.id,
+                'content': msg.content,
+                'session_id': msg.session_id,
+                'intent': msg.intent,
+                'timestamp': msg.timestamp.isoformat() if msg.timestamp else None,
+                'relevance_score': round(scores[msg.id] / top_score, 4),
+                'search_method': 'fulltext'
+            } for msg in messages]
+            
+        except Exception as e:
+            logger.error(f"Keyword search failed: {e}")
+            return []
+    
+    async def _search_conversations_scan(
+        self,
+        query: str,
+        user_id: int,
+        k: int = 5,
+        session_id_filter: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Unindexed LIKE scan (only matches legacy plaintext rows)."""
         try:
             # Simple keyword matching using SQL LIKE
             # 1. Clean query
@@ -1418,6 +1457,26 @@ class ConversationMemory:
         
         return topics
     
+    async def _index_message_for_search(self, message: ConversationMessage) -> None:
+        """
+        Add a message to the full-text index inside the current transaction.
+        
+        Runs in a SAVEPOINT so an index failure (e.g. table not yet migrated)
+        never aborts saving the message itself.
+        """
+        try:
+            async with self.db.begin_nested():
+                await self.search_index.index_message(
+                    message_id=message.id,
+                    user_id=message.user_id,
+                    session_id=message.session_id,
+                    role=message.role,
+                    content=message.content,
+                    timestamp=message.timestamp,
+                )
+        except Exception as e:
+            logger.debug(f"{LOG_INFO} Full-text indexing skipped for message {message.id}: {e}")
+    
     async def _index_message_in_rag(self, message: ConversationMessage) -> None:
         """
         Index a message in RAG vector store for semantic search - async.
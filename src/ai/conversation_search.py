@@ -0,0 +1,480 @@
+"""
+Conversation Full-Text Search
+
+Indexed keyword search over conversation history.
+
+Message content is stored Fernet-encrypted, so neither ``ILIKE`` nor a
+plaintext full-text index can be used against ``conversation_messages``
+directly. Instead every message is tokenized at write time and each token is
+replaced by a keyed, per-user blind token (HMAC). The blind tokens keep their
+original positions, so the database's native full-text machinery still
+provides indexed lookup, phrase matching and ranking without ever seeing
+plaintext:
+
+- PostgreSQL: ``tsvector`` column with a GIN index, ranked by ``ts_rank_cd``
+- SQLite (local/dev): FTS5 virtual table, ranked by ``bm25``
+
+Both paths apply the same recency weighting so results from different
+backends are comparable.
+
+Query syntax:
+    budget review            -> messages containing "budget" OR "review"
+    "quarterly budget"       -> exact phrase
+    "quarterly budget" cfo   -> phrase OR term
+"""
+import hashlib
+import hmac
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..utils.logger import setup_logger
+from .memory_constants import (
+    LOG_OK, LOG_INFO,
+    ROLE_USER,
+    KEYWORD_SEARCH_RECENCY_HALF_LIFE_DAYS,
+    KEYWORD_SEARCH_CANDIDATE_MULTIPLIER,
+    KEYWORD_SEARCH_MAX_TOKEN_LENGTH,
+)
+from .rag.query.rules import SEARCH_STOPWORDS
+
+logger = setup_logger(__name__)
+
+PG_SEARCH_TABLE = "conversation_message_search"
+SQLITE_SEARCH_TABLE = "conversation_message_fts"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_PHRASE_RE = re.compile(r'"([^"]+)"')
+
+# Blind tokens are spelled with letters only so that neither the Postgres
+# 'simple' parser nor the FTS5 'ascii' tokenizer splits or reinterprets them
+# (hex digests can be parsed as numbers / scientific notation).
+_NIBBLE_ALPHABET = "abcdefghijklmnop"
+_BLIND_TOKEN_BYTES = 8
+
+_PG_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {PG_SEARCH_TABLE} (
+        message_id INTEGER PRIMARY KEY REFERENCES conversation_messages(id) ON DELETE CASCADE,
+        user_id INTEGER NOT NULL,
+        session_id VARCHAR(255) NOT NULL,
+        role VARCHAR(50) NOT NULL,
+        timestamp TIMESTAMP NOT NULL,
+        search_vector TSVECTOR NOT NULL
+    )
+    """,
+    f"CREATE INDEX IF NOT EXISTS idx_conv_search_vector ON {PG_SEARCH_TABLE} USING GIN (search_vector)",
+    f"CREATE INDEX IF NOT EXISTS idx_conv_search_user_time ON {PG_SEARCH_TABLE} (user_id, timestamp DESC)",
+]
+
+_SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_SEARCH_TABLE} USING fts5(
+        tokens,
+        message_id UNINDEXED,
+        user_id UNINDEXED,
+        session_id UNINDEXED,
+        role UNINDEXED,
+        timestamp UNINDEXED,
+        tokenize = 'ascii'
+    )
+    """,
+]
+
+
+class SearchKeyMissing(RuntimeError):
+    """No secret is configured to derive blind tokens, so the index is disabled."""
+
+
+def _index_key() -> Optional[bytes]:
+    """Secret used to derive blind tokens (stable across restarts)."""
+    key = (
+        os.getenv('CONVERSATION_SEARCH_KEY')
+        or os.getenv('ENCRYPTION_KEY')
+        or os.getenv('SECRET_KEY')
+    )
+    if not key:
+        return None
+    return hashlib.sha256(f"conversation-search:{key}".encode('utf-8')).digest()
+
+
+_INDEX_KEY: Optional[bytes] = None
+_KEY_MISSING_LOGGED = False
+
+
+def _get_index_key() -> bytes:
+    """
+    Blind-token key. Raises SearchKeyMissing when no secret is configured:
+    tokens derived from a built-in constant could be computed by anyone.
+    """
+    global _INDEX_KEY, _KEY_MISSING_LOGGED
+    if _INDEX_KEY is None:
+        _INDEX_KEY = _index_key()
+        if _INDEX_KEY is None:
+            if not _KEY_MISSING_LOGGED:
+                logger.error(
+                    "Conversation search disabled: set CONVERSATION_SEARCH_KEY "
+                    "(or ENCRYPTION_KEY / SECRET_KEY) to enable the full-text index"
+                )
+                _KEY_MISSING_LOGGED = True
+            raise SearchKeyMissing("No conversation search key configured")
+    return _INDEX_KEY
+
+
+def tokenize(content: str) -> List[str]:
+    """Split text into lowercase word tokens (positions preserved)."""
+    if not content:
+        return []
+    return [t[:KEYWORD_SEARCH_MAX_TOKEN_LENGTH] for t in _WORD_RE.findall(content.lower())]
+
+
+def blind_token(user_id: int, token: str) -> str:
+    """
+    Map a plaintext token to its per-user blind token.
+
+    Scoping the HMAC by user means identical words from different users
+    never share a posting list, so index lookups are inherently per-user and
+    token frequencies cannot be correlated across tenants.
+    """
+    digest = hmac.new(
+        _get_index_key(), f"{user_id}:{token}".encode('utf-8'), hashlib.sha256
+    ).digest()[:_BLIND_TOKEN_BYTES]
+    return ''.join(_NIBBLE_ALPHABET[b >> 4] + _NIBBLE_ALPHABET[b & 0x0F] for b in digest)
+
+
+def blind_document(user_id: int, content: str) -> str:
+    """Blind every token of a message, keeping token order for phrase queries."""
+    return ' '.join(blind_token(user_id, t) for t in tokenize(content))
+
+
+@dataclass
+class ParsedQuery:
+    """Keyword query split into bare terms and quoted phrases."""
+    terms: List[str] = field(default_factory=list)
+    phrases: List[List[str]] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.terms and not self.phrases
+
+
+def parse_query(query: str) -> ParsedQuery:
+    """
+    Parse a user keyword query.
+
+    Quoted segments become phrases (stopwords kept, order significant); the
+    remainder becomes OR-ed terms with stopwords removed. If every bare term
+    is a stopword they are kept so the query is never silently empty.
+    """
+    parsed = ParsedQuery()
+    if not query:
+        return parsed
+
+    for phrase in _PHRASE_RE.findall(query):
+        tokens = tokenize(phrase)
+        if len(tokens) == 1:
+            parsed.terms.append(tokens[0])
+        elif tokens:
+            parsed.phrases.append(tokens)
+
+    remainder = tokenize(_PHRASE_RE.sub(' ', query))
+    terms = [t for t in remainder if t not in SEARCH_STOPWORDS]
+    if not terms and not parsed.phrases and not parsed.terms:
+        terms = remainder
+
+    seen = set(parsed.terms)
+    for term in terms:
+        if term not in seen:
+            parsed.terms.append(term)
+            seen.add(term)
+    return parsed
+
+
+def build_tsquery(user_id: int, parsed: ParsedQuery) -> str:
+    """Compile a parsed query into a Postgres ``to_tsquery('simple', ...)`` string."""
+    clauses = [blind_token(user_id, t) for t in parsed.terms]
+    for phrase in parsed.phrases:
+        clauses.append('(' + ' <-> '.join(blind_token(user_id, t) for t in phrase) + ')')
+    return ' | '.join(clauses)
+
+
+def build_fts5_query(user_id: int, parsed: ParsedQuery) -> str:
+    """Compile a parsed query into an FTS5 MATCH expression."""
+    clauses = [blind_token(user_id, t) for t in parsed.terms]
+    for phrase in parsed.phrases:
+        clauses.append('"' + ' '.join(blind_token(user_id, t) for t in phrase) + '"')
+    return ' OR '.join(clauses)
+
+
+def recency_weight(timestamp: Optional[datetime], now: datetime) -> float:
+    """Hyperbolic recency decay: 1.0 for new messages, 0.5 at the half-life."""
+    if timestamp is None:
+        return 1.0
+    age_days = max((now - timestamp).total_seconds(), 0.0) / 86400.0
+    return 1.0 / (1.0 + age_days / KEYWORD_SEARCH_RECENCY_HALF_LIFE_DAYS)
+
+
+async def ensure_search_schema(conn, is_sqlite: bool) -> None:
+    """
+    Create the full-text search structures if missing (idempotent).
+
+    Args:
+        conn: Async connection (inside a transaction)
+        is_sqlite: Whether the database is SQLite
+    """
+    for statement in (_SQLITE_DDL if is_sqlite else _PG_DDL):
+        await conn.execute(text(statement))
+
+
+class ConversationSearchIndex:
+    """
+    Full-text index over conversation messages (async).
+
+    Writes happen inside the caller's transaction so a message and its index
+    entry are committed (or rolled back) together.
+
+    Example:
+        index = ConversationSearchIndex(db)
+        await index.index_message(message)          # before commit
+        hits = await index.search('"budget review"', user_id=1, k=5)
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @property
+    def is_sqlite(self) -> bool:
+        bind = self.db.get_bind()
+        return bind.dialect.name == 'sqlite'
+
+    async def index_message(
+        self,
+        message_id: int,
+        user_id: int,
+        session_id: str,
+        role: str,
+        content: str,
+        timestamp: Optional[datetime] = None,
+    ) -> None:
+        """Add (or replace) the index entry for one message. Does not commit."""
+        document = blind_document(user_id, content)
+        timestamp = timestamp or datetime.utcnow()
+        params = {
+            'message_id': message_id,
+            'user_id': user_id,
+            'session_id': session_id,
+            'role': role,
+            'timestamp': timestamp,
+            'document': document,
+        }
+
+        if self.is_sqlite:
+            await self.db.execute(
+                text(f"DELETE FROM {SQLITE_SEARCH_TABLE} WHERE message_id = :message_id"),
+                {'message_id': message_id},
+            )
+            params['timestamp'] = timestamp.isoformat()
+            await self.db.execute(
+                text(
+                    f"INSERT INTO {SQLITE_SEARCH_TABLE} "
+                    "(tokens, message_id, user_id, session_id, role, timestamp) "
+                    "VALUES (:document, :message_id, :user_id, :session_id, :role, :timestamp)"
+                ),
+                params,
+            )
+        else:
+            await self.db.execute(
+                text(
+                    f"INSERT INTO {PG_SEARCH_TABLE} "
+                    "(message_id, user_id, session_id, role, timestamp, search_vector) "
+                    "VALUES (:message_id, :user_id, :session_id, :role, :timestamp, "
+                    "to_tsvector('simple', :document)) "
+                    "ON CONFLICT (message_id) DO UPDATE SET search_vector = EXCLUDED.search_vector"
+                ),
+                params,
+            )
+
+    async def delete_messages(self, message_ids: List[int]) -> None:
+        """Drop index entries for the given messages. Does not commit."""
+        if not message_ids:
+            return
+        table = SQLITE_SEARCH_TABLE if self.is_sqlite else PG_SEARCH_TABLE
+        stmt = text(f"DELETE FROM {table} WHERE message_id IN :ids").bindparams(
+            bindparam('ids', expanding=True)
+        )
+        await self.db.execute(stmt, {'ids': list(message_ids)})
+
+    async def search(
+        self,
+        query: str,
+        user_id: int,
+        k: int = 5,
+        session_id: Optional[str] = None,
+        role: Optional[str] = ROLE_USER,
+    ) -> List[Tuple[int, float]]:
+        """
+        Ranked keyword search.
+
+        Args:
+            query: Keyword query (supports "quoted phrases")
+            user_id: Only this user's messages are searched
+            k: Maximum number of hits
+            session_id: Optional session restriction
+            role: Message role to search (None for all roles)
+
+        Returns:
+            List of (message_id, score) ordered by descending score, where
+            score is text relevance multiplied by a recency weight.
+        """
+        parsed = parse_query(query)
+        if parsed.is_empty:
+            return []
+
+        now = datetime.utcnow()
+        if self.is_sqlite:
+            return await self._search_sqlite(parsed, user_id, k, session_id, role, now)
+        return await self._search_postgres(parsed, user_id, k, session_id, role, now)
+
+    async def _search_postgres(
+        self,
+        parsed: ParsedQuery,
+        user_id: int,
+        k: int,
+        session_id: Optional[str],
+        role: Optional[str],
+        now: datetime,
+    ) -> List[Tuple[int, float]]:
+        filters = ["s.user_id = :user_id", "s.search_vector @@ q"]
+        params = {
+            'user_id': user_id,
+            'tsquery': build_tsquery(user_id, parsed),
+            'now': now,
+            'half_life': float(KEYWORD_SEARCH_RECENCY_HALF_LIFE_DAYS),
+            'k': k,
+        }
+        if role:
+            filters.append("s.role = :role")
+            params['role'] = role
+        if session_id:
+            filters.append("s.session_id = :session_id")
+            params['session_id'] = session_id
+
+        stmt = text(
+            "SELECT s.message_id, "
+            "ts_rank_cd(s.search_vector, q) / "
+            "(1.0 + GREATEST(EXTRACT(EPOCH FROM (CAST(:now AS TIMESTAMP) - s.timestamp)), 0) "
+            "/ 86400.0 / :half_life) AS score "
+            f"FROM {PG_SEARCH_TABLE} s, to_tsquery('simple', :tsquery) q "
+            f"WHERE {' AND '.join(filters)} "
+            "ORDER BY score DESC, s.timestamp DESC "
+            "LIMIT :k"
+        )
+        result = await self.db.execute(stmt, params)
+        return [(row.message_id, float(row.score)) for row in result.fetchall()]
+
+    async def _search_sqlite(
+        self,
+        parsed: ParsedQuery,
+        user_id: int,
+        k: int,
+        session_id: Optional[str],
+        role: Optional[str],
+        now: datetime,
+    ) -> List[Tuple[int, float]]:
+        filters = [f"{SQLITE_SEARCH_TABLE} MATCH :match", "user_id = :user_id"]
+        params = {
+            'match': build_fts5_query(user_id, parsed),
+            'user_id': user_id,
+            'limit': k * KEYWORD_SEARCH_CANDIDATE_MULTIPLIER,
+        }
+        if role:
+            filters.append("role = :role")
+            params['role'] = role
+        if session_id:
+            filters.append("session_id = :session_id")
+            params['session_id'] = session_id
+
+        # bm25() is negative (lower = better); recency is applied in Python
+        # over a bounded candidate set.
+        stmt = text(
+            f"SELECT message_id, bm25({SQLITE_SEARCH_TABLE}) AS rank, timestamp "
+            f"FROM {SQLITE_SEARCH_TABLE} WHERE {' AND '.join(filters)} "
+            "ORDER BY rank LIMIT :limit"
+        )
+        result = await self.db.execute(stmt, params)
+
+        scored = []
+        for row in result.fetchall():
+            try:
+                ts = datetime.fromisoformat(row.timestamp) if row.timestamp else None
+            except (TypeError, ValueError):
+                ts = None
+            scored.append((int(row.message_id), -float(row.rank) * recency_weight(ts, now)))
+
+        scored.sort(key=lambda hit: hit[1], reverse=True)
+        return scored[:k]
+
+    async def backfill(self, batch_size: int = 500, user_id: Optional[int] = None) -> int:
+        """
+        Index messages written before the search index existed.
+
+        Walks ``conversation_messages`` by id in batches, decrypting content
+        through the ORM, and commits after each batch so it can be stopped
+        and resumed safely.
+
+        Returns:
+            Number of messages indexed
+
+        Raises:
+            SearchKeyMissing: No secret is configured to build the index with
+        """
+        from sqlalchemy import select
+        from ..database.models import ConversationMessage
+
+        _get_index_key()
+
+        table = SQLITE_SEARCH_TABLE if self.is_sqlite else PG_SEARCH_TABLE
+        indexed = 0
+        last_id = 0
+
+        while True:
+            stmt = (
+                select(ConversationMessage)
+                .where(ConversationMessage.id > last_id)
+                .where(
+                    ConversationMessage.id.not_in(
+                        select(text('message_id')).select_from(text(table))
+                    )
+                )
+                .order_by(ConversationMessage.id)
+                .limit(batch_size)
+            )
+            if user_id is not None:
+                stmt = stmt.where(ConversationMessage.user_id == user_id)
+
+            messages = (await self.db.execute(stmt)).scalars().all()
+            if not messages:
+                break
+
+            for msg in messages:
+                await self.index_message(
+                    message_id=msg.id,
+                    user_id=msg.user_id,
+                    session_id=msg.session_id,
+                    role=msg.role,
+                    content=msg.content or '',
+                    timestamp=msg.timestamp,
+                )
+            await self.db.commit()
+
+            indexed += len(messages)
+            last_id = messages[-1].id
+            logger.info(f"{LOG_INFO} Conversation search backfill: {indexed} messages indexed")
+
+        logger.info(f"{LOG_OK} Conversation search backfill complete ({indexed} messages)")
+        return indexed
@@ -0,0 +1,284 @@
+"""
+Batched Conversation Summarizer
+
+Fills in warm-tier ConversationSummary rows staged by
+ConversationMemory.clear_old_messages().
+
+Tiering stages one 'pending' summary row per eligible session with a single
+set-based INSERT ... SELECT. This job then:
+
+1. Loads a bounded batch of pending rows
+2. Fetches the first N messages of every session in the batch in one query
+3. Packs several sessions into each LLM request (JSON in, JSON out)
+4. Writes the summaries, marks the rows 'completed' and commits
+
+Each batch commits independently and raw messages are only deleted once their
+session is 'completed', so the job is resumable: a crash simply leaves the
+remaining rows 'pending' for the next run. Sessions the LLM omits, or all
+sessions when no LLM is available, get the extractive fallback summary.
+"""
+import asyncio
+import json
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.models import ConversationMessage, ConversationSummary
+from ..utils.logger import setup_logger
+from .memory_constants import (
+    LOG_OK, LOG_WARNING,
+    ROLE_USER,
+    SUMMARY_STATUS_PENDING, SUMMARY_STATUS_COMPLETED,
+    SUMMARIZER_BATCH_SIZE,
+    SUMMARIZER_SESSIONS_PER_REQUEST,
+    SUMMARIZER_MAX_MESSAGES_PER_SESSION,
+    SUMMARIZER_MESSAGE_PREVIEW_LENGTH,
+)
+
+logger = setup_logger(__name__)
+
+SessionKey = Tuple[int, str]
+
+SYSTEM_PROMPT = """
+You summarize archived conversations between a User and an AI Assistant.
+You will receive several conversations, each introduced by a line "### Conversation <id>".
+
+For EACH conversation return:
+- "id": the conversation id
+- "summary": 2-3 sentences on what the user wanted and what was decided or done
+- "topic": a short topic label (max 6 words)
+- "key_facts": up to 5 durable facts about the user (preferences, people, projects, deadlines)
+
+Return a single JSON object: {"summaries": [{"id": 0, "summary": "...", "topic": "...", "key_facts": ["..."]}]}
+"""
+
+
+def build_extractive_summary(messages: List[ConversationMessage]) -> Dict[str, Any]:
+    """
+    Lightweight summary that needs no LLM (fallback path).
+
+    Returns:
+        Dict with summary, topic and key_facts
+    """
+    conversation_lines = []
+    key_facts = []
+
+    for msg in messages:
+        role_label = "User" if msg.role == ROLE_USER else "Assistant"
+        content_preview = (msg.content or "")[:SUMMARIZER_MESSAGE_PREVIEW_LENGTH]
+        conversation_lines.append(f"{role_label}: {content_preview}")
+
+        # Extract intents as key facts
+        fact = f"Intent: {msg.intent}" if msg.intent else None
+        if fact and fact not in key_facts:
+            key_facts.append(fact)
+
+    summary_text = f"Conversation with {len(messages)} messages. "
+    if key_facts:
+        summary_text += f"Topics: {', '.join(key_facts[:5])}. "
+    summary_text += "Excerpt: " + " | ".join(conversation_lines[:5])
+
+    return {'summary': summary_text, 'topic': None, 'key_facts': key_facts[:20]}
+
+
+def _primary_agent(messages: List[ConversationMessage]) -> Optional[str]:
+    agents = Counter(m.active_agent for m in messages if m.active_agent)
+    return agents.most_common(1)[0][0] if agents else None
+
+
+def _parse_llm_json(response_text: str) -> Dict[str, Any]:
+    clean_text = response_text.replace("```json", "").replace("```", "").strip()
+    if not clean_text.startswith("{"):
+        match = re.search(r'\{.*\}', clean_text, re.DOTALL)
+        if not match:
+            return {}
+        clean_text = match.group(0)
+    try:
+        return json.loads(clean_text)
+    except json.JSONDecodeError:
+        return {}
+
+
+class ConversationSummarizer:
+    """
+    Resumable, batched warm-tier summarizer (async).
+
+    Example:
+        summarizer = ConversationSummarizer()
+        completed = await summarizer.summarize_pending(db, cutoff)
+    """
+
+    def __init__(
+        self,
+        llm: Optional[Any] = None,
+        batch_size: int = SUMMARIZER_BATCH_SIZE,
+        sessions_per_request: int = SUMMARIZER_SESSIONS_PER_REQUEST,
+        max_messages_per_session: int = SUMMARIZER_MAX_MESSAGES_PER_SESSION,
+        use_llm: bool = True,
+    ):
+        self.llm = llm
+        self.batch_size = batch_size
+        self.sessions_per_request = max(1, sessions_per_request)
+        self.max_messages_per_session = max_messages_per_session
+        self.use_llm = use_llm
+        self.llm_requests = 0
+
+    def _get_llm(self):
+        if self.llm is None and self.use_llm:
+            try:
+                from api.dependencies import AppState
+                from .llm_factory import LLMFactory
+                config = AppState.get_config()
+                self.llm = LLMFactory.get_llm_for_provider(config, temperature=0.0)
+            except Exception as e:
+                logger.warning(f"{LOG_WARNING} Summarizer LLM unavailable, using extractive summaries: {e}")
+                self.use_llm = False
+        return self.llm
+
+    async def summarize_pending(self, db: AsyncSession, cutoff: datetime) -> int:
+        """
+        Complete every pending summary, one committed batch at a time.
+
+        Args:
+            db: Async database session
+            cutoff: Only messages older than this belong to the warm tier
+
+        Returns:
+            Number of summaries completed
+        """
+        completed = 0
+        last_id = 0
+
+        while True:
+            result = await db.execute(
+                select(ConversationSummary)
+                .where(
+                    ConversationSummary.status == SUMMARY_STATUS_PENDING,
+                    ConversationSummary.id > last_id,
+                )
+                .order_by(ConversationSummary.id)
+                .limit(self.batch_size)
+            )
+            pending = result.scalars().all()
+            if not pending:
+                break
+            last_id = pending[-1].id
+
+            messages_by_session = await self._load_session_messages(
+                db, [(row.user_id, row.session_id) for row in pending], cutoff
+            )
+
+            for start in range(0, len(pending), self.sessions_per_request):
+                chunk = pending[start:start + self.sessions_per_request]
+                summaries = await self._summarize_chunk(chunk, messages_by_session)
+
+                for row in chunk:
+                    messages = messages_by_session.get((row.user_id, row.session_id), [])
+                    summary = summaries.get(row.id) or build_extractive_summary(messages)
+                    row.summary = (summary.get('summary') or '')[:2000]
+                    topic = summary.get('topic')
+                    row.topic = str(topic)[:200] if topic else None
+                    row.key_facts = list(summary.get('key_facts') or [])[:20]
+                    row.primary_agent = _primary_agent(messages)
+                    row.status = SUMMARY_STATUS_COMPLETED
+
+            await db.commit()
+            completed += len(pending)
+
+        if completed:
+            logger.info(
+                f"{LOG_OK} Summarized {completed} sessions using {self.llm_requests} LLM requests"
+            )
+        return completed
+
+    async def _load_session_messages(
+        self,
+        db: AsyncSession,
+        keys: List[SessionKey],
+        cutoff: datetime,
+    ) -> Dict[SessionKey, List[ConversationMessage]]:
+        """Fetch the first N old messages of every session in one query."""
+        row_number = func.row_number().over(
+            partition_by=(ConversationMessage.user_id, ConversationMessage.session_id),
+            order_by=ConversationMessage.timestamp,
+        ).label('rn')
+        ranked = (
+            select(ConversationMessage.id, row_number)
+            .where(
+                tuple_(ConversationMessage.user_id, ConversationMessage.session_id).in_(keys),
+                ConversationMessage.timestamp < cutoff,
+            )
+            .subquery()
+        )
+        result = await db.execute(
+            select(ConversationMessage)
+            .join(ranked, ranked.c.id == ConversationMessage.id)
+            .where(ranked.c.rn <= self.max_messages_per_session)
+            .order_by(ConversationMessage.timestamp)
+        )
+
+        grouped: Dict[SessionKey, List[ConversationMessage]] = {}
+        for msg in result.scalars().all():
+            grouped.setdefault((msg.user_id, msg.session_id), []).append(msg)
+        return grouped
+
+    async def _summarize_chunk(
+        self,
+        rows: List[ConversationSummary],
+        messages_by_session: Dict[SessionKey, List[ConversationMessage]],
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Summarize several sessions with one LLM call.
+
+        Returns:
+            Mapping of ConversationSummary.id -> summary dict. Sessions missing
+            from the mapping fall back to the extractive summary.
+        """
+        llm = self._get_llm()
+        if not llm:
+            return {}
+
+        sections = []
+        for row in rows:
+            messages = messages_by_session.get((row.user_id, row.session_id), [])
+            if not messages:
+                continue
+            lines = [
+                f"{'User' if m.role == ROLE_USER else 'Assistant'}: "
+                f"{(m.content or '')[:SUMMARIZER_MESSAGE_PREVIEW_LENGTH]}"
+                for m in messages
+            ]
+            sections.append(f"### Conversation {row.id}\n" + "\n".join(lines))
+
+        if not sections:
+            return {}
+
+        prompt_msgs = [
+            SystemMessage(content=SYSTEM_PROMPT),
+            HumanMessage(content="\n\n".join(sections)),
+        ]
+        try:
+            self.llm_requests += 1
+            result = await asyncio.to_thread(llm.invoke, prompt_msgs)
+            response_text = result.content if hasattr(result, 'content') else str(result)
+        except Exception as e:
+            logger.warning(f"{LOG_WARNING} Batched summarization failed, using extractive summaries: {e}")
+            return {}
+
+        summaries = {}
+        valid_ids = {row.id for row in rows}
+        for item in _parse_llm_json(response_text).get('summaries', []):
+            if not isinstance(item, dict):
+                continue
+            try:
+                summary_id = int(item.get('id'))
+            except (TypeError, ValueError):
+                continue
+            if summary_id in valid_ids and item.get('summary'):
+                summaries[summary_id] = item
+        return summaries
@@ -4,7 +4,7 @@ Query Intent Classifier
 Classifies queries into domains/intents based on patterns and keywords.
 Uses pattern-first, LLM-second strategy for optimal speed.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from ..config.intent_constants import (
     EMAIL_PATTERNS, EMAIL_MANAGEMENT_PATTERNS,
     CALENDAR_PATTERNS, CALENDAR_QUESTION_PATTERNS,
@@ -17,7 +17,37 @@ from ..config.classifier_config import (
 )
 from ...caching.intent_cache import global_intent_cache
 from src.agents.constants import INTENT_KEYWORDS, DOMAIN_TOOL_ROUTING
-from ..domain_detector import detect_domain
+from ..domain_detector import DomainDetector, get_domain_detector
+from ..multi_matcher import MultiPatternMatcher
+
+# Generic intent verbs for domains without an intent vocabulary of their own
+GENERIC_INTENT_KEYWORDS: Dict[str, List[str]] = {
+    "create": ["create", "add", "new", "schedule", "make"],
+    "search": ["find", "search", "show", "get", "list", "read"],
+}
+
+_routing_matcher: Optional[MultiPatternMatcher] = None
+
+
+def get_routing_matcher() -> MultiPatternMatcher:
+    """
+    Get the shared matcher over every routing vocabulary.
+    
+    Compiles domain keywords and patterns (labelled by domain), intent
+    keywords (labelled ``(domain, intent)``) and the generic intent verbs
+    (labelled ``(None, intent)``) once, so classification scans a query a
+    single time however many vocabularies are registered.
+    """
+    global _routing_matcher
+    if _routing_matcher is None:
+        vocabularies: Dict[Any, List[str]] = dict(DomainDetector.vocabularies())
+        for domain, categories in INTENT_KEYWORDS.items():
+            for intent, keywords in categories.items():
+                vocabularies[(domain, intent)] = keywords
+        for intent, keywords in GENERIC_INTENT_KEYWORDS.items():
+            vocabularies[(None, intent)] = keywords
+        _routing_matcher = MultiPatternMatcher(vocabularies)
+    return _routing_matcher
 
 
 def classify_query_intent(query: str) -> Dict[str, Any]:
@@ -49,13 +79,14 @@ def classify_query_intent(query: str) -> Dict[str, Any]:
         global_intent_cache.set_intent(query, fast_result)
         return fast_result
     
-    # 3. Try pattern-first approach using DomainDetector
-    domain_result = detect_domain(query)
+    # 3. Try pattern-first approach: one scan serves domain and intent matching
+    matches = get_routing_matcher().match(query_lower)
+    domain_result = get_domain_detector().detect_from_matches(matches)
     
     if domain_result.confidence >= PATTERN_CONFIDENCE_THRESHOLD:
         # High confidence pattern match - skip LLM
         primary_domain = domain_result.primary_domain or "general"
-        intent = _determine_intent(query_lower, primary_domain)
+        intent = _determine_intent(query_lower, primary_domain, matches)
         routes_to = DOMAIN_TOOL_ROUTING.get(primary_domain, "supervisor")
         
         result = {
@@ -110,18 +141,20 @@ def classify_query_intent(query: str) -> Dict[str, Any]:
         logging.getLogger(__name__).debug(f"LLM fallback to patterns: {e}")
     
     # 5. Final fallback: pattern matching with lower threshold
-    return _fallback_pattern_match(query, query_lower)
-def _fallback_pattern_match(query: str, query_lower: str) -> Dict[str, Any]:
+    return _fallback_pattern_match(query, query_lower, matches)
+def _fallback_pattern_match(query: str, query_lower: str,
+                            matches: Optional[Dict[Any, List[str]]] = None) -> Dict[str, Any]:
     """Fallback pattern matching when LLM fails or returns low confidence."""
+    if matches is None:
+        matches = get_routing_matcher().match(query_lower)
+    
     scores = {domain: 0 for domain in INTENT_KEYWORDS.keys()}
     scores["general"] = 0
     
-    # Calculate scores based on keywords
-    for domain, categories in INTENT_KEYWORDS.items():
-        for category, keywords in categories.items():
-            for keyword in keywords:
-                if keyword in query_lower:
-                    scores[domain] += 1
+    # Calculate scores based on intent keywords
+    for label, terms in matches.items():
+        if isinstance(label, tuple) and label[0] in INTENT_KEYWORDS:
+            scores[label[0]] += len(terms)
     
     # Find primary domain
     primary_domain = "general"
@@ -141,7 +174,7 @@ def _fallback_pattern_match(query: str, query_lower: str) -> Dict[str, Any]:
         confidence = "low"
         primary_domain = "general"
     
-    intent = _determine_intent(query_lower, primary_domain)
+    intent = _determine_intent(query_lower, primary_domain, matches)
     routes_to = DOMAIN_TOOL_ROUTING.get(primary_domain, "supervisor")
     
     result = {
@@ -156,18 +189,20 @@ def _fallback_pattern_match(query: str, query_lower: str) -> Dict[str, Any]:
     return result
 
 
-def _determine_intent(query_lower: str, domain: str) -> str:
+def _determine_intent(query_lower: str, domain: str,
+                      matches: Optional[Dict[Any, List[str]]] = None) -> str:
     """Determine specific intent within a domain using standard keywords."""
+    if matches is None:
+        matches = get_routing_matcher().match(query_lower)
     
     if domain in INTENT_KEYWORDS:
-        for intent_name, keywords in INTENT_KEYWORDS[domain].items():
-            if any(k in query_lower for k in keywords):
+        for intent_name in INTENT_KEYWORDS[domain]:
+            if (domain, intent_name) in matches:
                 return intent_name
                 
     # Generic fallbacks
-    if any(word in query_lower for word in ["create", "add", "new", "schedule", "make"]):
-        return "create"
-    if any(word in query_lower for word in ["find", "search", "show", "get", "list", "read"]):
-        return "search"
+    for intent_name in GENERIC_INTENT_KEYWORDS:
+        if (None, intent_name) in matches:
+            return intent_name
     
     return "general"
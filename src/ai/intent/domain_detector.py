@@ -13,6 +13,7 @@ from .config.intent_constants import (
     EMAIL_PATTERNS, EMAIL_MANAGEMENT_PATTERNS,
     TASK_KEYWORDS, CALENDAR_KEYWORDS, EMAIL_KEYWORDS
 )
+from .multi_matcher import MultiPatternMatcher
 
 
 @dataclass
@@ -30,7 +31,8 @@ class DomainDetector:
     Centralized domain detection utility.
     
     Detects whether a query is about email, calendar, or tasks using
-    keyword matching and pattern detection.
+    keyword matching and pattern detection. All domain vocabularies are
+    compiled into one MultiPatternMatcher, so a query is scanned once.
     
     Example:
         detector = DomainDetector()
@@ -51,6 +53,22 @@ class DomainDetector:
     CALENDAR_ALL_PATTERNS: List[str] = CALENDAR_PATTERNS + CALENDAR_QUESTION_PATTERNS
     EMAIL_ALL_PATTERNS: List[str] = EMAIL_PATTERNS + EMAIL_MANAGEMENT_PATTERNS
     
+    # Detection order, also the priority order for ties
+    DOMAINS = ('task', 'calendar', 'email')
+    
+    def __init__(self):
+        # Compiled once: detection is a single scan whatever the vocabulary size
+        self.matcher = MultiPatternMatcher(self.vocabularies())
+    
+    @classmethod
+    def vocabularies(cls) -> Dict[str, List[str]]:
+        """Keywords then patterns for each domain, in detection order"""
+        return {
+            'task': sorted(cls.TASK_KEYWORDS) + cls.TASK_PATTERNS,
+            'calendar': sorted(cls.CALENDAR_KEYWORDS) + cls.CALENDAR_ALL_PATTERNS,
+            'email': sorted(cls.EMAIL_KEYWORDS) + cls.EMAIL_ALL_PATTERNS,
+        }
+    
     def detect(self, query: str) -> DomainResult:
         """
         Detect the domain(s) of a query.
@@ -61,26 +79,29 @@ class DomainDetector:
         Returns:
             DomainResult with detected domain information
         """
-        query_lower = query.lower()
-        domains = []
-        keyword_matches: Dict[str, List[str]] = {}
+        return self.detect_from_matches(self.matcher.match(query))
+    
+    def detect_from_matches(self, matches: Dict[str, List[str]]) -> DomainResult:
+        """
+        Build a DomainResult from terms already matched against the query.
         
-        # Check each domain
-        task_matches = self._check_domain(query_lower, 'task')
-        calendar_matches = self._check_domain(query_lower, 'calendar')
-        email_matches = self._check_domain(query_lower, 'email')
+        Lets callers that scan the query with a wider matcher (see
+        classify_query_intent) reuse that scan instead of matching twice.
         
-        if task_matches:
-            domains.append('task')
-            keyword_matches['task'] = task_matches
-            
-        if calendar_matches:
-            domains.append('calendar')
-            keyword_matches['calendar'] = calendar_matches
+        Args:
+            matches: Matched terms by label; labels other than the
+                detector's domains are ignored
             
-        if email_matches:
-            domains.append('email')
-            keyword_matches['email'] = email_matches
+        Returns:
+            DomainResult with detected domain information
+        """
+        domains = []
+        keyword_matches: Dict[str, List[str]] = {}
+        
+        for domain in self.DOMAINS:
+            if matches.get(domain):
+                domains.append(domain)
+                keyword_matches[domain] = matches[domain]
         
         # Determine primary domain (most matches wins, with priority order)
         primary = self._determine_primary(domains, keyword_matches)
@@ -98,35 +119,7 @@ class DomainDetector:
     
     def _check_domain(self, query_lower: str, domain: str) -> List[str]:
         """Check if query matches a specific domain"""
-        matches = []
-        
-        if domain == 'task':
-            # Check keywords
-            for kw in self.TASK_KEYWORDS:
-                if kw in query_lower:
-                    matches.append(kw)
-            # Check patterns
-            for pattern in self.TASK_PATTERNS:
-                if pattern in query_lower and pattern not in matches:
-                    matches.append(pattern)
-                    
-        elif domain == 'calendar':
-            for kw in self.CALENDAR_KEYWORDS:
-                if kw in query_lower:
-                    matches.append(kw)
-            for pattern in self.CALENDAR_ALL_PATTERNS:
-                if pattern in query_lower and pattern not in matches:
-                    matches.append(pattern)
-                    
-        elif domain == 'email':
-            for kw in self.EMAIL_KEYWORDS:
-                if kw in query_lower:
-                    matches.append(kw)
-            for pattern in self.EMAIL_ALL_PATTERNS:
-                if pattern in query_lower and pattern not in matches:
-                    matches.append(pattern)
-        
-        return matches
+        return self.matcher.match(query_lower).get(domain, [])
     
     def _determine_primary(self, domains: List[str], 
                           keyword_matches: Dict[str, List[str]]) -> Optional[str]:
@@ -139,12 +132,10 @@ class DomainDetector:
         
         # Multiple domains - pick the one with most matches
         # Priority order for ties: task > calendar > email
-        priority_order = ['task', 'calendar', 'email']
-        
         max_matches = 0
         primary = None
         
-        for domain in priority_order:
+        for domain in self.DOMAINS:
             if domain in keyword_matches:
                 count = len(keyword_matches[domain])
                 if count > max_matches:
@@ -0,0 +1,124 @@
+"""
+Multi-Pattern Matcher - Compiled one-pass matching for routing vocabularies
+
+Domain detection and intent classification used to test every keyword and
+phrase against the query one at a time, so each new vocabulary added to the
+cost of every query. This module compiles all literal terms into a single
+Aho-Corasick automaton, built once, so a query is scanned once regardless
+of how many terms are registered.
+
+Matching keeps the semantics of the substring checks it replaces: a literal
+matches wherever ``term in text`` would be true, including inside longer
+words and overlapping other terms.
+
+Example:
+    matcher = MultiPatternMatcher({
+        'email': ['email', 'inbox'],
+        'calendar': ['meeting', 'my schedule'],
+    })
+    matcher.match("Any meeting invites in my inbox?")
+    # {'email': ['inbox'], 'calendar': ['meeting']}
+"""
+from typing import Dict, Hashable, Iterable, List, Mapping, Tuple
+
+
+class MultiPatternMatcher:
+    """
+    Matches many labelled literal vocabularies against text in one pass.
+
+    Each label (a domain name, or a ``(domain, intent)`` tuple) owns a list of
+    terms. ``match`` returns, for every label with at least one hit, the
+    distinct terms that matched in registration order. Matching is
+    case-insensitive.
+    """
+
+    def __init__(self, vocabularies: Mapping[Hashable, Iterable[str]]):
+        """
+        Compile the matcher.
+
+        Args:
+            vocabularies: Literal terms by label
+        """
+        # Every distinct (label, term) pair gets an id in registration order,
+        # so sorting hit ids reproduces the order callers listed terms in
+        self._terms: List[Tuple[Hashable, str]] = []
+        ids: Dict[Tuple[Hashable, str], int] = {}
+
+        literals: Dict[str, List[int]] = {}
+        for label, terms in vocabularies.items():
+            for term in terms:
+                term = term.lower()
+                if term and (label, term) not in ids:
+                    ids[(label, term)] = len(self._terms)
+                    self._terms.append((label, term))
+                    literals.setdefault(term, []).append(ids[(label, term)])
+
+        self._delta, self._out = self._build_automaton(literals)
+
+    @staticmethod
+    def _build_automaton(
+        literals: Dict[str, List[int]],
+    ) -> Tuple[List[Dict[str, int]], List[Tuple[int, ...]]]:
+        """
+        Build an Aho-Corasick automaton as a deterministic transition table.
+
+        Failure links are folded into the transitions, so scanning costs one
+        dict lookup per character. Transitions back to the root are omitted.
+        """
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for term, term_ids in literals.items():
+            state = 0
+            for ch in term:
+                if ch not in goto[state]:
+                    goto[state][ch] = len(goto)
+                    goto.append({})
+                    out.append([])
+                state = goto[state][ch]
+            out[state].extend(term_ids)
+
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = list(goto[0].values())
+        for state in queue:
+            # Breadth-first order guarantees the failure state is complete
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for ch, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0)
+                out[child].extend(out[fail[child]])
+                queue.append(child)
+
+        return delta, [tuple(sorted(ids)) for ids in out]
+
+    def __len__(self) -> int:
+        """Number of distinct (label, term) pairs compiled into the matcher"""
+        return len(self._terms)
+
+    def match(self, text: str) -> Dict[Hashable, List[str]]:
+        """
+        Find every registered term occurring in text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Matched terms by label, only for labels with at least one hit
+        """
+        text = text.lower()
+        delta, out = self._delta, self._out
+        hits = set()
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                hits.update(out[state])
+
+        matches: Dict[Hashable, List[str]] = {}
+        for term_id in sorted(hits):
+            label, term = self._terms[term_id]
+            matches.setdefault(label, []).append(term)
+        return matches
+
+    def scores(self, text: str) -> Dict[Hashable, int]:
+        """Number of distinct matched terms by label"""
+        return {label: len(terms) for label, terms in self.match(text).items()}
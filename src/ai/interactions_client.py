@@ -38,9 +38,27 @@ from threading import Lock
 from dataclasses import dataclass
 
 from ..utils.logger import setup_logger
+from .llm_gateway import LLMRequest, ResultCodec, estimate_tokens, get_llm_gateway
 
 logger = setup_logger(__name__)
 
+# Gateway provider name for Interactions API traffic
+GATEWAY_PROVIDER = "gemini_interactions"
+
+
+class _InteractionCodec(ResultCodec):
+    """Token accounting for raw Interactions API responses."""
+
+    def usage(self, result):
+        usage = getattr(result, 'usage', None)
+        return (
+            getattr(usage, 'prompt_tokens', 0) or 0,
+            getattr(usage, 'completion_tokens', 0) or 0,
+        )
+
+
+_INTERACTION_CODEC = _InteractionCodec()
+
 
 @dataclass
 class InteractionResult:
@@ -213,12 +231,19 @@ class InteractionsClient:
             with warnings.catch_warnings():
                 warnings.filterwarnings("ignore", message="Interactions usage is experimental")
                 try:
-                    response = await asyncio.wait_for(
-                        asyncio.to_thread(
-                            self._client.interactions.create,
-                            **params
+                    # Admission/accounting via the LLM gateway; interactions are
+                    # stateful server-side, so they are never coalesced or cached.
+                    # The 30s timeout covers the API call, not the queue wait.
+                    response = await get_llm_gateway().run(
+                        LLMRequest(provider=GATEWAY_PROVIDER, model=model, estimated_tokens=estimate_tokens(input)),
+                        lambda: asyncio.wait_for(
+                            asyncio.to_thread(
+                                self._client.interactions.create,
+                                **params
+                            ),
+                            timeout=30.0  # 30 second timeout for planning/interaction
                         ),
-                        timeout=30.0  # 30 second timeout for planning/interaction
+                        codec=_INTERACTION_CODEC,
                     )
                 except asyncio.TimeoutError:
                     logger.error("[ERROR] Interactions API call timed out after 30s")
@@ -57,3 +57,13 @@ LOG_INFO = "[INFO]"
 LOG_DEBUG = "[DEBUG]"
 LOG_OK = "[OK]"
 
+
+# LLM Gateway Limits (see llm_gateway.py)
+GATEWAY_PROVIDER_CONCURRENCY = 32          # In-flight calls per provider
+GATEWAY_TENANT_CONCURRENCY = 4             # In-flight calls per provider per user
+GATEWAY_BACKGROUND_SHARE = 0.75            # Fraction of provider slots background work may hold
+GATEWAY_PROVIDER_TOKENS_PER_MINUTE = 2_000_000
+GATEWAY_TENANT_TOKENS_PER_MINUTE = 200_000
+GATEWAY_MAX_QUEUE_WAIT_SECONDS = 120.0
+GATEWAY_CACHE_TTL_SECONDS = 60 * 60 * 6    # Deterministic (temperature 0) responses
+GATEWAY_LOCAL_CACHE_SIZE = 2048            # In-process fallback when Redis is unavailable
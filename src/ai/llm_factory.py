@@ -11,6 +11,7 @@ Features:
 - Comprehensive error handling and validation
 - Type-safe client creation
 - Thread-safe operations
+- All calls routed through the LLM gateway (see llm_gateway.py)
 
 Usage:
     from src.ai.llm_factory import LLMFactory
@@ -33,6 +34,7 @@ from langchain_google_genai import ChatGoogleGenerativeAI, HarmCategory, HarmBlo
 
 from ..utils.config import Config
 from ..utils.logger import setup_logger
+from .llm_gateway import GatewayChatModelMixin
 from .llm_constants import (
     PROVIDER_GEMINI, PROVIDER_GOOGLE,
     GEMINI_ALIASES, ALLOWED_MODELS, DEFAULT_TEMPERATURE, DEFAULT_MAX_TOKENS,
@@ -50,6 +52,13 @@ MIN_MAX_TOKENS = 1
 MAX_MAX_TOKENS = 100000
 
 
+class GatewayChatGoogleGenerativeAI(GatewayChatModelMixin, ChatGoogleGenerativeAI):
+    """
+    ChatGoogleGenerativeAI whose calls go through the LLM gateway
+    (admission control, coalescing, deterministic-response cache, accounting).
+    """
+
+
 class LLMFactory:
     """
     Factory for creating and managing Google Gemini LLM clients with intelligent caching.
@@ -264,8 +273,8 @@ class LLMFactory:
             return factory._client_cache[cache_key]
             
         try:
-            # Create new client 
-            client = ChatGoogleGenerativeAI(
+            # Create new client (routed through the LLM gateway)
+            client = GatewayChatGoogleGenerativeAI(
                 model=config.ai.model,  # type: ignore[arg-type]
                 google_api_key=config.ai.api_key,  # type: ignore[arg-type]
                 temperature=temperature,
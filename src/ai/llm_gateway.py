@@ -0,0 +1,852 @@
+"""
+LLM Gateway
+
+Single choke point in front of every LLM call (LangChain chat models built by
+LLMFactory and the Interactions API client).
+
+Features:
+- Per-provider and per-tenant (user) concurrency limits
+- Per-provider and per-tenant token-rate limits (token buckets, reconciled
+  with actual usage after each call)
+- Priority lanes: interactive calls are admitted ahead of background work,
+  and background work may only hold a share of the provider's slots
+- Single-flight coalescing of identical in-flight requests
+- Persistent cache for deterministic (temperature 0) responses - Redis
+  shared by API and Celery workers, in-process LRU if Redis is unreachable
+- Per-caller token and latency accounting
+
+Callers describe themselves with a context manager; the context propagates
+through asyncio tasks and LangChain's executor threads:
+
+    from src.ai.llm_gateway import llm_call_context, PRIORITY_BACKGROUND
+
+    with llm_call_context(caller="intent_classifier", tenant=user_id):
+        result = llm.invoke(messages)
+
+    with llm_call_context(caller="nightly_digest", priority=PRIORITY_BACKGROUND, cache=False):
+        ...
+"""
+import asyncio
+import copy
+import hashlib
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..utils.logger import setup_logger
+from ..utils.urls import URLs
+from .llm_constants import (
+    PROVIDER_GEMINI,
+    GATEWAY_PROVIDER_CONCURRENCY, GATEWAY_TENANT_CONCURRENCY, GATEWAY_BACKGROUND_SHARE,
+    GATEWAY_PROVIDER_TOKENS_PER_MINUTE, GATEWAY_TENANT_TOKENS_PER_MINUTE,
+    GATEWAY_MAX_QUEUE_WAIT_SECONDS, GATEWAY_CACHE_TTL_SECONDS, GATEWAY_LOCAL_CACHE_SIZE,
+)
+
+logger = setup_logger(__name__)
+
+# Priority lanes (lower value is admitted first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+# How often a queued call re-checks token buckets while waiting for refill
+_WAIT_POLL_SECONDS = 0.05
+# How long to stay on the in-process cache after a failed Redis connect
+_REDIS_RETRY_SECONDS = 60
+_CACHE_KEY = "llm:cache:{key}"
+
+
+# ============================================================================
+# CALL CONTEXT
+# ============================================================================
+
+@dataclass(frozen=True)
+class LLMCallContext:
+    """Who is calling and how the call should be scheduled."""
+    caller: str = "unknown"
+    tenant: Optional[Any] = None
+    priority: int = PRIORITY_INTERACTIVE
+    cache: bool = True
+
+
+_call_context: ContextVar[LLMCallContext] = ContextVar("llm_call_context", default=LLMCallContext())
+# Set while a gateway-admitted call runs, so nested model calls (e.g. LangChain's
+# default _agenerate delegating to _generate) are not admitted twice
+_inside_gateway: ContextVar[bool] = ContextVar("llm_inside_gateway", default=False)
+
+
+def current_call_context() -> LLMCallContext:
+    return _call_context.get()
+
+
+@contextmanager
+def llm_call_context(
+    caller: Optional[str] = None,
+    tenant: Optional[Any] = None,
+    priority: Optional[int] = None,
+    cache: Optional[bool] = None,
+):
+    """Scope LLM calls to a caller / tenant / priority lane (unset fields are inherited)."""
+    current = _call_context.get()
+    updates = {
+        name: value for name, value in
+        (('caller', caller), ('tenant', tenant), ('priority', priority), ('cache', cache))
+        if value is not None
+    }
+    token = _call_context.set(replace(current, **updates))
+    try:
+        yield
+    finally:
+        _call_context.reset(token)
+
+
+@dataclass
+class LLMRequest:
+    """
+    A single gateway call.
+
+    key: Identity of the request for coalescing/caching (None = unique call)
+    cacheable: Response may be served from / stored in the persistent cache
+    """
+    provider: str
+    model: str
+    key: Optional[str] = None
+    cacheable: bool = False
+    estimated_tokens: int = 0
+    context: LLMCallContext = field(default_factory=current_call_context)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap pre-call token estimate used for rate limiting (~4 chars/token)."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def request_key(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8", errors="replace"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+# ============================================================================
+# ADMISSION (concurrency + token rate + priority lanes)
+# ============================================================================
+
+class _TokenBucket:
+    """Tokens-per-minute bucket; may go into debt when actual usage exceeds estimates."""
+
+    def __init__(self, tokens_per_minute: Optional[int]):
+        self.rate = tokens_per_minute or 0
+        self.level = float(self.rate)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(float(self.rate), self.level + (now - self.updated) * self.rate / 60.0)
+        self.updated = now
+
+    def has_capacity(self) -> bool:
+        if not self.rate:
+            return True
+        self._refill()
+        # Any positive balance admits a call, so requests larger than the
+        # bucket cannot deadlock; the overdraft is paid back by refill.
+        return self.level > 0
+
+    def charge(self, tokens: float) -> None:
+        if self.rate:
+            self._refill()
+            self.level -= tokens
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "provider", "tenant", "tokens", "granted", "event", "loop", "future")
+
+    def __init__(self, priority, seq, provider, tenant, tokens):
+        self.priority = priority
+        self.seq = seq
+        self.provider = provider
+        self.tenant = tenant
+        self.tokens = tokens
+        self.granted = False
+        self.event: Optional[threading.Event] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.future: Optional[asyncio.Future] = None
+
+    def notify(self) -> None:
+        if self.event is not None:
+            self.event.set()
+        elif self.loop is not None and self.future is not None:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(True)
+
+
+class _Admission:
+    """Grants call slots in (priority, arrival) order across sync and async callers."""
+
+    def __init__(
+        self,
+        provider_concurrency: int,
+        tenant_concurrency: int,
+        background_share: float,
+        provider_tokens_per_minute: Optional[int],
+        tenant_tokens_per_minute: Optional[int],
+    ):
+        self.provider_concurrency = provider_concurrency
+        self.tenant_concurrency = tenant_concurrency
+        self.background_share = background_share
+        self.provider_tpm = provider_tokens_per_minute
+        self.tenant_tpm = tenant_tokens_per_minute
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._waiters: List[_Waiter] = []
+        self._provider_inflight: Dict[str, int] = {}
+        self._tenant_inflight: Dict[Tuple[str, Any], int] = {}
+        self._buckets: Dict[Any, _TokenBucket] = {}
+
+    def _bucket(self, key: Any, rate: Optional[int]) -> _TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _TokenBucket(rate)
+        return bucket
+
+    def _fits(self, w: _Waiter) -> bool:
+        limit = self.provider_concurrency
+        if w.priority > PRIORITY_INTERACTIVE:
+            limit = max(1, int(limit * self.background_share))
+        if self._provider_inflight.get(w.provider, 0) >= limit:
+            return False
+        if w.tenant is not None and self._tenant_inflight.get((w.provider, w.tenant), 0) >= self.tenant_concurrency:
+            return False
+        if not self._bucket(w.provider, self.provider_tpm).has_capacity():
+            return False
+        if w.tenant is not None and not self._bucket((w.provider, w.tenant), self.tenant_tpm).has_capacity():
+            return False
+        return True
+
+    def _grant(self, w: _Waiter) -> None:
+        w.granted = True
+        self._provider_inflight[w.provider] = self._provider_inflight.get(w.provider, 0) + 1
+        self._bucket(w.provider, self.provider_tpm).charge(w.tokens)
+        if w.tenant is not None:
+            key = (w.provider, w.tenant)
+            self._tenant_inflight[key] = self._tenant_inflight.get(key, 0) + 1
+            self._bucket(key, self.tenant_tpm).charge(w.tokens)
+
+    def _pump(self) -> None:
+        """Admit every queued waiter that fits, highest priority first (lock held)."""
+        if not self._waiters:
+            return
+        self._waiters.sort(key=lambda w: (w.priority, w.seq))
+        remaining = []
+        for w in self._waiters:
+            if self._fits(w):
+                self._grant(w)
+                w.notify()
+            else:
+                remaining.append(w)
+        self._waiters = remaining
+
+    def _enqueue(self, provider: str, tenant: Any, priority: int, tokens: int) -> _Waiter:
+        self._seq += 1
+        w = _Waiter(priority, self._seq, provider, tenant, tokens)
+        self._waiters.append(w)
+        self._pump()
+        return w
+
+    def _abandon(self, w: _Waiter) -> None:
+        with self._lock:
+            if w.granted:
+                self._release_locked(w, actual_tokens=None)
+            elif w in self._waiters:
+                self._waiters.remove(w)
+
+    def acquire(self, provider: str, tenant: Any, priority: int, tokens: int, timeout: float) -> _Waiter:
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            w = self._enqueue(provider, tenant, priority, tokens)
+            if w.granted:
+                return w
+            w.event = threading.Event()
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"LLM gateway queue wait exceeded {timeout}s for {provider}")
+                if w.event.wait(min(_WAIT_POLL_SECONDS, remaining)):
+                    return w
+                with self._lock:
+                    self._pump()
+                    if w.granted:
+                        return w
+        except BaseException:
+            self._abandon(w)
+            raise
+
+    async def acquire_async(self, provider: str, tenant: Any, priority: int, tokens: int, timeout: float) -> _Waiter:
+        deadline = time.monotonic() + timeout
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            w = self._enqueue(provider, tenant, priority, tokens)
+            if w.granted:
+                return w
+            w.loop = loop
+            w.future = loop.create_future()
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"LLM gateway queue wait exceeded {timeout}s for {provider}")
+                try:
+                    await asyncio.wait_for(asyncio.shield(w.future), timeout=min(_WAIT_POLL_SECONDS, remaining))
+                    return w
+                except asyncio.TimeoutError:
+                    with self._lock:
+                        self._pump()
+                        if w.granted:
+                            return w
+        except BaseException:
+            self._abandon(w)
+            raise
+
+    def _release_locked(self, w: _Waiter, actual_tokens: Optional[int]) -> None:
+        self._provider_inflight[w.provider] = max(0, self._provider_inflight.get(w.provider, 0) - 1)
+        if w.tenant is not None:
+            key = (w.provider, w.tenant)
+            self._tenant_inflight[key] = max(0, self._tenant_inflight.get(key, 0) - 1)
+        if actual_tokens is not None and actual_tokens != w.tokens:
+            # Reconcile the estimate with what the provider reported
+            delta = actual_tokens - w.tokens
+            self._bucket(w.provider, self.provider_tpm).charge(delta)
+            if w.tenant is not None:
+                self._bucket((w.provider, w.tenant), self.tenant_tpm).charge(delta)
+        self._pump()
+
+    def release(self, w: _Waiter, actual_tokens: Optional[int] = None) -> None:
+        with self._lock:
+            self._release_locked(w, actual_tokens)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'in_flight': dict(self._provider_inflight),
+                'queued': {
+                    'interactive': sum(1 for w in self._waiters if w.priority == PRIORITY_INTERACTIVE),
+                    'background': sum(1 for w in self._waiters if w.priority > PRIORITY_INTERACTIVE),
+                },
+            }
+
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+class ResponseCache:
+    """
+    Persistent cache of serialized deterministic responses.
+
+    Storage is Redis (shared by API and Celery workers). If Redis is
+    unreachable the cache degrades to a bounded per-process LRU.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, ttl_seconds: int = GATEWAY_CACHE_TTL_SECONDS,
+                 local_size: int = GATEWAY_LOCAL_CACHE_SIZE):
+        self.redis_url = redis_url or URLs.REDIS
+        self.ttl_seconds = ttl_seconds
+        self.local_size = local_size
+        self._client = None
+        self._retry_at = 0.0
+        self._local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _redis(self):
+        if self._client is None and time.time() >= self._retry_at:
+            try:
+                import redis
+                client = redis.from_url(self.redis_url, decode_responses=True, socket_timeout=1)
+                client.ping()
+                self._client = client
+            except Exception as e:
+                logger.warning(f"[LLMGateway] Redis unavailable, using in-process response cache: {e}")
+                self._retry_at = time.time() + _REDIS_RETRY_SECONDS
+        return self._client
+
+    def get(self, key: str) -> Optional[str]:
+        client = self._redis()
+        if client is not None:
+            try:
+                return client.get(_CACHE_KEY.format(key=key))
+            except Exception as e:
+                logger.warning(f"[LLMGateway] Cache read failed: {e}")
+                return None
+        with self._lock:
+            entry = self._local.get(key)
+            if entry and entry[0] > time.time():
+                self._local.move_to_end(key)
+                return entry[1]
+        return None
+
+    def put(self, key: str, value: str) -> None:
+        client = self._redis()
+        if client is not None:
+            try:
+                client.set(_CACHE_KEY.format(key=key), value, ex=self.ttl_seconds)
+                return
+            except Exception as e:
+                logger.warning(f"[LLMGateway] Cache write failed: {e}")
+        with self._lock:
+            self._local[key] = (time.time() + self.ttl_seconds, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+
+class ResultCodec:
+    """
+    How a gateway result is copied for followers and metered.
+
+    The base codec never caches; codecs that can serialize their results
+    set ``cacheable`` and implement encode/decode.
+    """
+
+    cacheable = False
+
+    def encode(self, result: Any) -> Optional[str]:
+        return None
+
+    def decode(self, raw: str) -> Any:
+        return None
+
+    def copy(self, result: Any) -> Any:
+        return copy.deepcopy(result)
+
+    def usage(self, result: Any) -> Tuple[int, int]:
+        """(prompt_tokens, completion_tokens); zeros if unknown."""
+        return 0, 0
+
+
+# ============================================================================
+# GATEWAY
+# ============================================================================
+
+@dataclass
+class _CallerStats:
+    calls: int = 0
+    cache_hits: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    queue_ms: float = 0.0
+    latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        executed = self.calls - self.cache_hits - self.coalesced
+        return {
+            'calls': self.calls,
+            'cache_hits': self.cache_hits,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'avg_queue_ms': round(self.queue_ms / executed, 1) if executed > 0 else 0.0,
+            'avg_latency_ms': round(self.latency_ms / executed, 1) if executed > 0 else 0.0,
+            'max_latency_ms': round(self.max_latency_ms, 1),
+        }
+
+
+class LLMGateway:
+    """
+    Admission, coalescing, caching and accounting for LLM calls.
+
+    Sync (run_sync / slot) and async (run / aslot) callers share the same
+    limits, in-flight table and cache.
+    """
+
+    def __init__(
+        self,
+        provider_concurrency: int = GATEWAY_PROVIDER_CONCURRENCY,
+        tenant_concurrency: int = GATEWAY_TENANT_CONCURRENCY,
+        background_share: float = GATEWAY_BACKGROUND_SHARE,
+        provider_tokens_per_minute: Optional[int] = GATEWAY_PROVIDER_TOKENS_PER_MINUTE,
+        tenant_tokens_per_minute: Optional[int] = GATEWAY_TENANT_TOKENS_PER_MINUTE,
+        max_queue_wait: float = GATEWAY_MAX_QUEUE_WAIT_SECONDS,
+        cache: Optional[ResponseCache] = None,
+    ):
+        self.admission = _Admission(
+            provider_concurrency, tenant_concurrency, background_share,
+            provider_tokens_per_minute, tenant_tokens_per_minute,
+        )
+        self.max_queue_wait = max_queue_wait
+        self.cache = cache or ResponseCache()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._callers: Dict[str, _CallerStats] = {}
+
+    # --- accounting ---
+
+    def _stats_for(self, caller: str) -> _CallerStats:
+        stats = self._callers.get(caller)
+        if stats is None:
+            stats = self._callers[caller] = _CallerStats()
+        return stats
+
+    def _record(self, request: LLMRequest, outcome: str, queue_ms: float = 0.0,
+                latency_ms: float = 0.0, usage: Tuple[int, int] = (0, 0)) -> None:
+        with self._lock:
+            stats = self._stats_for(request.context.caller)
+            stats.calls += 1
+            if outcome == 'cache_hit':
+                stats.cache_hits += 1
+            elif outcome == 'coalesced':
+                stats.coalesced += 1
+            elif outcome == 'error':
+                stats.errors += 1
+            if outcome in ('executed', 'error'):
+                stats.queue_ms += queue_ms
+                stats.latency_ms += latency_ms
+                stats.max_latency_ms = max(stats.max_latency_ms, latency_ms)
+            stats.prompt_tokens += usage[0]
+            stats.completion_tokens += usage[1]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            callers = {name: stats.as_dict() for name, stats in self._callers.items()}
+            inflight_keys = len(self._inflight)
+        totals = _CallerStats()
+        for stats in self._callers.values():
+            for attr in ('calls', 'cache_hits', 'coalesced', 'errors', 'prompt_tokens', 'completion_tokens'):
+                setattr(totals, attr, getattr(totals, attr) + getattr(stats, attr))
+        return {
+            'totals': {k: v for k, v in totals.as_dict().items() if not k.endswith('_ms')},
+            'callers': callers,
+            'admission': self.admission.snapshot(),
+            'coalescing_keys_in_flight': inflight_keys,
+        }
+
+    # --- cache / single-flight helpers ---
+
+    @staticmethod
+    def _uses_cache(request: LLMRequest, codec: ResultCodec) -> bool:
+        return bool(codec.cacheable and request.cacheable and request.key and request.context.cache)
+
+    def _cache_lookup(self, request: LLMRequest, codec: ResultCodec) -> Optional[Any]:
+        if not self._uses_cache(request, codec):
+            return None
+        raw = self.cache.get(request.key)
+        if raw is None:
+            return None
+        try:
+            return codec.decode(raw)
+        except Exception as e:
+            logger.debug(f"[LLMGateway] Discarding undecodable cache entry: {e}")
+            return None
+
+    def _cache_store(self, request: LLMRequest, codec: ResultCodec, result: Any) -> None:
+        if not self._uses_cache(request, codec):
+            return
+        try:
+            raw = codec.encode(result)
+        except Exception as e:
+            logger.debug(f"[LLMGateway] Result not cacheable: {e}")
+            return
+        if raw is not None:
+            self.cache.put(request.key, raw)
+
+    def _join_or_lead(self, request: LLMRequest) -> Tuple[Optional[Future], bool]:
+        """Return (future, is_leader); future is None for uncoalescable requests."""
+        if not request.key:
+            return None, True
+        with self._lock:
+            future = self._inflight.get(request.key)
+            if future is not None:
+                return future, False
+            future = self._inflight[request.key] = Future()
+            return future, True
+
+    def _finish_lead(self, request: LLMRequest, future: Optional[Future], result: Any = None,
+                     error: Optional[BaseException] = None) -> None:
+        if future is None:
+            return
+        with self._lock:
+            self._inflight.pop(request.key, None)
+        # Followers never cancel the shared future, but don't let a stray
+        # cancel turn into InvalidStateError in the leader
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    # --- sync API ---
+
+    def run_sync(self, request: LLMRequest, fn: Callable[[], Any], codec: Optional[ResultCodec] = None) -> Any:
+        """Run a blocking model call through the gateway."""
+        codec = codec or ResultCodec()
+        if _inside_gateway.get():
+            return fn()
+
+        cached = self._cache_lookup(request, codec)
+        if cached is not None:
+            self._record(request, 'cache_hit')
+            return cached
+
+        future, leader = self._join_or_lead(request)
+        if not leader:
+            result = future.result()
+            self._record(request, 'coalesced')
+            return codec.copy(result)
+
+        try:
+            with self.slot(request) as slot:
+                token = _inside_gateway.set(True)
+                try:
+                    result = fn()
+                finally:
+                    _inside_gateway.reset(token)
+                slot['usage'] = codec.usage(result)
+        except BaseException as e:
+            self._finish_lead(request, future, error=e)
+            raise
+        self._finish_lead(request, future, result=result)
+        self._cache_store(request, codec, result)
+        return result
+
+    @contextmanager
+    def slot(self, request: LLMRequest):
+        """Hold an admission slot for the duration of a (sync) call or stream."""
+        if _inside_gateway.get():
+            yield {}
+            return
+        ctx = request.context
+        queued = time.monotonic()
+        waiter = self.admission.acquire(
+            request.provider, ctx.tenant, ctx.priority, request.estimated_tokens, self.max_queue_wait,
+        )
+        started = time.monotonic()
+        slot: Dict[str, Any] = {}
+        outcome = 'error'
+        try:
+            yield slot
+            outcome = 'executed'
+        finally:
+            usage = slot.get('usage') or (0, 0)
+            actual = sum(usage) if any(usage) else None
+            self.admission.release(waiter, actual_tokens=actual)
+            self._record(
+                request, outcome,
+                queue_ms=(started - queued) * 1000,
+                latency_ms=(time.monotonic() - started) * 1000,
+                usage=usage if any(usage) else (request.estimated_tokens, 0),
+            )
+
+    # --- async API ---
+
+    async def run(self, request: LLMRequest, fn: Callable[[], Awaitable[Any]],
+                  codec: Optional[ResultCodec] = None) -> Any:
+        """Run an async model call through the gateway."""
+        codec = codec or ResultCodec()
+        if _inside_gateway.get():
+            return await fn()
+
+        if self._uses_cache(request, codec):
+            cached = await asyncio.to_thread(self._cache_lookup, request, codec)
+            if cached is not None:
+                self._record(request, 'cache_hit')
+                return cached
+
+        future, leader = self._join_or_lead(request)
+        if not leader:
+            # Shielded: a cancelled follower must not cancel the shared
+            # future out from under the leader and the other followers
+            result = await asyncio.shield(asyncio.wrap_future(future))
+            self._record(request, 'coalesced')
+            return codec.copy(result)
+
+        try:
+            async with self.aslot(request) as slot:
+                token = _inside_gateway.set(True)
+                try:
+                    result = await fn()
+                finally:
+                    _inside_gateway.reset(token)
+                slot['usage'] = codec.usage(result)
+        except BaseException as e:
+            self._finish_lead(request, future, error=e)
+            raise
+        self._finish_lead(request, future, result=result)
+        if self._uses_cache(request, codec):
+            await asyncio.to_thread(self._cache_store, request, codec, result)
+        return result
+
+    @asynccontextmanager
+    async def aslot(self, request: LLMRequest):
+        """Hold an admission slot for the duration of an async call or stream."""
+        if _inside_gateway.get():
+            yield {}
+            return
+        ctx = request.context
+        queued = time.monotonic()
+        waiter = await self.admission.acquire_async(
+            request.provider, ctx.tenant, ctx.priority, request.estimated_tokens, self.max_queue_wait,
+        )
+        started = time.monotonic()
+        slot: Dict[str, Any] = {}
+        outcome = 'error'
+        try:
+            yield slot
+            outcome = 'executed'
+        finally:
+            usage = slot.get('usage') or (0, 0)
+            actual = sum(usage) if any(usage) else None
+            self.admission.release(waiter, actual_tokens=actual)
+            self._record(
+                request, outcome,
+                queue_ms=(started - queued) * 1000,
+                latency_ms=(time.monotonic() - started) * 1000,
+                usage=usage if any(usage) else (request.estimated_tokens, 0),
+            )
+
+
+# ============================================================================
+# LANGCHAIN CHAT MODEL ADAPTER
+# ============================================================================
+
+class ChatResultCodec(ResultCodec):
+    """Serialize LangChain ChatResults with langchain_core's loader."""
+
+    cacheable = True
+
+    def encode(self, result: Any) -> Optional[str]:
+        from langchain_core.load import dumps
+        return dumps(result.generations)
+
+    def decode(self, raw: str) -> Any:
+        from langchain_core.load import loads
+        from langchain_core.outputs import ChatResult
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return ChatResult(generations=loads(raw))
+
+    def usage(self, result: Any) -> Tuple[int, int]:
+        prompt = completion = 0
+        for generation in getattr(result, 'generations', []) or []:
+            meta = getattr(getattr(generation, 'message', None), 'usage_metadata', None) or {}
+            prompt += meta.get('input_tokens', 0) or 0
+            completion += meta.get('output_tokens', 0) or 0
+        return prompt, completion
+
+
+_CHAT_CODEC = ChatResultCodec()
+
+
+class GatewayChatModelMixin:
+    """
+    Route a LangChain chat model's generate/stream calls through the gateway.
+
+    Mix in before the concrete model class:
+        class GatewayChatGoogleGenerativeAI(GatewayChatModelMixin, ChatGoogleGenerativeAI): ...
+    """
+
+    gateway_provider = PROVIDER_GEMINI
+
+    def _gateway_request(self, messages, stop, kwargs, coalesce: bool = True) -> LLMRequest:
+        ctx = current_call_context()
+        text = " ".join(str(getattr(m, 'content', m)) for m in messages)
+        key = None
+        if coalesce:
+            try:
+                from langchain_core.load import dumps
+                key = request_key(self._get_llm_string(stop=stop, **kwargs), dumps(messages))
+            except Exception:
+                key = None
+        temperature = getattr(self, 'temperature', None)
+        return LLMRequest(
+            provider=self.gateway_provider,
+            model=str(getattr(self, 'model', None) or self._llm_type),
+            key=key,
+            cacheable=temperature is not None and float(temperature) == 0.0,
+            estimated_tokens=estimate_tokens(text),
+            context=ctx,
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        parent = super(GatewayChatModelMixin, self)
+        return get_llm_gateway().run_sync(
+            self._gateway_request(messages, stop, kwargs),
+            lambda: parent._generate(messages, stop=stop, run_manager=run_manager, **kwargs),
+            codec=_CHAT_CODEC,
+        )
+
+    def _delegates_to_sync(self, name: str) -> bool:
+        """True if the wrapped model only has LangChain's default async shim
+        (which runs the sync method in an executor, and that is gated already)."""
+        from langchain_core.language_models.chat_models import BaseChatModel
+        for klass in type(self).__mro__:
+            if klass is GatewayChatModelMixin or issubclass(klass, GatewayChatModelMixin):
+                continue
+            if name in klass.__dict__:
+                return klass is BaseChatModel
+        return True
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        parent = super(GatewayChatModelMixin, self)
+        if self._delegates_to_sync('_agenerate'):
+            return await parent._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        return await get_llm_gateway().run(
+            self._gateway_request(messages, stop, kwargs),
+            lambda: parent._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs),
+            codec=_CHAT_CODEC,
+        )
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        request = self._gateway_request(messages, stop, kwargs, coalesce=False)
+        with get_llm_gateway().slot(request):
+            yield from super(GatewayChatModelMixin, self)._stream(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            )
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        parent = super(GatewayChatModelMixin, self)
+        if self._delegates_to_sync('_astream'):
+            async for chunk in parent._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                yield chunk
+            return
+        request = self._gateway_request(messages, stop, kwargs, coalesce=False)
+        async with get_llm_gateway().aslot(request):
+            async for chunk in parent._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                yield chunk
+
+
+# Global gateway
+_llm_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get the process-wide LLM gateway"""
+    global _llm_gateway
+    if _llm_gateway is None:
+        with _gateway_lock:
+            if _llm_gateway is None:
+                _llm_gateway = LLMGateway()
+    return _llm_gateway
+
+
+def set_llm_gateway(gateway: Optional[LLMGateway]) -> None:
+    """Replace the process-wide gateway (tests, custom limits)."""
+    global _llm_gateway
+    with _gateway_lock:
+        _llm_gateway = gateway
@@ -559,6 +559,188 @@ class SemanticMemory:
         # 3. Fallback to keyword search
         return await self._keyword_fact_search(query, user_id, limit)
 
+    async def search_facts_batch(self,
+                                 queries: List[str],
+                                 user_id: int,
+                                 limit: int = 5,
+                                 use_semantic: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Search facts for several queries at once.
+        
+        Follows the same hierarchy as search_facts(), but each tier runs once
+        for all queries still without results (one DB round trip per tier
+        instead of one per query).
+        
+        Args:
+            queries: Search queries
+            user_id: User ID
+            limit: Max results per query
+            use_semantic: Whether to use semantic search
+            
+        Returns:
+            Mapping of query -> results (every query is present)
+        """
+        results: Dict[str, List[Dict[str, Any]]] = {q: [] for q in queries}
+        
+        tiers = []
+        if use_semantic and self.rag:
+            tiers.append(("RAG", self._semantic_fact_search_batch))
+        if use_semantic:
+            tiers.append(("Embedding", self._embedding_fact_search_batch))
+        tiers.append(("Keyword", self._keyword_fact_search_batch))
+        
+        for name, search in tiers:
+            pending = [q for q, found in results.items() if not found]
+            if not pending:
+                break
+            try:
+                found = await search(pending, user_id, limit)
+            except Exception as e:
+                logger.debug(f"{name} batch fact search failed: {e}")
+                continue
+            for query in pending:
+                results[query] = found.get(query, [])
+        
+        return results
+
+    async def _semantic_fact_search_batch(
+        self,
+        queries: List[str],
+        user_id: int,
+        limit: int
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """RAG search per query (concurrently), then one DB fetch for all hits."""
+        import asyncio
+        
+        searches = await asyncio.gather(*(
+            asyncio.to_thread(
+                self.rag.search,
+                query,
+                k=limit,
+                filters={'type': 'fact', 'user_id': str(user_id)}
+            )
+            for query in queries
+        ))
+        
+        # query -> [(fact_id, score)]
+        hits: Dict[str, List[Tuple[int, float]]] = {}
+        for query, search_results in zip(queries, searches):
+            for result in search_results:
+                fact_id_str = result.get('metadata', {}).get('id', '') or result.get('id', '')
+                if fact_id_str.startswith('fact_'):
+                    hits.setdefault(query, []).append((
+                        int(fact_id_str.replace('fact_', '')),
+                        result.get('score', result.get('confidence', 0.5))
+                    ))
+        
+        fact_ids = {fact_id for pairs in hits.values() for fact_id, _ in pairs}
+        if not fact_ids:
+            return {}
+        
+        try:
+            stmt = select(AgentFact).where(AgentFact.id.in_(fact_ids))
+            result = await self.db.execute(stmt)
+            facts = {f.id: f for f in result.scalars().all()}
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Semantic batch fact search DB query failed: {e}")
+            return {}
+        
+        return {
+            query: [
+                {
+                    "id": facts[fact_id].id,
+                    "content": facts[fact_id].content,
+                    "category": facts[fact_id].category,
+                    "confidence": facts[fact_id].confidence,
+                    "score": score,
+                    "source": facts[fact_id].source
+                }
+                for fact_id, score in pairs if fact_id in facts
+            ]
+            for query, pairs in hits.items()
+        }
+
+    async def _embedding_fact_search_batch(
+        self,
+        queries: List[str],
+        user_id: int,
+        limit: int
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Embedding similarity for all queries against one load of the user's facts."""
+        from .memory_utils import compute_similarity_scores
+        
+        all_facts = await self.get_facts(user_id, limit=100, min_confidence=0.3)
+        if not all_facts:
+            return {}
+        
+        candidates = [{"content": f.get("content", "")} for f in all_facts]
+        min_score = 0.3
+        results = {}
+        for query in queries:
+            scores = compute_similarity_scores(query, candidates)
+            scored_facts = sorted(zip(all_facts, scores), key=lambda x: x[1], reverse=True)
+            results[query] = [
+                {**fact, "score": score}
+                for fact, score in scored_facts[:limit]
+                if score >= min_score
+            ]
+        return results
+
+    async def _keyword_fact_search_batch(
+        self,
+        queries: List[str],
+        user_id: int,
+        limit: int
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """One keyword query covering every query's keywords, split back per query."""
+        keywords = {q: [w for w in q.split() if len(w) > 3] for q in queries}
+        all_keywords = sorted({w for words in keywords.values() for w in words})
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        
+        if any(not words for words in keywords.values()):
+            recent = await self.get_facts(user_id, limit=limit)
+            for query, words in keywords.items():
+                if not words:
+                    results[query] = recent
+        if not all_keywords:
+            return results
+        
+        try:
+            from sqlalchemy import or_
+            conditions = [AgentFact.content.ilike(f"%{kw}%") for kw in all_keywords]
+            
+            # Over-fetch so one query's matches can't crowd out another's
+            stmt = select(AgentFact).where(
+                AgentFact.user_id == user_id,
+                or_(*conditions)
+            ).order_by(desc(AgentFact.confidence)).limit(limit * len(queries) * 4)
+            
+            result = await self.db.execute(stmt)
+            facts = result.scalars().all()
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Keyword batch fact search failed: {e}")
+            return results
+        
+        for query, words in keywords.items():
+            if not words:
+                continue
+            lowered = [w.lower() for w in words]
+            results[query] = [
+                {
+                    "id": f.id,
+                    "content": f.content,
+                    "category": f.category,
+                    "confidence": f.confidence,
+                    "score": 0.7,  # Keyword match score
+                    "source": f.source
+                }
+                for f in facts
+                if any(w in (f.content or "").lower() for w in lowered)
+            ][:limit]
+        return results
+
     async def _embedding_fact_search(
         self,
         query: str,
@@ -34,3 +34,18 @@ SESSION_ID_DISPLAY_LENGTH = 8
 # Entity Types for Context Extraction
 ENTITY_TYPES: List[str] = ['people', 'meetings', 'tasks', 'emails']
 
+
+# Keyword (full-text) Search
+KEYWORD_SEARCH_RECENCY_HALF_LIFE_DAYS = 90  # Relevance halves for messages this old
+KEYWORD_SEARCH_CANDIDATE_MULTIPLIER = 4  # FTS5 candidates fetched per result before recency re-rank
+KEYWORD_SEARCH_MAX_TOKEN_LENGTH = 64
+
+# Tiered Retention (hot → warm → cold)
+SUMMARY_STATUS_PENDING = "pending"
+SUMMARY_STATUS_COMPLETED = "completed"
+WARM_TIER_RETENTION_DAYS = 180
+TIERING_BATCH_SIZE = 500  # Sessions staged / messages deleted per statement
+SUMMARIZER_BATCH_SIZE = 40  # Pending sessions loaded per summarizer batch (one commit each)
+SUMMARIZER_SESSIONS_PER_REQUEST = 8  # Sessions packed into a single LLM call
+SUMMARIZER_MAX_MESSAGES_PER_SESSION = 50
+SUMMARIZER_MESSAGE_PREVIEW_LENGTH = 150
@@ -11,7 +11,6 @@ during LLM API calls (200-500ms each). This enables 10-100x throughput improveme
 """
 import json
 import re
-import hashlib
 import asyncio
 from typing import Dict, Any, Optional, List
 from pydantic import BaseModel, Field
@@ -22,6 +21,11 @@ from ..utils.config import Config
 from .llm_factory import LLMFactory
 from .prompts import INTENT_CLASSIFICATION_PROMPT
 from .prompts.utils import format_prompt
+from .classification_cache import (
+    ClassificationCache,
+    classifier_version,
+    get_classification_cache,
+)
 
 logger = setup_logger(__name__)
 
@@ -85,14 +89,31 @@ class QueryClassifier:
     Direct imports are now possible since ai/ can import from utils/ without cycles.
     """
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, cache: Optional[ClassificationCache] = None):
         self.config = config
         self.llm_client = None
         self.provider = None
         self.supports_structured_outputs = False
-        self._classification_cache = {} 
+        # Shared across instances and processes; versioned by prompt/schema/model
+        self._classification_cache = cache or get_classification_cache(
+            self._cache_version(),
+            embedder_factory=self._create_embedder
+        )
         self._init_llm()
     
+    def _cache_version(self) -> str:
+        """Changes whenever the classification prompt, schema or model changes."""
+        return classifier_version(
+            INTENT_CLASSIFICATION_PROMPT,
+            json.dumps(IntentClassificationSchema.model_json_schema(), sort_keys=True),
+            str(getattr(getattr(self.config, 'ai', None), 'model', ''))
+        )
+    
+    def _create_embedder(self):
+        """Embedding provider for near-hit cache lookups (built on first use)."""
+        from .rag.core.embedding_provider import create_embedding_provider
+        return create_embedding_provider(self.config, getattr(self.config, 'rag', None))
+    
     def _init_llm(self):
         """Initialize LLM client and detect structured output support"""
         try:
@@ -133,11 +154,11 @@ class QueryClassifier:
             logger.warning("LLM not available, using basic classification")
             return self._basic_classify(query)
         
-        # Check cache first to prevent hitting rate limits
-        query_hash = hashlib.md5(query.lower().strip().encode()).hexdigest()
-        if query_hash in self._classification_cache:
+        # Check cache first (exact, then near-hit) to skip the LLM call
+        cached = await asyncio.to_thread(self._classification_cache.get, query)
+        if cached is not None:
             logger.debug(f"Using cached classification for: {query[:30]}...")
-            return self._classification_cache[query_hash]
+            return cached
         
         # Try structured outputs first if supported
         if self.supports_structured_outputs:
@@ -145,7 +166,7 @@ class QueryClassifier:
                 classification = await self._classify_with_structured_outputs(query)
                 if classification:
                     # Cache the result
-                    self._classification_cache[query_hash] = classification
+                    await asyncio.to_thread(self._classification_cache.put, query, classification)
                     logger.info(f"[SEARCH] Query classified (structured): intent={classification.get('intent')}, "
                                f"confidence={classification.get('confidence')}")
                     return classification
@@ -156,7 +177,7 @@ class QueryClassifier:
         try:
             classification = await self._classify_with_prompt(query)
             # Cache the result
-            self._classification_cache[query_hash] = classification
+            await asyncio.to_thread(self._classification_cache.put, query, classification)
             logger.info(f"[SEARCH] Query classified (prompt-based): intent={classification.get('intent')}, "
                        f"confidence={classification.get('confidence')}")
             return classification
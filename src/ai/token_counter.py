@@ -0,0 +1,264 @@
+"""
+Local Token Counter
+
+Provider-free token counting for context budgeting, so assembling a context
+never waits on a count_tokens network call.
+
+- Counts come from a local BPE encoding (tiktoken cl100k_base) when it can be
+  loaded, otherwise from a word/punctuation heuristic.
+- Each model family has a calibration ratio (provider tokens / local tokens).
+  Ratios start from built-in defaults and are refined from sampled provider
+  counts, which callers collect off the critical path (see
+  ContextAssembler._calibrate_in_background).
+- Counts are cached per content hash, so re-counting the same facts across
+  pruning passes and turns is free.
+- TokenLedger supports incremental totals as sections are added and pruned.
+
+Error bound: after calibration, local counts are expected to be within
+TOKEN_COUNT_ERROR_BOUND (relative) of the provider's count for prose. The
+observed error of every calibration sample is tracked in get_stats() and a
+warning is logged when a sample falls outside the bound.
+"""
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Stated relative error bound vs. the provider's count (prose, after calibration)
+TOKEN_COUNT_ERROR_BOUND = 0.10
+# Cached counts (per process, keyed by content hash)
+TOKEN_CACHE_SIZE = 10_000
+# Take one provider sample every N counted assemblies per family
+CALIBRATION_SAMPLE_EVERY = 50
+# Weight of a new sample in the calibration ratio (EWMA)
+CALIBRATION_SMOOTHING = 0.2
+# Don't retry loading the local encoding more often than this
+ENCODING_RETRY_SECONDS = 600
+
+# Initial provider/local ratios per model family (refined online)
+DEFAULT_CALIBRATION = {
+    'gemini': 1.0,
+    'gpt': 1.0,
+    'default': 1.0,
+}
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def model_family(model: Optional[str]) -> str:
+    name = (model or '').lower()
+    if 'gemini' in name:
+        return 'gemini'
+    if name.startswith('gpt') or name.startswith('o1') or name.startswith('o3'):
+        return 'gpt'
+    return 'default'
+
+
+def heuristic_token_count(text: str) -> int:
+    """
+    Tokenizer-free estimate: words split into ~4-character pieces, one token
+    per punctuation mark and per non-ASCII character.
+    """
+    if not text:
+        return 0
+    total = 0
+    for piece in _WORD_RE.findall(text):
+        if piece.isascii():
+            total += 1 if len(piece) <= 4 else math.ceil(len(piece) / 4)
+        else:
+            total += len(piece)
+    return total
+
+
+class _LocalEncoding:
+    """Lazily loaded cl100k_base encoder shared by all counters."""
+
+    def __init__(self):
+        self._encoding = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._encoding is not None or time.monotonic() < self._retry_at:
+            return self._encoding
+        with self._lock:
+            if self._encoding is None and time.monotonic() >= self._retry_at:
+                try:
+                    import tiktoken
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    logger.warning(f"[TokenCounter] Local BPE encoding unavailable, using heuristic: {e}")
+                    self._retry_at = time.monotonic() + ENCODING_RETRY_SECONDS
+        return self._encoding
+
+
+_local_encoding = _LocalEncoding()
+
+
+def _default_encoder(text: str) -> int:
+    encoding = _local_encoding.get()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return heuristic_token_count(text)
+
+
+class TokenCounter:
+    """
+    Calibrated, cached local token counter for one model family.
+
+    Example:
+        counter = get_token_counter("gemini-2.5-flash")
+        n = counter.count(prompt)
+    """
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        encoder: Optional[Callable[[str], int]] = None,
+        cache_size: int = TOKEN_CACHE_SIZE,
+        error_bound: float = TOKEN_COUNT_ERROR_BOUND,
+    ):
+        self.model = model
+        self.family = model_family(model)
+        self.error_bound = error_bound
+        self._encoder = encoder or _default_encoder
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._ratio = DEFAULT_CALIBRATION.get(self.family, DEFAULT_CALIBRATION['default'])
+        self._counted = 0
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'samples': 0,
+            'samples_out_of_bound': 0,
+            'max_error': 0.0,
+            'mean_error': 0.0,
+        }
+
+    @property
+    def ratio(self) -> float:
+        return self._ratio
+
+    def _raw(self, text: str) -> int:
+        """Uncalibrated local count, cached by content hash."""
+        key = hashlib.blake2b(text.encode('utf-8', errors='replace'), digest_size=16).digest()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._stats['hits'] += 1
+                return cached
+        count = self._encoder(text)
+        with self._lock:
+            self._stats['misses'] += 1
+            self._cache[key] = count
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return count
+
+    def count(self, text: str) -> int:
+        """Calibrated token count for text (never touches the network)."""
+        if not text:
+            return 0
+        return max(1, round(self._raw(text) * self._ratio))
+
+    def upper_bound(self, text: str) -> int:
+        """Count padded by the error bound, for hard limits."""
+        return math.ceil(self.count(text) * (1 + self.error_bound))
+
+    def should_sample(self) -> bool:
+        """True once every CALIBRATION_SAMPLE_EVERY calls; callers then fetch a provider count."""
+        with self._lock:
+            self._counted += 1
+            return self._counted % CALIBRATION_SAMPLE_EVERY == 1
+
+    def calibrate(self, text: str, provider_count: int) -> None:
+        """Fold a provider-reported count for text into the family ratio."""
+        raw = self._raw(text)
+        if not raw or provider_count <= 0:
+            return
+        with self._lock:
+            error = abs(round(raw * self._ratio) - provider_count) / provider_count
+            n = self._stats['samples'] + 1
+            self._stats['samples'] = n
+            self._stats['mean_error'] += (error - self._stats['mean_error']) / n
+            self._stats['max_error'] = max(self._stats['max_error'], error)
+            if error > self.error_bound:
+                self._stats['samples_out_of_bound'] += 1
+                logger.warning(
+                    f"[TokenCounter] {self.family} local count off by {error:.1%} "
+                    f"(bound {self.error_bound:.0%}); recalibrating"
+                )
+            observed = provider_count / raw
+            self._ratio += CALIBRATION_SMOOTHING * (observed - self._ratio)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached'] = len(self._cache)
+        stats.update({
+            'family': self.family,
+            'ratio': round(self._ratio, 4),
+            'error_bound': self.error_bound,
+            'mean_error': round(stats['mean_error'], 4),
+            'max_error': round(stats['max_error'], 4),
+        })
+        return stats
+
+
+class TokenLedger:
+    """
+    Running token total over named sections.
+
+    Sections are counted once when added; removing one subtracts its count,
+    so pruning passes never re-tokenize the whole prompt.
+    """
+
+    def __init__(self, counter: TokenCounter, separator_tokens: int = 1):
+        self.counter = counter
+        self.separator_tokens = separator_tokens
+        self._sections: Dict[Any, int] = {}
+        self.total = 0
+
+    def add(self, key: Any, text: str) -> int:
+        self.remove(key)
+        tokens = self.counter.count(text) + self.separator_tokens
+        self._sections[key] = tokens
+        self.total += tokens
+        return tokens
+
+    def remove(self, key: Any) -> int:
+        tokens = self._sections.pop(key, 0)
+        self.total -= tokens
+        return tokens
+
+    def cost(self, text: str) -> int:
+        """Tokens that adding text would cost."""
+        return self.counter.count(text) + self.separator_tokens
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._sections
+
+
+_counters: Dict[str, TokenCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def get_token_counter(model: Optional[str] = None) -> TokenCounter:
+    """Get the shared counter for a model's family."""
+    family = model_family(model)
+    counter = _counters.get(family)
+    if counter is None:
+        with _counters_lock:
+            counter = _counters.get(family)
+            if counter is None:
+                counter = _counters[family] = TokenCounter(model)
+    return counter
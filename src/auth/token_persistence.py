@@ -7,6 +7,38 @@ from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+def _save_tokens(creds: Any, target_type: str, condition: Any, label: str) -> None:
+    """Write refreshed tokens to the rows matching condition."""
+    try:
+        from src.database import get_db_context
+        from sqlalchemy import update
+        from src.database.models import UserIntegration, Session
+        
+        with get_db_context() as db:
+            # Map table-specific columns
+            access_col = "access_token" if target_type == "integration" else "gmail_access_token"
+            refresh_col = "refresh_token" if target_type == "integration" else "gmail_refresh_token"
+            expiry_col = "expires_at" if target_type == "integration" else "token_expiry"
+            
+            values = {
+                access_col: creds.token,
+                expiry_col: creds.expiry.replace(tzinfo=None) if creds.expiry else None
+            }
+            if creds.refresh_token:
+                values[refresh_col] = creds.refresh_token
+                
+            model = UserIntegration if target_type == "integration" else Session
+            db.execute(
+                update(model)
+                .where(condition(model))
+                .values(**values)
+            )
+            db.commit()
+            logger.info(f"[TokenPersistence] Persisted refreshed tokens for {label}")
+    except Exception as e:
+        logger.error(f"[TokenPersistence] Failed to persist tokens for {label}: {e}")
+
+
 def create_token_saver_callback(target_id: int, target_type: str = "integration"):
     """
     Creates a callback to persist refreshed tokens to the database.
@@ -19,33 +51,22 @@ def create_token_saver_callback(target_id: int, target_type: str = "integration"
         Callable that accepts (creds) object and saves to DB.
     """
     def save_tokens(creds: Any):
-        try:
-            from src.database import get_db_context
-            from sqlalchemy import update
-            from src.database.models import UserIntegration, Session
-            
-            with get_db_context() as db:
-                # Map table-specific columns
-                access_col = "access_token" if target_type == "integration" else "gmail_access_token"
-                refresh_col = "refresh_token" if target_type == "integration" else "gmail_refresh_token"
-                expiry_col = "expires_at" if target_type == "integration" else "token_expiry"
-                
-                values = {
-                    access_col: creds.token,
-                    expiry_col: creds.expiry.replace(tzinfo=None) if creds.expiry else None
-                }
-                if creds.refresh_token:
-                    values[refresh_col] = creds.refresh_token
-                    
-                model = UserIntegration if target_type == "integration" else Session
-                db.execute(
-                    update(model)
-                    .where(model.id == target_id)
-                    .values(**values)
-                )
-                db.commit()
-                logger.info(f"[TokenPersistence] Persisted refreshed tokens for {target_type} {target_id}")
-        except Exception as e:
-            logger.error(f"[TokenPersistence] Failed to persist tokens for {target_type} {target_id}: {e}")
+        _save_tokens(creds, target_type, lambda model: model.id == target_id, f"{target_type} {target_id}")
             
     return save_tokens
+
+
+def create_integration_token_saver(user_id: int, provider: str):
+    """
+    Creates a callback that persists refreshed tokens to the user's
+    UserIntegration row for provider (used by the Google client registry).
+    """
+    def save_tokens(creds: Any):
+        _save_tokens(
+            creds,
+            "integration",
+            lambda model: (model.user_id == user_id) & (model.provider == provider),
+            f"integration {provider} of user {user_id}",
+        )
+    
+    return save_tokens
@@ -6,6 +6,7 @@ Clean architecture with Google API clients and credential management.
 Exports:
 - Google API Clients: Calendar, Gmail, Tasks, Keep, Drive
 - Credential Management: CredentialProvider, CredentialFactory
+- Client Caching: GoogleClientRegistry, get_client_registry
 - Base Class: BaseGoogleAPIClient
 """
 
@@ -21,6 +22,7 @@ from .base.google_api_client import BaseGoogleAPIClient
 
 # Credential management
 from .credential_provider import CredentialProvider, CredentialFactory
+from .client_registry import GoogleClientRegistry, get_client_registry
 
 __all__ = [
     # API Clients
@@ -34,6 +36,8 @@ __all__ = [
     # Credentials
     'CredentialProvider',
     'CredentialFactory',
+    'GoogleClientRegistry',
+    'get_client_registry',
 ]
 
 
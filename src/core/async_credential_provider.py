@@ -202,11 +202,11 @@ class AsyncCredentialFactory:
         
         elif service_type.lower() == 'calendar':
             from ..integrations.google_calendar.service import CalendarService
-            return CalendarService(config=self.config, credentials=credentials)
+            return CalendarService(config=self.config, credentials=credentials, user_id=user_id)
             
         elif service_type.lower() in ['task', 'tasks']:
             from ..integrations.google_tasks.service import TaskService
-            return TaskService(config=self.config, credentials=credentials)
+            return TaskService(config=self.config, credentials=credentials, user_id=user_id)
             
         else:
             raise ValueError(f"Unknown service type: {service_type}")
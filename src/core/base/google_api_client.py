@@ -55,6 +55,15 @@ class BaseGoogleAPIClient(ABC):
         """Monkey-patch credentials.refresh to call our callback after success"""
         if not self.credentials:
             return
+        # Shared credentials from client_registry are refreshed and persisted
+        # by the registry under its per-(user, provider) lock
+        registry_key = getattr(self.credentials, '_registry_key', None)
+        if registry_key is not None:
+            from ..client_registry import get_client_registry
+            get_client_registry().set_token_saver(*registry_key, self.token_update_callback)
+            return
+        if getattr(self.credentials, '_persist_on_refresh', False):
+            return
             
         original_refresh = self.credentials.refresh
         
@@ -68,6 +77,7 @@ class BaseGoogleAPIClient(ABC):
                 logger.error(f"Failed to persist refreshed tokens: {e}")
         
         self.credentials.refresh = wrapped_refresh
+        self.credentials._persist_on_refresh = True
     
     def _load_credentials(self) -> Optional[Credentials]:
         """
@@ -19,6 +19,7 @@ from ...utils import (
 )
 from ...integrations.google_calendar.exceptions import AuthenticationException
 from ..base import BaseGoogleAPIClient
+from ..client_registry import get_client_registry
 from .utils import (
     parse_datetime_with_timezone,
     format_datetime_rfc3339,
@@ -48,7 +49,10 @@ class GoogleCalendarClient(BaseGoogleAPIClient):
     
     def _build_service(self) -> Any:
         """Build Google Calendar API service"""
-        return build('calendar', 'v3', credentials=self.credentials, cache_discovery=False)
+        return get_client_registry().get_service(
+            'calendar', 'v3', self.credentials,
+            builder=lambda: build('calendar', 'v3', credentials=self.credentials, cache_discovery=False),
+        )
     
     def _get_required_scopes(self) -> List[str]:
         """Get required Google Calendar scopes"""
@@ -0,0 +1,530 @@
+"""
+Calendar Interval Engine - Shared interval structures for conflict detection
+
+Used by conflict checks, overlap scans and free-slot finding so none of them
+compare events pairwise:
+
+- sweep_overlaps(): sorted sweep-line over a batch of events, O(n log n + k)
+- IntervalTree: static, max-end augmented tree for point/range queries,
+  O(log n + k) per query, plus merged busy blocks for free-slot finding
+- CalendarIndexCache: per user/calendar/window cache of built trees
+
+All intervals are normalized to timezone-aware UTC. All-day events span
+midnight-to-midnight in the event's (or user's) timezone rather than UTC, and
+recurring master events (RRULE) are expanded inside the requested window.
+"""
+import heapq
+import hashlib
+import re
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pytz
+
+from ...utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+Window = Tuple[datetime, datetime]
+
+# Safety cap on occurrences expanded from one recurring master event
+MAX_RECURRENCE_EXPANSION = 1000
+
+INDEX_CACHE_TTL_SECONDS = 300
+INDEX_CACHE_MAX_ENTRIES = 512
+
+_UNTIL_UTC_RE = re.compile(r'UNTIL=(\d{8}T\d{6})Z')
+
+
+@dataclass(frozen=True)
+class EventInterval:
+    """A single (possibly expanded) event occurrence in UTC."""
+    start: datetime
+    end: datetime
+    event_id: Optional[str] = None
+    title: str = 'Untitled Event'
+    all_day: bool = False
+    transparent: bool = False
+    event: Dict[str, Any] = field(default_factory=dict, compare=False, hash=False, repr=False)
+
+    @property
+    def duration(self) -> timedelta:
+        return self.end - self.start
+
+
+# ============================================================================
+# NORMALIZATION
+# ============================================================================
+
+def _resolve_tz(name: Optional[str], default_tz: str) -> Any:
+    for candidate in (name, default_tz, 'UTC'):
+        if not candidate:
+            continue
+        try:
+            return pytz.timezone(candidate)
+        except pytz.UnknownTimeZoneError:
+            continue
+    return pytz.UTC
+
+
+def _to_utc(value: datetime, tz: Any) -> datetime:
+    if value.tzinfo is None:
+        value = tz.localize(value)
+    return value.astimezone(pytz.UTC)
+
+
+def _parse_boundary(time_obj: Any, default_tz: str) -> Tuple[Optional[datetime], bool, Any]:
+    """
+    Parse a Google Calendar start/end object.
+
+    Returns:
+        (local naive datetime, is_all_day, tzinfo) or (None, False, tz)
+    """
+    if isinstance(time_obj, datetime):
+        tz = time_obj.tzinfo or _resolve_tz(None, default_tz)
+        return time_obj, False, tz
+    if not isinstance(time_obj, dict):
+        return None, False, _resolve_tz(None, default_tz)
+
+    tz = _resolve_tz(time_obj.get('timeZone'), default_tz)
+    date_time = time_obj.get('dateTime')
+    if date_time:
+        try:
+            if isinstance(date_time, datetime):
+                return date_time, False, tz
+            return datetime.fromisoformat(date_time.replace('Z', '+00:00')), False, tz
+        except (ValueError, AttributeError):
+            return None, False, tz
+
+    day = time_obj.get('date')
+    if day:
+        try:
+            if isinstance(day, date) and not isinstance(day, datetime):
+                parsed = datetime(day.year, day.month, day.day)
+            else:
+                parsed = datetime.fromisoformat(str(day)[:10])
+            return parsed, True, tz
+        except ValueError:
+            return None, True, tz
+
+    return None, False, tz
+
+
+def _localize(value: datetime, tz: Any) -> datetime:
+    """Attach tz to a naive wall-clock time (DST-correct for pytz zones)."""
+    if value.tzinfo is not None:
+        return value
+    if hasattr(tz, 'localize'):
+        return tz.localize(value)
+    return value.replace(tzinfo=tz)
+
+
+def _expand_recurrence(
+    rules: List[str],
+    local_start: datetime,
+    duration: timedelta,
+    tz: Any,
+    window: Window,
+) -> List[datetime]:
+    """
+    Expand RRULE/EXDATE lines into occurrence start times (UTC) within window.
+
+    Expansion happens on naive wall-clock times and each occurrence is
+    localized separately, so a 9:00 weekly meeting stays at 9:00 across DST.
+    """
+    from dateutil.rrule import rrulestr
+
+    naive_start = local_start.replace(tzinfo=None) if local_start.tzinfo else local_start
+    rrule_lines = []
+    exdates = set()
+
+    for line in rules:
+        line = line.strip()
+        if line.upper().startswith('RRULE'):
+            # UNTIL in UTC must be converted to local wall-clock for a naive DTSTART
+            def _until_local(match):
+                until = datetime.strptime(match.group(1), '%Y%m%dT%H%M%S').replace(tzinfo=pytz.UTC)
+                return 'UNTIL=' + until.astimezone(tz).strftime('%Y%m%dT%H%M%S')
+            rrule_lines.append(_UNTIL_UTC_RE.sub(_until_local, line))
+        elif line.upper().startswith('EXDATE'):
+            values = line.split(':', 1)[-1]
+            for raw in values.split(','):
+                raw = raw.strip()
+                try:
+                    if raw.endswith('Z'):
+                        parsed = datetime.strptime(raw, '%Y%m%dT%H%M%SZ').replace(tzinfo=pytz.UTC)
+                        exdates.add(parsed.astimezone(tz).replace(tzinfo=None))
+                    elif 'T' in raw:
+                        exdates.add(datetime.strptime(raw, '%Y%m%dT%H%M%S'))
+                    else:
+                        exdates.add(datetime.strptime(raw, '%Y%m%d'))
+                except ValueError:
+                    continue
+
+    if not rrule_lines:
+        return []
+
+    rule = rrulestr('\n'.join(rrule_lines), dtstart=naive_start, forceset=True)
+    window_start_local = window[0].astimezone(tz).replace(tzinfo=None) - duration
+    window_end_local = window[1].astimezone(tz).replace(tzinfo=None)
+
+    starts = []
+    for occurrence in rule.between(window_start_local, window_end_local, inc=True):
+        if occurrence in exdates:
+            continue
+        starts.append(_localize(occurrence, tz).astimezone(pytz.UTC))
+        if len(starts) >= MAX_RECURRENCE_EXPANSION:
+            logger.warning(f"Recurrence expansion capped at {MAX_RECURRENCE_EXPANSION} occurrences")
+            break
+    return starts
+
+
+def event_intervals(
+    event: Dict[str, Any],
+    default_tz: str = 'UTC',
+    window: Optional[Window] = None,
+) -> List[EventInterval]:
+    """
+    Normalize one event (Google Calendar API or internal format) to intervals.
+
+    Args:
+        event: Event dict with 'start'/'end' ({'dateTime'|'date', 'timeZone'})
+        default_tz: Timezone for naive times and all-day events without one
+        window: (start, end) in which recurring master events are expanded;
+                without a window only the first occurrence is returned
+
+    Returns:
+        List of EventInterval (empty if the event cannot be parsed)
+    """
+    start_raw, all_day, tz = _parse_boundary(event.get('start'), default_tz)
+    if start_raw is None:
+        return []
+    end_raw, _, end_tz = _parse_boundary(event.get('end'), default_tz)
+
+    if all_day:
+        local_start = _localize(start_raw, tz)
+        # Google uses an exclusive end date; a missing end means one day
+        local_end = _localize(end_raw if end_raw else start_raw + timedelta(days=1), tz)
+    else:
+        local_start = _localize(start_raw, tz)
+        local_end = _localize(end_raw, end_tz) if end_raw else local_start
+
+    start = local_start.astimezone(pytz.UTC)
+    end = local_end.astimezone(pytz.UTC)
+    if end < start:
+        return []
+
+    title = event.get('title') or event.get('summary') or 'Untitled Event'
+    common = {
+        'event_id': event.get('id'),
+        'title': title,
+        'all_day': all_day,
+        'transparent': event.get('transparency') == 'transparent',
+        'event': event,
+    }
+
+    recurrence = event.get('recurrence')
+    if recurrence and window and not event.get('recurringEventId'):
+        duration = end - start
+        try:
+            starts = _expand_recurrence(list(recurrence), start_raw, duration, tz, window)
+            return [EventInterval(start=s, end=s + duration, **common) for s in starts]
+        except Exception as e:
+            logger.warning(f"Failed to expand recurrence for event {event.get('id')}: {e}")
+
+    return [EventInterval(start=start, end=end, **common)]
+
+
+def build_intervals(
+    events: Iterable[Dict[str, Any]],
+    default_tz: str = 'UTC',
+    window: Optional[Window] = None,
+    include_transparent: bool = True,
+    exclude_event_id: Optional[str] = None,
+) -> List[EventInterval]:
+    """Normalize a batch of events, expanding recurrences within window."""
+    intervals = []
+    for event in events:
+        if exclude_event_id and event.get('id') == exclude_event_id:
+            continue
+        for interval in event_intervals(event, default_tz, window):
+            if interval.transparent and not include_transparent:
+                continue
+            if window and (interval.end <= window[0] or interval.start >= window[1]):
+                continue
+            intervals.append(interval)
+    return intervals
+
+
+# ============================================================================
+# BATCH SCANS
+# ============================================================================
+
+def sweep_overlaps(
+    intervals: List[EventInterval],
+    min_overlap: timedelta = timedelta(0),
+) -> List[Tuple[EventInterval, EventInterval, timedelta]]:
+    """
+    Find every overlapping pair with a sorted sweep-line.
+
+    Intervals are visited by start time while a min-heap keyed on end time
+    holds the currently active ones, so cost is O(n log n + k) for k
+    overlapping pairs instead of O(n^2).
+
+    Args:
+        intervals: Intervals to scan
+        min_overlap: Ignore pairs overlapping by less than this
+
+    Returns:
+        List of (earlier, later, overlap). Back-to-back intervals never overlap.
+    """
+    ordered = sorted(intervals, key=lambda iv: (iv.start, iv.end))
+    active: List[Tuple[datetime, int]] = []
+    pairs = []
+
+    for idx, current in enumerate(ordered):
+        while active and active[0][0] <= current.start:
+            heapq.heappop(active)
+        for _, other_idx in active:
+            other = ordered[other_idx]
+            overlap = min(other.end, current.end) - current.start
+            if overlap > timedelta(0) and overlap >= min_overlap:
+                pairs.append((other, current, overlap))
+        heapq.heappush(active, (current.end, idx))
+
+    return pairs
+
+
+def merge_busy(intervals: Iterable[EventInterval]) -> List[Tuple[datetime, datetime]]:
+    """Merge intervals into disjoint, sorted busy blocks."""
+    blocks: List[Tuple[datetime, datetime]] = []
+    for iv in sorted(intervals, key=lambda iv: iv.start):
+        if blocks and iv.start <= blocks[-1][1]:
+            if iv.end > blocks[-1][1]:
+                blocks[-1] = (blocks[-1][0], iv.end)
+        else:
+            blocks.append((iv.start, iv.end))
+    return blocks
+
+
+# ============================================================================
+# POINT QUERIES
+# ============================================================================
+
+class IntervalTree:
+    """
+    Static interval tree over a calendar window.
+
+    Intervals are sorted by start and viewed as an implicit balanced BST
+    (node = midpoint of a range) where each node stores the maximum end in
+    its subtree. A query prunes subtrees whose max end is before the query
+    start and right subtrees whose starts are after the query end.
+
+    Example:
+        tree = IntervalTree(build_intervals(events, 'America/New_York'))
+        clashes = tree.overlapping(proposed_start, proposed_end)
+        slots = tree.free_slots(timedelta(minutes=30), max_slots=3)
+    """
+
+    def __init__(self, intervals: List[EventInterval]):
+        self._items = sorted(intervals, key=lambda iv: (iv.start, iv.end))
+        self._starts = [iv.start for iv in self._items]
+        self._max_end: List[Optional[datetime]] = [None] * len(self._items)
+        self._build(0, len(self._items))
+
+        self._by_end = sorted(self._items, key=lambda iv: iv.end)
+        self._ends = [iv.end for iv in self._by_end]
+        self.busy = merge_busy(iv for iv in self._items if not iv.transparent)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _build(self, lo: int, hi: int) -> Optional[datetime]:
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        best = self._items[mid].end
+        for child in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child is not None and child > best:
+                best = child
+        self._max_end[mid] = best
+        return best
+
+    def overlapping(
+        self,
+        start: datetime,
+        end: datetime,
+        include_transparent: bool = True,
+    ) -> List[EventInterval]:
+        """Return intervals overlapping [start, end) in start order."""
+        start = _to_utc(start, pytz.UTC)
+        end = _to_utc(end, pytz.UTC)
+        found: List[EventInterval] = []
+        self._query(0, len(self._items), start, end, found)
+        if not include_transparent:
+            found = [iv for iv in found if not iv.transparent]
+        return found
+
+    def _query(self, lo: int, hi: int, start: datetime, end: datetime, out: List[EventInterval]) -> None:
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self._max_end[mid] <= start:
+            return
+        self._query(lo, mid, start, end, out)
+        item = self._items[mid]
+        if item.start >= end:
+            return
+        if item.end > start:
+            out.append(item)
+        self._query(mid + 1, hi, start, end, out)
+
+    def latest_ending_before(
+        self,
+        when: datetime,
+        include_transparent: bool = True,
+        exclude_event_id: Optional[str] = None,
+    ) -> Optional[EventInterval]:
+        """Interval with the latest end time that is <= when (e.g. for travel time)."""
+        idx = bisect_right(self._ends, _to_utc(when, pytz.UTC))
+        while idx > 0:
+            idx -= 1
+            candidate = self._by_end[idx]
+            if exclude_event_id is not None and candidate.event_id == exclude_event_id:
+                continue
+            if include_transparent or not candidate.transparent:
+                return candidate
+        return None
+
+    def free_slots(
+        self,
+        duration: timedelta,
+        window_start: Optional[datetime] = None,
+        window_end: Optional[datetime] = None,
+        max_slots: int = 5,
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Find free slots of at least `duration` using merged busy blocks.
+
+        Without a window, only gaps between busy blocks are considered.
+
+        Returns:
+            List of (slot_start, slot_start + duration)
+        """
+        blocks = self.busy
+        if window_start is not None:
+            window_start = _to_utc(window_start, pytz.UTC)
+        if window_end is not None:
+            window_end = _to_utc(window_end, pytz.UTC)
+
+        gaps: List[Tuple[datetime, datetime]] = []
+        cursor = window_start
+        for block_start, block_end in blocks:
+            if cursor is not None and block_start > cursor:
+                gaps.append((cursor, block_start))
+            if cursor is None or block_end > cursor:
+                cursor = block_end
+        if window_end is not None and cursor is not None and window_end > cursor:
+            gaps.append((cursor, window_end))
+
+        slots = []
+        for gap_start, gap_end in gaps:
+            if window_end is not None:
+                gap_end = min(gap_end, window_end)
+            if gap_end - gap_start >= duration:
+                slots.append((gap_start, gap_start + duration))
+                if len(slots) >= max_slots:
+                    break
+        return slots
+
+
+# ============================================================================
+# PER-USER CACHE
+# ============================================================================
+
+def _fingerprint(events: List[Dict[str, Any]]) -> str:
+    digest = hashlib.sha1()
+    for event in events:
+        start = event.get('start') or {}
+        end = event.get('end') or {}
+        digest.update(repr((
+            event.get('id'), event.get('updated'), event.get('transparency'),
+            start.get('dateTime') if isinstance(start, dict) else start,
+            start.get('date') if isinstance(start, dict) else None,
+            end.get('dateTime') if isinstance(end, dict) else end,
+            end.get('date') if isinstance(end, dict) else None,
+        )).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class CalendarIndexCache:
+    """
+    LRU + TTL cache of IntervalTrees per (user, calendar, window).
+
+    A cached tree is reused only while the event fingerprint (ids, update
+    stamps and times) matches, so callers can pass freshly listed events and
+    still skip the rebuild when nothing changed.
+    """
+
+    def __init__(self, ttl_seconds: int = INDEX_CACHE_TTL_SECONDS, max_entries: int = INDEX_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[str, float, IntervalTree]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(
+        self,
+        user_id: Any,
+        events: List[Dict[str, Any]],
+        window: Optional[Window] = None,
+        calendar_id: str = 'primary',
+        default_tz: str = 'UTC',
+    ) -> IntervalTree:
+        key = (user_id, calendar_id, window, default_tz)
+        fingerprint = _fingerprint(events)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == fingerprint and now - entry[1] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        tree = IntervalTree(build_intervals(events, default_tz, window))
+
+        with self._lock:
+            self._entries[key] = (fingerprint, now, tree)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return tree
+
+    def invalidate(self, user_id: Any, calendar_id: Optional[str] = None) -> None:
+        """Drop cached trees for a user (optionally one calendar) after a write."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id and (calendar_id is None or k[1] == calendar_id)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_index_cache: Optional[CalendarIndexCache] = None
+
+
+def get_calendar_index_cache() -> CalendarIndexCache:
+    """Get the process-wide calendar interval index cache."""
+    global _index_cache
+    if _index_cache is None:
+        _index_cache = CalendarIndexCache()
+    return _index_cache
@@ -15,6 +15,7 @@ import re
 from ...utils import get_timezone, FlexibleDateParser
 from ...utils.logger import setup_logger
 from ...utils.config import ConfigDefaults
+from .intervals import IntervalTree, build_intervals
 
 logger = setup_logger(__name__)
 
@@ -511,15 +512,23 @@ def events_overlap(
 def find_conflicts(
     proposed_start: datetime,
     proposed_end: datetime,
-    existing_events: List[Dict[str, Any]]
+    existing_events: List[Dict[str, Any]],
+    index: Optional[IntervalTree] = None,
+    default_tz: str = 'UTC'
 ) -> List[Dict[str, Any]]:
     """
     Find conflicts between a proposed time range and existing events.
     
+    Backed by the shared interval engine (see intervals.py): pass a prebuilt
+    ``index`` (e.g. from get_calendar_index_cache()) to answer repeated checks
+    against the same window in O(log n + k).
+    
     Args:
         proposed_start: Proposed event start time
         proposed_end: Proposed event end time
         existing_events: List of existing events (from Google Calendar API format)
+        index: Optional prebuilt IntervalTree over existing_events
+        default_tz: Timezone for naive times and all-day events
         
     Returns:
         List of conflicting events with details:
@@ -527,24 +536,17 @@ def find_conflicts(
         - start_time: Start datetime
         - end_time: End datetime
     """
-    conflicts = []
-    
-    for event in existing_events:
-        event_start = parse_event_time(event.get('start', {}))
-        event_end = parse_event_time(event.get('end', {}))
-        
-        if not event_start or not event_end:
-            continue
-        
-        # Check for overlap
-        if events_overlap(proposed_start, proposed_end, event_start, event_end):
-            conflicts.append({
-                'title': event.get('summary', 'Untitled Event'),
-                'start_time': event_start,
-                'end_time': event_end
-            })
-    
-    return conflicts
+    if index is None:
+        index = IntervalTree(build_intervals(existing_events, default_tz))
+    
+    return [
+        {
+            'title': interval.title,
+            'start_time': interval.start,
+            'end_time': interval.end
+        }
+        for interval in index.overlapping(proposed_start, proposed_end)
+    ]
 
 
 # ============================================================================
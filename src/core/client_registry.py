@@ -0,0 +1,304 @@
+"""
+Per-User Google Client Registry
+
+Keeps decrypted integration credentials and built Google API resources alive
+between client constructions, so tool calls, crawler cycles and dashboard
+requests stop re-decrypting tokens and rebuilding discovery resources.
+
+- Credentials are cached per (user_id, provider) and reloaded when they are
+  about to expire (google-auth's refresh threshold) or exceed a max age.
+  Reloads are single-flight per key: concurrent callers wait for one load.
+- Token refreshes triggered mid-request (401 / expiry inside AuthorizedHttp)
+  are single-flight under the same per-key lock, and the refreshed tokens
+  are persisted by the saver registered for (user_id, provider) - by
+  default the user's UserIntegration row. Nothing is persisted when a
+  waiting caller finds the token already refreshed.
+- httplib2 is not thread-safe, so built resources are cached per thread
+  (keyed by credentials object, API, version and thread id) in a bounded LRU.
+- Entries are invalidated when a UserIntegration row is inserted, updated or
+  deleted in this process.
+
+Usage:
+    registry = get_client_registry()
+    creds = registry.get_credentials(user_id=123, provider='gmail', db_session=db)
+    service = registry.get_service('gmail', 'v1', creds, builder=lambda: build(...))
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from google.oauth2.credentials import Credentials
+from sqlalchemy.orm import Session
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Upper bound on how long decrypted credentials are reused before re-reading the
+# database; bounds staleness for changes made by other processes.
+CREDENTIAL_MAX_AGE_SECONDS = 900
+# Built API resources kept across all users/threads
+MAX_CACHED_SERVICES = 512
+
+
+@dataclass
+class _CredentialEntry:
+    credentials: Credentials
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+class GoogleClientRegistry:
+    """
+    Process-wide cache of Google credentials and API resources.
+    """
+
+    def __init__(
+        self,
+        max_age_seconds: float = CREDENTIAL_MAX_AGE_SECONDS,
+        max_services: int = MAX_CACHED_SERVICES,
+    ):
+        self.max_age_seconds = max_age_seconds
+        self.max_services = max_services
+        self._lock = threading.RLock()
+        self._credentials: Dict[Tuple[int, str], _CredentialEntry] = {}
+        self._key_locks: Dict[Tuple[int, str], threading.Lock] = {}
+        self._token_savers: Dict[Tuple[int, str], Callable[[Credentials], None]] = {}
+        # (id(credentials), api, version, thread_id) -> (credentials, resource)
+        self._services: "OrderedDict[Tuple[int, str, str, int], Tuple[Any, Any]]" = OrderedDict()
+        self._stats = {
+            'credential_hits': 0,
+            'credential_misses': 0,
+            'credential_reloads': 0,
+            'token_refreshes': 0,
+            'service_hits': 0,
+            'service_misses': 0,
+            'service_evictions': 0,
+            'invalidations': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Credentials
+    # ------------------------------------------------------------------
+
+    def get_credentials(
+        self,
+        user_id: int,
+        provider: str,
+        db_session: Optional[Session] = None,
+    ) -> Optional[Credentials]:
+        """
+        Get cached integration credentials, loading (and refreshing) them if needed.
+
+        Returns:
+            Shared Credentials object or None if the integration is unavailable
+        """
+        key = (user_id, provider)
+        entry = self._fresh_entry(key)
+        if entry:
+            self._count('credential_hits')
+            return entry.credentials
+
+        with self._key_lock(key):
+            # Another caller may have loaded it while we waited
+            entry = self._fresh_entry(key)
+            if entry:
+                self._count('credential_hits')
+                return entry.credentials
+
+            with self._lock:
+                stale = self._credentials.pop(key, None)
+            self._count('credential_reloads' if stale else 'credential_misses')
+
+            from .credential_provider import CredentialProvider
+            credentials = CredentialProvider.get_integration_credentials(
+                user_id=user_id,
+                provider=provider,
+                db_session=db_session,
+                auto_refresh=True,
+            )
+            if stale:
+                self._drop_services_for(stale.credentials)
+            if not credentials:
+                return None
+
+            self._install_single_flight_refresh(credentials, key)
+            with self._lock:
+                self._credentials[key] = _CredentialEntry(credentials)
+            return credentials
+
+    def _fresh_entry(self, key: Tuple[int, str]) -> Optional[_CredentialEntry]:
+        with self._lock:
+            entry = self._credentials.get(key)
+        if not entry:
+            return None
+        if time.monotonic() - entry.loaded_at > self.max_age_seconds:
+            return None
+        # `expired` already includes google-auth's refresh threshold
+        if entry.credentials.expired or not entry.credentials.token:
+            return None
+        return entry
+
+    def _key_lock(self, key: Tuple[int, str]) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _install_single_flight_refresh(self, credentials: Credentials, key: Tuple[int, str]) -> None:
+        """
+        Collapse concurrent refreshes of one shared credentials object into
+        one, and persist the new tokens for (user_id, provider).
+        """
+        original_refresh = credentials.refresh
+        registry = self
+
+        def refresh(request):
+            token_before = credentials.token
+            with registry._key_lock(key):
+                if credentials.token != token_before and credentials.valid:
+                    # Another thread refreshed while we were waiting
+                    return
+                original_refresh(request)
+                registry._count('token_refreshes')
+                registry._persist_tokens(key, credentials)
+
+        credentials.refresh = refresh
+        # Marks the object as registry-managed so clients don't wrap it again
+        credentials._registry_key = key
+
+    def set_token_saver(self, user_id: int, provider: str, saver: Callable[[Credentials], None]) -> None:
+        """Register the callback that persists refreshed tokens for (user_id, provider)."""
+        with self._lock:
+            self._token_savers[(user_id, provider)] = saver
+
+    def _persist_tokens(self, key: Tuple[int, str], credentials: Credentials) -> None:
+        with self._lock:
+            saver = self._token_savers.get(key)
+        if saver is None:
+            from ..auth.token_persistence import create_integration_token_saver
+            saver = create_integration_token_saver(*key)
+        try:
+            saver(credentials)
+        except Exception as e:
+            logger.error(f"[ClientRegistry] Failed to persist refreshed tokens for {key}: {e}")
+
+    # ------------------------------------------------------------------
+    # API resources
+    # ------------------------------------------------------------------
+
+    def get_service(
+        self,
+        api: str,
+        version: str,
+        credentials: Any,
+        builder: Callable[[], Any],
+    ) -> Any:
+        """
+        Get a built API resource for the calling thread, building it on a miss.
+
+        Args:
+            api: API name (e.g. 'gmail')
+            version: API version (e.g. 'v1')
+            credentials: Credentials the resource is bound to
+            builder: Zero-argument callable that builds the resource
+        """
+        if credentials is None:
+            return builder()
+
+        key = (id(credentials), api, version, threading.get_ident())
+        with self._lock:
+            cached = self._services.get(key)
+            # Guard against id() reuse after the original object was collected
+            if cached and cached[0] is credentials:
+                self._services.move_to_end(key)
+                self._stats['service_hits'] += 1
+                return cached[1]
+
+        service = builder()
+        with self._lock:
+            self._stats['service_misses'] += 1
+            if service is not None:
+                self._services[key] = (credentials, service)
+                self._services.move_to_end(key)
+                while len(self._services) > self.max_services:
+                    self._services.popitem(last=False)
+                    self._stats['service_evictions'] += 1
+        return service
+
+    def _drop_services_for(self, credentials: Any) -> None:
+        with self._lock:
+            for key in [k for k, (creds, _) in self._services.items() if creds is credentials]:
+                del self._services[key]
+
+    # ------------------------------------------------------------------
+    # Invalidation and metrics
+    # ------------------------------------------------------------------
+
+    def invalidate(self, user_id: int, provider: Optional[str] = None) -> None:
+        """Drop cached credentials (and their resources) for a user/provider."""
+        with self._lock:
+            keys = [k for k in self._credentials if k[0] == user_id and (provider is None or k[1] == provider)]
+            entries = [self._credentials.pop(k) for k in keys]
+            if entries:
+                self._stats['invalidations'] += len(entries)
+        for entry in entries:
+            self._drop_services_for(entry.credentials)
+        if entries:
+            logger.debug(f"[ClientRegistry] Invalidated {len(entries)} credential entries for user {user_id}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._credentials.clear()
+            self._services.clear()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and cache sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached_credentials'] = len(self._credentials)
+            stats['cached_services'] = len(self._services)
+        cred_total = stats['credential_hits'] + stats['credential_misses'] + stats['credential_reloads']
+        svc_total = stats['service_hits'] + stats['service_misses']
+        stats['credential_hit_ratio'] = round(stats['credential_hits'] / cred_total, 3) if cred_total else 0.0
+        stats['service_hit_ratio'] = round(stats['service_hits'] / svc_total, 3) if svc_total else 0.0
+        return stats
+
+
+def _install_invalidation_hooks(registry: GoogleClientRegistry) -> None:
+    """Invalidate cached entries whenever a UserIntegration row changes."""
+    try:
+        from sqlalchemy import event
+        from ..database.models import UserIntegration
+
+        def _on_change(mapper, connection, target):
+            if target.user_id is not None:
+                registry.invalidate(target.user_id, target.provider)
+
+        for name in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(UserIntegration, name, _on_change)
+    except Exception as e:
+        logger.warning(f"[ClientRegistry] Could not install invalidation hooks: {e}")
+
+
+# Global registry
+_client_registry: Optional[GoogleClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> GoogleClientRegistry:
+    """Get the global client registry"""
+    global _client_registry
+    if _client_registry is None:
+        with _registry_lock:
+            if _client_registry is None:
+                registry = GoogleClientRegistry()
+                _install_invalidation_hooks(registry)
+                _client_registry = registry
+    return _client_registry
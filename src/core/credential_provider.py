@@ -30,6 +30,7 @@ import os
 
 from ..utils.logger import setup_logger
 from ..utils.config import Config
+from .client_registry import get_client_registry
 
 logger = setup_logger(__name__)
 
@@ -450,7 +451,7 @@ class CredentialFactory:
     Supports all Google API clients: Gmail, Calendar, Tasks.
     
     Features:
-    - Automatic credential loading
+    - Automatic credential loading (cached per user via GoogleClientRegistry)
     - Support for multiple credential sources
     - Type-safe client creation
     - Centralized error handling
@@ -512,7 +513,7 @@ class CredentialFactory:
         if not credentials:
             # 1. Try specific integration credentials first (prioritizes UserIntegration table)
             if user_id:
-                credentials = self.provider.get_integration_credentials(
+                credentials = get_client_registry().get_credentials(
                     user_id=user_id,
                     provider='gmail',
                     db_session=db_session
@@ -555,7 +556,7 @@ class CredentialFactory:
         if not credentials:
             # 1. Try specific integration credentials first
             if user_id:
-                credentials = self.provider.get_integration_credentials(
+                credentials = get_client_registry().get_credentials(
                     user_id=user_id,
                     provider='google_calendar',
                     db_session=db_session
@@ -598,7 +599,7 @@ class CredentialFactory:
         if not credentials:
             # 1. Try specific integration credentials first
             if user_id:
-                credentials = self.provider.get_integration_credentials(
+                credentials = get_client_registry().get_credentials(
                     user_id=user_id,
                     provider='google_tasks',
                     db_session=db_session
@@ -655,7 +656,7 @@ class CredentialFactory:
         if not credentials:
             # 2. Try specific integration credentials first
             if user_id and provider:
-                credentials = self.provider.get_integration_credentials(
+                credentials = get_client_registry().get_credentials(
                     user_id=user_id,
                     provider=provider,
                     db_session=db_session
@@ -675,11 +676,11 @@ class CredentialFactory:
         
         elif service_type.lower() == 'calendar':
             from ..integrations.google_calendar.service import CalendarService
-            return CalendarService(config=self.config, credentials=credentials)
+            return CalendarService(config=self.config, credentials=credentials, user_id=user_id)
         
         elif service_type.lower() in ['task', 'tasks']:
             from ..integrations.google_tasks.service import TaskService
-            return TaskService(config=self.config, credentials=credentials)
+            return TaskService(config=self.config, credentials=credentials, user_id=user_id)
         
         else:
             raise ValueError(
@@ -11,6 +11,7 @@ import io
 from ...utils.logger import setup_logger
 from ...utils.config import Config
 from ..base import BaseGoogleAPIClient
+from ..client_registry import get_client_registry
 
 logger = setup_logger(__name__)
 
@@ -36,7 +37,10 @@ class GoogleDriveClient(BaseGoogleAPIClient):
     
     def _build_service(self) -> Any:
         """Build Google Drive API service"""
-        return build('drive', 'v3', credentials=self.credentials)
+        return get_client_registry().get_service(
+            'drive', 'v3', self.credentials,
+            builder=lambda: build('drive', 'v3', credentials=self.credentials),
+        )
     
     def _get_required_scopes(self) -> List[str]:
         """Get required Google Drive scopes"""
@@ -19,6 +19,7 @@ from ...utils import (
     ServiceUnavailableError
 )
 from ..base import BaseGoogleAPIClient
+from ..client_registry import get_client_registry
 from .utils import (
     extract_headers,
     extract_message_body,
@@ -52,7 +53,10 @@ class GoogleGmailClient(BaseGoogleAPIClient):
     
     def _build_service(self) -> Any:
         """Build Gmail API service"""
-        return build('gmail', 'v1', credentials=self.credentials, cache_discovery=False)
+        return get_client_registry().get_service(
+            'gmail', 'v1', self.credentials,
+            builder=lambda: build('gmail', 'v1', credentials=self.credentials, cache_discovery=False),
+        )
     
     def _get_required_scopes(self) -> List[str]:
         """Get required Gmail scopes"""
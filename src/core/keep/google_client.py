@@ -12,6 +12,7 @@ from googleapiclient.errors import HttpError
 from src.utils.logger import setup_logger
 from src.utils.config import Config
 from src.core.base import BaseGoogleAPIClient
+from src.core.client_registry import get_client_registry
 
 logger = setup_logger(__name__)
 
@@ -84,7 +85,10 @@ class GoogleKeepClient(BaseGoogleAPIClient):
     
     def _build_service(self) -> Any:
         """Build Google Keep API service"""
-        return build('keep', 'v1', credentials=self.credentials, cache_discovery=False)
+        return get_client_registry().get_service(
+            'keep', 'v1', self.credentials,
+            builder=lambda: build('keep', 'v1', credentials=self.credentials, cache_discovery=False),
+        )
     
     def _get_required_scopes(self) -> List[str]:
         """Get required Google Keep scopes"""
@@ -13,6 +13,7 @@ from ...utils.logger import setup_logger
 from ...utils.config import Config
 from ...utils.api import get_api_url_with_fallback
 from ..base import BaseGoogleAPIClient
+from ..client_registry import get_client_registry
 from .utils import format_task_from_google
 
 logger = setup_logger(__name__)
@@ -43,7 +44,10 @@ class GoogleTasksClient(BaseGoogleAPIClient):
     
     def _build_service(self) -> Any:
         """Build Google Tasks API service"""
-        return build('tasks', 'v1', credentials=self.credentials, cache_discovery=False)
+        return get_client_registry().get_service(
+            'tasks', 'v1', self.credentials,
+            builder=lambda: build('tasks', 'v1', credentials=self.credentials, cache_discovery=False),
+        )
     
     def _get_required_scopes(self) -> List[str]:
         """Get required Google Tasks scopes"""
@@ -3,7 +3,7 @@ Database models and operations for multi-user support
 
 Main exports:
 - Base: SQLAlchemy declarative base for all models
-- Models: User, Session, ConversationMessage, BlogPost, UserSettings, AuditLog, OAuthState, UserWritingProfile, WebhookSubscription, WebhookDelivery
+- Models: User, Session, ConversationMessage, BlogPost, UserSettings, AuditLog, OAuthState, UserWritingProfile, WebhookSubscription, WebhookSubscriptionEvent, WebhookDelivery
 - Session management: 
   - Sync: get_db (FastAPI dependency), get_db_context (context manager)
   - Async: get_async_db (FastAPI dependency), get_async_db_context (context manager)
@@ -23,7 +23,7 @@ from .models import (
     UserWritingProfile,
     MessageClassification
 )
-from .webhook_models import WebhookSubscription, WebhookDelivery, WebhookEventType, WebhookDeliveryStatus
+from .webhook_models import WebhookSubscription, WebhookSubscriptionEvent, WebhookDelivery, WebhookEventType, WebhookDeliveryStatus
 from .database import get_db, get_db_session, init_db
 from .async_database import get_async_db, get_async_db_context, init_async_db, AsyncSession, get_async_session_local
 from .utils import get_db_context, get_db_session_safe, get_or_create, safe_query, transaction
@@ -41,6 +41,7 @@ __all__ = [
     'OAuthState',
     'UserWritingProfile',
     'WebhookSubscription',
+    'WebhookSubscriptionEvent',
     'WebhookDelivery',
     'WebhookEventType',
     'WebhookDeliveryStatus',
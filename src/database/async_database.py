@@ -362,7 +362,34 @@ async def _apply_async_migrations(engine: AsyncEngine):
                      column_type = "VARCHAR(50)"
                      await conn.execute(text(f"ALTER TABLE conversation_messages ADD COLUMN active_agent {column_type}"))
                      logger.info("[OK] Migration applied: added active_agent column")
-    
+
+            # Check conversation_summaries columns
+            if 'conversation_summaries' in inspector:
+                existing_columns = await conn.run_sync(
+                    lambda sync_conn: [col['name'] for col in inspect(sync_conn).get_columns('conversation_summaries')]
+                )
+                
+                # Add status (batched summarizer progress)
+                if 'status' not in existing_columns:
+                    logger.info("Adding missing column: conversation_summaries.status")
+                    await conn.execute(text(
+                        "ALTER TABLE conversation_summaries ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'completed'"
+                    ))
+                    await conn.execute(text(
+                        "CREATE INDEX IF NOT EXISTS ix_conversation_summaries_status ON conversation_summaries(status)"
+                    ))
+                    logger.info("[OK] Migration applied: added conversation_summaries.status column")
+
+            if 'conversation_messages' in inspector:
+                # Full-text search index over conversation messages
+                from ..ai.conversation_search import ensure_search_schema
+                await ensure_search_schema(conn, is_sqlite)
+
+            if 'webhook_subscriptions' in inspector and 'webhook_subscription_events' in inspector:
+                # Event-type index for subscriptions created before it existed
+                from ..features.webhook_service import backfill_event_index
+                await backfill_event_index(conn)
+
     except Exception as e:
         logger.warning(f"Async migration check failed (non-critical): {e}")
 
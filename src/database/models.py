@@ -2,8 +2,8 @@
 SQLAlchemy models for multi-user authentication and settings
 """
 from datetime import datetime, timedelta
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Index, Float, or_
-from sqlalchemy.orm import DeclarativeBase, relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Index, Float, or_, event
+from sqlalchemy.orm import DeclarativeBase, relationship, Session as OrmSession
 from sqlalchemy.ext.hybrid import hybrid_property
 from .types import EncryptedString, EncryptedJSON
 
@@ -665,6 +665,81 @@ class ActionableItem(Base):
         return f"<ActionableItem(id={self.id}, title='{self.title[:30]}...', type={self.item_type})>"
 
 
+class ReminderTimer(Base):
+    """
+    One scheduled reminder for an actionable item.
+    
+    Fire times are computed when the item is written (see
+    services/reminders/timer_queue.py), so the dispatcher only reads the
+    next due rows off the (status, fire_at) index instead of scanning items.
+    """
+    __tablename__ = 'reminder_timers'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    item_id = Column(String, ForeignKey('actionable_items.id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    
+    fire_at = Column(DateTime, nullable=False)
+    offset_label = Column(String(20), nullable=False)  # 3d, 1d, 2h, now
+    status = Column(String(20), nullable=False, default='pending')  # pending, claimed, fired, cancelled, failed
+    
+    # Claim bookkeeping (one dispatcher owns a timer until it fires or times out)
+    claim_token = Column(String(64), nullable=True, index=True)
+    claimed_at = Column(DateTime, nullable=True)
+    fired_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index('idx_reminder_timer_status_fire', 'status', 'fire_at'),
+    )
+    
+    def __repr__(self):
+        return f"<ReminderTimer(id={self.id}, item_id={self.item_id}, fire_at={self.fire_at}, status={self.status})>"
+
+
+@event.listens_for(ActionableItem, 'after_insert')
+def _schedule_item_timers_on_insert(mapper, connection, target):
+    """Write the item's reminder timers in the same transaction as the item."""
+    from src.services.reminders.timer_queue import sync_item_timers
+    sync_item_timers(connection, target, created=True)
+
+
+@event.listens_for(ActionableItem, 'after_update')
+def _schedule_item_timers_on_update(mapper, connection, target):
+    """Reschedule or cancel timers when the due date, type or status changes."""
+    from src.services.reminders.timer_queue import sync_item_timers
+    sync_item_timers(connection, target)
+
+
+@event.listens_for(OrmSession, 'after_flush')
+def _invalidate_user_cache_on_flush(session, flush_context):
+    """Drop cached sessions, users, integrations, settings and profiles written in this flush."""
+    try:
+        from src.services.user_cache import invalidate_flushed
+    except ImportError:
+        return
+    invalidate_flushed(session)
+
+
+@event.listens_for(OrmSession, 'after_commit')
+def _invalidate_user_cache_on_commit(session):
+    """Invalidate again once committed, in case a reader cached the old row meanwhile."""
+    try:
+        from src.services.user_cache import invalidate_committed
+    except ImportError:
+        return
+    invalidate_committed(session)
+
+
+@event.listens_for(OrmSession, 'after_rollback')
+def _discard_user_cache_invalidations(session):
+    try:
+        from src.services.user_cache import discard_pending
+    except ImportError:
+        return
+    discard_pending(session)
+
+
 class AutonomySettings(Base):
     """
     User's autonomy preferences per action type.
@@ -834,6 +909,79 @@ class InAppNotification(Base):
         self.dismissed_at = datetime.utcnow()
 
 
+class NotificationOutbox(Base):
+    """
+    Transactional outbox for external notification channels (email, push).
+    
+    Rows are written in the same transaction as the change that triggers the
+    notification and drained by the outbox worker (see
+    services/notifications/outbox.py), which fans out to channels in batches.
+    """
+    __tablename__ = 'notification_outbox'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    idempotency_key = Column(String(128), nullable=True, unique=True)  # Drops duplicate sends
+    
+    payload = Column(EncryptedJSON, nullable=False)  # title, message, priority, action link
+    channels = Column(JSON, nullable=False)  # e.g. ['email', 'push']
+    delivered_channels = Column(JSON, default=list)  # Not retried once delivered
+    
+    status = Column(String(20), nullable=False, default='pending')  # pending, claimed, delivered, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Retry backoff
+    last_error = Column(Text, nullable=True)
+    
+    claim_token = Column(String(64), nullable=True, index=True)
+    claimed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    delivered_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_outbox_status_available', 'status', 'available_at'),
+    )
+    
+    def __repr__(self):
+        return f"<NotificationOutbox(id={self.id}, user_id={self.user_id}, status='{self.status}')>"
+
+
+class WorkflowRun(Base):
+    """
+    Durable state of one workflow execution.
+    
+    The serialized WorkflowContext (including step checkpoints) is rewritten
+    after every step, and the lease columns record which worker currently
+    owns the run, so an orphaned run can be resumed by any worker once its
+    lease expires (see workflows/engine/store.py).
+    """
+    __tablename__ = 'workflow_runs'
+    
+    workflow_id = Column(String(36), primary_key=True)
+    workflow_name = Column(String(100), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    
+    status = Column(String(20), nullable=False, default='pending')  # WorkflowStatus values
+    context = Column(EncryptedJSON, nullable=False)  # WorkflowContext.to_dict()
+    
+    # Lease (the owning worker renews it while the run is in progress)
+    lease_owner = Column(String(64), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)  # Times the run was (re)started
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    completed_at = Column(DateTime, nullable=True)
+    compacted = Column(Boolean, nullable=False, default=False)  # Checkpoints dropped after completion
+    
+    __table_args__ = (
+        Index('idx_workflow_run_status_lease', 'status', 'lease_expires_at'),
+        Index('idx_workflow_run_user_created', 'user_id', 'created_at'),
+    )
+    
+    def __repr__(self):
+        return f"<WorkflowRun(id={self.workflow_id}, name='{self.workflow_name}', status='{self.status}')>"
+
+
 class GhostDraft(Base):
     """
     Persistent storage for Ghost drafts (Proactive suggestions).
@@ -951,6 +1099,10 @@ class ConversationSummary(Base):
     message_count = Column(Integer, default=0)
     primary_agent = Column(String(50))     # Most-used agent in the session
     
+    # 'pending' rows are staged by tiering and filled in by the batched summarizer;
+    # raw messages are only deleted once their session's summary is 'completed'
+    status = Column(String(20), default='completed', nullable=False, index=True)
+    
     # Time range of original messages
     first_message_at = Column(DateTime)
     last_message_at = Column(DateTime)
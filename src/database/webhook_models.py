@@ -87,6 +87,7 @@ class WebhookSubscription(Base):
     # Relationships
     user = relationship("User", backref="webhook_subscriptions")
     deliveries = relationship("WebhookDelivery", back_populates="subscription", cascade="all, delete-orphan")
+    event_index = relationship("WebhookSubscriptionEvent", cascade="all, delete-orphan")
     
     # Indexes
     __table_args__ = (
@@ -98,6 +99,29 @@ class WebhookSubscription(Base):
         return f"<WebhookSubscription(id={self.id}, user_id={self.user_id}, url='{self.url}')>"
 
 
+class WebhookSubscriptionEvent(Base):
+    """
+    Event-type index for webhook subscriptions
+    
+    One row per (subscription, event type) so matching subscriptions for an
+    event is an indexed lookup instead of scanning every subscription's
+    event_types JSON. Kept in sync by WebhookService.
+    """
+    __tablename__ = 'webhook_subscription_events'
+    
+    id = Column(Integer, primary_key=True)
+    subscription_id = Column(Integer, ForeignKey('webhook_subscriptions.id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)
+    event_type = Column(String(100), nullable=False)
+    
+    __table_args__ = (
+        Index('idx_webhook_event_lookup', 'event_type', 'user_id', 'subscription_id'),
+    )
+    
+    def __repr__(self):
+        return f"<WebhookSubscriptionEvent(subscription_id={self.subscription_id}, event_type='{self.event_type}')>"
+
+
 class WebhookDeliveryStatus(str, enum.Enum):
     """Webhook delivery status"""
     PENDING = "pending"
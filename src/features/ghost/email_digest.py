@@ -57,9 +57,9 @@ class EmailDigestAgent:
             # Get unread emails from last 24 hours
             yesterday = datetime.utcnow() - timedelta(days=1)
             
-            emails = await email_service.search_emails(
+            emails = await email_service.search_emails_async(
                 query="is:unread",
-                max_results=50
+                limit=50
             )
             
             # Filter and prioritize
@@ -0,0 +1,470 @@
+"""
+Write-combining Interaction Aggregator
+
+Buffers relationship interaction signals (email sent, Slack mention, meeting
+attended) and applies them to the graph in bulk, instead of one synchronous
+double-UPSERT per recipient per event.
+
+- record() increments a counter keyed by (user, contact, source) in a Redis
+  hash, so every API and Celery process feeds the same buffer. Async callers
+  use record_async(), which runs the (blocking) Redis write in a thread.
+- flush() atomically moves the buffer aside, sums the increments into one
+  row per (user, contact) with per-source counts and a combined weight, and
+  applies them as a single bulk AQL UPSERT (chunked). The Celery beat task
+  ghost_tasks.flush_relationship_interactions runs it every
+  RELATIONSHIP_FLUSH_SECONDS.
+
+Crash recovery:
+- Increments live in Redis until a flush applies them, so a worker crash
+  loses nothing. The moved-aside batch is only deleted after the graph
+  write succeeds; a flush that dies midway leaves it in place and the next
+  flush applies it first. The worst case is one batch applied twice (graph
+  write succeeded, delete did not).
+- Without Redis, increments are held per process and flushed by the process
+  itself once RELATIONSHIP_LOCAL_MAX_PENDING increments or
+  RELATIONSHIP_FLUSH_SECONDS have accumulated, which bounds what a crash
+  can lose. The API runs an interval flusher (start_interaction_flusher)
+  so an idle process still drains its buffer, and both the API and Celery
+  workers flush it once more at shutdown.
+- The cross-process flush lock holds a random token and is released with a
+  compare-and-delete, so a flush that outlives the lock TTL cannot release
+  the lock another process has since taken.
+"""
+import asyncio
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.logger import setup_logger
+from src.utils.urls import URLs
+
+logger = setup_logger(__name__)
+
+# Interaction source weights — meetings count more than emails,
+# which count more than Slack messages.
+SOURCE_WEIGHTS: Dict[str, float] = {
+    "meeting": 0.20,
+    "email": 0.10,
+    "slack": 0.05,
+}
+DEFAULT_SOURCE_WEIGHT = 0.10
+
+# How often buffered increments are applied to the graph
+RELATIONSHIP_FLUSH_SECONDS = 30
+# In-process buffer size (no Redis) that triggers an early flush
+RELATIONSHIP_LOCAL_MAX_PENDING = 500
+# Edges per bulk AQL statement
+RELATIONSHIP_FLUSH_CHUNK = 1000
+
+_REDIS_RETRY_SECONDS = 60
+_PENDING_KEY = "gardener:interactions:pending"
+_PENDING_LAST_KEY = "gardener:interactions:pending:last"
+_PENDING_SINCE_KEY = "gardener:interactions:pending:since"
+_INFLIGHT_KEY = "gardener:interactions:inflight"
+_INFLIGHT_LAST_KEY = "gardener:interactions:inflight:last"
+_INFLIGHT_SINCE_KEY = "gardener:interactions:inflight:since"
+_FLUSH_LOCK_KEY = "gardener:interactions:flush_lock"
+
+# Delete the flush lock only if this flush still owns it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+BULK_UPSERT_AQL = """
+FOR r IN @rows
+    UPSERT { email: r.email }
+    INSERT {
+        email: r.email,
+        name: SPLIT(r.email, "@")[0],
+        created_at: DATE_ISO8601(DATE_NOW()),
+        node_type: "Person"
+    }
+    UPDATE {}
+    IN Person
+
+    LET person = NEW
+
+    UPSERT { _from: CONCAT("User/", r.user_id), _to: person._id }
+    INSERT {
+        _from: CONCAT("User/", r.user_id),
+        _to: person._id,
+        last_interaction: r.last_interaction,
+        interaction_count: r.count,
+        strength: MIN([1.0, r.weight]),
+        first_seen: r.first_seen,
+        rel_type: "COMMUNICATES_WITH",
+        email_count: r.email_count,
+        slack_count: r.slack_count,
+        meeting_count: r.meeting_count,
+        last_source: r.last_source
+    }
+    UPDATE {
+        last_interaction: MAX([OLD.last_interaction, r.last_interaction]),
+        interaction_count: (OLD.interaction_count || 0) + r.count,
+        strength: MIN([1.0, (OLD.strength || 0) + r.weight]),
+        email_count: (OLD.email_count || 0) + r.email_count,
+        slack_count: (OLD.slack_count || 0) + r.slack_count,
+        meeting_count: (OLD.meeting_count || 0) + r.meeting_count,
+        last_source: r.last_interaction >= OLD.last_interaction ? r.last_source : OLD.last_source
+    }
+    IN COMMUNICATES_WITH
+"""
+
+
+def _field(user_id: Any, contact: str, source: str) -> str:
+    return f"{user_id}|{contact}|{source}"
+
+
+def _iso(ts: float) -> str:
+    """Epoch seconds as ISO 8601 UTC, matching AQL DATE_ISO8601()."""
+    return datetime.utcfromtimestamp(ts).isoformat(timespec='milliseconds') + 'Z'
+
+
+def combine_increments(
+    counts: Dict[str, int],
+    last_seen: Dict[str, float],
+) -> List[Dict[str, Any]]:
+    """
+    Sum buffered (user, contact, source) counters into one row per
+    (user, contact) with per-source counts and a combined weight.
+    """
+    rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for field, count in counts.items():
+        try:
+            user_id, contact, source = field.rsplit("|", 2)
+            count = int(count)
+        except ValueError:
+            continue
+        if count <= 0:
+            continue
+        row = rows.get((user_id, contact))
+        if row is None:
+            row = rows[(user_id, contact)] = {
+                "user_id": user_id,
+                "email": contact,
+                "count": 0,
+                "weight": 0.0,
+                "email_count": 0,
+                "slack_count": 0,
+                "meeting_count": 0,
+                "last_ts": 0.0,
+                "first_ts": None,
+                "last_source": source,
+            }
+        row["count"] += count
+        row["weight"] += count * SOURCE_WEIGHTS.get(source, DEFAULT_SOURCE_WEIGHT)
+        if source in SOURCE_WEIGHTS:
+            row[f"{source}_count"] += count
+        ts = float(last_seen.get(field) or time.time())
+        if ts >= row["last_ts"]:
+            row["last_ts"] = ts
+            row["last_source"] = source
+        row["first_ts"] = ts if row["first_ts"] is None else min(row["first_ts"], ts)
+
+    combined = []
+    for row in rows.values():
+        row["weight"] = round(row["weight"], 4)
+        row["last_interaction"] = _iso(row.pop("last_ts"))
+        row["first_seen"] = _iso(row.pop("first_ts"))
+        combined.append(row)
+    return combined
+
+
+class InteractionAggregator:
+    """
+    Redis-backed write-combining buffer for relationship strength increments.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        flush_seconds: float = RELATIONSHIP_FLUSH_SECONDS,
+        local_max_pending: int = RELATIONSHIP_LOCAL_MAX_PENDING,
+        chunk_size: int = RELATIONSHIP_FLUSH_CHUNK,
+    ):
+        self.redis_url = redis_url or URLs.REDIS
+        self.flush_seconds = flush_seconds
+        self.local_max_pending = local_max_pending
+        self.chunk_size = chunk_size
+
+        self._client = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self._flusher_graph: Any = None
+
+        # In-process buffer when Redis is unavailable
+        self._local_counts: Dict[str, int] = defaultdict(int)
+        self._local_last: Dict[str, float] = {}
+        self._local_since: Optional[float] = None
+
+        self._stats = {
+            "recorded": 0,
+            "flushes": 0,
+            "increments_flushed": 0,
+            "edges_flushed": 0,
+            "failures": 0,
+            "last_flush_size": 0,
+            "last_flush_edges": 0,
+            "last_flush_lag_seconds": None,
+            "last_flush_duration_seconds": None,
+            "last_flush_at": None,
+        }
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(self, user_id: Any, contact: str, source: str, at: Optional[float] = None) -> None:
+        """Buffer one interaction between a user and a contact."""
+        if not contact:
+            return
+        field = _field(user_id, contact.strip().lower(), source)
+        at = at or time.time()
+
+        client = self._redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                pipe.hincrby(_PENDING_KEY, field, 1)
+                pipe.hset(_PENDING_LAST_KEY, field, at)
+                pipe.set(_PENDING_SINCE_KEY, at, nx=True)
+                pipe.execute()
+                with self._lock:
+                    self._stats["recorded"] += 1
+                return
+            except Exception as e:
+                logger.warning(f"[Gardener] Redis buffer write failed, buffering in process: {e}")
+
+        with self._lock:
+            self._local_counts[field] += 1
+            self._local_last[field] = max(self._local_last.get(field, 0.0), at)
+            if self._local_since is None:
+                self._local_since = at
+            self._stats["recorded"] += 1
+
+    async def record_async(self, user_id: Any, contact: str, source: str, at: Optional[float] = None) -> None:
+        """record() without blocking the event loop on Redis (or its first connect)."""
+        await asyncio.to_thread(self.record, user_id, contact, source, at)
+
+    def local_flush_due(self) -> bool:
+        """Whether this process's in-memory buffer should be flushed now."""
+        with self._lock:
+            if not self._local_counts:
+                return False
+            pending = sum(self._local_counts.values())
+            age = time.time() - (self._local_since or time.time())
+        return pending >= self.local_max_pending or age >= self.flush_seconds
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    async def flush(self, graph_manager: Any) -> int:
+        """
+        Apply every buffered increment to the graph.
+
+        Returns:
+            Number of increments applied
+        """
+        async with self._flush_lock:
+            applied = await self._flush_local(graph_manager)
+            client = await asyncio.to_thread(self._redis)
+            if client is not None:
+                try:
+                    applied += await self._flush_redis(client, graph_manager)
+                except Exception as e:
+                    self._stats["failures"] += 1
+                    logger.error(f"[Gardener] Interaction flush failed (will retry): {e}")
+            return applied
+
+    async def flush_local(self, graph_manager: Any) -> int:
+        """
+        Apply only this process's in-memory buffer (Redis-buffered
+        increments are left to the beat task).
+
+        Returns:
+            Number of increments applied
+        """
+        async with self._flush_lock:
+            return await self._flush_local(graph_manager)
+
+    async def start(self, graph_manager: Any) -> None:
+        """Flush the in-process buffer every flush_seconds, even when idle."""
+        if self._flusher is not None and not self._flusher.done():
+            return
+        self._flusher_graph = graph_manager
+        self._flusher = asyncio.create_task(self._flush_loop(graph_manager))
+        logger.info("[Gardener] Interaction flusher started")
+
+    async def stop(self) -> None:
+        """Stop the interval flusher and apply whatever is still buffered."""
+        if self._flusher is None:
+            return
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        self._flusher = None
+        await self.flush_local(self._flusher_graph)
+        logger.info("[Gardener] Interaction flusher stopped")
+
+    async def _flush_loop(self, graph_manager: Any) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                await self.flush_local(graph_manager)
+            except Exception as e:
+                logger.error(f"[Gardener] Interval interaction flush failed: {e}")
+
+    async def _flush_local(self, graph_manager: Any) -> int:
+        with self._lock:
+            if not self._local_counts:
+                return 0
+            counts, self._local_counts = dict(self._local_counts), defaultdict(int)
+            last, self._local_last = self._local_last, {}
+            since, self._local_since = self._local_since, None
+        try:
+            return await self._apply(graph_manager, counts, last, since)
+        except Exception as e:
+            # Put the increments back so the next flush retries them
+            with self._lock:
+                for field, count in counts.items():
+                    self._local_counts[field] += count
+                    self._local_last[field] = max(self._local_last.get(field, 0.0), last.get(field, 0.0))
+                self._local_since = min(filter(None, (self._local_since, since)), default=None)
+            self._stats["failures"] += 1
+            logger.error(f"[Gardener] Interaction flush failed (will retry): {e}")
+            return 0
+
+    async def _flush_redis(self, client: Any, graph_manager: Any) -> int:
+        token = uuid.uuid4().hex
+
+        def _take_batch():
+            if not client.set(_FLUSH_LOCK_KEY, token, nx=True, ex=max(int(self.flush_seconds * 4), 60)):
+                return None
+            # A batch left by a crashed flush is applied before new increments
+            if not client.exists(_INFLIGHT_KEY):
+                if not client.exists(_PENDING_KEY):
+                    return {}, {}, None
+                pipe = client.pipeline(transaction=True)
+                pipe.rename(_PENDING_KEY, _INFLIGHT_KEY)
+                pipe.rename(_PENDING_LAST_KEY, _INFLIGHT_LAST_KEY)
+                pipe.rename(_PENDING_SINCE_KEY, _INFLIGHT_SINCE_KEY)
+                pipe.execute(raise_on_error=False)
+            return (
+                client.hgetall(_INFLIGHT_KEY),
+                client.hgetall(_INFLIGHT_LAST_KEY),
+                client.get(_INFLIGHT_SINCE_KEY),
+            )
+
+        batch = await asyncio.to_thread(_take_batch)
+        if batch is None:
+            logger.debug("[Gardener] Another process is flushing interactions")
+            return 0
+        try:
+            counts, last, since = batch
+            if not counts:
+                return 0
+            applied = await self._apply(
+                graph_manager,
+                {k: int(v) for k, v in counts.items()},
+                {k: float(v) for k, v in last.items()},
+                float(since) if since else None,
+            )
+            await asyncio.to_thread(client.delete, _INFLIGHT_KEY, _INFLIGHT_LAST_KEY, _INFLIGHT_SINCE_KEY)
+            return applied
+        finally:
+            await asyncio.to_thread(client.eval, _RELEASE_LOCK_SCRIPT, 1, _FLUSH_LOCK_KEY, token)
+
+    async def _apply(
+        self,
+        graph_manager: Any,
+        counts: Dict[str, int],
+        last_seen: Dict[str, float],
+        since: Optional[float],
+    ) -> int:
+        started = time.time()
+        rows = combine_increments(counts, last_seen)
+        for start in range(0, len(rows), self.chunk_size):
+            await graph_manager.execute_query(BULK_UPSERT_AQL, {"rows": rows[start:start + self.chunk_size]})
+
+        increments = sum(row["count"] for row in rows)
+        finished = time.time()
+        self._stats["flushes"] += 1
+        self._stats["increments_flushed"] += increments
+        self._stats["edges_flushed"] += len(rows)
+        self._stats["last_flush_size"] = increments
+        self._stats["last_flush_edges"] = len(rows)
+        self._stats["last_flush_lag_seconds"] = round(finished - since, 3) if since else None
+        self._stats["last_flush_duration_seconds"] = round(finished - started, 3)
+        self._stats["last_flush_at"] = datetime.utcnow().isoformat()
+        logger.info(
+            f"[Gardener] Flushed {increments} interactions as {len(rows)} edge updates "
+            f"(lag {self._stats['last_flush_lag_seconds']}s)"
+        )
+        return increments
+
+    # ------------------------------------------------------------------
+    # Storage and metrics
+    # ------------------------------------------------------------------
+
+    def _redis(self):
+        if self._client is None and time.time() >= self._retry_at:
+            try:
+                import redis
+                client = redis.from_url(self.redis_url, decode_responses=True, socket_timeout=1)
+                client.ping()
+                self._client = client
+            except Exception as e:
+                logger.warning(f"[Gardener] Redis unavailable, buffering interactions in process: {e}")
+                self._retry_at = time.time() + _REDIS_RETRY_SECONDS
+        return self._client
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Buffer depth and age, plus size and lag of recent flushes."""
+        stats = dict(self._stats)
+        with self._lock:
+            stats["local_pending"] = sum(self._local_counts.values())
+            oldest = self._local_since
+        client = self._redis()
+        if client is not None:
+            try:
+                stats["pending_keys"] = client.hlen(_PENDING_KEY)
+                stats["inflight_keys"] = client.hlen(_INFLIGHT_KEY)
+                since = client.get(_PENDING_SINCE_KEY)
+                if since:
+                    oldest = min(filter(None, (oldest, float(since))))
+            except Exception as e:
+                logger.debug(f"[Gardener] Stats read failed: {e}")
+        stats["oldest_pending_seconds"] = round(time.time() - oldest, 1) if oldest else None
+        return stats
+
+
+_interaction_aggregator: Optional[InteractionAggregator] = None
+
+
+def get_interaction_aggregator() -> InteractionAggregator:
+    """Get or create the global interaction aggregator."""
+    global _interaction_aggregator
+    if _interaction_aggregator is None:
+        _interaction_aggregator = InteractionAggregator()
+    return _interaction_aggregator
+
+
+async def start_interaction_flusher(graph_manager: Any) -> None:
+    """Start the global aggregator's interval flusher."""
+    await get_interaction_aggregator().start(graph_manager)
+
+
+async def stop_interaction_flusher() -> None:
+    """Stop the interval flusher and apply this process's remaining buffer."""
+    await get_interaction_aggregator().stop()
@@ -15,6 +15,7 @@ import logging
 from src.utils.logger import setup_logger
 from src.utils.config import Config
 from src.database.models import User
+from src.features.ghost.interaction_aggregator import get_interaction_aggregator
 
 logger = setup_logger(__name__)
 
@@ -22,14 +23,6 @@ logger = setup_logger(__name__)
 DECAY_THRESHOLD_DAYS = 30
 STRONG_RELATIONSHIP_THRESHOLD = 0.6
 
-# Interaction source weights — meetings count more than emails,
-# which count more than Slack messages.
-SOURCE_WEIGHTS: Dict[str, float] = {
-    "meeting": 0.20,
-    "email": 0.10,
-    "slack": 0.05,
-}
-
 
 class RelationshipGardener:
     """
@@ -78,6 +71,8 @@ class RelationshipGardener:
         else:
             return
 
+        await self._flush_local_interactions()
+
     def _extract_slack_recipients(self, payload: Dict[str, Any]) -> List[str]:
         """Extract email addresses from Slack message interactions."""
         recipients = []
@@ -111,86 +106,29 @@ class RelationshipGardener:
         self, user_id: int, recipient: str, source: str = "email"
     ):
         """
-        Update the COMMUNICATES_WITH edge in the graph with source-weighted
-        strength increments.
+        Record a source-weighted strength increment for the user's
+        COMMUNICATES_WITH edge to recipient.
+
+        Increments are write-combined by the interaction aggregator and
+        applied in bulk (see interaction_aggregator.py).
 
         Source weights:
         - meeting: +0.20 per interaction
         - email: +0.10 per interaction
         - slack: +0.05 per interaction
         """
-        weight = SOURCE_WEIGHTS.get(source, 0.10)
+        await get_interaction_aggregator().record_async(user_id, recipient, source)
 
+    async def _flush_local_interactions(self):
+        """Flush this process's buffer when Redis is unavailable and it's due."""
+        aggregator = get_interaction_aggregator()
+        if not aggregator.local_flush_due():
+            return
         try:
             from src.services.indexing.graph import KnowledgeGraphManager
-            from src.services.indexing.graph.schema import NodeType
-            
-            kg = KnowledgeGraphManager(self.config)
-            
-            # AQL upsert for relationship tracking with source-weighted strength
-            query = """
-            // Ensure User node reference
-            LET user_key = CONCAT("user:", @user_id)
-            
-            // Upsert Person node
-            UPSERT { email: @email }
-            INSERT { 
-                email: @email, 
-                name: SPLIT(@email, "@")[0],
-                created_at: DATE_ISO8601(DATE_NOW()),
-                node_type: "Person"
-            }
-            UPDATE {} 
-            IN Person
-            OPTIONS { waitForSync: true }
-            
-            LET person = NEW
-            
-            // Upsert COMMUNICATES_WITH edge with source-weighted strength
-            UPSERT { _from: CONCAT("User/", @user_id), _to: person._id }
-            INSERT { 
-                _from: CONCAT("User/", @user_id), 
-                _to: person._id,
-                last_interaction: DATE_ISO8601(DATE_NOW()),
-                interaction_count: 1,
-                strength: @weight,
-                first_seen: DATE_ISO8601(DATE_NOW()),
-                rel_type: "COMMUNICATES_WITH",
-                email_count: @source == "email" ? 1 : 0,
-                slack_count: @source == "slack" ? 1 : 0,
-                meeting_count: @source == "meeting" ? 1 : 0,
-                last_source: @source
-            }
-            UPDATE { 
-                last_interaction: DATE_ISO8601(DATE_NOW()),
-                interaction_count: OLD.interaction_count + 1,
-                strength: MIN(1.0, OLD.strength + @weight),
-                email_count: @source == "email" ? (OLD.email_count || 0) + 1 : (OLD.email_count || 0),
-                slack_count: @source == "slack" ? (OLD.slack_count || 0) + 1 : (OLD.slack_count || 0),
-                meeting_count: @source == "meeting" ? (OLD.meeting_count || 0) + 1 : (OLD.meeting_count || 0),
-                last_source: @source
-            }
-            IN COMMUNICATES_WITH
-            OPTIONS { waitForSync: true }
-            
-            RETURN NEW.strength
-            """
-            
-            result = await kg.execute_query(query, {
-                'user_id': str(user_id),
-                'email': recipient.lower(),
-                'weight': weight,
-                'source': source,
-            })
-            
-            if result:
-                logger.debug(
-                    f"[Gardener] Edge strength ({source}): "
-                    f"{result[0] if result else 'N/A'}"
-                )
-                
+            await aggregator.flush(KnowledgeGraphManager(self.config))
         except Exception as e:
-            logger.error(f"[Gardener] Graph update failed: {e}")
+            logger.error(f"[Gardener] Local interaction flush failed: {e}")
 
     async def analyze_decay(self, user_id: int) -> List[Dict[str, Any]]:
         """
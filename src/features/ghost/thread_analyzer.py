@@ -17,6 +17,7 @@ from src.utils.logger import setup_logger
 from src.utils.config import Config
 from src.database.models import User, GhostDraft
 from src.services.indexing.graph.manager import KnowledgeGraphManager
+from src.services.indexing.graph.schema import NodeType
 from src.ai.llm_factory import LLMFactory
 from src.services.notifications.notification_service import NotificationService, NotificationRequest, NotificationType, NotificationPriority
 from src.utils.config import Config, ConfigDefaults
@@ -53,7 +54,7 @@ class ThreadAnalyzerAgent:
         logger.info(f"[Ghost] ThreadAnalyzer examining message in channel {payload.get('channel')}")
         
         # Analyze the message/thread
-        analysis = await self._analyze_thread(payload)
+        analysis = await self._analyze_thread(payload, user_id)
         
         if not analysis.get("needs_action"):
             return
@@ -61,7 +62,7 @@ class ThreadAnalyzerAgent:
         # Take action based on analysis
         await self._take_action(analysis, user_id, payload)
     
-    async def _analyze_thread(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def _analyze_thread(self, payload: Dict[str, Any], user_id: Optional[int] = None) -> Dict[str, Any]:
         """
         Analyze a Slack thread/message using LLM for high-fidelity detection.
         """
@@ -92,8 +93,8 @@ class ThreadAnalyzerAgent:
                 analysis.update(detected)
                 
                 # 2. Duplicate Check (Autonomous Glue)
-                if analysis["action_type"] == "bug_report" and self.graph:
-                    is_duplicate = await self._is_already_ticketed(analysis["draft_title"])
+                if analysis["action_type"] == "bug_report" and self.graph and user_id is not None:
+                    is_duplicate = await self._is_already_ticketed(analysis["draft_title"], user_id)
                     if is_duplicate:
                         logger.info(f"[Ghost] Skipping already ticketed issue: {analysis['draft_title']}")
                         analysis["needs_action"] = False
@@ -138,23 +139,19 @@ class ThreadAnalyzerAgent:
             logger.debug(f"LLM analysis failed to parse response: {e}")
             return None
 
-    async def _is_already_ticketed(self, title: str) -> bool:
-        """Check ArangoDB for similar issues to prevent noise."""
+    async def _is_already_ticketed(self, title: str, user_id: int) -> bool:
+        """Check the user's Linear issues for a similar title to prevent noise."""
         if not self.graph: return False
         
-        # Simple fuzzy search in the graph for issues with similar titles
-        query = """
-        FOR i IN Issue
-            FILTER LIKE(i.title, @pattern, true)
-            LIMIT 1
-            RETURN i.id
-        """
-        # Create a basic like pattern (words > 3 chars)
-        words = [w for w in title.split() if len(w) > 3]
-        if not words: return False
-        
-        pattern = f"%{words[0]}%"
-        results = await self.graph.execute_query(query, {"pattern": pattern})
+        # Most of the draft title's terms must appear in an existing issue title
+        results = await self.graph.search_text(
+            title,
+            user_id=user_id,
+            node_types=[NodeType.LINEAR_ISSUE],
+            fields=["names"],
+            limit=1,
+            min_match=0.5,
+        )
         return len(results) > 0
 
     def _heuristic_analysis(self, payload: Dict[str, Any], analysis: Dict[str, Any]) -> Dict[str, Any]:
@@ -226,10 +223,9 @@ class ThreadAnalyzerAgent:
             summary=analysis.get("summary")
         )
         self.db.add(draft)
-        await self.db.commit()
-        await self.db.refresh(draft)
+        await self.db.flush()
 
-        # 2. Notification Service for In-App Alert
+        # 2. Notification Service for In-App Alert (same transaction as the draft)
         req = NotificationRequest(
             user_id=user_id,
             title=f"🐛 Potential Bug: {title[:40]}...",
@@ -241,7 +237,9 @@ class ThreadAnalyzerAgent:
             action_url=f"/dashboard/ghost/drafts/{draft.id}"
         )
         
-        await self.notification_service.send_notification(req)
+        await self.notification_service.send_notification(req, commit=False)
+        await self.db.commit()
+        await self.db.refresh(draft)
         
         # Fallback to Email (Secondary)
         await self._send_fallback_email(title, description, analysis, user_id, channel)
@@ -3,34 +3,63 @@ Webhook Service - Manage and trigger webhooks
 
 Full database-backed implementation for webhook subscriptions,
 delivery with HTTP POST, HMAC signatures, retries, and statistics.
+
+Delivery engine:
+- Matching subscriptions are found through the webhook_subscription_events
+  index (event_type, user_id) instead of scanning every subscription.
+- A batch of deliveries shares one keep-alive connection pool and is
+  dispatched concurrently, bounded globally and per endpoint host.
+- Each host has a circuit breaker; while it is open, deliveries to that
+  host are rescheduled without spending a retry attempt.
+- Status and statistics are written with one commit per batch.
 """
+import asyncio
 import hmac
 import hashlib
 import json
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
 
+from sqlalchemy import inspect as sa_inspect, select, text
 from sqlalchemy.orm import Session
 
 from src.database.webhook_models import (
     WebhookSubscription,
+    WebhookSubscriptionEvent,
     WebhookDelivery,
     WebhookDeliveryStatus,
     WebhookEventType,
 )
 from ..utils.logger import setup_logger
+from ..utils.resilience import CircuitBreaker, get_circuit_breaker
 
 logger = setup_logger(__name__)
 
 # Maximum retry delay (1 hour)
 MAX_RETRY_DELAY = 3600
 
+# Concurrent deliveries per batch (also the connection pool size)
+MAX_CONCURRENT_DELIVERIES = 50
+# Concurrent deliveries to a single endpoint host
+MAX_CONCURRENT_PER_HOST = 4
+# Consecutive failures before a host's circuit opens, and how long it stays open
+HOST_FAILURE_THRESHOLD = 5
+HOST_RECOVERY_TIMEOUT = 60.0
+
 
 class WebhookService:
     """Database-backed service for managing webhook subscriptions and deliveries."""
 
-    def __init__(self, db_session: Optional[Session] = None):
+    def __init__(
+        self,
+        db_session: Optional[Session] = None,
+        max_concurrency: int = MAX_CONCURRENT_DELIVERIES,
+        max_per_host: int = MAX_CONCURRENT_PER_HOST,
+    ):
         self.db = db_session
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
 
     # Subscription CRUD
 
@@ -58,6 +87,7 @@ class WebhookService:
             successful_deliveries=0,
             failed_deliveries=0,
         )
+        self._sync_event_index(subscription)
         self.db.add(subscription)
         self.db.commit()
         self.db.refresh(subscription)
@@ -96,6 +126,8 @@ class WebhookService:
         for key, value in kwargs.items():
             if hasattr(subscription, key):
                 setattr(subscription, key, value)
+        if 'event_types' in kwargs or 'user_id' in kwargs:
+            self._sync_event_index(subscription)
         subscription.updated_at = datetime.utcnow()
         self.db.commit()
         return subscription
@@ -109,24 +141,36 @@ class WebhookService:
         self.db.commit()
         return True
 
+    @staticmethod
+    def _sync_event_index(subscription: WebhookSubscription) -> None:
+        """Rebuild the (event_type, user_id) index rows for a subscription."""
+        subscription.event_index = [
+            WebhookSubscriptionEvent(user_id=subscription.user_id, event_type=event_type)
+            for event_type in dict.fromkeys(subscription.event_types or [])
+        ]
+
     # Event triggering
 
     def get_active_subscriptions_for_event(
         self,
         event_type: WebhookEventType,
+        user_id: Optional[int] = None,
     ) -> List[WebhookSubscription]:
         """Return active subscriptions that listen for *event_type*."""
-        all_active = (
+        matching = select(WebhookSubscriptionEvent.subscription_id).where(
+            WebhookSubscriptionEvent.event_type == event_type.value
+        )
+        if user_id is not None:
+            matching = matching.where(WebhookSubscriptionEvent.user_id == user_id)
+
+        return (
             self.db.query(WebhookSubscription)
-            .filter(WebhookSubscription.is_active == True)
+            .filter(
+                WebhookSubscription.is_active == True,
+                WebhookSubscription.id.in_(matching),
+            )
             .all()
         )
-        # event_types is a JSON list stored in the column
-        return [
-            s
-            for s in all_active
-            if event_type.value in (s.event_types or [])
-        ]
 
     async def trigger_webhook_event(
         self,
@@ -134,14 +178,19 @@ class WebhookService:
         event_id: str,
         payload: Dict[str, Any],
         user_id: Optional[int] = None,
+        http_client=None,
     ) -> List[WebhookDelivery]:
         """
         Find all active subscriptions matching *event_type* and deliver
-        the payload to each one.
+        the payload to each one concurrently.
+
+        Deliveries are persisted as PENDING in one commit (so they have ids
+        and survive a crash), dispatched, then their results are committed
+        together.
         """
-        subscriptions = self.get_active_subscriptions_for_event(event_type)
-        if user_id is not None:
-            subscriptions = [s for s in subscriptions if s.user_id == user_id]
+        subscriptions = self.get_active_subscriptions_for_event(event_type, user_id=user_id)
+        if not subscriptions:
+            return []
 
         deliveries: List[WebhookDelivery] = []
         for sub in subscriptions:
@@ -154,25 +203,107 @@ class WebhookService:
                 attempt_count=0,
                 max_attempts=sub.retry_count,
             )
-            self.db.add(delivery)
-            self.db.commit()
-
             # Attach the subscription object so _deliver_webhook can access it
             delivery.subscription = sub
-
-            await self._deliver_webhook(delivery)
+            self.db.add(delivery)
             deliveries.append(delivery)
+        self.db.commit()
 
+        await self._dispatch(deliveries, http_client=http_client)
+        self.db.commit()
         return deliveries
 
     # HTTP delivery
 
-    async def _deliver_webhook(self, delivery: WebhookDelivery) -> bool:
+    async def _dispatch(self, deliveries: List[WebhookDelivery], http_client=None) -> int:
+        """
+        Deliver a batch concurrently over a shared connection pool.
+
+        Concurrency is capped globally (max_concurrency) and per endpoint
+        host (max_per_host). Only ORM attributes are mutated while requests
+        are in flight; the caller commits once afterwards.
+
+        Returns:
+            Number of successful deliveries
+        """
+        import httpx
+
+        # Resolve subscriptions (and their attributes) before going concurrent
+        prepared = [(delivery, delivery.subscription) for delivery in deliveries]
+        if not prepared:
+            return 0
+
+        overall = asyncio.Semaphore(self.max_concurrency)
+        per_host: Dict[str, asyncio.Semaphore] = {}
+
+        async def run(client, delivery: WebhookDelivery, subscription: WebhookSubscription) -> bool:
+            host = urlsplit(subscription.url).netloc.lower()
+            breaker = self._host_breaker(host)
+            host_limit = per_host.setdefault(host, asyncio.Semaphore(self.max_per_host))
+            async with host_limit, overall:
+                # Checked once a slot is free so queued requests see failures ahead of them
+                if not breaker.allow_request():
+                    self._defer_for_open_circuit(delivery, host, breaker)
+                    return False
+                ok = await self._deliver_webhook(delivery, client=client, commit=False)
+                if self._host_is_healthy(delivery):
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+            return ok
+
+        async def run_all(client) -> List[Any]:
+            return await asyncio.gather(
+                *(run(client, delivery, subscription) for delivery, subscription in prepared),
+                return_exceptions=True,
+            )
+
+        if http_client is not None:
+            results = await run_all(http_client)
+        else:
+            limits = httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            )
+            async with httpx.AsyncClient(limits=limits) as client:
+                results = await run_all(client)
+
+        for (delivery, _), result in zip(prepared, results):
+            if isinstance(result, Exception):
+                logger.error(f"[Webhooks] Delivery {delivery.id} crashed: {result}")
+        return sum(1 for result in results if result is True)
+
+    @staticmethod
+    def _host_breaker(host: str) -> CircuitBreaker:
+        return get_circuit_breaker(
+            f"webhook:{host}",
+            failure_threshold=HOST_FAILURE_THRESHOLD,
+            recovery_timeout=HOST_RECOVERY_TIMEOUT,
+        )
+
+    @staticmethod
+    def _defer_for_open_circuit(delivery: WebhookDelivery, host: str, breaker: CircuitBreaker) -> None:
+        """Reschedule a delivery to an unhealthy host without using up an attempt."""
+        delivery.status = WebhookDeliveryStatus.RETRYING
+        delivery.next_retry_at = datetime.utcnow() + timedelta(seconds=breaker.recovery_timeout)
+        delivery.error_message = f"Circuit open for {host}"
+
+    async def _deliver_webhook(
+        self,
+        delivery: WebhookDelivery,
+        client=None,
+        commit: bool = True,
+    ) -> bool:
         """
         Deliver a single webhook via HTTP POST.
 
         Updates delivery status, subscription statistics, and schedules
         retries on failure.
+
+        Args:
+            delivery: Delivery to send (with its subscription loaded)
+            client: Shared httpx.AsyncClient; a one-off client is used if omitted
+            commit: Commit the status change (batched callers commit once themselves)
         """
         import httpx
 
@@ -193,14 +324,25 @@ class WebhookService:
             delivery.first_attempted_at = now
         delivery.last_attempted_at = now
         delivery.status = WebhookDeliveryStatus.PROCESSING
+        # Response fields describe the latest attempt only
+        delivery.response_status_code = None
+        delivery.response_body = None
 
         try:
-            async with httpx.AsyncClient(timeout=subscription.timeout_seconds) as client:
+            if client is not None:
                 response = await client.post(
                     subscription.url,
                     content=payload_str,
                     headers=headers,
+                    timeout=subscription.timeout_seconds,
                 )
+            else:
+                async with httpx.AsyncClient(timeout=subscription.timeout_seconds) as one_off:
+                    response = await one_off.post(
+                        subscription.url,
+                        content=payload_str,
+                        headers=headers,
+                    )
 
             delivery.response_status_code = response.status_code
             delivery.response_body = response.text[:2000] if response.text else None
@@ -215,23 +357,31 @@ class WebhookService:
                 subscription.last_delivery_at = datetime.utcnow()
                 subscription.last_success_at = datetime.utcnow()
 
-                self.db.commit()
+                if commit:
+                    self.db.commit()
                 return True
             else:
                 # Non-2xx response — schedule retry or fail
                 return self._handle_delivery_failure(
-                    delivery, subscription, f"HTTP {response.status_code}"
+                    delivery, subscription, f"HTTP {response.status_code}", commit=commit
                 )
 
         except Exception as e:
             delivery.error_message = str(e)
-            return self._handle_delivery_failure(delivery, subscription, str(e))
+            return self._handle_delivery_failure(delivery, subscription, str(e), commit=commit)
+
+    @staticmethod
+    def _host_is_healthy(delivery: WebhookDelivery) -> bool:
+        """Whether the last attempt reached a healthy endpoint (no error, 5xx or 429)."""
+        code = delivery.response_status_code
+        return code is not None and code < 500 and code != 429
 
     def _handle_delivery_failure(
         self,
         delivery: WebhookDelivery,
         subscription: WebhookSubscription,
         reason: str,
+        commit: bool = True,
     ) -> bool:
         """Mark delivery as retrying or permanently failed."""
         if delivery.attempt_count < delivery.max_attempts:
@@ -249,13 +399,14 @@ class WebhookService:
             subscription.last_delivery_at = datetime.utcnow()
             subscription.last_failure_at = datetime.utcnow()
 
-        self.db.commit()
+        if commit:
+            self.db.commit()
         return False
 
     # Retry logic
 
-    async def retry_pending_webhooks(self) -> int:
-        """Retry all deliveries that are due for retry."""
+    async def retry_pending_webhooks(self, http_client=None) -> int:
+        """Retry all deliveries that are due for retry (one concurrent batch)."""
         due = (
             self.db.query(WebhookDelivery)
             .filter(
@@ -264,12 +415,26 @@ class WebhookService:
             )
             .all()
         )
+        if not due:
+            return 0
+
+        # Load all missing subscriptions in one query; the per-delivery
+        # relationship access then resolves from the identity map (which
+        # only holds weak references, so keep the list alive until dispatch).
+        missing = {
+            delivery.subscription_id
+            for delivery in due
+            if 'subscription' in sa_inspect(delivery).unloaded
+        }
+        subscriptions = (
+            self.db.query(WebhookSubscription).filter(WebhookSubscription.id.in_(missing)).all()
+            if missing else []
+        )
 
-        count = 0
-        for delivery in due:
-            await self._deliver_webhook(delivery)
-            count += 1
-        return count
+        await self._dispatch(due, http_client=http_client)
+        del subscriptions
+        self.db.commit()
+        return len(due)
 
     @staticmethod
     def _calculate_retry_delay(attempt: int) -> int:
@@ -328,3 +493,34 @@ class WebhookService:
         )
         self.db.commit()
         return deleted
+
+
+async def backfill_event_index(conn) -> None:
+    """
+    Populate webhook_subscription_events for subscriptions created before
+    the index existed. Runs from the startup migrations; no-op once filled.
+    """
+    existing = await conn.execute(text("SELECT 1 FROM webhook_subscription_events LIMIT 1"))
+    if existing.first() is not None:
+        return
+
+    result = await conn.execute(text("SELECT id, user_id, event_types FROM webhook_subscriptions"))
+    rows = []
+    for subscription_id, user_id, event_types in result:
+        if isinstance(event_types, str):
+            try:
+                event_types = json.loads(event_types)
+            except ValueError:
+                event_types = []
+        for event_type in dict.fromkeys(event_types or []):
+            rows.append({'subscription_id': subscription_id, 'user_id': user_id, 'event_type': event_type})
+
+    if rows:
+        await conn.execute(
+            text(
+                "INSERT INTO webhook_subscription_events (subscription_id, user_id, event_type) "
+                "VALUES (:subscription_id, :user_id, :event_type)"
+            ),
+            rows,
+        )
+        logger.info(f"[OK] Migration applied: indexed {len(rows)} webhook subscription event types")
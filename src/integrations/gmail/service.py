@@ -79,6 +79,9 @@ class EmailService:
     def search_emails(self, **kwargs) -> List[Dict[str, Any]]:
         return self.search_service.search_emails(**kwargs)
 
+    async def search_emails_async(self, **kwargs) -> List[Dict[str, Any]]:
+        return await self.search_service.search_emails_async(**kwargs)
+
     def list_unread_emails(self, limit: int = 10) -> List[Dict[str, Any]]:
         return self.search_service.list_unread_emails(limit=limit)
 
@@ -46,7 +46,8 @@ class CalendarService:
     def __init__(
         self,
         config: Config,
-        credentials: Optional[Any] = None
+        credentials: Optional[Any] = None,
+        user_id: Optional[int] = None
     ):
         """
         Initialize calendar service
@@ -54,9 +55,11 @@ class CalendarService:
         Args:
             config: Application configuration
             credentials: OAuth credentials (if available)
+            user_id: Owning user; enables the shared per-user interval index cache
         """
         self.config = config
         self.credentials = credentials
+        self.user_id = user_id
         
         # Initialize Google Calendar client
         try:
@@ -201,6 +204,7 @@ class CalendarService:
             )
             
             logger.info(f"[CALENDAR_SERVICE] Event created: {event.get('id')}")
+            self._on_events_changed()
             return event
             
         except SchedulingConflictException:
@@ -280,6 +284,7 @@ class CalendarService:
             event = self.calendar_client.update_event(event_id, update_data)
             
             logger.info(f"[CALENDAR_SERVICE] Event updated: {event_id}")
+            self._on_events_changed()
             return event
             
         except (EventNotFoundException, SchedulingConflictException):
@@ -313,6 +318,7 @@ class CalendarService:
             self.calendar_client.delete_event(event_id)
             
             logger.info(f"[CALENDAR_SERVICE] Event deleted: {event_id}")
+            self._on_events_changed()
             return {'event_id': event_id, 'status': 'deleted'}
             
         except Exception as e:
@@ -565,12 +571,10 @@ class CalendarService:
             events = self.list_events(start_date=check_start_raw, end_date=end_time)
             
             # Strict Filter: Verify overlap and exclude self
-            from ...core.calendar.utils import events_overlap, parse_event_time, parse_datetime_with_timezone
+            from ...core.calendar.utils import parse_event_time, parse_datetime_with_timezone
             
             # Calculate precise window for strict overlap check using config for timezone context
             start_dt = parse_datetime_with_timezone(start_time, self.config)
-            
-            # ... (rest of existing setup) ...
 
             if not start_dt:
                 # Fallback to naive parsing if util fails, but force simple UTC awareness to avoid crash
@@ -594,43 +598,21 @@ class CalendarService:
             if end_dt:
                 end_dt = end_dt.replace(microsecond=0)
 
-            conflicts = []
-            
-            # 1. Sort events to find the one immediately BEFORE our proposed start
-            # This is needed for travel time calculation
-            sorted_events = sorted(events, key=lambda e: parse_event_time(e.get('start', {})).timestamp() if parse_event_time(e.get('start', {})) else 0)
-            
-            previous_event = None
-            
-            for event in sorted_events:
-                if event.get('id') == exclude_event_id:
-                    continue
-
-                # Fix 1: Transparency Handling
-                # If event is marked as "transparent" (Free), it does not block time
-                if event.get('transparency') == 'transparent':
-                    continue
-                    
-                e_start = parse_event_time(event.get('start', {}))
-                e_end = parse_event_time(event.get('end', {}))
-                
-                if e_start and e_end:
-                    # Fix 2: Microsecond Drift
-                    # Normalize existing event times too
-                    e_start = e_start.replace(microsecond=0)
-                    e_end = e_end.replace(microsecond=0)
-
-                    # Strict overlap check for direct conflicts
-                    is_overlap = events_overlap(start_dt, end_dt, e_start, e_end)
-                    logger.info(f"[DEBUG_CONFLICT] Checking: Proposed {start_dt} - {end_dt} vs Existing {e_start} - {e_end} | Overlap: {is_overlap}")
-                    if is_overlap:
-                        conflicts.append(event)
-                    
-                    # Track potential previous event for travel time
-                    # Logic: If event ENDS before we START, it is a candidate for "previous event"
-                    # We want the *latest* one that ends before we start.
-                    if e_end <= start_dt:
-                        previous_event = event
+            # 1. Interval index over the checked window. Transparent ("Free")
+            # events never block time; the updated event itself is excluded.
+            index = self._interval_index(events)
+            conflicts = [
+                interval.event
+                for interval in index.overlapping(start_dt, end_dt, include_transparent=False)
+                if interval.event_id != exclude_event_id
+            ]
+            
+            # Latest event that ENDS before we START (for travel time), not counting
+            # the event being updated
+            previous = index.latest_ending_before(
+                start_dt, include_transparent=False, exclude_event_id=exclude_event_id
+            )
+            previous_event = previous.event if previous else None
 
             # 2. Check Travel Time from Previous Event
             if self.maps_service and location and previous_event and not conflicts:
@@ -838,42 +820,38 @@ class CalendarService:
         working_hours_only: bool,
         max_suggestions: int
     ) -> List[Dict[str, str]]:
-        """Find available time gaps between events"""
-        # Use parse_event_time to handle both dicts and objects safely
-        from ...core.calendar.utils import parse_event_time, format_datetime_rfc3339
+        """Find available time gaps between (merged) busy blocks"""
+        from ...core.calendar.utils import format_datetime_rfc3339
         
-        # Sort events by start time safely
-        def get_start(e):
-            dt = parse_event_time(e.get('start', {}))
-            return dt.timestamp() if dt else 0
-            
-        sorted_events = sorted(events, key=get_start)
-        
-        free_slots = []
+        # Overlapping events are merged first, so a gap is never reported
+        # inside a long event that an earlier short event precedes.
+        index = self._interval_index(events)
+        slots = index.free_slots(timedelta(minutes=duration_minutes), max_slots=max_suggestions)
         
-        # Simple implementation - can be enhanced with working hours logic
-        for i in range(len(sorted_events) - 1):
-            current_end_dt = parse_event_time(sorted_events[i].get('end', {}))
-            next_start_dt = parse_event_time(sorted_events[i + 1].get('start', {}))
-            
-            if current_end_dt and next_start_dt:
-                try:
-                    # Both are datetime objects now (aware or naive consistently from utils)
-                    gap_minutes = (next_start_dt - current_end_dt).total_seconds() / 60
-                    
-                    if gap_minutes >= duration_minutes:
-                        free_slots.append({
-                            'start': format_datetime_rfc3339(current_end_dt),
-                            'end': format_datetime_rfc3339(current_end_dt + timedelta(minutes=duration_minutes))
-                        })
-                        
-                        if len(free_slots) >= max_suggestions:
-                            break
-                except Exception as e:
-                    logger.warning(f"Error calculating gap: {e}")
-                    continue
+        return [
+            {
+                'start': format_datetime_rfc3339(slot_start),
+                'end': format_datetime_rfc3339(slot_end)
+            }
+            for slot_start, slot_end in slots
+        ]
+    
+    def _interval_index(self, events: List[Dict[str, Any]]):
+        """Interval tree over events (cached per user when user_id is known)."""
+        from ...core.calendar.intervals import IntervalTree, build_intervals, get_calendar_index_cache
         
-        return free_slots
+        if self.user_id is not None:
+            return get_calendar_index_cache().get_or_build(self.user_id, events)
+        return IntervalTree(build_intervals(events))
+    
+    def _on_events_changed(self) -> None:
+        """Drop the cached interval index and refresh dashboard briefs after a write."""
+        if self.user_id is None:
+            return
+        from ...core.calendar.intervals import get_calendar_index_cache
+        from ...services.dashboard.brief_cache import schedule_brief_refresh
+        get_calendar_index_cache().invalidate(self.user_id)
+        schedule_brief_refresh(self.user_id, sources=['calendar'])
     
     # ===================================================================
     # INTEGRATIONS
@@ -38,8 +38,14 @@ class GoogleDriveClient:
 
     def _wrap_credentials_refresh(self, credentials: Credentials):
         """Monkey-patch credentials.refresh to call our callback after success"""
-        original_refresh = credentials.refresh
         callback = self.token_update_callback
+        registry_key = getattr(credentials, '_registry_key', None)
+        if registry_key is not None:
+            # Registry-managed credentials are refreshed and persisted by the registry
+            from src.core.client_registry import get_client_registry
+            get_client_registry().set_token_saver(*registry_key, callback)
+            return
+        original_refresh = credentials.refresh
         
         def wrapped_refresh(request):
             logger.info("[DRIVE_CLIENT] Auto-refreshing credentials...")
@@ -70,7 +70,8 @@ class TaskService:
     def __init__(
         self,
         config: Config,
-        credentials: Any
+        credentials: Any,
+        user_id: Optional[int] = None
     ):
         """
         Initialize task service with Google Tasks
@@ -78,6 +79,7 @@ class TaskService:
         Args:
             config: Application configuration
             credentials: Google OAuth credentials (REQUIRED)
+            user_id: Owning user; task writes then refresh the user's dashboard briefs
             
         Raises:
             AuthenticationException: If credentials not provided
@@ -97,6 +99,7 @@ class TaskService:
         
         self.config = config
         self.credentials = credentials
+        self.user_id = user_id
         
         # Initialize Google Tasks client (required)
         try:
@@ -118,6 +121,12 @@ class TaskService:
                 cause=e
             )
     
+    def _on_tasks_changed(self) -> None:
+        """Refresh the user's dashboard briefs after a task write."""
+        if self.user_id is not None:
+            from ...services.dashboard.brief_cache import schedule_brief_refresh
+            schedule_brief_refresh(self.user_id, sources=['tasks'])
+    
     def _get_backend(self):
         """Get Google Tasks backend (only option now)"""
         return self.google_tasks
@@ -208,6 +217,7 @@ class TaskService:
                             logger.warning(f"[TASK_SERVICE] Failed to create subtask: {subtask_title}")
             
             logger.info(f"[TASK_SERVICE] Task created: {task_id}")
+            self._on_tasks_changed()
             return task
             
         except TaskValidationException:
@@ -274,6 +284,7 @@ class TaskService:
                     )
             
             logger.info(f"[TASK_SERVICE] Task updated: {task_id}")
+            self._on_tasks_changed()
             return task
             
         except TaskNotFoundException:
@@ -312,6 +323,7 @@ class TaskService:
                 task = {'id': task_id, 'status': 'completed'}
             
             logger.info(f"[TASK_SERVICE] Task completed: {task_id}")
+            self._on_tasks_changed()
             return task
             
         except TaskServiceException:
@@ -342,6 +354,7 @@ class TaskService:
                 self.google_tasks.delete_task(task_id, tasklist_id=tasklist_id)
             
             logger.info(f"[TASK_SERVICE] Task deleted: {task_id}")
+            self._on_tasks_changed()
             return {'task_id': task_id, 'status': 'deleted'}
             
         except Exception as e:
@@ -10,12 +10,20 @@ Instead of waiting for agents to query memory, this component:
 - Injects "you should know" context proactively
 
 This enables truly intelligent agents that anticipate needs.
+
+Gathering runs on every turn, so it is bounded: each finder issues one
+batched query for all active entities, runs under a deadline capped by the
+turn budget, and its results are cached per user and entity set between
+turns. Finders that miss the deadline are cancelled, so none keeps using
+the shared memory session after the turn has moved on.
 """
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Set, Tuple
 from enum import Enum
 import asyncio
+import time
 
 from src.utils.logger import setup_logger
 
@@ -97,12 +105,32 @@ class ProactiveInjector:
     MIN_RELEVANCE_THRESHOLD = 0.5
     RECENCY_WINDOW_HOURS = 24
     
+    # Latency budget for gathering candidates on one turn
+    TURN_BUDGET_SECONDS = 0.25
+    # Deadline for a single finder (capped by what is left of the turn budget)
+    FINDER_TIMEOUT_SECONDS = 0.2
+    # Cached finder results kept across users/entity sets
+    FINDER_CACHE_MAX_ENTRIES = 2000
+    
+    # (name, method, cache TTL seconds)
+    FINDERS = (
+        ("entity", "_find_entity_related_memories", 300),
+        ("goal", "_find_goal_related_memories", 120),
+        ("time_sensitive", "_find_time_sensitive_memories", 60),
+        ("conflict", "_find_conflict_memories", 120),
+        ("opportunity", "_find_opportunity_memories", 300),
+        ("linear", "_find_linear_proactive_memories", 300),
+        ("protection", "_find_protection_memories", 60),
+        ("workload", "_find_workload_memories", 300),
+    )
+    
     def __init__(
         self,
         semantic_memory: Optional[Any] = None,
         graph_manager: Optional[Any] = None,
         goal_tracker: Optional[Any] = None,
-        salience_scorer: Optional[Any] = None
+        salience_scorer: Optional[Any] = None,
+        turn_budget_seconds: Optional[float] = None
     ):
         """
         Initialize the proactive injector.
@@ -112,16 +140,33 @@ class ProactiveInjector:
             graph_manager: KnowledgeGraphManager instance
             goal_tracker: GoalTracker instance
             salience_scorer: SalienceScorer instance
+            turn_budget_seconds: Override for TURN_BUDGET_SECONDS
         """
         self.semantic_memory = semantic_memory
         self.graph_manager = graph_manager
         self.goal_tracker = goal_tracker
         self.salience_scorer = salience_scorer
+        self.turn_budget_seconds = turn_budget_seconds or self.TURN_BUDGET_SECONDS
         
         # Track recently injected memories to avoid repetition
         # user_id -> set of memory IDs
         self._recently_injected: Dict[int, Set[str]] = {}
         self._injection_timestamps: Dict[int, List[datetime]] = {}
+        
+        # (finder, user_id, agent, entities, goals) -> (expires_at, memories)
+        self._finder_cache: "OrderedDict[Tuple, Tuple[float, List[ProactiveMemory]]]" = OrderedDict()
+        self._finder_stats: Dict[str, Dict[str, float]] = {
+            name: {
+                "runs": 0,
+                "cache_hits": 0,
+                "timeouts": 0,
+                "errors": 0,
+                "candidates": 0,
+                "injected": 0,
+                "total_ms": 0.0
+            }
+            for name, _, _ in self.FINDERS
+        }
     
     async def get_proactive_memories(
         self,
@@ -140,28 +185,21 @@ class ProactiveInjector:
         """
         max_memories = max_memories or self.MAX_INJECTIONS_PER_TURN
         candidates = []
+        # id(memory) -> finder name, for contribution metrics
+        origin: Dict[int, str] = {}
         
-        # Gather candidates from various sources
-        tasks = [
-            self._find_entity_related_memories(context),
-            self._find_goal_related_memories(context),
-            self._find_time_sensitive_memories(context),
-            self._find_conflict_memories(context),
-            self._find_opportunity_memories(context),
-            self._find_linear_proactive_memories(context),
-            self._find_protection_memories(context),
-            self._find_workload_memories(context)
-        ]
-        
+        # Gather candidates from various sources, within the turn budget
+        deadline = time.monotonic() + self.turn_budget_seconds
         try:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            results = await asyncio.gather(*(
+                self._run_finder(name, method, ttl, context, deadline)
+                for name, method, ttl in self.FINDERS
+            ))
             
-            for result in results:
-                if isinstance(result, Exception):
-                    logger.debug(f"[ProactiveInjector] Source failed: {result}")
-                    continue
-                if result:
-                    candidates.extend(result)
+            for (name, _, _), result in zip(self.FINDERS, results):
+                for memory in result:
+                    origin[id(memory)] = name
+                candidates.extend(result)
         
         except Exception as e:
             logger.warning(f"[ProactiveInjector] Memory gathering failed: {e}")
@@ -182,6 +220,9 @@ class ProactiveInjector:
         # Take top N
         result = sorted_memories[:max_memories]
         
+        for memory in result:
+            self._finder_stats[origin[id(memory)]]["injected"] += 1
+        
         # Record what we're injecting
         self._record_injection(context.user_id, result)
         
@@ -192,6 +233,108 @@ class ProactiveInjector:
         
         return result
     
+    async def _run_finder(
+        self,
+        name: str,
+        method: str,
+        ttl: float,
+        context: InjectionContext,
+        deadline: float
+    ) -> List[ProactiveMemory]:
+        """Return one finder's result from cache or within its deadline; never raises."""
+        stats = self._finder_stats[name]
+        key = (
+            name,
+            context.user_id,
+            context.agent_name,
+            frozenset(context.active_entities),
+            frozenset(context.active_goals)
+        )
+        
+        cached = self._finder_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            stats["cache_hits"] += 1
+            return cached[1]
+        
+        timeout = min(self.FINDER_TIMEOUT_SECONDS, deadline - time.monotonic())
+        try:
+            # A finder past its deadline is cancelled rather than left
+            # running on the shared session after the turn moves on
+            return await asyncio.wait_for(
+                self._complete_finder(name, method, ttl, key, context), timeout=max(timeout, 0)
+            )
+        except asyncio.TimeoutError:
+            stats["timeouts"] += 1
+            logger.debug(f"[ProactiveInjector] Finder '{name}' cancelled after {timeout:.3f}s")
+            return []
+    
+    async def _complete_finder(
+        self,
+        name: str,
+        method: str,
+        ttl: float,
+        key: Tuple,
+        context: InjectionContext
+    ) -> List[ProactiveMemory]:
+        """Run one finder and cache its result; raises only when cancelled."""
+        stats = self._finder_stats[name]
+        started = time.monotonic()
+        try:
+            memories = await getattr(self, method)(context)
+        except Exception as e:
+            stats["errors"] += 1
+            logger.debug(f"[ProactiveInjector] Source '{name}' failed: {e}")
+            return []
+        finally:
+            stats["total_ms"] += (time.monotonic() - started) * 1000
+        
+        memories = memories or []
+        stats["runs"] += 1
+        stats["candidates"] += len(memories)
+        
+        self._finder_cache[key] = (time.monotonic() + ttl, memories)
+        self._finder_cache.move_to_end(key)
+        while len(self._finder_cache) > self.FINDER_CACHE_MAX_ENTRIES:
+            self._finder_cache.popitem(last=False)
+        return memories
+    
+    async def _search_facts_batch(
+        self,
+        queries: List[str],
+        user_id: int,
+        limit: int
+    ) -> Dict[str, List[Any]]:
+        """One batched fact search for all queries (query -> facts)."""
+        if hasattr(self.semantic_memory, "search_facts_batch"):
+            return await self.semantic_memory.search_facts_batch(
+                queries=queries,
+                user_id=user_id,
+                limit=limit
+            )
+        
+        # Sequential fallback: memory backends may share one DB session
+        results = {}
+        for query in queries:
+            results[query] = await self.semantic_memory.search_facts(
+                query=query,
+                user_id=user_id,
+                limit=limit
+            ) or []
+        return results
+    
+    @staticmethod
+    def _fact_fields(fact: Any) -> Tuple[str, float, Optional[str]]:
+        """(content, confidence, memory_id) from a fact dict or object."""
+        if isinstance(fact, dict):
+            content = fact.get("content", "")
+            confidence = fact.get("confidence", 0.5)
+            fact_id = fact.get("id")
+        else:
+            content = getattr(fact, "content", str(fact))
+            confidence = getattr(fact, "confidence", 0.5)
+            fact_id = getattr(fact, "id", None)
+        return content, confidence, f"fact_{fact_id}" if fact_id is not None else None
+    
     async def _find_entity_related_memories(
         self, 
         context: InjectionContext
@@ -203,28 +346,24 @@ class ProactiveInjector:
             return memories
         
         try:
-            for entity in context.active_entities[:3]:
-                if hasattr(self.semantic_memory, "search_facts"):
-                    facts = await self.semantic_memory.search_facts(
-                        query=entity,
-                        user_id=context.user_id,
-                        limit=2
-                    )
+            entities = context.active_entities[:3]
+            facts_by_entity = await self._search_facts_batch(entities, context.user_id, limit=2)
+            
+            for entity in entities:
+                for fact in facts_by_entity.get(entity) or []:
+                    content, confidence, memory_id = self._fact_fields(fact)
                     
-                    for fact in (facts or []):
-                        content = getattr(fact, "content", str(fact))
-                        confidence = getattr(fact, "confidence", 0.5)
-                        
-                        if confidence >= 0.5:
-                            memories.append(ProactiveMemory(
-                                content=content,
-                                reason=InjectionReason.ENTITY_MATCH,
-                                relevance_score=confidence,
-                                source="semantic",
-                                explanation=f"About {entity}",
-                                related_entities=[entity],
-                                urgency="normal" if confidence < 0.8 else "high"
-                            ))
+                    if confidence >= 0.5:
+                        memories.append(ProactiveMemory(
+                            content=content,
+                            reason=InjectionReason.ENTITY_MATCH,
+                            relevance_score=confidence,
+                            source="semantic",
+                            explanation=f"About {entity}",
+                            related_entities=[entity],
+                            memory_id=memory_id,
+                            urgency="normal" if confidence < 0.8 else "high"
+                        ))
         
         except Exception as e:
             logger.debug(f"[ProactiveInjector] Entity search failed: {e}")
@@ -279,76 +418,75 @@ class ProactiveInjector:
         """Find time-sensitive memories (upcoming events, deadlines)."""
         memories = []
         
-        if not self.graph_manager:
+        if not self.graph_manager or not hasattr(self.graph_manager, "query"):
             return memories
         
-        try:
-            # Look for upcoming calendar events
-            if hasattr(self.graph_manager, "query"):
-                now = datetime.utcnow()
-                soon = now + timedelta(hours=4)
-                
-                # Query for events in the next 4 hours
-                query = """
-                FOR e IN CalendarEvent
-                    FILTER e.user_id == @user_id
-                      AND e.start_time >= @now
-                      AND e.start_time <= @soon
-                    LIMIT 2
-                    RETURN { title: e.title, start_time: e.start_time }
-                """
-                
-                results = await self.graph_manager.query(
-                    query,
-                    {"user_id": context.user_id, "now": now.isoformat(), "soon": soon.isoformat()}
-                )
-                
-                for record in results:
-                    memories.append(ProactiveMemory(
-                        content=f"Upcoming: {record['e.title']}",
-                        reason=InjectionReason.TIME_SENSITIVE,
-                        relevance_score=0.85,
-                        source="graph",
-                        explanation="Event coming up soon",
-                        urgency="high"
-                    ))
+        now = datetime.utcnow()
+        soon = now + timedelta(hours=4)
+        tomorrow = now + timedelta(days=1)
+        
+        # Look for upcoming calendar events in the next 4 hours
+        events_query = """
+        FOR e IN CalendarEvent
+            FILTER e.user_id == @user_id
+              AND e.start_time >= @now
+              AND e.start_time <= @soon
+            LIMIT 2
+            RETURN { title: e.title, start_time: e.start_time }
+        """
         
-        except Exception as e:
-            logger.debug(f"[ProactiveInjector] Time-sensitive search failed: {e}")
+        # Linear issues due within 24 hours
+        deadlines_query = """
+        FOR i IN LinearIssue
+            FILTER i.user_id == @user_id
+              AND i.dueDate >= @now
+              AND i.dueDate <= @tomorrow
+              AND i.priority IN [1, 2]
+            LIMIT 2
+            RETURN { title: i.title, identifier: i.identifier, priority: i.priority }
+        """
         
-        # Check for Linear deadlines if available
-        if self.graph_manager:
-            try:
-                # Query for Linear issues due within 24 hours
-                now = datetime.utcnow()
-                tomorrow = now + timedelta(days=1)
-                
-                query = """
-                FOR i IN LinearIssue
-                    FILTER i.user_id == @user_id
-                      AND i.dueDate >= @now
-                      AND i.dueDate <= @tomorrow
-                      AND i.priority IN [1, 2]
-                    LIMIT 2
-                    RETURN { title: i.title, identifier: i.identifier, priority: i.priority }
-                """
-                
-                results = await self.graph_manager.query(
-                    query,
-                    {"user_id": context.user_id, "now": now.isoformat(), "tomorrow": tomorrow.isoformat()}
-                )
-                
-                for record in results:
-                    memories.append(ProactiveMemory(
-                        content=f"Deadline: {record['i.identifier']} - {record['i.title']}",
-                        reason=InjectionReason.TIME_SENSITIVE,
-                        relevance_score=0.9,
-                        source="graph",
-                        explanation="Linear issue due soon",
-                        urgency="critical" if record['i.priority'] == 1 else "high"
-                    ))
-            except Exception as e:
-                logger.debug(f"[ProactiveInjector] Linear deadline search failed: {e}")
+        # Both lookups are independent; run them together
+        events, deadlines = await asyncio.gather(
+            self.graph_manager.query(
+                events_query,
+                {"user_id": context.user_id, "now": now.isoformat(), "soon": soon.isoformat()}
+            ),
+            self.graph_manager.query(
+                deadlines_query,
+                {"user_id": context.user_id, "now": now.isoformat(), "tomorrow": tomorrow.isoformat()}
+            ),
+            return_exceptions=True
+        )
+        
+        if isinstance(events, Exception):
+            logger.debug(f"[ProactiveInjector] Time-sensitive search failed: {events}")
+        else:
+            for record in events or []:
+                memories.append(ProactiveMemory(
+                    content=f"Upcoming: {_field(record, 'title', 'e.title')}",
+                    reason=InjectionReason.TIME_SENSITIVE,
+                    relevance_score=0.85,
+                    source="graph",
+                    explanation="Event coming up soon",
+                    urgency="high"
+                ))
+        
+        if isinstance(deadlines, Exception):
+            logger.debug(f"[ProactiveInjector] Linear deadline search failed: {deadlines}")
+        else:
+            for record in deadlines or []:
+                memories.append(ProactiveMemory(
+                    content=(
+                        f"Deadline: {_field(record, 'identifier', 'i.identifier')} - "
+                        f"{_field(record, 'title', 'i.title')}"
+                    ),
+                    reason=InjectionReason.TIME_SENSITIVE,
+                    relevance_score=0.9,
+                    source="graph",
+                    explanation="Linear issue due soon",
+                    urgency="critical" if _field(record, 'priority', 'i.priority') == 1 else "high"
+                ))
         
         return memories
     
@@ -360,35 +498,45 @@ class ProactiveInjector:
         memories = []
         
         # Look for scheduling conflicts if calendar-related
-        if context.agent_name == "calendar" and self.graph_manager:
+        if (context.agent_name == "calendar" and context.active_entities
+                and self.graph_manager and hasattr(self.graph_manager, "query")):
             try:
-                # Check if any entities mentioned are marked as unavailable
-                for entity in context.active_entities:
-                    if hasattr(self.graph_manager, "query"):
-                        query = """
-                        FOR p IN Person
-                            FILTER CONTAINS(LOWER(p.name), LOWER(@entity))
-                            FOR s IN OUTBOUND p HAS_STATUS
-                                FILTER s.type IN ['OOO', 'Busy', 'Unavailable']
-                                LIMIT 1
-                                RETURN { name: p.name, type: s.type, until: s.until }
-                        """
-                        
-                        results = await self.graph_manager.query(
-                            query,
-                            {"entity": entity}
-                        )
-                        
-                        for record in results:
-                            memories.append(ProactiveMemory(
-                                content=f"{record['p.name']} is currently {record['s.type']}",
-                                reason=InjectionReason.CONFLICT_DETECTED,
-                                relevance_score=0.95,
-                                source="graph",
-                                explanation="Potential conflict",
-                                related_entities=[entity],
-                                urgency="high"
-                            ))
+                # One query for all mentioned entities marked as unavailable
+                query = """
+                FOR p IN Person
+                    LET entity = FIRST(
+                        FOR candidate IN @entities
+                            FILTER CONTAINS(LOWER(p.name), LOWER(candidate))
+                            RETURN candidate
+                    )
+                    FILTER entity != null
+                    FOR s IN OUTBOUND p HAS_STATUS
+                        FILTER s.type IN ['OOO', 'Busy', 'Unavailable']
+                        LIMIT @limit
+                        RETURN { name: p.name, type: s.type, until: s.until, entity: entity }
+                """
+                
+                results = await self.graph_manager.query(
+                    query,
+                    {"entities": list(context.active_entities), "limit": len(context.active_entities)}
+                )
+                
+                seen_entities = set()
+                for record in results or []:
+                    entity = record.get("entity")
+                    # At most one status per entity
+                    if entity in seen_entities:
+                        continue
+                    seen_entities.add(entity)
+                    memories.append(ProactiveMemory(
+                        content=f"{_field(record, 'name', 'p.name')} is currently {_field(record, 'type', 's.type')}",
+                        reason=InjectionReason.CONFLICT_DETECTED,
+                        relevance_score=0.95,
+                        source="graph",
+                        explanation="Potential conflict",
+                        related_entities=[entity] if entity else [],
+                        urgency="high"
+                    ))
             
             except Exception as e:
                 logger.debug(f"[ProactiveInjector] Conflict search failed: {e}")
@@ -405,27 +553,24 @@ class ProactiveInjector:
         # Example: If user mentions a person, surface recent interactions
         if context.active_entities and self.semantic_memory:
             try:
-                for entity in context.active_entities[:2]:
-                    # Look for communication patterns
-                    if hasattr(self.semantic_memory, "search_facts"):
-                        facts = await self.semantic_memory.search_facts(
-                            query=f"communication {entity}",
-                            user_id=context.user_id,
-                            limit=1
-                        )
-                        
-                        for fact in (facts or []):
-                            content = getattr(fact, "content", str(fact))
-                            if "prefer" in content.lower() or "like" in content.lower():
-                                memories.append(ProactiveMemory(
-                                    content=content,
-                                    reason=InjectionReason.OPPORTUNITY,
-                                    relevance_score=0.7,
-                                    source="semantic",
-                                    explanation=f"Tip for {entity}",
-                                    related_entities=[entity],
-                                    urgency="low"
-                                ))
+                # Look for communication patterns
+                queries = {f"communication {entity}": entity for entity in context.active_entities[:2]}
+                facts_by_query = await self._search_facts_batch(list(queries), context.user_id, limit=1)
+                
+                for query, entity in queries.items():
+                    for fact in facts_by_query.get(query) or []:
+                        content, _, memory_id = self._fact_fields(fact)
+                        if "prefer" in content.lower() or "like" in content.lower():
+                            memories.append(ProactiveMemory(
+                                content=content,
+                                reason=InjectionReason.OPPORTUNITY,
+                                relevance_score=0.7,
+                                source="semantic",
+                                explanation=f"Tip for {entity}",
+                                related_entities=[entity],
+                                memory_id=memory_id,
+                                urgency="low"
+                            ))
             
             except Exception as e:
                 logger.debug(f"[ProactiveInjector] Opportunity search failed: {e}")
@@ -596,14 +741,32 @@ class ProactiveInjector:
             len(ids) for ids in self._recently_injected.values()
         )
         
+        finders = {}
+        for name, stats in self._finder_stats.items():
+            calls = stats["runs"] + stats["cache_hits"]
+            finders[name] = {
+                **stats,
+                "total_ms": round(stats["total_ms"], 1),
+                "avg_ms": round(stats["total_ms"] / stats["runs"], 1) if stats["runs"] else 0.0,
+                "contribution_rate": round(stats["injected"] / calls, 3) if calls else 0.0
+            }
+        
         return {
             "total_users_tracked": total_users,
             "total_memories_injected": total_injected,
             "max_injections_per_turn": self.MAX_INJECTIONS_PER_TURN,
-            "relevance_threshold": self.MIN_RELEVANCE_THRESHOLD
+            "relevance_threshold": self.MIN_RELEVANCE_THRESHOLD,
+            "turn_budget_seconds": self.turn_budget_seconds,
+            "cached_finder_results": len(self._finder_cache),
+            "finders": finders
         }
 
 
+def _field(record: Dict[str, Any], name: str, legacy_name: str) -> Any:
+    """Read a returned field, accepting the older 'var.attr' key style."""
+    return record.get(name, record.get(legacy_name))
+
+
 # Global instance
 _proactive_injector: Optional[ProactiveInjector] = None
 
@@ -11,17 +11,49 @@ should be surfaced to agents based on multiple factors:
 - Importance (explicit importance markers)
 - Goal alignment (relation to active goals)
 - Entity overlap (shared entities with current context)
+
+score_batch is vectorized: the query is embedded once (and reused across
+calls), stored memory embeddings are used where present and the rest are
+batch-encoded, and every factor is computed as a numpy array before a
+partial selection for top_k.
 """
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import math
 import re
 
+import numpy as np
+
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+_WORD_RE = re.compile(r'\b\w+\b')
+
+_STOPWORDS = frozenset({
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been',
+    'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'could', 'should', 'may', 'might', 'must', 'can',
+    'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by', 'from',
+    'as', 'into', 'through', 'during', 'before', 'after',
+    'above', 'below', 'between', 'under', 'again', 'further',
+    'then', 'once', 'here', 'there', 'when', 'where', 'why',
+    'how', 'all', 'each', 'few', 'more', 'most', 'other',
+    'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same',
+    'so', 'than', 'too', 'very', 'just', 'and', 'but', 'if',
+    'or', 'because', 'until', 'while', 'about', 'against',
+    'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'you',
+    'your', 'he', 'him', 'his', 'she', 'her', 'it', 'its',
+    'they', 'them', 'their', 'what', 'which', 'who', 'whom'
+})
+
+# Query embeddings kept per scorer (queries repeat across turns and passes)
+QUERY_EMBEDDING_CACHE_SIZE = 64
+# Tokenized memory contents kept per scorer (FIFO-evicted)
+CONTENT_WORDS_CACHE_SIZE = 20_000
+
 
 @dataclass
 class ScoredMemory:
@@ -80,6 +112,9 @@ class SalienceScorer:
         "entity_overlap": 0.10
     }
     
+    # Column order of the factor matrix used by score_batch
+    FACTORS = ("recency", "frequency", "relevance", "importance", "goal_alignment", "entity_overlap")
+    
     # Decay parameters
     RECENCY_HALF_LIFE_HOURS = 24  # Memory "importance" halves every 24 hours
     FREQUENCY_LOG_BASE = 2  # Logarithmic frequency bonus
@@ -98,6 +133,8 @@ class SalienceScorer:
         """
         self.weights = weights or self.DEFAULT_WEIGHTS.copy()
         self.embedder = embedder
+        self._query_vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._word_cache: "OrderedDict[str, frozenset]" = OrderedDict()
         
         # Normalize weights to sum to 1.0
         weight_sum = sum(self.weights.values())
@@ -175,35 +212,191 @@ class SalienceScorer:
         query: str,
         active_goals: Optional[List[str]] = None,
         current_entities: Optional[List[str]] = None,
-        top_k: Optional[int] = None
+        top_k: Optional[int] = None,
+        now: Optional[datetime] = None
     ) -> List[ScoredMemory]:
         """
         Score a batch of memories and return sorted by salience.
         
+        Produces the same scores as score() for each memory, but computes
+        every factor over the whole batch at once.
+        
         Args:
-            memories: List of memory dictionaries
+            memories: List of memory dictionaries (an optional 'embedding'
+                      key is used instead of re-encoding the content)
             query: Current user query
             active_goals: Active user goals
             current_entities: Entities in current context
             top_k: Only return top K highest scoring memories
+            now: Current time (for testing)
             
         Returns:
             List of ScoredMemory sorted by score (highest first)
         """
-        now = datetime.utcnow()
+        if not memories:
+            return []
+        now = now or datetime.utcnow()
         
-        scored = [
-            self.score(m, query, active_goals, current_entities, now)
-            for m in memories
+        factors = np.empty((len(self.FACTORS), len(memories)))
+        factors[0] = self._recency_batch(memories, now)
+        factors[1] = self._frequency_batch(memories)
+        factors[2] = self._relevance_batch(memories, query)
+        factors[3] = np.fromiter(
+            (m.get("importance", 0.5) for m in memories), dtype=float, count=len(memories)
+        )
+        factors[4] = self._goal_alignment_batch(memories, active_goals or [])
+        factors[5] = self._entity_overlap_batch(memories, current_entities or [])
+        
+        weights = np.array([self.weights[name] for name in self.FACTORS])
+        scores = np.clip(weights @ factors, 0.0, 1.0)
+        
+        order = self._top_indices(scores, top_k)
+        return [
+            ScoredMemory(
+                content=memories[i].get("content", ""),
+                score=float(scores[i]),
+                source=memories[i].get("source", "unknown"),
+                metadata=memories[i].get("metadata", {}),
+                recency_score=float(factors[0, i]),
+                frequency_score=float(factors[1, i]),
+                relevance_score=float(factors[2, i]),
+                importance_score=float(factors[3, i]),
+                goal_alignment_score=float(factors[4, i]),
+                entity_overlap_score=float(factors[5, i])
+            )
+            for i in order
         ]
-        
-        # Sort by score descending
-        scored.sort(key=lambda x: x.score, reverse=True)
-        
+    
+    @staticmethod
+    def _top_indices(scores: np.ndarray, top_k: Optional[int]) -> np.ndarray:
+        """Indices of the highest scores, descending; ties keep input order."""
+        candidates = np.arange(len(scores))
         if top_k is not None:
-            scored = scored[:top_k]
+            if top_k <= 0:
+                return candidates[:0]
+            if top_k < len(scores):
+                # Partial selection: everything above the k-th largest score,
+                # then ties at that score in input order
+                kth = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+                above = np.flatnonzero(scores > kth)
+                ties = np.flatnonzero(scores == kth)[:top_k - len(above)]
+                candidates = np.concatenate([above, ties])
+        # lexsort is stable on the last key, so equal scores keep input order
+        return candidates[np.lexsort((candidates, -scores[candidates]))]
+    
+    def _recency_batch(self, memories: List[Dict[str, Any]], now: datetime) -> np.ndarray:
+        ages = np.array([self._age_hours(m.get("timestamp"), now) for m in memories], dtype=float)
+        unknown = np.isnan(ages)
+        with np.errstate(invalid='ignore'):
+            decay = np.exp2(-np.where(unknown, 0.0, ages) / self.RECENCY_HALF_LIFE_HOURS)
+            decay[ages < 0] = 1.0
+        decay[unknown] = 0.5
+        return decay
+    
+    def _frequency_batch(self, memories: List[Dict[str, Any]]) -> np.ndarray:
+        counts = np.fromiter(
+            (m.get("access_count", 1) for m in memories), dtype=float, count=len(memories)
+        )
+        max_normalized = math.log(100 + 1, self.FREQUENCY_LOG_BASE)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            bonus = np.log(np.maximum(counts, 0) + 1) / math.log(self.FREQUENCY_LOG_BASE) / max_normalized
+        return np.where(counts > 0, np.minimum(bonus, 1.0), 0.0)
+    
+    def _relevance_batch(self, memories: List[Dict[str, Any]], query: str) -> np.ndarray:
+        contents = [m.get("content", "") for m in memories]
+        relevance = np.zeros(len(memories))
+        if not query:
+            return relevance
+        
+        if self.embedder:
+            try:
+                query_vec = self._query_vector(query)
+                matrix, has_vec = self._memory_matrix(memories, contents, query_vec.shape[0])
+                norms = np.linalg.norm(matrix, axis=1)
+                query_norm = np.linalg.norm(query_vec)
+                valid = has_vec & (norms > 0) & (query_norm > 0)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    cosine = (matrix @ query_vec) / (norms * query_norm)
+                relevance = np.where(valid, (cosine + 1) / 2, 0.0)
+                # Keyword fallback where no usable vector exists (as in score())
+                fallback = np.flatnonzero(~valid)
+            except Exception as e:
+                logger.debug(f"Batch embedding similarity failed: {e}")
+                fallback = range(len(memories))
+        else:
+            fallback = range(len(memories))
         
-        return scored
+        query_words = set(self._tokenize(query.lower()))
+        for i in fallback:
+            if contents[i]:
+                relevance[i] = self._keyword_overlap(self._content_words(contents[i].lower()), query_words)
+        return relevance
+    
+    def _query_vector(self, query: str) -> np.ndarray:
+        cached = self._query_vectors.get(query)
+        if cached is not None:
+            self._query_vectors.move_to_end(query)
+            return cached
+        encode = getattr(self.embedder, "encode_query", None) or self.embedder.encode
+        vector = np.asarray(encode(query), dtype=float)
+        self._query_vectors[query] = vector
+        while len(self._query_vectors) > QUERY_EMBEDDING_CACHE_SIZE:
+            self._query_vectors.popitem(last=False)
+        return vector
+    
+    def _memory_matrix(
+        self,
+        memories: List[Dict[str, Any]],
+        contents: List[str],
+        dim: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Stack memory vectors, batch-encoding only the ones without a stored embedding."""
+        vectors = [m.get("embedding") for m in memories]
+        missing = [
+            i for i, vector in enumerate(vectors)
+            if (vector is None or len(vector) != dim) and contents[i]
+        ]
+        if missing:
+            texts = [contents[i] for i in missing]
+            encode_batch = getattr(self.embedder, "encode_batch", None)
+            encoded = encode_batch(texts) if encode_batch else [self.embedder.encode(t) for t in texts]
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+        
+        has_vec = np.fromiter(
+            (vector is not None and len(vector) == dim for vector in vectors),
+            dtype=bool,
+            count=len(vectors)
+        )
+        zero = np.zeros(dim)
+        # One conversion for the whole batch instead of row-by-row assignment
+        matrix = np.array([v if ok else zero for v, ok in zip(vectors, has_vec)], dtype=float)
+        return matrix, has_vec
+    
+    def _goal_alignment_batch(self, memories: List[Dict[str, Any]], goals: List[str]) -> np.ndarray:
+        alignment = np.zeros(len(memories))
+        if not goals:
+            return alignment
+        goal_phrases = [g.lower() for g in goals]
+        goal_words = [set(self._tokenize(g)) for g in goal_phrases]
+        for i, memory in enumerate(memories):
+            content = memory.get("content", "")
+            if content:
+                alignment[i] = self._goal_alignment_tokens(content.lower(), goal_phrases, goal_words)
+        return alignment
+    
+    def _entity_overlap_batch(self, memories: List[Dict[str, Any]], current_entities: List[str]) -> np.ndarray:
+        current_set = {e.lower().strip() for e in current_entities}
+        if not current_set:
+            return np.zeros(len(memories))
+        return np.fromiter(
+            (
+                len(current_set.intersection([e.lower().strip() for e in m.get("entities") or ()]))
+                for m in memories
+            ),
+            dtype=float,
+            count=len(memories)
+        ) / len(current_set)
     
     def _recency_decay(
         self, 
@@ -216,15 +409,29 @@ class SalienceScorer:
         Recent memories get higher scores, with decay over time.
         Half-life: RECENCY_HALF_LIFE_HOURS
         """
+        age_hours = self._age_hours(timestamp, now)
+        if math.isnan(age_hours):
+            return 0.5  # Default for unknown/unparseable timestamps
+        
+        if age_hours < 0:
+            return 1.0  # Future timestamps get max score
+        
+        # Exponential decay: score = 2^(-age/half_life)
+        decay = math.pow(2, -age_hours / self.RECENCY_HALF_LIFE_HOURS)
+        return decay
+    
+    @staticmethod
+    def _age_hours(timestamp: Any, now: datetime) -> float:
+        """Age of a timestamp in hours, or NaN if it is missing or unparseable."""
         if timestamp is None:
-            return 0.5  # Default for unknown timestamps
+            return math.nan
         
         # Parse timestamp if string
         if isinstance(timestamp, str):
             try:
                 timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
             except ValueError:
-                return 0.5
+                return math.nan
         
         # Handle timezone-naive comparison
         if timestamp.tzinfo and not now.tzinfo:
@@ -233,17 +440,10 @@ class SalienceScorer:
             timestamp = timestamp.replace(tzinfo=now.tzinfo)
         
         try:
-            age_hours = (now - timestamp).total_seconds() / 3600
+            return (now - timestamp).total_seconds() / 3600
         except TypeError:
             # Fallback if datetime comparison fails
-            return 0.5
-        
-        if age_hours < 0:
-            return 1.0  # Future timestamps get max score
-        
-        # Exponential decay: score = 2^(-age/half_life)
-        decay = math.pow(2, -age_hours / self.RECENCY_HALF_LIFE_HOURS)
-        return decay
+            return math.nan
     
     def _frequency_bonus(self, access_count: int) -> float:
         """
@@ -277,16 +477,15 @@ class SalienceScorer:
         if self.embedder:
             try:
                 # Assuming embedder has encode() method returning vectors
-                content_vec = self.embedder.encode(content)
-                query_vec = self.embedder.encode(query)
+                content_vec = np.asarray(self.embedder.encode(content), dtype=float)
+                query_vec = self._query_vector(query)
                 
                 # Cosine similarity
-                dot_product = sum(a * b for a, b in zip(content_vec, query_vec))
-                norm_content = math.sqrt(sum(a * a for a in content_vec))
-                norm_query = math.sqrt(sum(b * b for b in query_vec))
+                norm_content = np.linalg.norm(content_vec)
+                norm_query = np.linalg.norm(query_vec)
                 
                 if norm_content > 0 and norm_query > 0:
-                    return (dot_product / (norm_content * norm_query) + 1) / 2
+                    return float((content_vec @ query_vec / (norm_content * norm_query) + 1) / 2)
             except Exception as e:
                 logger.debug(f"Embedding similarity failed: {e}")
         
@@ -300,9 +499,12 @@ class SalienceScorer:
         Simple but effective fallback when embeddings unavailable.
         """
         # Tokenize
-        content_words = set(self._tokenize(content.lower()))
+        content_words = self._content_words(content.lower())
         query_words = set(self._tokenize(query.lower()))
-        
+        return self._keyword_overlap(content_words, query_words)
+    
+    @staticmethod
+    def _keyword_overlap(content_words: set, query_words: set) -> float:
         if not content_words or not query_words:
             return 0.0
         
@@ -321,28 +523,20 @@ class SalienceScorer:
         # Weighted combination
         return 0.4 * jaccard + 0.6 * query_coverage
     
+    def _content_words(self, content_lower: str) -> frozenset:
+        """Keyword set for memory content; cached since the same memories are re-scored every turn."""
+        words = self._word_cache.get(content_lower)
+        if words is None:
+            words = frozenset(self._tokenize(content_lower))
+            self._word_cache[content_lower] = words
+            if len(self._word_cache) > CONTENT_WORDS_CACHE_SIZE:
+                self._word_cache.popitem(last=False)
+        return words
+    
     def _tokenize(self, text: str) -> List[str]:
         """Simple tokenization for keyword matching."""
-        # Remove punctuation and split
-        words = re.findall(r'\b\w+\b', text)
-        # Filter stopwords
-        stopwords = {
-            'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been',
-            'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
-            'would', 'could', 'should', 'may', 'might', 'must', 'can',
-            'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by', 'from',
-            'as', 'into', 'through', 'during', 'before', 'after',
-            'above', 'below', 'between', 'under', 'again', 'further',
-            'then', 'once', 'here', 'there', 'when', 'where', 'why',
-            'how', 'all', 'each', 'few', 'more', 'most', 'other',
-            'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same',
-            'so', 'than', 'too', 'very', 'just', 'and', 'but', 'if',
-            'or', 'because', 'until', 'while', 'about', 'against',
-            'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'you',
-            'your', 'he', 'him', 'his', 'she', 'her', 'it', 'its',
-            'they', 'them', 'their', 'what', 'which', 'who', 'whom'
-        }
-        return [w for w in words if w not in stopwords and len(w) > 1]
+        # Remove punctuation and split, filter stopwords
+        return [w for w in _WORD_RE.findall(text) if w not in _STOPWORDS and len(w) > 1]
     
     def _goal_alignment(self, content: str, goals: List[str]) -> float:
         """
@@ -353,22 +547,29 @@ class SalienceScorer:
         if not goals or not content:
             return 0.0
         
-        content_lower = content.lower()
+        goal_phrases = [g.lower() for g in goals]
+        goal_words = [set(self._tokenize(g)) for g in goal_phrases]
+        return self._goal_alignment_tokens(content.lower(), goal_phrases, goal_words)
+    
+    def _goal_alignment_tokens(
+        self,
+        content_lower: str,
+        goal_phrases: List[str],
+        goal_words: List[set]
+    ) -> float:
         max_alignment = 0.0
+        content_words = None
         
-        for goal in goals:
-            goal_lower = goal.lower()
-            
+        for goal_lower, words in zip(goal_phrases, goal_words):
             # Check direct substring match
             if goal_lower in content_lower:
                 return 1.0
             
             # Check keyword overlap
-            goal_words = set(self._tokenize(goal_lower))
-            content_words = set(self._tokenize(content_lower))
-            
-            if goal_words:
-                overlap = len(goal_words & content_words) / len(goal_words)
+            if words:
+                if content_words is None:
+                    content_words = self._content_words(content_lower)
+                overlap = len(words & content_words) / len(words)
                 max_alignment = max(max_alignment, overlap)
         
         return max_alignment
@@ -5,7 +5,7 @@ from .cor_layer import CORLayer
 from .audit import SecurityAudit
 from .audit_graph import GraphAuditTrail
 from .detectors.prompt_guard import PromptGuard
-from .detectors.data_guard import DataGuard
+from .detectors.data_guard import DataGuard, GuardedStream
 from .governance.rate_limiter import ToolRateLimiter
 from .governance.parameter_validator import ParameterValidator
 from .governance.rbac import RBACEnforcer
@@ -16,6 +16,7 @@ __all__ = [
     'GraphAuditTrail',
     'PromptGuard',
     'DataGuard',
+    'GuardedStream',
     'ToolRateLimiter',
     'ParameterValidator',
     'RBACEnforcer',
@@ -8,7 +8,7 @@ Phase 2: Rate Limiting, Parameter Validation, RBAC, Audit Trail
 """
 from typing import Dict, Any, Optional, Tuple
 from .detectors.prompt_guard import PromptGuard
-from .detectors.data_guard import DataGuard
+from .detectors.data_guard import DataGuard, GuardedStream
 from .audit import SecurityAudit
 from .governance.rate_limiter import ToolRateLimiter
 from .governance.parameter_validator import ParameterValidator
@@ -79,12 +79,15 @@ class CORLayer:
 
     def sanitize_output(self, response: str, user_id: Optional[int] = None) -> str:
         """Sanitize outgoing agent response for PII."""
-        # 1. Check for massive leaks first
-        if self.data_guard.scan_for_leaks(response):
-             return "[SECURITY_BLOCK] Response blocked due to potential data leakage (massive PII dump detected)."
+        # Leak check and redaction share one scan
+        is_leak, sanitized = self.data_guard.guard_output(response, user_id)
+        if is_leak:
+            return self.data_guard.BLOCK_MESSAGE
+        return sanitized
 
-        # 2. Redact specific PII
-        return self.data_guard.sanitize_output(response, user_id)
+    def open_output_stream(self, user_id: Optional[int] = None) -> GuardedStream:
+        """Sanitize an outgoing response that is streamed chunk by chunk."""
+        return self.data_guard.stream(user_id)
 
     # =========================================================================
     # Phase 2: Tool Governance
@@ -2,6 +2,7 @@
 Detectors submodule for security
 """
 from .prompt_guard import PromptGuard
-from .data_guard import DataGuard
+from .data_guard import DataGuard, GuardedStream
+from .redaction import RedactionEngine, RedactionRule, StreamRedactor
 
-__all__ = ['PromptGuard', 'DataGuard']
+__all__ = ['PromptGuard', 'DataGuard', 'GuardedStream', 'RedactionEngine', 'RedactionRule', 'StreamRedactor']
@@ -4,9 +4,9 @@ Data Guard: PII Redaction & Leakage Prevention
 Responsible for scanning outputs for Sensitive Personal Information (PII)
 and redacting it before it reaches the user or logs.
 """
-import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from ..audit import SecurityAudit
+from .redaction import RedactionEngine, RedactionRule, StreamRedactor
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -15,20 +15,68 @@ class DataGuard:
     """
     Guards against data leakage (PII, Credentials).
     Uses regex patterns to identify and redact sensitive data.
+
+    All patterns are compiled into one RedactionEngine, so redaction and the
+    leak-density check share a single scan, on complete responses
+    (sanitize_output/guard_output) as well as on token streams (stream).
     """
     
     # Common PII Patterns
     PATTERNS = {
         'EMAIL': r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+',
-        'PHONE_US': r'(\+?1[-.]?)?\(?\d{3}\)?[-.]?\d{3}[-.]?\d{4}',
+        'PHONE_US': r'(?:\+?1[-.]?)?\(?\d{3}\)?[-.]?\d{3}[-.]?\d{4}',
         'CREDIT_CARD': r'\b(?:\d[ -]*?){13,16}\b',
         'SSN': r'\b\d{3}-\d{2}-\d{4}\b',
-        'API_KEY_SK': r'sk-[a-zA-Z0-9]{20,}',  # Common OpenAI/Stripe style
+        'API_KEY_SK': r'sk-(?:proj-)?[a-zA-Z0-9]{20,}',  # Common OpenAI/Stripe style
         'API_KEY_GEN': r'[A-Za-z0-9+/]{40,}',    # Generic high-entropy strings (heuristic)
     }
+
+    # Suffixes that may still grow into a match (what a stream must hold back)
+    TAILS = {
+        'EMAIL': r'[a-zA-Z0-9_.+-]+(?:@[a-zA-Z0-9.-]*)?',
+        'PHONE_US': r'[+(\d][\d().+-]*',
+        'CREDIT_CARD': r'\d[\d -]*',
+        'SSN': r'\d[\d-]*',
+        'API_KEY_SK': r'sk-[a-zA-Z0-9-]*|sk?',
+    }
+
+    # Leak heuristic: long output with a high density of email addresses
+    LEAK_MIN_CHARS = 5000
+    LEAK_MAX_EMAILS = 10
+    BLOCK_MESSAGE = "[SECURITY_BLOCK] Response blocked due to potential data leakage (massive PII dump detected)."
     
     def __init__(self, config: Dict[str, Any] = None):
         self.config = config or {}
+        self.engine = RedactionEngine(self._build_rules(self._mode() == 'paranoid'))
+
+    def _mode(self) -> Optional[str]:
+        # Handle both dict and Config object types
+        if isinstance(self.config, dict):
+            return self.config.get('mode')
+        return getattr(self.config, 'mode', None)
+
+    def _build_rules(self, paranoid: bool) -> List[RedactionRule]:
+        """
+        Rules in precedence order.
+
+        Credit cards, SSNs and API keys are always redacted. Email/phone are
+        often needed for agents, so in user output they are only redacted in
+        "paranoid" mode; emails are still counted for leak detection (without
+        consuming text, so a card inside an address is still redacted).
+        """
+        def rule(name, replacement, prefilter, lead):
+            return RedactionRule(name, self.PATTERNS[name], replacement, prefilter, lead, self.TAILS[name])
+
+        rules = [
+            rule('CREDIT_CARD', '[REDACTED_CC]', r'\d', r'\d'),
+            rule('SSN', '[REDACTED_SSN]', r'\d', r'\d'),
+            rule('API_KEY_SK', '[REDACTED_KEY]', 'sk-', 'sk-'),
+            # Tried once per word that contains an "@", not at every character
+            rule('EMAIL', '[REDACTED_EMAIL]' if paranoid else None, '@', r'(?<![a-zA-Z0-9_.+-])[a-zA-Z0-9_.+-]+@'),
+        ]
+        if paranoid:
+            rules.append(rule('PHONE_US', '[REDACTED_PHONE]', r'\d', r'[+(\d]'))
+        return rules
 
     def sanitize_output(self, text: str, user_id: Optional[int] = None) -> str:
         """
@@ -43,45 +91,26 @@ class DataGuard:
         """
         if not text:
             return ""
-            
-        sanitized = text
-        total_redacted = 0
-        
-        # 1. Credit Card Redaction (Critical)
-        sanitized, count = re.subn(self.PATTERNS['CREDIT_CARD'], '[REDACTED_CC]', sanitized)
-        total_redacted += count
-        
-        # 2. SSN Redaction (Critical)
-        sanitized, count = re.subn(self.PATTERNS['SSN'], '[REDACTED_SSN]', sanitized)
-        total_redacted += count
-        
-        # 3. API Key Redaction (Critical)
-        sanitized, count = re.subn(self.PATTERNS['API_KEY_SK'], '[REDACTED_KEY]', sanitized)
-        total_redacted += count
-        
-        # 4. Email/Phone (Context Dependent - often needed for agents, so we might NOT redact these for USER output)
-        # However, for LOGGING, we definitely should.
-        # Current policy: Allow Email/Phone in user output (functionality), redact in Logs.
-        # This wrapper is for USER output, so we skip email/phone redaction here 
-        # unless strictly configured to "paranoid" mode.
-        # Handle both dict and Config object types
-        mode = None
-        if isinstance(self.config, dict):
-            mode = self.config.get('mode')
-        else:
-            mode = getattr(self.config, 'mode', None)
-        
-        if mode == 'paranoid':
-             sanitized, count = re.subn(self.PATTERNS['EMAIL'], '[REDACTED_EMAIL]', sanitized)
-             total_redacted += count
-             sanitized, count = re.subn(self.PATTERNS['PHONE_US'], '[REDACTED_PHONE]', sanitized)
-             total_redacted += count
-
-        if total_redacted > 0:
-            SecurityAudit.log_leak_prevention("pii_redaction", total_redacted, user_id)
-            logger.info(f"Redacted {total_redacted} sensitive items from output")
-            
-        return sanitized
+
+        result = self.engine.redact(text)
+        self._log_redactions(result.redacted, user_id)
+        return result.text
+
+    def guard_output(self, text: str, user_id: Optional[int] = None) -> Tuple[bool, str]:
+        """
+        Leak check and redaction in one pass.
+
+        Returns:
+            (is_leak, sanitized_text); the text is left unredacted when a leak is found
+        """
+        if not text:
+            return False, ""
+
+        result = self.engine.redact(text)
+        if self.is_leak(len(text), result.counts.get('EMAIL', 0)):
+            return True, text
+        self._log_redactions(result.redacted, user_id)
+        return False, result.text
 
     def scan_for_leaks(self, text: str) -> bool:
         """
@@ -89,13 +118,66 @@ class DataGuard:
         Returns True if a leak is suspected.
         """
         # Heuristic: If output is huge and contains many JSON-like structures or excessive specific patterns
-        if len(text) > 5000:
-            # Check for high density of email addresses (e.g. contact dump)
-            emails = re.findall(self.PATTERNS['EMAIL'], text)
-            if len(emails) > 10:
-                # BLOCK massive data dumps
-                logger.error(f"SECURITY BLOCK: Possible data dump detected. Found {len(emails)} emails in output.")
-                SecurityAudit.log_leak_prevention("massive_data_dump", len(emails), None)
-                return True
-                
+        if not text or len(text) <= self.LEAK_MIN_CHARS:
+            return False
+        return self.is_leak(len(text), self.engine.redact(text).counts.get('EMAIL', 0))
+
+    def is_leak(self, total_chars: int, email_count: int) -> bool:
+        """Apply the leak heuristic to counts gathered during redaction."""
+        if total_chars > self.LEAK_MIN_CHARS and email_count > self.LEAK_MAX_EMAILS:
+            # BLOCK massive data dumps
+            logger.error(f"SECURITY BLOCK: Possible data dump detected. Found {email_count} emails in output.")
+            SecurityAudit.log_leak_prevention("massive_data_dump", email_count, None)
+            return True
         return False
+
+    def stream(self, user_id: Optional[int] = None) -> 'GuardedStream':
+        """Redactor for output produced chunk by chunk (e.g. LLM tokens)."""
+        return GuardedStream(self, user_id)
+
+    def _log_redactions(self, count: int, user_id: Optional[int]):
+        if count > 0:
+            SecurityAudit.log_leak_prevention("pii_redaction", count, user_id)
+            logger.info(f"Redacted {count} sensitive items from output")
+
+
+class GuardedStream:
+    """
+    Streaming counterpart of CORLayer.sanitize_output.
+
+    feed() returns redacted text as soon as it can no longer be part of a
+    match; close() flushes the rest. Once the leak heuristic trips, the
+    block message is returned once and all further output is dropped (text
+    emitted before that point has already left).
+
+    Example:
+        stream = data_guard.stream(user_id)
+        for token in tokens:
+            emit(stream.feed(token))
+        emit(stream.close())
+    """
+
+    def __init__(self, guard: DataGuard, user_id: Optional[int] = None):
+        self.guard = guard
+        self.user_id = user_id
+        self.redactor: StreamRedactor = guard.engine.stream()
+        self.blocked = False
+
+    def feed(self, chunk: str) -> str:
+        if self.blocked:
+            return ""
+        return self._checked(self.redactor.feed(chunk))
+
+    def close(self) -> str:
+        if self.blocked:
+            return ""
+        output = self._checked(self.redactor.close())
+        if not self.blocked:
+            self.guard._log_redactions(self.redactor.redacted, self.user_id)
+        return output
+
+    def _checked(self, output: str) -> str:
+        if self.guard.is_leak(self.redactor.total_chars, self.redactor.counts.get('EMAIL', 0)):
+            self.blocked = True
+            return self.guard.BLOCK_MESSAGE
+        return output
@@ -0,0 +1,228 @@
+"""
+Redaction Engine: single-pass, streaming PII redaction
+
+All redaction rules are compiled into one alternation of named groups, so a
+text is scanned once however many rules are active. Each rule has a cheap
+literal prefilter (a digit, "@", "sk-"); rules whose prefilter does not
+occur are left out of the scan, and text that hits none is not scanned.
+Within the scan, a lookahead on the rules' leading characters skips
+positions where no match can start.
+
+StreamRedactor applies the engine to a token stream. After each chunk it
+emits everything except the shortest suffix that could still grow into a
+redactable match (e.g. a trailing run of digits, or "sk-" and what follows).
+Rules that only count matches (email addresses for leak detection) never
+hold output back; their matches are counted in the same pass, as zero-width
+lookaheads, so they never consume text a redacting rule would match.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@dataclass(frozen=True)
+class RedactionRule:
+    """
+    One pattern the engine looks for.
+
+    Attributes:
+        name: Rule name (used as the regex group name and in counts)
+        pattern: Regex for a complete match (no named groups)
+        replacement: Text substituted for a match; None counts without redacting
+        prefilter: Regex that any text containing a match must contain
+        lead: Regex that must match where a match starts (checked before the rule is tried)
+        tail: Regex matching every suffix of the text that may be the start
+              of a match still being written (a superset is fine)
+    """
+    name: str
+    pattern: str
+    replacement: Optional[str]
+    prefilter: str
+    lead: str
+    tail: str
+
+
+@dataclass
+class RedactionResult:
+    """Redacted text, per-rule match counts and the number of replacements."""
+    text: str
+    counts: Dict[str, int] = field(default_factory=dict)
+    redacted: int = 0
+
+
+class RedactionEngine:
+    """
+    Compiled multi-rule scanner.
+
+    Rules earlier in the list win when several could match at the same
+    position; redacting rules always win over counting ones.
+
+    Example:
+        engine = RedactionEngine([ssn_rule, email_rule])
+        engine.redact("SSN 123-45-6789").text  # "SSN [REDACTED_SSN]"
+    """
+
+    def __init__(self, rules: Sequence[RedactionRule]):
+        self.rules = {rule.name: rule for rule in rules}
+        self._prefilters = [(rule.name, re.compile(rule.prefilter)) for rule in rules]
+        self._prefilter = re.compile("|".join(f"(?:{r.prefilter})" for r in rules))
+        self._scanners: Dict[Tuple[str, ...], re.Pattern] = {}
+
+        redacting = [r.tail for r in rules if r.replacement is not None]
+        counting = [r.tail for r in rules if r.replacement is None]
+        self._redact_tail = re.compile(f"(?:{'|'.join(redacting)})\\Z") if redacting else None
+        self._count_tail = re.compile(f"(?:{'|'.join(counting)})\\Z") if counting else None
+
+    def may_match(self, text: str) -> bool:
+        """Cheap check: False means the text contains no match of any rule."""
+        return self._prefilter.search(text) is not None
+
+    def _scanner(self, names: Tuple[str, ...]) -> re.Pattern:
+        """Combined pattern for the rules whose prefilter hit (compiled once per set)."""
+        scanner = self._scanners.get(names)
+        if scanner is None:
+            # The leading lookahead lets the engine skip positions where no rule can start
+            leads = "|".join(self.rules[name].lead for name in names)
+            rules = [self.rules[name] for name in names]
+            branches = [f"(?P<{r.name}>{r.pattern})" for r in rules if r.replacement is not None]
+            # Counting rules match zero-width, and only where their own lead
+            # does, so the scan goes on through (and redacts inside) their match
+            branches += [
+                f"(?=(?:{r.lead}))(?=(?P<{r.name}>{r.pattern}))"
+                for r in rules if r.replacement is None
+            ]
+            scanner = re.compile(f"(?=(?:{leads}))(?:{'|'.join(branches)})")
+            self._scanners[names] = scanner
+        return scanner
+
+    def matches(self, text: str, pos: int = 0) -> List[re.Match]:
+        """All non-overlapping matches from pos (text before pos is lookbehind context)."""
+        active = tuple(name for name, prefilter in self._prefilters if prefilter.search(text, pos))
+        if not active:
+            return []
+        return list(self._scanner(active).finditer(text, pos))
+
+    def tail_start(self, text: str, counting: bool = False) -> int:
+        """Start of the longest suffix that could still become a match."""
+        tail = self._count_tail if counting else self._redact_tail
+        if tail is None:
+            return len(text)
+        found = tail.search(text)
+        return found.start() if found else len(text)
+
+    def replacement(self, match: re.Match) -> Optional[str]:
+        return self.rules[match.lastgroup].replacement
+
+    def redact(self, text: str) -> RedactionResult:
+        """Redact a complete text in one pass."""
+        counts: Dict[str, int] = {}
+        parts = []
+        last = 0
+        redacted = 0
+        for match in self.matches(text):
+            counts[match.lastgroup] = counts.get(match.lastgroup, 0) + 1
+            replacement = self.replacement(match)
+            if replacement is not None:
+                parts.append(text[last:match.start()])
+                parts.append(replacement)
+                last = match.end()
+                redacted += 1
+        if not redacted:
+            return RedactionResult(text, counts)
+        parts.append(text[last:])
+        return RedactionResult("".join(parts), counts, redacted)
+
+    def stream(self) -> 'StreamRedactor':
+        return StreamRedactor(self)
+
+
+class StreamRedactor:
+    """
+    Incremental redaction over a stream of chunks.
+
+    feed() returns the text that is safe to emit now; close() returns the
+    rest. Joined together they equal engine.redact() of the whole stream.
+
+    Example:
+        redactor = engine.stream()
+        for chunk in tokens:
+            send(redactor.feed(chunk))
+        send(redactor.close())
+    """
+
+    def __init__(self, engine: RedactionEngine):
+        self.engine = engine
+        self.counts: Dict[str, int] = {}
+        self.redacted = 0
+        self.total_chars = 0
+        self._buf = ""      # Text not yet fully scanned
+        self._emitted = 0   # Leading chars of _buf already emitted
+        self._prev = ""     # Char before _buf (lookbehind context for \b)
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk; return the redacted text that can be emitted now."""
+        if not chunk:
+            return ""
+        self.total_chars += len(chunk)
+        self._buf += chunk
+        return self._advance(final=False)
+
+    def close(self) -> str:
+        """End of stream: return everything still held back, redacted."""
+        return self._advance(final=True)
+
+    def _advance(self, final: bool) -> str:
+        buf = self._buf
+        text = self._prev + buf
+        offset = len(self._prev)
+        matches = [
+            (m.start() - offset, m.end() - offset, m)
+            for m in self.engine.matches(text, offset)
+        ]
+
+        if final:
+            scan_cut = emit_cut = len(buf)
+        else:
+            # Hold back what could still grow into a match: for redacting rules
+            # the output itself, for counting rules only the scan position
+            redact_tail = self.engine.tail_start(buf)
+            scan_tail = min(redact_tail, self.engine.tail_start(buf, counting=True))
+            scan_cut, emit_cut = scan_tail, redact_tail
+            # A match reaching into the tail (or the end) may still change
+            for start, end, match in matches:
+                if end > scan_tail or end == len(buf):
+                    scan_cut = min(scan_cut, start)
+                if self.engine.replacement(match) is not None and (end > redact_tail or end == len(buf)):
+                    emit_cut = min(emit_cut, start)
+            emit_cut = max(emit_cut, scan_cut)
+
+        parts = []
+        pos = self._emitted
+        for start, end, match in matches:
+            if end > emit_cut:
+                break
+            # Matches between scan_cut and emit_cut are rescanned (and counted) next time
+            if end <= scan_cut and start < scan_cut:
+                self.counts[match.lastgroup] = self.counts.get(match.lastgroup, 0) + 1
+            replacement = self.engine.replacement(match)
+            if replacement is None or end <= self._emitted:
+                continue
+            if start < self._emitted:
+                logger.warning(f"[Redaction] {match.lastgroup} match overlaps emitted text; redacting the rest")
+                start = self._emitted
+            parts.append(buf[pos:start])
+            parts.append(replacement)
+            pos = end
+            self.redacted += 1
+        if emit_cut > pos:
+            parts.append(buf[pos:emit_cut])
+
+        if scan_cut > 0:
+            self._prev = buf[scan_cut - 1]
+        self._buf = buf[scan_cut:]
+        self._emitted = max(emit_cut - scan_cut, 0)
+        return "".join(parts)
@@ -5,7 +5,8 @@ Active Services:
 - RAGService: High-level RAG service with caching and LLM enhancement
 - UnifiedIndexerService: Central orchestration for all background indexers
 - ProfileUpdateService: Background profile update service
-- ProfileCache: LRU cache for user writing profiles
+- ProfileCache: Cache for user writing profiles
+- UserDataCache: Two-tier (per-process + Redis) cache for sessions, users, integrations and settings
 - ContactResolver: Resolve contact information across sources
 - ContextService: Context assembly for agent queries
 - GraphSearchService: Graph-based search across user data
@@ -32,6 +33,7 @@ from .profile_service import (
     stop_profile_service,
 )
 from .profile_cache import ProfileCache, get_profile_cache
+from .user_cache import UserDataCache, get_user_cache
 from .config_manager import ConfigManager, get_config_manager, configure_service_from_manager
 from .factory import ServiceFactory, create_service_factory
 from .contact_resolver import ContactResolver
@@ -54,6 +56,8 @@ __all__ = [
     "stop_profile_service",
     "ProfileCache",
     "get_profile_cache",
+    "UserDataCache",
+    "get_user_cache",
     # Service Management
     "ConfigManager",
     "get_config_manager",
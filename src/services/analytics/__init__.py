@@ -9,10 +9,16 @@ from .memory_analytics import (
     get_memory_analytics,
     init_memory_analytics
 )
+from .activity_rollups import (
+    ActivityRollupStore,
+    get_activity_rollups
+)
 
 __all__ = [
     "MemoryGraphAnalytics",
     "AnalyticsMetric",
     "get_memory_analytics",
-    "init_memory_analytics"
+    "init_memory_analytics",
+    "ActivityRollupStore",
+    "get_activity_rollups"
 ]
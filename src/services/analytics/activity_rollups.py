@@ -0,0 +1,474 @@
+"""
+Activity Rollups
+
+Per-user activity counters maintained incrementally at index time, so
+temporal analytics read a handful of pre-aggregated rows instead of scanning
+every content node or TimeBlock edge in the database.
+
+Each indexed activity (email, message, calendar event) increments one counter
+per granularity and dimension:
+
+- granularity: hour ("2026-03-02T14"), day ("2026-03-02"), week ("2026-W10")
+- dimension: source (gmail, slack, google_calendar, ...) or contact
+
+Contacts are keyed by a per-user blind token; the readable address is stored
+encrypted on first insert, like other sensitive graph properties.
+
+Indexers re-process items on re-sync, so each node is counted once: a marker
+keyed on (user, node id, activity day) is written with the counters, and
+nodes whose marker already exists are skipped. Markers expire (TTL index)
+ROLLUP_SEEN_RETENTION_DAYS after their activity day; older activity is not
+counted, since without its marker a re-synced node would be counted again.
+
+Each user's rollup version (bumped on every write) is kept in Redis so
+report caches in the API process see writes made by Celery indexers.
+
+Backends:
+- ArangoDB: ``ActivityRollup`` collection, one batched UPSERT per sync cycle
+  and a persistent (user_id, granularity, dimension, bucket) index for reads
+- NetworkX / no graph: in-process counters with the same API
+
+Data indexed before rollups existed is counted by the one-off
+``backfill_activity_rollups`` Celery task, queued when the collection is
+first created. It goes through the same markers, so it only adds nodes the
+indexers haven't counted and can run alongside them.
+"""
+import asyncio
+import hashlib
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.services.indexing.graph.manager import GraphBackend
+from src.services.indexing.graph.text_search import blind_token, search_enabled, user_id_values
+from src.utils.encryption import encrypt_token, decrypt_token
+from src.utils.logger import setup_logger
+from src.utils.urls import URLs
+
+logger = setup_logger(__name__)
+
+ROLLUP_COLLECTION = "ActivityRollup"
+ROLLUP_SEEN_COLLECTION = "ActivityRollupSeen"  # Nodes already counted
+ROLLUP_VERSION_KEY = "activity_rollups:version:{user_id}"
+ROLLUP_SEEN_RETENTION_DAYS = 90
+ROLLUP_BACKFILL_BATCH_SIZE = 1000
+_REDIS_RETRY_SECONDS = 60
+ROLLUP_GRANULARITIES = ("hour", "day", "week")
+ROLLUP_DIMENSIONS = ("source", "contact")
+
+# Node types counted as user activity (matches the temporal report's sources)
+ACTIVITY_NODE_TYPES = frozenset({"Email", "Message", "CalendarEvent"})
+
+# First property present wins
+TIMESTAMP_PROPERTIES = ("timestamp", "start_time", "date", "created_at")
+CONTACT_PROPERTIES = ("sender_email", "organizer_email", "author_email", "organizer", "sender", "author", "user")
+
+_BUCKET_FORMATS = {"hour": "%Y-%m-%dT%H", "day": "%Y-%m-%d"}
+
+
+def bucket_for(timestamp: datetime, granularity: str) -> str:
+    """Bucket label for a UTC timestamp (labels sort chronologically)."""
+    if granularity == "week":
+        year, week, _ = timestamp.isocalendar()
+        return f"{year}-W{week:02d}"
+    return timestamp.strftime(_BUCKET_FORMATS[granularity])
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse an ISO string or datetime into a naive UTC datetime."""
+    if isinstance(value, datetime):
+        ts = value
+    elif isinstance(value, str) and value:
+        try:
+            ts = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def activity_from_node(node: Any) -> Optional[Tuple[datetime, str, Optional[str]]]:
+    """
+    Extract (timestamp, source, contact) from a ParsedNode or node dict.
+
+    Returns None for nodes that are not user activity or carry no timestamp.
+    """
+    node_type = getattr(node, 'node_type', None) or (node.get('node_type') if isinstance(node, dict) else None)
+    node_type = getattr(node_type, 'value', node_type)
+    if node_type not in ACTIVITY_NODE_TYPES:
+        return None
+
+    props = getattr(node, 'properties', None)
+    if props is None and isinstance(node, dict):
+        props = node
+    props = props or {}
+
+    timestamp = None
+    for key in TIMESTAMP_PROPERTIES:
+        timestamp = parse_timestamp(props.get(key))
+        if timestamp:
+            break
+    if not timestamp:
+        return None
+
+    contact = None
+    for key in CONTACT_PROPERTIES:
+        value = props.get(key)
+        if isinstance(value, str) and value.strip() and not value.startswith("ENC:"):
+            contact = value.strip().lower()
+            break
+
+    return timestamp, str(props.get('source') or node_type).lower(), contact
+
+
+def node_id_of(node: Any) -> Optional[str]:
+    """Identifier of a ParsedNode or node dict, if it has one."""
+    node_id = getattr(node, 'node_id', None)
+    if node_id is None and isinstance(node, dict):
+        node_id = node.get('id') or node.get('_key')
+    return str(node_id) if node_id else None
+
+
+class ActivityRollupStore:
+    """
+    Incrementally maintained per-user activity counters.
+
+    ``record_nodes`` is called once per indexer sync cycle; reads only touch the
+    requesting user's rows, so their cost doesn't grow with the number of
+    tenants or the size of the graph.
+    """
+
+    def __init__(self, graph_manager: Optional[Any] = None, redis_url: Optional[str] = None):
+        self.graph_manager = graph_manager
+        self.redis_url = redis_url or URLs.REDIS
+        self._client = None
+        self._retry_at = 0.0
+        # In-memory rows when ArangoDB isn't the backend: key -> row
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        # In-memory markers of counted nodes when ArangoDB isn't the backend: key -> expiry
+        self._seen: Dict[str, float] = {}
+        self._seen_pruned_at = 0.0
+        # Bumped on every write; lets readers key caches on freshness.
+        # Fallback for when Redis (shared across processes) is unavailable.
+        self._versions: Counter = Counter()
+        self._collection_ready = False
+
+    @property
+    def _use_arango(self) -> bool:
+        return getattr(self.graph_manager, 'backend_type', None) == GraphBackend.ARANGODB
+
+    def _redis(self):
+        if self._client is None and time.time() >= self._retry_at:
+            try:
+                import redis
+                client = redis.from_url(self.redis_url, decode_responses=True, socket_timeout=1)
+                client.ping()
+                self._client = client
+            except Exception as e:
+                logger.warning(f"[ActivityRollups] Redis unavailable, rollup versions are per-process: {e}")
+                self._retry_at = time.time() + _REDIS_RETRY_SECONDS
+        return self._client
+
+    async def version(self, user_id: Any) -> int:
+        """Write counter for a user (changes whenever their rollups change, in any process)."""
+        return await asyncio.to_thread(self._read_version, user_id)
+
+    def _read_version(self, user_id: Any) -> int:
+        client = self._redis()
+        if client is not None:
+            try:
+                return int(client.get(ROLLUP_VERSION_KEY.format(user_id=user_id)) or 0)
+            except Exception as e:
+                logger.debug(f"[ActivityRollups] Version read failed: {e}")
+        return self._versions[str(user_id)]
+
+    def _bump_shared_version(self, user_id: Any) -> None:
+        client = self._redis()
+        if client is not None:
+            try:
+                client.incr(ROLLUP_VERSION_KEY.format(user_id=user_id))
+            except Exception as e:
+                logger.debug(f"[ActivityRollups] Version bump failed: {e}")
+
+    async def record_nodes(self, user_id: Any, nodes: Iterable[Any]) -> int:
+        """
+        Count indexed nodes into the user's rollups, once per node.
+
+        Nodes already counted (re-synced items) are skipped, as are nodes
+        whose activity is older than the marker retention; nodes without an
+        id can't be deduplicated and are always counted.
+
+        Returns:
+            Number of activities recorded
+        """
+        events = []
+        markers: Dict[str, Dict[str, Any]] = {}
+        now = time.time()
+        for node in nodes:
+            event = activity_from_node(node)
+            if not event:
+                continue
+            node_id = node_id_of(node)
+            if node_id is None:
+                events.append(event)
+                continue
+            day = event[0].replace(hour=0, minute=0, second=0, microsecond=0)
+            expires_at = day.replace(tzinfo=timezone.utc).timestamp() + ROLLUP_SEEN_RETENTION_DAYS * 86400
+            if expires_at <= now:
+                continue
+            key = self._key(user_id, "seen", bucket_for(day, "day"), "node", node_id)
+            if key not in markers:
+                markers[key] = {"_key": key, "user_id": user_id, "expires_at": expires_at, "event": event}
+
+        if markers:
+            fresh = await self._mark_seen(markers)
+            events.extend(markers[key]["event"] for key in fresh)
+        return await self.record(user_id, events)
+
+    async def _mark_seen(self, markers: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Write markers for counted nodes; returns the keys that were new."""
+        if not self._use_arango:
+            self._prune_seen()
+            fresh = [key for key in markers if key not in self._seen]
+            for key in fresh:
+                self._seen[key] = markers[key]["expires_at"]
+            return fresh
+        await self._ensure_collection()
+        rows = [
+            {"_key": key, "user_id": m["user_id"], "expires_at": m["expires_at"]}
+            for key, m in markers.items()
+        ]
+        # OLD is null only for the writer that inserted the marker, so
+        # concurrent cycles re-processing a node count it once between them
+        results = await self.graph_manager.execute_query(f"""
+        FOR m IN @markers
+            UPSERT {{ _key: m._key }}
+            INSERT m
+            UPDATE {{}}
+            IN {ROLLUP_SEEN_COLLECTION}
+            RETURN {{ key: NEW._key, fresh: OLD == null }}
+        """, {'markers': rows})
+        return [r["key"] for r in results or [] if r.get("fresh")]
+
+    def _prune_seen(self) -> None:
+        """Drop expired in-memory markers (at most hourly; ArangoDB uses a TTL index)."""
+        now = time.time()
+        if now - self._seen_pruned_at < 3600:
+            return
+        self._seen_pruned_at = now
+        for key in [k for k, expires_at in self._seen.items() if expires_at <= now]:
+            del self._seen[key]
+
+    async def record(self, user_id: Any, events: Iterable[Tuple[datetime, str, Optional[str]]]) -> int:
+        """Count (timestamp, source, contact) activities into the user's rollups (no deduplication)."""
+        deltas: Dict[str, Dict[str, Any]] = {}
+        recorded = 0
+        # Contacts are keyed by blind token; without a search key only sources are counted
+        count_contacts = search_enabled()
+        for timestamp, source, contact in events:
+            recorded += 1
+            values = [("source", source, None)]
+            if contact and count_contacts:
+                values.append(("contact", blind_token(user_id, contact), contact))
+            for granularity in ROLLUP_GRANULARITIES:
+                bucket = bucket_for(timestamp, granularity)
+                for dimension, value, label in values:
+                    key = self._key(user_id, granularity, bucket, dimension, value)
+                    row = deltas.get(key)
+                    if row is None:
+                        row = deltas[key] = {
+                            "user_id": user_id,
+                            "granularity": granularity,
+                            "bucket": bucket,
+                            "dimension": dimension,
+                            "value": value,
+                            "label": label,
+                            "count": 0,
+                            "last_at": "",
+                        }
+                    row["count"] += 1
+                    row["last_at"] = max(row["last_at"], timestamp.isoformat())
+
+        if not deltas:
+            return 0
+
+        try:
+            if self._use_arango:
+                await self._upsert_arangodb(deltas)
+            else:
+                self._upsert_memory(deltas)
+            self._versions[str(user_id)] += 1
+            await asyncio.to_thread(self._bump_shared_version, user_id)
+        except Exception as e:
+            logger.error(f"[ActivityRollups] Failed to record {recorded} activities for user {user_id}: {e}")
+            return 0
+        return recorded
+
+    async def get_buckets(
+        self,
+        user_id: Any,
+        granularity: str,
+        dimension: str,
+        since: datetime,
+    ) -> List[Dict[str, Any]]:
+        """
+        Read a user's counters from ``since`` onwards.
+
+        Returns:
+            Rows with bucket, value, label (decrypted contact, if any),
+            count and last_at
+        """
+        since_bucket = bucket_for(since, granularity)
+        if self._use_arango:
+            await self._ensure_collection()
+            rows = await self.graph_manager.execute_query(f"""
+            FOR r IN {ROLLUP_COLLECTION}
+                FILTER r.user_id IN @user_ids
+                   AND r.granularity == @granularity
+                   AND r.dimension == @dimension
+                   AND r.bucket >= @since
+                RETURN KEEP(r, 'bucket', 'value', 'label', 'count', 'last_at')
+            """, {
+                'user_ids': user_id_values(user_id),
+                'granularity': granularity,
+                'dimension': dimension,
+                'since': since_bucket,
+            })
+        else:
+            owner = str(user_id)
+            rows = [
+                dict(r) for r in self._rows.values()
+                if str(r["user_id"]) == owner and r["granularity"] == granularity
+                and r["dimension"] == dimension and r["bucket"] >= since_bucket
+            ]
+
+        for row in rows or []:
+            if row.get("label"):
+                try:
+                    row["label"] = decrypt_token(row["label"])
+                except Exception:
+                    row["label"] = None
+        return rows or []
+
+    async def backfill(
+        self,
+        user_id: Any,
+        days: int = ROLLUP_SEEN_RETENTION_DAYS,
+        batch_size: int = ROLLUP_BACKFILL_BATCH_SIZE,
+    ) -> int:
+        """
+        Count a user's indexed content from the last ``days`` into their rollups (ArangoDB only).
+
+        Used once for data indexed before rollups existed (see the
+        backfill_activity_rollups task); reads only the user's own documents,
+        a page at a time. Nodes go through the same markers as live indexing,
+        so ones already counted are skipped and existing rows are never reset.
+
+        Returns:
+            Number of activities recorded
+        """
+        if not self._use_arango:
+            return 0
+        since = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        recorded = 0
+        for collection in sorted(ACTIVITY_NODE_TYPES):
+            after = ""
+            while True:
+                docs = await self.graph_manager.execute_query(f"""
+                FOR d IN {collection}
+                    FILTER d.user_id IN @user_ids AND d.timestamp >= @since AND d._key > @after
+                    SORT d._key
+                    LIMIT @batch
+                    RETURN d
+                """, {'user_ids': user_id_values(user_id), 'since': since, 'after': after, 'batch': batch_size})
+                if not docs:
+                    break
+                recorded += await self.record_nodes(user_id, docs)
+                if len(docs) < batch_size:
+                    break
+                after = docs[-1]["_key"]
+        return recorded
+
+    @staticmethod
+    def _key(user_id: Any, granularity: str, bucket: str, dimension: str, value: str) -> str:
+        raw = f"{user_id}|{granularity}|{bucket}|{dimension}|{value}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _upsert_memory(self, deltas: Dict[str, Dict[str, Any]]) -> None:
+        for key, delta in deltas.items():
+            row = self._rows.get(key)
+            if row is None:
+                row = self._rows[key] = {**delta, "count": 0, "last_at": "", "label": self._encrypt_label(delta["label"])}
+            row["count"] += delta["count"]
+            row["last_at"] = max(row["last_at"], delta["last_at"])
+
+    async def _upsert_arangodb(self, deltas: Dict[str, Dict[str, Any]]) -> None:
+        await self._ensure_collection()
+        rows = [
+            {**delta, "_key": key, "label": self._encrypt_label(delta["label"])}
+            for key, delta in deltas.items()
+        ]
+        await self.graph_manager.execute_query(f"""
+        FOR r IN @rows
+            UPSERT {{ _key: r._key }}
+            INSERT r
+            UPDATE {{ count: OLD.count + r.count, last_at: MAX([OLD.last_at, r.last_at]) }}
+            IN {ROLLUP_COLLECTION}
+        """, {'rows': rows})
+
+    @staticmethod
+    def _encrypt_label(label: Optional[str]) -> Optional[str]:
+        if not label:
+            return None
+        try:
+            return encrypt_token(label)
+        except Exception:
+            return None
+
+    async def _ensure_collection(self) -> None:
+        """Create the rollup collections and the read index once."""
+        if self._collection_ready:
+            return
+        db = self.graph_manager.db
+
+        def _execute() -> bool:
+            created = not db.has_collection(ROLLUP_COLLECTION)
+            if created:
+                db.create_collection(ROLLUP_COLLECTION)
+            db.collection(ROLLUP_COLLECTION).add_persistent_index(
+                fields=["user_id", "granularity", "dimension", "bucket"]
+            )
+            if not db.has_collection(ROLLUP_SEEN_COLLECTION):
+                db.create_collection(ROLLUP_SEEN_COLLECTION)
+            db.collection(ROLLUP_SEEN_COLLECTION).add_persistent_index(fields=["user_id"])
+            db.collection(ROLLUP_SEEN_COLLECTION).add_ttl_index(fields=["expires_at"], expiry_time=0)
+            return created
+
+        created = await asyncio.to_thread(_execute)
+        self._collection_ready = True
+        if created:
+            # First deployment with rollups: count what was indexed before
+            try:
+                from src.workers.tasks.maintenance_tasks import backfill_activity_rollups
+                backfill_activity_rollups.delay()
+                logger.info("[ActivityRollups] Queued rollup backfill for existing data")
+            except Exception as e:
+                logger.warning(f"[ActivityRollups] Could not queue rollup backfill: {e}")
+
+
+# Global instance management
+_activity_rollups: Optional[ActivityRollupStore] = None
+
+
+def get_activity_rollups(graph_manager: Optional[Any] = None) -> ActivityRollupStore:
+    """Get the global rollup store, creating it on first use."""
+    global _activity_rollups
+    if _activity_rollups is None:
+        _activity_rollups = ActivityRollupStore(graph_manager)
+    elif graph_manager is not None and _activity_rollups.graph_manager is None:
+        _activity_rollups.graph_manager = graph_manager
+    return _activity_rollups
@@ -8,17 +8,29 @@ Advanced graph analytics for the memory system, providing:
 - Cross-app activity insights
 - Meeting preparation metrics
 
+Temporal patterns are read from per-user activity rollups maintained at
+index time (see activity_rollups.py).
 """
-from typing import Dict, Any, List, Optional
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
 from datetime import datetime, timedelta
 from enum import Enum
 
 from src.services.indexing.graph import KnowledgeGraphManager
 from src.utils.logger import setup_logger
 from src.utils.config import Config
+from .activity_rollups import ActivityRollupStore, get_activity_rollups
 
 logger = setup_logger(__name__)
 
+# Report section cache
+ANALYTICS_CACHE_TTL_SECONDS = 300
+ANALYTICS_CACHE_MAX_ENTRIES = 1024
+
+# Contacts listed in the temporal report
+TEMPORAL_TOP_CONTACTS = 10
+
 
 class AnalyticsMetric(str, Enum):
     """Available analytics metrics"""
@@ -45,11 +57,17 @@ class MemoryGraphAnalytics:
         self,
         config: Config,
         graph_manager: KnowledgeGraphManager,
-        llm_client=None
+        llm_client=None,
+        rollups: Optional[ActivityRollupStore] = None
     ):
         self.config = config
         self.graph_manager = graph_manager
         self.llm_client = llm_client
+        self.rollups = rollups or get_activity_rollups(graph_manager)
+        # (section, user_id, days, version) -> (cached_at, result)
+        self._cache: Dict[Tuple[Any, ...], Tuple[float, Dict[str, Any]]] = {}
+        self._pending: Dict[Tuple[Any, ...], "asyncio.Future"] = {}
+        self._cache_ttl = ANALYTICS_CACHE_TTL_SECONDS
     
     async def get_relationship_analytics(
         self,
@@ -328,6 +346,7 @@ class MemoryGraphAnalytics:
         - Activity by hour of day
         - Busy vs quiet periods
         - Activity trends
+        - Activity by source and most active contacts
         """
         result = {
             "daily_pattern": {},
@@ -335,60 +354,43 @@ class MemoryGraphAnalytics:
             "activity_trend": [],
             "peak_hours": [],
             "quiet_periods": [],
+            "source_activity": {},
+            "contact_activity": [],
             "generated_at": datetime.utcnow().isoformat()
         }
         
         try:
-            # Activity by day of week - AQL version
-            weekly_query = """
-            FOR edge IN UNION(
-                (FOR e IN OCCURRED_DURING RETURN e),
-                (FOR e IN SCHEDULED_FOR RETURN e)
-            )
-                LET tb = DOCUMENT(edge._to)
-                LET content = DOCUMENT(edge._from)
-                FILTER content.user_id == @user_id
-                   AND tb.date >= DATE_SUBTRACT(DATE_NOW(), @days, 'day')
-                COLLECT day = DATE_DAYOFWEEK(tb.date)
-                AGGREGATE activity = LENGTH(1)
-                RETURN { day: day, activity: activity }
-            """
-            
-            weekly = await self.graph_manager.execute_query(weekly_query, {
-                'user_id': user_id,
-                'duration': f'P{time_range_days}D'
-            })
-            
-            day_names = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-            for row in weekly or []:
-                day_num = row.get('day', 0)
-                day_name = day_names[day_num] if 0 <= day_num < 7 else f"Day {day_num}"
-                result["weekly_pattern"][day_name] = row.get('activity', 0)
-            
-            # Activity by hour (approximate from timestamps) - AQL version
-            hourly_query = """
-            FOR content IN UNION(
-                (FOR e IN Email FILTER e.user_id == @user_id AND e.timestamp != null RETURN e),
-                (FOR m IN Message FILTER m.user_id == @user_id AND m.timestamp != null RETURN m),
-                (FOR c IN CalendarEvent FILTER c.user_id == @user_id AND c.timestamp != null RETURN c)
+            # Served from per-user rollups maintained at index time, so the
+            # cost depends on this user's buckets, not the size of the graph
+            now = datetime.utcnow()
+            since = now - timedelta(days=time_range_days)
+            hourly_rows, daily_rows, contact_rows = await asyncio.gather(
+                self.rollups.get_buckets(user_id, "hour", "source", since),
+                self.rollups.get_buckets(user_id, "day", "source", min(since, now - timedelta(days=13))),
+                self.rollups.get_buckets(user_id, "day", "contact", since),
             )
-                FILTER content.timestamp >= DATE_SUBTRACT(DATE_NOW(), @days, 'day')
-                COLLECT hour = DATE_HOUR(content.timestamp)
-                AGGREGATE activity = LENGTH(1)
-                SORT hour
-                RETURN { hour: hour, activity: activity }
-            """
-            
-            hourly = await self.graph_manager.execute_query(hourly_query, {
-                'user_id': user_id,
-                'duration': f'P{time_range_days}D'
-            })
-            
-            hourly_data = {}
-            for row in hourly or []:
-                hour = row.get('hour', 0)
-                hourly_data[f"{hour:02d}:00"] = row.get('activity', 0)
-            result["daily_pattern"] = hourly_data
+            since_day = since.strftime('%Y-%m-%d')
+            
+            # Activity by day of week
+            day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+            by_day: Dict[str, int] = {}
+            by_source: Dict[str, int] = {}
+            for row in daily_rows:
+                if row['bucket'] < since_day:
+                    continue
+                by_day[row['bucket']] = by_day.get(row['bucket'], 0) + row['count']
+                by_source[row['value']] = by_source.get(row['value'], 0) + row['count']
+            for day, activity in by_day.items():
+                day_name = day_names[datetime.strptime(day, '%Y-%m-%d').weekday()]
+                result["weekly_pattern"][day_name] = result["weekly_pattern"].get(day_name, 0) + activity
+            result["source_activity"] = dict(sorted(by_source.items(), key=lambda x: x[1], reverse=True))
+            
+            # Activity by hour of day
+            hourly_data: Dict[str, int] = {}
+            for row in hourly_rows:
+                hour = f"{row['bucket'][-2:]}:00"
+                hourly_data[hour] = hourly_data.get(hour, 0) + row['count']
+            result["daily_pattern"] = dict(sorted(hourly_data.items()))
             
             # Find peak hours (top 3)
             if hourly_data:
@@ -396,30 +398,29 @@ class MemoryGraphAnalytics:
                 result["peak_hours"] = [h for h, _ in sorted_hours[:3]]
                 result["quiet_periods"] = [h for h, _ in sorted_hours[-3:]]
             
-            # Activity trend (daily counts for last 14 days) - AQL version
-            trend_query = """
-            FOR content IN UNION(
-                (FOR e IN Email FILTER e.user_id == @user_id AND e.timestamp != null RETURN e),
-                (FOR m IN Message FILTER m.user_id == @user_id AND m.timestamp != null RETURN m),
-                (FOR c IN CalendarEvent FILTER c.user_id == @user_id AND c.timestamp != null RETURN c)
-            )
-                FILTER content.timestamp >= DATE_SUBTRACT(DATE_NOW(), 14, 'day')
-                COLLECT day = DATE_TRUNC(content.timestamp, 'day')
-                AGGREGATE activity = LENGTH(1)
-                SORT day DESC
-                LIMIT 14
-                RETURN { day: day, activity: activity }
-            """
-            
-            trend = await self.graph_manager.execute_query(trend_query, {
-                'user_id': user_id
-            })
-            
-            for row in trend or []:
-                result["activity_trend"].append({
-                    "date": str(row.get('day')),
-                    "activity": row.get('activity', 0)
+            # Activity trend (daily counts for last 14 days)
+            trend_start = (now - timedelta(days=13)).strftime('%Y-%m-%d')
+            trend: Dict[str, int] = {}
+            for row in daily_rows:
+                if row['bucket'] >= trend_start:
+                    trend[row['bucket']] = trend.get(row['bucket'], 0) + row['count']
+            result["activity_trend"] = [
+                {"date": day, "activity": activity}
+                for day, activity in sorted(trend.items(), reverse=True)
+            ]
+            
+            # Most active contacts in the range
+            contacts: Dict[str, Dict[str, Any]] = {}
+            for row in contact_rows:
+                entry = contacts.setdefault(row['value'], {
+                    "contact": row.get('label'), "interactions": 0, "last_interaction": ""
                 })
+                entry["interactions"] += row['count']
+                entry["last_interaction"] = max(entry["last_interaction"], row.get('last_at') or "")
+                entry["contact"] = entry["contact"] or row.get('label')
+            result["contact_activity"] = sorted(
+                contacts.values(), key=lambda c: c["interactions"], reverse=True
+            )[:TEMPORAL_TOP_CONTACTS]
             
         except Exception as e:
             logger.error(f"[MemoryAnalytics] Temporal analysis failed: {e}")
@@ -588,16 +589,70 @@ class MemoryGraphAnalytics:
         """
         Generate a comprehensive analytics report.
         
-        Combines all analytics into a single report.
+        Combines all analytics into a single report. Sections run
+        concurrently and are cached per user and time range.
         """
+        relationships, topics, temporal, cross_app = await asyncio.gather(
+            self._cached("relationships", user_id, time_range_days, self.get_relationship_analytics),
+            self._cached("topics", user_id, time_range_days, self.get_topic_analytics),
+            self._cached("temporal", user_id, time_range_days, self.get_temporal_activity_patterns),
+            self._cached("cross_app", user_id, time_range_days, self.get_cross_app_insights),
+        )
         return {
-            "relationships": await self.get_relationship_analytics(user_id, time_range_days),
-            "topics": await self.get_topic_analytics(user_id, time_range_days),
-            "temporal": await self.get_temporal_activity_patterns(user_id, time_range_days),
-            "cross_app": await self.get_cross_app_insights(user_id, time_range_days),
+            "relationships": relationships,
+            "topics": topics,
+            "temporal": temporal,
+            "cross_app": cross_app,
             "generated_at": datetime.utcnow().isoformat(),
             "time_range_days": time_range_days
         }
+    
+    async def _cached(
+        self,
+        section: str,
+        user_id: int,
+        time_range_days: int,
+        compute: Callable[[int, int], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Return a report section from cache, computing it at most once at a time.
+        
+        Temporal results are also keyed on the user's rollup version, which
+        indexers bump in Redis, so newly indexed activity shows up without
+        waiting for the TTL. Without Redis only writes made by this process
+        change the version; others wait for the TTL.
+        """
+        version = await self.rollups.version(user_id) if section == "temporal" else 0
+        key = (section, user_id, time_range_days, version)
+        
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[0] < self._cache_ttl:
+            return cached[1]
+        
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute(user_id, time_range_days))
+            self._pending[key] = task
+            task.add_done_callback(lambda t: self._store_result(key, t))
+        # Shield so one caller disconnecting doesn't cancel the shared query
+        return await asyncio.shield(task)
+    
+    def _store_result(self, key: Tuple[Any, ...], task: "asyncio.Future") -> None:
+        """Cache a finished section computation (bounded, oldest first out)."""
+        self._pending.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._cache.pop(key, None)
+        self._cache[key] = (time.monotonic(), task.result())
+        while len(self._cache) > ANALYTICS_CACHE_MAX_ENTRIES:
+            self._cache.pop(next(iter(self._cache)))
+    
+    def invalidate_cache(self, user_id: Optional[int] = None) -> int:
+        """Drop cached sections for a user (or all users). Returns count removed."""
+        keys = [k for k in self._cache if user_id is None or k[1] == user_id]
+        for key in keys:
+            del self._cache[key]
+        return len(keys)
 
 
 # Global instance management
@@ -0,0 +1,331 @@
+"""
+Brief Cache.
+
+Materialized dashboard briefs per user, so the dashboard never aggregates
+Gmail, Calendar, Tasks and the LLM reminder summary on the request path.
+
+- Snapshots are written by BriefService.refresh_briefs() (background worker
+  or section-level refresh endpoint) and served as-is by GET /briefs.
+- Source changes (new mail, calendar/task writes) mark the affected sections
+  stale and schedule a debounced background refresh.
+- Every snapshot carries a hash of the reminder inputs; the LLM reminder
+  summary is only regenerated when that hash changes.
+
+Storage is Redis (shared by API and Celery workers). If Redis is unreachable
+the store degrades to a per-process in-memory dict.
+"""
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from src.utils.logger import setup_logger
+from src.utils.urls import URLs
+
+logger = setup_logger(__name__)
+
+# Sections materialized in a snapshot ('reminders' is derived from the rest)
+BRIEF_SECTIONS = (
+    'emails', 'urgent_emails', 'todos', 'meetings',
+    'documents', 'ghost_drafts', 'people',
+)
+
+# Which sections each upstream source feeds
+SOURCE_SECTIONS: Dict[str, tuple] = {
+    'email': ('emails', 'urgent_emails'),
+    'calendar': ('meetings',),
+    'tasks': ('todos',),
+    'drive': ('documents',),
+    'ghost': ('ghost_drafts',),
+    'people': ('people',),
+}
+
+BRIEF_SNAPSHOT_TTL_SECONDS = 60 * 60 * 24
+# Snapshots older than this are served but flagged stale and refreshed
+BRIEF_MAX_AGE_SECONDS = 60 * 15
+# Notifications within this window coalesce into one refresh
+BRIEF_REFRESH_DEBOUNCE_SECONDS = 20
+# How long to stay on the in-process store after a failed Redis connect
+REDIS_RETRY_SECONDS = 60
+
+_SNAPSHOT_KEY = "briefs:snapshot:{user_id}"
+_STALE_KEY = "briefs:stale:{user_id}"
+_REFRESH_KEY = "briefs:refresh:{user_id}"
+
+
+def sections_for_sources(sources: Iterable[str]) -> Set[str]:
+    """Map source names ('email', 'calendar', ...) to brief sections."""
+    sections: Set[str] = set()
+    for source in sources:
+        sections.update(SOURCE_SECTIONS.get(source, ()))
+    return sections
+
+
+def reminders_input_hash(sections: Dict[str, Any], extra: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Stable hash of everything the reminder summary is generated from.
+
+    The current hour is included so time-relative reminders ("due soon",
+    last 48h) are still regenerated at least hourly.
+    """
+    payload = {
+        'sections': {name: sections.get(name) for name in BRIEF_SECTIONS},
+        'extra': extra or {},
+        'hour': datetime.now().strftime('%Y-%m-%dT%H'),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class BriefStore:
+    """
+    Snapshot + staleness store for materialized briefs (sync API).
+
+    Example:
+        store = get_brief_store()
+        store.mark_stale(user_id, {'meetings'})
+        snapshot = store.get(user_id)
+    """
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = redis_url or URLs.REDIS
+        self._client = None
+        self._retry_at = 0.0
+        self._local: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _redis(self):
+        if self._client is None and time.time() >= self._retry_at:
+            try:
+                import redis
+                client = redis.from_url(self.redis_url, decode_responses=True, socket_timeout=1)
+                client.ping()
+                self._client = client
+            except Exception as e:
+                logger.warning(f"[BriefStore] Redis unavailable, using in-process store: {e}")
+                self._retry_at = time.time() + REDIS_RETRY_SECONDS
+        return self._client
+
+    @property
+    def is_shared(self) -> bool:
+        """True if snapshots are visible to Celery workers (Redis backend)."""
+        return self._redis() is not None
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        key = _SNAPSHOT_KEY.format(user_id=user_id)
+        client = self._redis()
+        if client is not None:
+            try:
+                raw = client.get(key)
+                return json.loads(raw) if raw else None
+            except Exception as e:
+                logger.warning(f"[BriefStore] Failed to read snapshot for user {user_id}: {e}")
+                return None
+        with self._lock:
+            entry = self._local.get(key)
+            if entry and entry[0] > time.time():
+                return entry[1]
+        return None
+
+    def put(self, user_id: int, snapshot: Dict[str, Any]) -> None:
+        key = _SNAPSHOT_KEY.format(user_id=user_id)
+        client = self._redis()
+        if client is not None:
+            try:
+                client.set(key, json.dumps(snapshot, default=str), ex=BRIEF_SNAPSHOT_TTL_SECONDS)
+                return
+            except Exception as e:
+                logger.warning(f"[BriefStore] Failed to write snapshot for user {user_id}: {e}")
+        with self._lock:
+            self._local[key] = (time.time() + BRIEF_SNAPSHOT_TTL_SECONDS, snapshot)
+
+    # ------------------------------------------------------------------
+    # Staleness
+    # ------------------------------------------------------------------
+
+    def mark_stale(self, user_id: int, sections: Iterable[str]) -> None:
+        sections = [s for s in sections if s in BRIEF_SECTIONS]
+        if not sections:
+            return
+        key = _STALE_KEY.format(user_id=user_id)
+        client = self._redis()
+        if client is not None:
+            try:
+                client.sadd(key, *sections)
+                client.expire(key, BRIEF_SNAPSHOT_TTL_SECONDS)
+                return
+            except Exception as e:
+                logger.warning(f"[BriefStore] Failed to mark stale for user {user_id}: {e}")
+        with self._lock:
+            self._local.setdefault(key, set()).update(sections)
+
+    def stale_sections(self, user_id: int) -> Set[str]:
+        key = _STALE_KEY.format(user_id=user_id)
+        client = self._redis()
+        if client is not None:
+            try:
+                return set(client.smembers(key))
+            except Exception as e:
+                logger.warning(f"[BriefStore] Failed to read stale sections for user {user_id}: {e}")
+                return set()
+        with self._lock:
+            return set(self._local.get(key, set()))
+
+    def claim_stale(self, user_id: int) -> Set[str]:
+        """
+        Atomically take (and clear) the stale sections before a refresh.
+
+        Sections marked stale while the refresh runs stay flagged for the
+        next one; a failed refresh should mark_stale() the claimed set again.
+        """
+        key = _STALE_KEY.format(user_id=user_id)
+        client = self._redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                pipe.smembers(key)
+                pipe.delete(key)
+                members, _ = pipe.execute()
+                return set(members)
+            except Exception as e:
+                logger.warning(f"[BriefStore] Failed to claim stale sections for user {user_id}: {e}")
+                return set()
+        with self._lock:
+            return set(self._local.pop(key, set()))
+
+    # ------------------------------------------------------------------
+    # Refresh debounce
+    # ------------------------------------------------------------------
+
+    def claim_refresh(self, user_id: int, ttl_seconds: int = BRIEF_REFRESH_DEBOUNCE_SECONDS) -> bool:
+        """Return True if the caller should schedule a refresh (none pending)."""
+        key = _REFRESH_KEY.format(user_id=user_id)
+        client = self._redis()
+        if client is not None:
+            try:
+                return bool(client.set(key, '1', nx=True, ex=max(1, ttl_seconds)))
+            except Exception as e:
+                logger.warning(f"[BriefStore] Failed to claim refresh for user {user_id}: {e}")
+                return True
+        with self._lock:
+            expires = self._local.get(key)
+            if expires and expires > time.time():
+                return False
+            self._local[key] = time.time() + ttl_seconds
+            return True
+
+    def release_refresh(self, user_id: int) -> None:
+        key = _REFRESH_KEY.format(user_id=user_id)
+        client = self._redis()
+        if client is not None:
+            try:
+                client.delete(key)
+                return
+            except Exception as e:
+                logger.warning(f"[BriefStore] Failed to release refresh for user {user_id}: {e}")
+        with self._lock:
+            self._local.pop(key, None)
+
+
+_brief_store: Optional[BriefStore] = None
+
+
+def get_brief_store() -> BriefStore:
+    """Get the process-wide brief store."""
+    global _brief_store
+    if _brief_store is None:
+        _brief_store = BriefStore()
+    return _brief_store
+
+
+def load_cached_briefs(user_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Serve the materialized briefs for a user without touching any integration.
+
+    Returns:
+        Briefs payload with a 'meta' staleness marker, or None if no snapshot
+    """
+    store = get_brief_store()
+    snapshot = store.get(user_id)
+    if not snapshot:
+        return None
+
+    stale = store.stale_sections(user_id)
+    generated_at = snapshot.get('generated_at')
+    age_seconds = None
+    if generated_at:
+        try:
+            age_seconds = max(0.0, time.time() - datetime.fromisoformat(generated_at).timestamp())
+        except ValueError:
+            age_seconds = None
+    expired = age_seconds is None or age_seconds > BRIEF_MAX_AGE_SECONDS
+
+    return to_payload(snapshot, stale_sections=sorted(stale), stale=bool(stale) or expired, age_seconds=age_seconds)
+
+
+def to_payload(
+    snapshot: Dict[str, Any],
+    stale_sections: Optional[List[str]] = None,
+    stale: bool = False,
+    age_seconds: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Shape a snapshot like BriefService.get_dashboard_briefs() output."""
+    sections = snapshot.get('sections', {})
+    return {
+        "emails": sections.get('emails', []),
+        "todos": sections.get('todos', []),
+        "meetings": sections.get('meetings', []),
+        "documents": sections.get('documents', []),
+        "ghost_drafts": sections.get('ghost_drafts', []),
+        "people": sections.get('people', {}),
+        "reminders": snapshot.get('reminders', {}),
+        "meta": {
+            "generated_at": snapshot.get('generated_at'),
+            "sections_refreshed_at": snapshot.get('sections_refreshed_at', {}),
+            "stale": stale,
+            "stale_sections": stale_sections or [],
+            "age_seconds": round(age_seconds, 1) if age_seconds is not None else None,
+        },
+    }
+
+
+def schedule_brief_refresh(
+    user_id: int,
+    sources: Optional[Iterable[str]] = None,
+    sections: Optional[Iterable[str]] = None,
+    countdown: int = BRIEF_REFRESH_DEBOUNCE_SECONDS,
+) -> bool:
+    """
+    Mark sections stale and schedule one debounced background refresh.
+
+    Call this whenever an upstream source changes. Bursts of notifications
+    (e.g. many new emails) collapse into a single refresh.
+
+    Returns:
+        True if a refresh task was enqueued by this call
+    """
+    try:
+        store = get_brief_store()
+        affected = set(sections or ())
+        if sources:
+            affected |= sections_for_sources(sources)
+        store.mark_stale(user_id, affected)
+
+        # A worker cannot see an in-process store; the next dashboard load refreshes inline
+        if not store.is_shared:
+            return False
+        if not store.claim_refresh(user_id, ttl_seconds=max(countdown, BRIEF_REFRESH_DEBOUNCE_SECONDS)):
+            return False
+
+        from src.workers.tasks.brief_tasks import refresh_dashboard_briefs
+        refresh_dashboard_briefs.apply_async(args=[user_id], countdown=countdown)
+        return True
+    except Exception as e:
+        logger.warning(f"[BriefCache] Failed to schedule brief refresh for user {user_id}: {e}")
+        return False
@@ -27,6 +27,12 @@ from src.integrations.google_tasks.service import TaskService
 from src.integrations.google_calendar.service import CalendarService
 from src.integrations.google_drive.service import GoogleDriveService
 from src.services.extraction.actionable_item_extractor import ActionableItemExtractor
+from src.services.dashboard.brief_cache import (
+    BRIEF_SECTIONS,
+    get_brief_store,
+    reminders_input_hash,
+    to_payload,
+)
 
 logger = setup_logger(__name__)
 
@@ -59,46 +65,132 @@ class BriefService:
         Get all briefs components in parallel.
         Reminders are generated as an intelligent summary of emails, todos, meetings, and documents.
         """
-        # First: Fetch emails, todos, meetings, documents in parallel
         # Optimization: Skip slow document fetching in fast_mode (voice)
-        tasks = [
-            self._get_emails(user_id, fast_mode=fast_mode),
-            self._get_todos(user_id, fast_mode=fast_mode),
-            self._get_meetings(user_id),
-        ]
-        if not fast_mode:
-            tasks.append(self._get_documents(user_id))
-            
-        # Always fetch Ghost drafts (internal and fast)
-        tasks.append(self._get_ghost_drafts(user_id))
-        
-        # People CRM data (fast — graph queries only)
-        tasks.append(self._get_people(user_id))
-            
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        emails = results[0] if isinstance(results[0], list) else []
-        todos = results[1] if isinstance(results[1], list) else []
-        meetings = results[2] if isinstance(results[2], list) else []
-        
-        idx = 3
-        documents = []
-        if not fast_mode:
-            documents = results[idx] if isinstance(results[idx], list) else []
-            idx += 1
-            
-        ghost_drafts = results[idx] if isinstance(results[idx], list) else []
-        idx += 1
-        
-        people = results[idx] if isinstance(results[idx], dict) else {}
+        sections = [s for s in BRIEF_SECTIONS if not (fast_mode and s == 'documents')]
+        data = await self._fetch_sections(user_id, sections, fast_mode=fast_mode)
+        reminders = await self._build_reminders(user_id, user_name, data, fast_mode=fast_mode)
+
+        return {
+            "emails": data['emails'],
+            "todos": data['todos'],
+            "meetings": data['meetings'],
+            "documents": data.get('documents', []),
+            "ghost_drafts": data['ghost_drafts'],
+            "people": data['people'],
+            "reminders": reminders
+        }
+
+    async def refresh_briefs(
+        self,
+        user_id: int,
+        user_name: str = "there",
+        sections: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Refresh the materialized briefs snapshot for a user.
+
+        Only the requested sections plus those marked stale are refetched
+        (everything on the first run); the rest are reused from the stored
+        snapshot. The LLM reminder summary is regenerated only when the hash
+        of its inputs changed.
+
+        Args:
+            user_id: User ID
+            user_name: Name used in the reminder greeting
+            sections: Sections to force-refresh (see BRIEF_SECTIONS)
+
+        Returns:
+            Briefs payload (same shape as get_dashboard_briefs, plus 'meta')
+        """
+        store = get_brief_store()
+        snapshot = await asyncio.to_thread(store.get, user_id) or {}
+        claimed = await asyncio.to_thread(store.claim_stale, user_id)
+
+        cached_sections = snapshot.get('sections', {})
+        wanted = set(sections or ()) | claimed
+        wanted |= {s for s in BRIEF_SECTIONS if s not in cached_sections}
+        # Urgent emails are filtered against the people CRM data
+        if 'urgent_emails' in wanted:
+            wanted.add('people')
+
+        try:
+            fetched = await self._fetch_sections(user_id, [s for s in BRIEF_SECTIONS if s in wanted])
+        except Exception:
+            await asyncio.to_thread(store.mark_stale, user_id, claimed)
+            raise
+
+        now_iso = datetime.now().isoformat()
+        merged = dict(cached_sections)
+        merged.update(fetched)
+        refreshed_at = dict(snapshot.get('sections_refreshed_at', {}))
+        refreshed_at.update({name: now_iso for name in fetched})
+
+        llm_reminders = await self._get_llm_classified_reminders(user_id)
+        input_hash = reminders_input_hash(merged, {'llm_reminders': llm_reminders, 'user_name': user_name})
+
+        if snapshot.get('reminders') and snapshot.get('reminders_hash') == input_hash:
+            logger.info(f"[BriefService] Reminder inputs unchanged for user {user_id}, reusing summary")
+            reminders = snapshot['reminders']
+        else:
+            reminders = await self._build_reminders(user_id, user_name, merged, llm_reminders=llm_reminders)
+            refreshed_at['reminders'] = now_iso
+
+        snapshot = {
+            'sections': merged,
+            'sections_refreshed_at': refreshed_at,
+            'reminders': reminders,
+            'reminders_hash': input_hash,
+            'generated_at': now_iso,
+        }
+        await asyncio.to_thread(store.put, user_id, snapshot)
+        logger.info(f"[BriefService] Refreshed briefs for user {user_id}: sections={sorted(fetched)}")
+
+        stale = await asyncio.to_thread(store.stale_sections, user_id)
+        return to_payload(snapshot, stale_sections=sorted(stale), stale=bool(stale), age_seconds=0.0)
+
+    async def _fetch_sections(self, user_id: int, sections: List[str], fast_mode: bool = False) -> Dict[str, Any]:
+        """Fetch the requested brief sections (independent sources in parallel)."""
+        fetchers = {
+            'emails': lambda: self._get_emails(user_id, fast_mode=fast_mode),
+            'todos': lambda: self._get_todos(user_id, fast_mode=fast_mode),
+            'meetings': lambda: self._get_meetings(user_id),
+            'documents': lambda: self._get_documents(user_id),
+            # Always fetch Ghost drafts (internal and fast)
+            'ghost_drafts': lambda: self._get_ghost_drafts(user_id),
+            # People CRM data (fast — graph queries only)
+            'people': lambda: self._get_people(user_id),
+        }
+        names = [name for name in sections if name in fetchers]
+        results = await asyncio.gather(*(fetchers[name]() for name in names), return_exceptions=True)
+
+        data: Dict[str, Any] = {}
+        for name, result in zip(names, results):
+            expected = dict if name == 'people' else list
+            data[name] = result if isinstance(result, expected) else expected()
 
         # We must fetch recent important emails SEQUENTIALLY after _get_emails 
         # because google-api-python-client's httplib2 is NOT thread-safe for parallel calls on the same client.
-        urgent_read_emails = []
-        try:
-            urgent_read_emails = await self._get_recent_important_emails(user_id, people)
-        except Exception as e:
-            logger.error(f"[BriefService] Sequential fetch of urgent emails failed: {e}")
+        if 'urgent_emails' in sections:
+            data['urgent_emails'] = []
+            try:
+                data['urgent_emails'] = await self._get_recent_important_emails(user_id, data.get('people', {}))
+            except Exception as e:
+                logger.error(f"[BriefService] Sequential fetch of urgent emails failed: {e}")
+
+        return data
+
+    async def _build_reminders(
+        self,
+        user_id: int,
+        user_name: str,
+        data: Dict[str, Any],
+        fast_mode: bool = False,
+        llm_reminders: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """Build the reminders section from already-fetched section data."""
+        emails = data.get('emails', [])
+        todos = data.get('todos', [])
+        meetings = data.get('meetings', [])
 
         # 2. Skip slow LLM-based summarization in fast_mode (voice optimization)
         # _generate_smart_reminders takes ~6-8s, which is too slow for voice (~1s limit)
@@ -123,29 +215,21 @@ class BriefService:
                 reminders["items"].append({"title": f"Task: {t['title']}", "subtitle": t.get('due_date') or "no due date"})
             for m in meetings[:3]:
                 reminders["items"].append({"title": f"Meeting: {m['title']}", "subtitle": m['start_time']})
-        else:
-            # Generate smart reminders from aggregated data using LLM
-            reminders = await self._generate_smart_reminders(
-                user_id=user_id,
-                user_name=user_name,
-                emails=emails, # Unread
-                urgent_emails=urgent_read_emails, # New param
-                todos=todos,
-                meetings=meetings,
-                documents=documents,
-                ghost_drafts=ghost_drafts,
-                people=people
-            )
+            return reminders
 
-        return {
-            "emails": emails,
-            "todos": todos,
-            "meetings": meetings,
-            "documents": documents,
-            "ghost_drafts": ghost_drafts,
-            "people": people,
-            "reminders": reminders
-        }
+        # Generate smart reminders from aggregated data using LLM
+        return await self._generate_smart_reminders(
+            user_id=user_id,
+            user_name=user_name,
+            emails=emails, # Unread
+            urgent_emails=data.get('urgent_emails', []), # New param
+            todos=todos,
+            meetings=meetings,
+            documents=data.get('documents', []),
+            ghost_drafts=data.get('ghost_drafts', []),
+            people=data.get('people', {}),
+            llm_reminders=llm_reminders
+        )
 
     async def _get_emails(self, user_id: int, fast_mode: bool = False) -> List[Dict]:
         """Fetch important unread emails using Gmail's IMPORTANT label."""
@@ -731,7 +815,8 @@ class BriefService:
         urgent_emails: List[Dict] = [], # New
         documents: List[Dict] = [],
         ghost_drafts: List[Dict] = [],
-        people: Dict[str, Any] = {} # New
+        people: Dict[str, Any] = {}, # New
+        llm_reminders: Optional[List[Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
         """
         Generate intelligent reminders.
@@ -744,7 +829,8 @@ class BriefService:
         # PRIORITY 1: LLM-Classified Reminders (from background task)
         # These are pre-analyzed by Gemini for intelligent prioritization
         try:
-            llm_reminders = await self._get_llm_classified_reminders(user_id)
+            if llm_reminders is None:
+                llm_reminders = await self._get_llm_classified_reminders(user_id)
             if llm_reminders:
                 logger.info(f"[BriefService][Reminders] Found {len(llm_reminders)} LLM-classified reminders")
                 items.extend(llm_reminders)
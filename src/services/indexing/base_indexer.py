@@ -423,6 +423,7 @@ class BaseIndexer(ABC):
             # 3. Batch event-driven intelligence across ALL indexed nodes
             if all_indexed_nodes:
                 await self._batch_event_driven_intelligence(all_indexed_nodes)
+                await self._record_activity(all_indexed_nodes)
             
             # 4. Log high failure rates as errors
             if items and stats.errors > len(items) * 0.3:
@@ -466,6 +467,14 @@ class BaseIndexer(ABC):
                     f"[{self.name}] {len(errors)}/{len(tasks)} event-driven intelligence tasks failed"
                 )
             
+    async def _record_activity(self, nodes: List[ParsedNode]):
+        """Count indexed activity into the user's analytics rollups (re-synced nodes are skipped)."""
+        try:
+            from src.services.analytics.activity_rollups import get_activity_rollups
+            await get_activity_rollups(self.graph_manager).record_nodes(self.user_id, nodes)
+        except Exception as e:
+            logger.debug(f"[{self.name}] Activity rollup update failed: {e}")
+            
     async def _index_vector_only(self, node: ParsedNode):
         """Fallback for when graph is not enabled"""
         if not node.searchable_text or not self.rag_engine:
@@ -295,8 +295,11 @@ class EventStreamHandler:
             # Trigger immediate sync (fetch and transform)
             items = await email_crawler.fetch_delta()
             
+            # Limit to 5 to avoid blocking; a coalesced burst stands for
+            # several notifications, so allow one item per notification.
+            limit = max(5, int(payload.get("coalesced", 1)))
             nodes = []
-            for item in items[:5]:  # Limit to 5 to avoid blocking
+            for item in items[:limit]:
                 result = await email_crawler.transform_item(item)
                 if result:
                     if isinstance(result, list):
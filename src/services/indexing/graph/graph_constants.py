@@ -40,6 +40,27 @@ ARANGO_DEFAULT_PASSWORD = URLs.ARANGODB_PASSWORD
 ARANGO_DEFAULT_DB = URLs.ARANGODB_DB
 ARANGO_GRAPH_NAME = "clavr_graph"
 
+# Text Search (see text_search.py)
+GRAPH_SEARCH_VIEW = "GraphTextSearch"  # ArangoSearch view over all node collections
+GRAPH_SEARCH_PROPERTY = "search_tokens"  # Per-field blind tokens stored on each node
+# Search field -> node properties tokenized into it
+GRAPH_SEARCH_FIELDS = {
+    "names": ("name", "title", "display_name", "identifier"),
+    "subjects": ("subject",),
+    "merchants": ("merchant", "vendor"),
+    "content": ("content", "body", "summary", "description", "text", "notes"),
+}
+# Relevance boost per search field
+GRAPH_SEARCH_FIELD_WEIGHTS = {
+    "names": 3.0,
+    "subjects": 2.0,
+    "merchants": 2.5,
+    "content": 1.0,
+}
+GRAPH_SEARCH_MAX_TOKEN_LENGTH = 64
+GRAPH_SEARCH_CANDIDATE_MULTIPLIER = 4  # Over-fetch when post-filtering by min_match
+GRAPH_SEARCH_REINDEX_BATCH_SIZE = 500  # Nodes per round trip when backfilling search tokens
+
 
 
 # NetworkX Settings
@@ -42,6 +42,21 @@ from .graph_constants import (
     ARANGO_GRAPH_NAME,
     PRIMARY_BACKEND,
     FALLBACK_BACKEND,
+    GRAPH_SEARCH_VIEW,
+    GRAPH_SEARCH_PROPERTY,
+    GRAPH_SEARCH_CANDIDATE_MULTIPLIER,
+    GRAPH_SEARCH_REINDEX_BATCH_SIZE,
+)
+from .text_search import (
+    GraphTextIndex,
+    build_search_tokens,
+    query_tokens,
+    search_enabled,
+    resolve_fields,
+    match_fraction,
+    user_id_values,
+    build_search_aql,
+    build_view_links,
 )
 from src.utils.logger import setup_logger
 from src.utils.config import Config
@@ -50,6 +65,11 @@ from src.utils.encryption import encrypt_token, decrypt_token
 logger = setup_logger(__name__)
 
 
+def _index_fields(field: Union[str, Tuple[str, ...]]) -> List[str]:
+    """Normalize an INDEX_CONFIG entry to ArangoDB's index field list."""
+    return [field] if isinstance(field, str) else list(field)
+
+
 class GraphBackend(str, Enum):
     """Supported graph database backends"""
     ARANGODB = "arangodb"  # Production backend (primary)
@@ -97,6 +117,8 @@ class KnowledgeGraphManager:
         self.validation_mode = validation_mode
         self.config = config
         self.reactive_service = None
+        # In-memory mirror of the GraphTextSearch view (NetworkX backend)
+        self.text_index = GraphTextIndex()
         
         # Initialize graph immediately for NetworkX backend
         if self.backend_type == GraphBackend.NETWORKX:
@@ -177,11 +199,14 @@ class KnowledgeGraphManager:
                 raise
 
         # Define recommended indexes for performance optimization
-        self.INDEX_CONFIG: Dict[NodeType, List[str]] = {
+        # Entries are a field name or a tuple of fields for a compound index
+        self.INDEX_CONFIG: Dict[NodeType, List[Union[str, Tuple[str, ...]]]] = {
             NodeType.RECEIPT: ["merchant", "date", "category"],
             NodeType.LEAD: ["interest_level", "last_contacted"],
             NodeType.EMAIL: ["thread_id", "date"],
             NodeType.CONTACT: ["email"],
+            # Compound index: pending-delivery lookups by user (InsightDeliveryService)
+            NodeType.INSIGHT: [("delivered", "queued_for_digest", "user_id")],
         }
     
     def _encrypt_graph_properties(self, properties: Dict[str, Any]) -> Dict[str, Any]:
@@ -207,7 +232,10 @@ class KnowledgeGraphManager:
         
         new_props = properties.copy()
         for key, value in properties.items():
-            if isinstance(value, str):
+            if key == GRAPH_SEARCH_PROPERTY:
+                # Blind search tokens are index-only, never part of a node's output
+                new_props.pop(key)
+            elif isinstance(value, str):
                 # Try to decrypt if it looks like an encrypted string or if it's in sensitive list
                 if value.startswith("ENC:"):
                     try:
@@ -279,6 +307,12 @@ class KnowledgeGraphManager:
         for warning in validation_result.warnings:
             logger.warning(f"Node validation warning: {warning}")
         
+        # Blind search tokens must be derived while the text is still plaintext.
+        # Without a search key none are stored, so reindex_search_tokens picks
+        # the node up once a key is configured.
+        indexed = search_enabled()
+        search_tokens = build_search_tokens(properties.get("user_id"), properties) if indexed else {}
+        
         # Encrypt sensitive properties before adding metadata
         encrypted_properties = self._encrypt_graph_properties(properties)
         
@@ -288,9 +322,14 @@ class KnowledgeGraphManager:
             "node_type": node_type.value,
             "created_at": datetime.now().isoformat(),
         }
+        if indexed:
+            # Stored even when empty: marks the node as indexed (see reindex_search_tokens)
+            properties_with_meta[GRAPH_SEARCH_PROPERTY] = search_tokens
         
         if self.backend_type == GraphBackend.NETWORKX:
             self.graph.add_node(node_id, **properties_with_meta)
+            if indexed:
+                self.text_index.add(node_id, properties.get("user_id"), node_type.value, search_tokens)
             logger.debug(f"Added node: {node_id} ({node_type.value})")
             success = True
         
@@ -549,6 +588,82 @@ class KnowledgeGraphManager:
             return [self._decrypt_graph_properties(n) for n in nodes]
 
     
+    async def search_text(
+        self,
+        query: str,
+        user_id: Union[int, str],
+        node_types: Optional[List[Union[NodeType, str]]] = None,
+        fields: Optional[List[str]] = None,
+        limit: int = 20,
+        min_match: float = 0.0,
+        sort: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranked keyword search over a user's nodes (see text_search.py)
+        
+        Backed by the GraphTextSearch ArangoSearch view, or its in-memory
+        mirror on NetworkX. The query is matched literally, word by word,
+        never as a regex.
+        
+        Args:
+            query: Free-text query
+            user_id: Owner whose nodes are searched (required)
+            node_types: Optional node types to restrict to
+            fields: Search fields to match (names, subjects, merchants,
+                content); defaults to all, each boosted by its weight
+            limit: Maximum number of results
+            min_match: Minimum fraction of query terms a node must contain
+            sort: Optional property to order by (descending) instead of score
+            
+        Returns:
+            Decrypted node dictionaries with a ``_score``, best first
+        """
+        if user_id is None or user_id == "":
+            raise ValueError("search_text requires a user_id")
+        
+        fields = resolve_fields(fields)
+        if not search_enabled():
+            return []
+        tokens = query_tokens(user_id, query)
+        if not tokens or limit <= 0:
+            return []
+        type_values = [t.value if hasattr(t, 'value') else str(t) for t in node_types or []]
+        
+        if self.backend_type == GraphBackend.NETWORKX:
+            ranked = self.text_index.search(
+                tokens, user_id, node_types=type_values, fields=fields,
+                limit=len(self.text_index) if sort else limit, min_match=min_match,
+            )
+            nodes = [
+                {'id': node_id, **self._decrypt_graph_properties(dict(self.graph.nodes[node_id])), '_score': score}
+                for node_id, score in ranked
+                if self.graph.has_node(node_id)
+            ]
+            if sort:
+                nodes.sort(key=lambda n: str(n.get(sort) or ''), reverse=True)
+            return nodes[:limit]
+        
+        elif self.backend_type == GraphBackend.ARANGODB:
+            # min_match can't be expressed in SEARCH, so over-fetch and filter
+            fetch = limit * GRAPH_SEARCH_CANDIDATE_MULTIPLIER if min_match else limit
+            params: Dict[str, Any] = {
+                'user_ids': user_id_values(user_id),
+                'tokens': tokens,
+                'limit': fetch,
+            }
+            if type_values:
+                params['node_types'] = type_values
+            if sort:
+                params['sort'] = sort
+            
+            docs = await self._query_arangodb(build_search_aql(fields, bool(type_values), sort), params)
+            if min_match:
+                docs = [
+                    d for d in docs
+                    if match_fraction(d.get(GRAPH_SEARCH_PROPERTY), tokens, fields) >= min_match
+                ]
+            return [self._decrypt_graph_properties(d) for d in docs[:limit]]
+    
     async def find_node_by_property(
         self,
         node_type: NodeType,
@@ -921,6 +1036,7 @@ class KnowledgeGraphManager:
         if self.backend_type == GraphBackend.NETWORKX:
             if self.graph.has_node(node_id):
                 self.graph.remove_node(node_id)
+                self.text_index.remove(node_id)
                 logger.debug(f"Deleted node: {node_id}")
                 return True
             return False
@@ -933,6 +1049,7 @@ class KnowledgeGraphManager:
         """Clear all nodes and relationships"""
         if self.backend_type == GraphBackend.NETWORKX:
             self.graph.clear()
+            self.text_index.clear()
             logger.info("Cleared graph")
             return True
         
@@ -997,10 +1114,14 @@ class KnowledgeGraphManager:
                 if node_type in self.INDEX_CONFIG:
                     for field in self.INDEX_CONFIG[node_type]:
                         try:
-                            col.add_persistent_index(fields=[field])
+                            col.add_persistent_index(fields=_index_fields(field))
                             logger.info(f"[INDEX] Created persistent index for {collection_name}.{field}")
                         except Exception as e:
                             logger.warning(f"[INDEX] Failed to create index for {collection_name}.{field}: {e}")
+                try:
+                    self.db.update_arangosearch_view(GRAPH_SEARCH_VIEW, {'links': build_view_links([collection_name])})
+                except Exception as e:
+                    logger.debug(f"[INDEX] Could not link {collection_name} to {GRAPH_SEARCH_VIEW}: {e}")
             
             # Upsert document using AQL
             # We use node_id as _key if valid, otherwise we store it as 'id' property and let Arango generate _key?
@@ -1056,15 +1177,108 @@ class KnowledgeGraphManager:
                     for field in fields:
                         try:
                             # ArangoDB add_persistent_index is idempotent if index exists
-                            col.add_persistent_index(fields=[field])
+                            col.add_persistent_index(fields=_index_fields(field))
                             logger.info(f"[INDEX] Verified/Created index for {collection_name}.{field}")
                         except Exception as e:
                             logger.error(f"[INDEX] Failed to initialize index for {collection_name}.{field}: {e}")
                 return True
             
-            return await asyncio.to_thread(_execute)
+            indexed = await asyncio.to_thread(_execute)
+            await self.initialize_search_view()
+            return indexed
         
         return True
+    
+    async def initialize_search_view(self) -> bool:
+        """
+        Create or refresh the GraphTextSearch view over every node collection.
+        
+        Collections created later are linked as they appear (_add_node_arangodb).
+        
+        Returns:
+            True if the view is in place
+        """
+        if self.backend_type != GraphBackend.ARANGODB:
+            return True
+        
+        def _execute():
+            try:
+                existing = {c['name'] for c in self.db.collections() if not c['system']}
+                links = build_view_links(nt.value for nt in NodeType if nt.value in existing)
+                if any(v['name'] == GRAPH_SEARCH_VIEW for v in self.db.views()):
+                    self.db.update_arangosearch_view(GRAPH_SEARCH_VIEW, {'links': links})
+                else:
+                    self.db.create_arangosearch_view(GRAPH_SEARCH_VIEW, {'links': links})
+                logger.info(f"[INDEX] Verified/Created search view {GRAPH_SEARCH_VIEW} ({len(links)} collections)")
+                return True
+            except Exception as e:
+                logger.error(f"[INDEX] Failed to initialize search view {GRAPH_SEARCH_VIEW}: {e}")
+                return False
+        
+        return await asyncio.to_thread(_execute)
+
+    async def reindex_search_tokens(self, batch_size: int = GRAPH_SEARCH_REINDEX_BATCH_SIZE) -> int:
+        """
+        Add search tokens to nodes stored without them (before text search existed).
+        
+        Works in batches per collection and is resumable: a node is done once
+        it has a search_tokens property (empty when it has no searchable text),
+        so an interrupted run continues where it stopped.
+        
+        Args:
+            batch_size: Nodes read and updated per round trip
+            
+        Returns:
+            Number of nodes reindexed (0 while no search key is configured)
+        """
+        if not search_enabled():
+            return 0
+        if self.backend_type == GraphBackend.NETWORKX:
+            reindexed = 0
+            for node_id, data in self.graph.nodes(data=True):
+                if GRAPH_SEARCH_PROPERTY in data:
+                    continue
+                search_tokens = build_search_tokens(data.get("user_id"), self._decrypt_graph_properties(dict(data)))
+                data[GRAPH_SEARCH_PROPERTY] = search_tokens
+                self.text_index.add(node_id, data.get("user_id"), data.get("node_type"), search_tokens)
+                reindexed += 1
+            return reindexed
+        
+        def _execute():
+            reindexed = 0
+            existing = {c['name'] for c in self.db.collections() if not c['system']}
+            for collection_name in (nt.value for nt in NodeType if nt.value in existing):
+                while True:
+                    docs = list(self.db.aql.execute(
+                        f"""
+                        FOR doc IN {collection_name}
+                            FILTER doc.{GRAPH_SEARCH_PROPERTY} == null
+                            LIMIT @batch
+                            RETURN doc
+                        """,
+                        bind_vars={'batch': batch_size}
+                    ))
+                    if not docs:
+                        break
+                    updates = [
+                        {
+                            'key': doc['_key'],
+                            'tokens': build_search_tokens(doc.get('user_id'), self._decrypt_graph_properties(doc)),
+                        }
+                        for doc in docs
+                    ]
+                    self.db.aql.execute(
+                        f"""
+                        FOR u IN @updates
+                            UPDATE {{ _key: u.key }} WITH {{ {GRAPH_SEARCH_PROPERTY}: u.tokens }} IN {collection_name}
+                        """,
+                        bind_vars={'updates': updates}
+                    )
+                    reindexed += len(docs)
+                    logger.info(f"[INDEX] Search tokens added to {reindexed} nodes so far ({collection_name})")
+            return reindexed
+        
+        return await asyncio.to_thread(_execute)
 
     async def _add_relationship_arangodb(self, from_node: str, to_node: str, rel_type: RelationType, properties: Dict[str, Any]) -> bool:
         """Add relationship to ArangoDB"""
@@ -0,0 +1,329 @@
+"""
+Knowledge Graph Text Search
+
+Ranked, per-user, field-weighted keyword lookup over graph nodes.
+
+Sensitive node properties (name, subject, content, ...) are Fernet-encrypted
+at rest, so neither ``=~``/``LIKE`` filters nor a plaintext ArangoSearch
+analyzer can match them - and regex filters interpolating user input are a
+full collection scan besides. Instead, ``KnowledgeGraphManager.add_node``
+tokenizes the searchable properties while they are still plaintext and stores
+each token as a keyed, per-user blind token (HMAC) grouped by search field:
+
+    search_tokens = {"names": [...], "subjects": [...], "merchants": [...], "content": [...]}
+
+Nodes stored before this existed get their tokens from
+``KnowledgeGraphManager.reindex_search_tokens`` (nightly Celery task).
+
+- ArangoDB: the ``GraphTextSearch`` view links every node collection and
+  indexes ``search_tokens.<field>`` with the identity analyzer (tokenization
+  already happened at write time). Queries BOOST each field by its weight and
+  rank by BM25.
+- NetworkX: ``GraphTextIndex`` mirrors the same tokens in an in-memory
+  inverted index with the same field weights and an IDF ranking.
+
+Both backends share the tokenizer and blind-token derivation here, so a query
+matches the same nodes either way and user input never reaches a regex.
+
+Blind tokens are keyed by GRAPH_SEARCH_KEY (or ENCRYPTION_KEY / SECRET_KEY).
+Without a secret, graph text search is disabled (SearchKeyMissing): tokens
+derived from a built-in constant could be reversed by dictionary attack.
+"""
+import hashlib
+import heapq
+import hmac
+import math
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from src.utils.logger import setup_logger
+
+from .graph_constants import (
+    GRAPH_SEARCH_VIEW,
+    GRAPH_SEARCH_PROPERTY,
+    GRAPH_SEARCH_FIELDS,
+    GRAPH_SEARCH_FIELD_WEIGHTS,
+    GRAPH_SEARCH_MAX_TOKEN_LENGTH,
+)
+
+logger = setup_logger(__name__)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Dropped from queries (never from indexed text) unless nothing else is left
+_QUERY_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "at", "by", "for", "from", "in", "is", "it", "me",
+    "my", "of", "on", "or", "the", "to", "was", "what", "when", "where", "who", "with",
+})
+
+
+class SearchKeyMissing(RuntimeError):
+    """No secret is configured to derive blind tokens, so graph text search is disabled."""
+
+
+def _index_key() -> Optional[bytes]:
+    """Secret used to derive blind tokens (stable across restarts)."""
+    key = (
+        os.getenv('GRAPH_SEARCH_KEY')
+        or os.getenv('ENCRYPTION_KEY')
+        or os.getenv('SECRET_KEY')
+    )
+    if not key:
+        return None
+    return hashlib.sha256(f"graph-search:{key}".encode('utf-8')).digest()
+
+
+_INDEX_KEY: Optional[bytes] = None
+_KEY_MISSING_LOGGED = False
+
+
+def _get_index_key() -> bytes:
+    """
+    Blind-token key. Raises SearchKeyMissing when no secret is configured:
+    tokens derived from a built-in constant could be computed by anyone.
+    """
+    global _INDEX_KEY, _KEY_MISSING_LOGGED
+    if _INDEX_KEY is None:
+        _INDEX_KEY = _index_key()
+        if _INDEX_KEY is None:
+            if not _KEY_MISSING_LOGGED:
+                logger.error(
+                    "Graph text search disabled: set GRAPH_SEARCH_KEY "
+                    "(or ENCRYPTION_KEY / SECRET_KEY) to enable blind search tokens"
+                )
+                _KEY_MISSING_LOGGED = True
+            raise SearchKeyMissing("No graph search key configured")
+    return _INDEX_KEY
+
+
+def search_enabled() -> bool:
+    """Whether a secret is configured to derive blind tokens."""
+    try:
+        _get_index_key()
+        return True
+    except SearchKeyMissing:
+        return False
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    if not text:
+        return []
+    return [t[:GRAPH_SEARCH_MAX_TOKEN_LENGTH] for t in _WORD_RE.findall(text.lower())]
+
+
+def blind_token(user_id: Any, token: str) -> str:
+    """
+    Map a plaintext token to its per-user blind token.
+
+    Scoping the HMAC by user keeps every posting list per-user, so identical
+    words from different tenants never collide or become correlatable.
+    """
+    return hmac.new(
+        _get_index_key(), f"{user_id}:{token}".encode('utf-8'), hashlib.sha256
+    ).hexdigest()[:16]
+
+
+def build_search_tokens(user_id: Any, properties: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Blind the searchable plaintext properties of a node, grouped by search field.
+
+    Args:
+        user_id: Owner of the node
+        properties: Node properties before encryption
+
+    Returns:
+        Distinct blind tokens per search field (fields without text are omitted)
+    """
+    if user_id is None or user_id == "":
+        return {}
+
+    search: Dict[str, List[str]] = {}
+    for field, sources in GRAPH_SEARCH_FIELDS.items():
+        tokens: Dict[str, None] = {}
+        for prop in sources:
+            for text in _texts(properties.get(prop)):
+                for token in tokenize(text):
+                    tokens[blind_token(user_id, token)] = None
+        if tokens:
+            search[field] = list(tokens)
+    return search
+
+
+def _texts(value: Any) -> Iterable[str]:
+    """Plaintext strings held by a property value (str or list of str)."""
+    if isinstance(value, str):
+        if not value.startswith("ENC:"):
+            yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            if isinstance(item, str) and not item.startswith("ENC:"):
+                yield item
+
+
+def query_tokens(user_id: Any, query: str) -> List[str]:
+    """Blind the distinct terms of a keyword query (stopwords dropped if possible)."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    content_terms = [t for t in terms if t not in _QUERY_STOPWORDS]
+    return [blind_token(user_id, t) for t in (content_terms or terms)]
+
+
+def resolve_fields(fields: Optional[Sequence[str]]) -> List[str]:
+    """Validate requested search fields against the known set."""
+    if not fields:
+        return list(GRAPH_SEARCH_FIELDS)
+    unknown = set(fields) - set(GRAPH_SEARCH_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown graph search fields: {sorted(unknown)}")
+    return list(fields)
+
+
+def match_fraction(search: Optional[Dict[str, List[str]]], tokens: Sequence[str], fields: Sequence[str]) -> float:
+    """Fraction of query tokens present in any of the given fields of a node."""
+    if not tokens:
+        return 0.0
+    present: Set[str] = set()
+    for field in fields:
+        present.update((search or {}).get(field, ()))
+    return sum(1 for t in tokens if t in present) / len(tokens)
+
+
+def user_id_values(user_id: Any) -> List[Any]:
+    """user_id is stored as int or str depending on the writer; match both."""
+    values: List[Any] = [str(user_id)]
+    if str(user_id).isdigit():
+        values.append(int(user_id))
+    return values
+
+
+def build_search_aql(fields: Sequence[str], filter_types: bool, sort: Optional[str]) -> str:
+    """
+    AQL for a ranked text search over the ArangoSearch view.
+
+    Field names and weights come from the constants (validated by
+    resolve_fields); user input only ever arrives through bind variables.
+    """
+    boosts = "\n            OR ".join(
+        f"BOOST(doc.{GRAPH_SEARCH_PROPERTY}.{field} IN @tokens, {GRAPH_SEARCH_FIELD_WEIGHTS[field]})"
+        for field in fields
+    )
+    type_clause = "AND doc.node_type IN @node_types" if filter_types else ""
+    order = "doc.@sort DESC, score DESC" if sort else "score DESC"
+    return f"""
+    FOR doc IN {GRAPH_SEARCH_VIEW}
+        SEARCH doc.user_id IN @user_ids
+            {type_clause}
+            AND (
+            {boosts}
+            )
+        LET score = BM25(doc)
+        SORT {order}
+        LIMIT @limit
+        RETURN MERGE(doc, {{ _score: score }})
+    """
+
+
+def build_view_links(collections: Iterable[str]) -> Dict[str, Any]:
+    """ArangoSearch view links indexing the blind tokens of each node collection."""
+    link = {
+        "includeAllFields": False,
+        "fields": {
+            "user_id": {"analyzers": ["identity"]},
+            "node_type": {"analyzers": ["identity"]},
+            GRAPH_SEARCH_PROPERTY: {
+                "fields": {field: {"analyzers": ["identity"]} for field in GRAPH_SEARCH_FIELDS}
+            },
+        },
+    }
+    return {name: link for name in collections}
+
+
+class GraphTextIndex:
+    """
+    In-memory inverted index mirroring GraphTextSearch for the NetworkX backend.
+
+    Postings map a blind token to the nodes and fields containing it; ranking
+    sums, per matched query token, its IDF times the weight of every field it
+    occurs in - the same field boosts the ArangoSearch query applies.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+        self._docs: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, node_id: str, user_id: Any, node_type: str, search: Dict[str, List[str]]) -> None:
+        """Index (or re-index) a node's blind tokens."""
+        self.remove(node_id)
+        if not search:
+            return
+
+        fields_by_token: Dict[str, List[str]] = {}
+        for field, tokens in search.items():
+            for token in tokens:
+                fields_by_token.setdefault(token, []).append(field)
+        for token, fields in fields_by_token.items():
+            self._postings.setdefault(token, {})[node_id] = tuple(fields)
+        self._docs[node_id] = {"user_id": str(user_id), "node_type": node_type, "tokens": list(fields_by_token)}
+
+    def remove(self, node_id: str) -> None:
+        """Drop a node from the index."""
+        doc = self._docs.pop(node_id, None)
+        if not doc:
+            return
+        for token in doc["tokens"]:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(node_id, None)
+                if not postings:
+                    del self._postings[token]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._docs.clear()
+
+    def search(
+        self,
+        tokens: Sequence[str],
+        user_id: Any,
+        node_types: Optional[Sequence[str]] = None,
+        fields: Optional[Sequence[str]] = None,
+        limit: int = 20,
+        min_match: float = 0.0,
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank the user's nodes against blind query tokens.
+
+        Returns:
+            (node_id, score) pairs, best first, ties broken by node_id
+        """
+        fields = set(resolve_fields(fields))
+        types = set(node_types) if node_types else None
+        owner = str(user_id)
+        total = max(len(self._docs), 1)
+
+        scores: Dict[str, float] = {}
+        matched: Dict[str, int] = {}
+        for token in tokens:
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1.0 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for node_id, token_fields in postings.items():
+                weight = sum(GRAPH_SEARCH_FIELD_WEIGHTS[f] for f in token_fields if f in fields)
+                if not weight:
+                    continue
+                doc = self._docs[node_id]
+                if doc["user_id"] != owner or (types and doc["node_type"] not in types):
+                    continue
+                scores[node_id] = scores.get(node_id, 0.0) + idf * weight
+                matched[node_id] = matched.get(node_id, 0) + 1
+
+        if min_match and tokens:
+            needed = min_match * len(tokens)
+            scores = {n: s for n, s in scores.items() if matched[n] >= needed}
+
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
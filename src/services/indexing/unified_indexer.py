@@ -432,7 +432,7 @@ def get_unified_indexer() -> UnifiedIndexerService:
 # Provider Registry — data-driven config instead of per-provider if/elif
 # ---------------------------------------------------------------------------
 # creds_source:
-#   "credential_provider" → uses CredentialProvider.get_integration_credentials (needs token_saver)
+#   "credential_provider" → uses cached CredentialProvider credentials via the client registry (needs token_saver)
 #   "access_token"        → uses integration.access_token string
 #   "integration"         → passes the full UserIntegration object
 _PROVIDER_REGISTRY: dict = {}  # populated after constants are importable
@@ -467,11 +467,10 @@ def _resolve_credentials(integration, provider_cfg):
     source = provider_cfg["creds_source"]
 
     if source == "credential_provider":
-        from src.core.credential_provider import CredentialProvider
-        creds = CredentialProvider.get_integration_credentials(
+        from src.core.client_registry import get_client_registry
+        creds = get_client_registry().get_credentials(
             user_id=integration.user_id,
             provider=integration.provider,
-            auto_refresh=True,
         )
         if not creds:
             return None, None
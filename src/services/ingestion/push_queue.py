@@ -0,0 +1,438 @@
+"""
+Push Ingestion Queue
+
+Durable, coalescing queue between push webhooks (Gmail, Slack) and indexing.
+
+- Routers append events to a local SQLite file (WAL mode) and return
+  immediately, so notifications survive API restarts.
+- A worker loop claims all queued events for a (source, user) once that
+  stream has been quiet for the debounce window, or once its oldest event
+  reaches the max delay, and hands the whole group to the source's batch
+  handler. A burst of Gmail notifications becomes one delta sync.
+- Successful events are deleted; failed ones are released with backoff and
+  dead-lettered after PUSH_QUEUE_MAX_ATTEMPTS. A handler fails the whole
+  group by raising, or only some events by raising BatchFailure. Groups claimed by a worker
+  that died are reclaimed after the visibility timeout.
+
+Exposes queue depth, coalescing ratio and notification-to-indexed latency
+through get_stats().
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from ...utils.logger import setup_logger
+from ..service_constants import ServiceConstants
+
+logger = setup_logger(__name__)
+
+# Recent notification-to-indexed latencies kept for percentiles
+_LATENCY_SAMPLES = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS push_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    dedup_key TEXT,
+    received_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    claimed_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    dead INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_push_events_group ON push_events(dead, claimed_at, source, user_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_push_events_dedup ON push_events(source, dedup_key);
+"""
+
+
+@dataclass
+class QueuedEvent:
+    """A push event as stored in the queue."""
+    id: int
+    source: str
+    user_id: int
+    payload: Dict[str, Any]
+    received_at: float
+    attempts: int
+
+
+class BatchFailure(Exception):
+    """
+    Raised by a batch handler when only some events of the group failed.
+
+    The failed events are retried (or dead-lettered); the rest are acked.
+    """
+
+    def __init__(self, failed: List[QueuedEvent], error: str):
+        super().__init__(error)
+        self.failed = failed
+
+
+# handler(user_id, events) - events are oldest first; raising fails the
+# whole group, BatchFailure only the events it lists
+BatchHandler = Callable[[int, List[QueuedEvent]], Awaitable[None]]
+
+
+class PushEventQueue:
+    """
+    Durable per-(source, user) coalescing queue for push events.
+
+    Example:
+        queue = get_push_queue()
+        queue.register_handler('gmail', process_gmail_batch)
+        queue.enqueue('gmail', user_id, payload)
+        await queue.start()
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        debounce_seconds: Optional[float] = None,
+        max_delay_seconds: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        visibility_timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        poll_seconds: Optional[float] = None,
+    ):
+        self.path = path or ServiceConstants.PUSH_QUEUE_PATH
+        self.debounce_seconds = (
+            debounce_seconds if debounce_seconds is not None else ServiceConstants.PUSH_QUEUE_DEBOUNCE_SECONDS
+        )
+        self.max_delay_seconds = max_delay_seconds or ServiceConstants.PUSH_QUEUE_MAX_DELAY_SECONDS
+        self.concurrency = concurrency or ServiceConstants.PUSH_QUEUE_CONCURRENCY
+        self.visibility_timeout = visibility_timeout or ServiceConstants.PUSH_QUEUE_VISIBILITY_TIMEOUT
+        self.max_attempts = max_attempts or ServiceConstants.PUSH_QUEUE_MAX_ATTEMPTS
+        self.poll_seconds = poll_seconds or ServiceConstants.PUSH_QUEUE_POLL_SECONDS
+
+        self._handlers: Dict[str, BatchHandler] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._in_flight: Set[Tuple[str, int]] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.is_running = False
+
+        # Metrics
+        self._enqueued = 0
+        self._duplicates = 0
+        self._batches = 0
+        self._events_processed = 0
+        self._failures = 0
+        self._dead_lettered = 0
+        self._latencies: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory and self.path != ':memory:':
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def register_handler(self, source: str, handler: BatchHandler) -> None:
+        """Register the batch handler for a source ('gmail', 'slack', ...)."""
+        self._handlers[source] = handler
+
+    def enqueue(
+        self,
+        source: str,
+        user_id: int,
+        payload: Dict[str, Any],
+        dedup_key: Optional[str] = None,
+    ) -> bool:
+        """
+        Durably append a push event.
+
+        Args:
+            source: Source name with a registered handler
+            user_id: Owning user
+            payload: JSON-serializable event payload
+            dedup_key: Provider event id; redeliveries with the same key are dropped
+
+        Returns:
+            False if the event was a duplicate of one still queued
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._db().execute(
+                "INSERT OR IGNORE INTO push_events (source, user_id, payload, dedup_key, received_at, available_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (source, user_id, json.dumps(payload, default=str), dedup_key, now, now),
+            )
+        if cursor.rowcount == 0:
+            self._duplicates += 1
+            return False
+        self._enqueued += 1
+        self._notify()
+        return True
+
+    def _notify(self) -> None:
+        """Wake the worker loop (safe to call from any thread)."""
+        wakeup, task = self._wakeup, self._task
+        if wakeup is None or task is None:
+            return
+        try:
+            task.get_loop().call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass
+
+    def _ready_groups(self, now: float) -> List[Tuple[str, int]]:
+        """(source, user_id) groups that are quiet for the debounce window or overdue."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT source, user_id FROM push_events "
+                "WHERE dead = 0 AND claimed_at IS NULL AND available_at <= ? "
+                "GROUP BY source, user_id "
+                "HAVING MAX(received_at) <= ? OR MIN(received_at) <= ? "
+                "ORDER BY MIN(received_at)",
+                (now, now - self.debounce_seconds, now - self.max_delay_seconds),
+            ).fetchall()
+        return [(source, user_id) for source, user_id in rows if (source, user_id) not in self._in_flight]
+
+    def _claim(self, source: str, user_id: int, now: float) -> List[QueuedEvent]:
+        """Atomically claim every available event of a group."""
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT id, payload, received_at, attempts FROM push_events "
+                    "WHERE source = ? AND user_id = ? AND dead = 0 AND claimed_at IS NULL AND available_at <= ? "
+                    "ORDER BY id",
+                    (source, user_id, now),
+                ).fetchall()
+                if rows:
+                    conn.executemany(
+                        "UPDATE push_events SET claimed_at = ? WHERE id = ?",
+                        [(now, row[0]) for row in rows],
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return [
+            QueuedEvent(id=row[0], source=source, user_id=user_id, payload=json.loads(row[1]),
+                        received_at=row[2], attempts=row[3])
+            for row in rows
+        ]
+
+    def _ack(self, events: List[QueuedEvent]) -> None:
+        with self._lock:
+            self._db().executemany("DELETE FROM push_events WHERE id = ?", [(e.id,) for e in events])
+
+    def _release(self, events: List[QueuedEvent], error: str) -> None:
+        """Return a failed group to the queue with backoff, or dead-letter it."""
+        now = time.time()
+        updates = []
+        for event in events:
+            attempts = event.attempts + 1
+            dead = 1 if attempts >= self.max_attempts else 0
+            self._dead_lettered += dead
+            updates.append((attempts, now + min(2 ** attempts, 300), error[:500], dead, event.id))
+        with self._lock:
+            self._db().executemany(
+                "UPDATE push_events SET claimed_at = NULL, attempts = ?, available_at = ?, "
+                "last_error = ?, dead = ? WHERE id = ?",
+                updates,
+            )
+
+    def _reclaim_expired(self, now: float) -> int:
+        """Release groups claimed by a worker that never finished them."""
+        with self._lock:
+            cursor = self._db().execute(
+                "UPDATE push_events SET claimed_at = NULL WHERE claimed_at IS NOT NULL AND claimed_at <= ?",
+                (now - self.visibility_timeout,),
+            )
+        if cursor.rowcount:
+            logger.warning(f"[PushQueue] Reclaimed {cursor.rowcount} events from expired claims")
+        return cursor.rowcount
+
+    # ------------------------------------------------------------------
+    # Processing
+    # ------------------------------------------------------------------
+
+    async def process_ready(self) -> int:
+        """
+        Run one pass: claim every ready group and process them concurrently.
+
+        Returns:
+            Number of batches processed
+        """
+        now = time.time()
+        await asyncio.to_thread(self._reclaim_expired, now)
+        groups = await asyncio.to_thread(self._ready_groups, now)
+        if not groups:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(source: str, user_id: int) -> bool:
+            async with semaphore:
+                return await self._run_group(source, user_id)
+
+        results = await asyncio.gather(*(run(source, user_id) for source, user_id in groups))
+        return sum(1 for processed in results if processed)
+
+    async def _run_group(self, source: str, user_id: int) -> bool:
+        key = (source, user_id)
+        if key in self._in_flight:
+            return False
+        self._in_flight.add(key)
+        try:
+            events = await asyncio.to_thread(self._claim, source, user_id, time.time())
+            if not events:
+                return False
+
+            handler = self._handlers.get(source)
+            try:
+                if handler is None:
+                    raise RuntimeError(f"No handler registered for source '{source}'")
+                await handler(user_id, events)
+            except BatchFailure as e:
+                self._failures += 1
+                failed_ids = {event.id for event in e.failed}
+                logger.error(
+                    f"[PushQueue] {source} batch for user {user_id}: "
+                    f"{len(failed_ids)}/{len(events)} events failed: {e}"
+                )
+                await asyncio.to_thread(self._release, e.failed, str(e))
+                events = [event for event in events if event.id not in failed_ids]
+                if not events:
+                    return True
+            except Exception as e:
+                self._failures += 1
+                logger.error(f"[PushQueue] {source} batch for user {user_id} failed ({len(events)} events): {e}")
+                await asyncio.to_thread(self._release, events, str(e))
+                return True
+
+            await asyncio.to_thread(self._ack, events)
+            finished = time.time()
+            self._batches += 1
+            self._events_processed += len(events)
+            self._latencies.extend(finished - event.received_at for event in events)
+            if len(events) > 1:
+                logger.info(f"[PushQueue] Coalesced {len(events)} {source} events for user {user_id}")
+            return True
+        finally:
+            self._in_flight.discard(key)
+
+    async def start(self) -> None:
+        """Start the background worker loop."""
+        if self.is_running:
+            logger.warning("Push queue worker already running")
+            return
+        self.is_running = True
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._worker_loop())
+        logger.info(f"Push queue worker started ({self.path})")
+
+    async def stop(self) -> None:
+        """Stop the worker loop; unprocessed events stay queued on disk."""
+        if not self.is_running:
+            return
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        logger.info("Push queue worker stopped")
+
+    async def _worker_loop(self) -> None:
+        while self.is_running:
+            try:
+                await self.process_ready()
+            except Exception as e:
+                logger.error(f"Error in push queue worker loop: {e}", exc_info=True)
+
+            # Woken early by enqueue(); a group only becomes ready once its
+            # debounce window passes, so keep polling at a short interval.
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, coalescing ratio and notification-to-indexed latency."""
+        with self._lock:
+            depth_rows = self._db().execute(
+                "SELECT source, COUNT(*), MIN(received_at) FROM push_events WHERE dead = 0 GROUP BY source"
+            ).fetchall()
+            dead_letter = self._db().execute("SELECT COUNT(*) FROM push_events WHERE dead = 1").fetchone()[0]
+
+        now = time.time()
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 3)
+
+        return {
+            "running": self.is_running,
+            "depth": sum(row[1] for row in depth_rows),
+            "depth_by_source": {row[0]: row[1] for row in depth_rows},
+            "oldest_pending_seconds": round(now - min(row[2] for row in depth_rows), 1) if depth_rows else None,
+            "dead_letter": dead_letter,
+            "enqueued": self._enqueued,
+            "duplicates_dropped": self._duplicates,
+            "batches": self._batches,
+            "events_processed": self._events_processed,
+            "coalescing_ratio": round(self._events_processed / self._batches, 2) if self._batches else None,
+            "failures": self._failures,
+            "dead_lettered": self._dead_lettered,
+            "latency_seconds": {
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(latencies[-1], 3) if latencies else None,
+                "samples": len(latencies),
+            },
+        }
+
+
+_push_queue: Optional[PushEventQueue] = None
+
+
+def get_push_queue() -> PushEventQueue:
+    """Get or create the global push queue instance."""
+    global _push_queue
+    if _push_queue is None:
+        _push_queue = PushEventQueue()
+    return _push_queue
+
+
+async def start_push_queue(handlers: Dict[str, BatchHandler]) -> None:
+    """Register batch handlers and start the global push queue worker."""
+    queue = get_push_queue()
+    for source, handler in handlers.items():
+        queue.register_handler(source, handler)
+    await queue.start()
+
+
+async def stop_push_queue() -> None:
+    """Stop the global push queue worker."""
+    await get_push_queue().stop()
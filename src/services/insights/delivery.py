@@ -16,10 +16,14 @@ actively surfacing them to help users:
 
 Version: 1.0.0
 """
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Iterable, Deque
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict, deque
+from dataclasses import dataclass
 from enum import Enum
 import asyncio
+import time
+import zlib
 
 from src.utils.logger import setup_logger
 from src.utils.config import Config
@@ -37,6 +41,20 @@ class InsightPriority(str, Enum):
     LOW = "low"            # Store for context, don't push
 
 
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse an ISO timestamp from the graph as naive UTC."""
+    if not value:
+        return None
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    except Exception:
+        return None
+
+
 class DeliveryChannel(str, Enum):
     """Available channels for insight delivery."""
     PUSH = "push"          # Push notification
@@ -45,6 +63,15 @@ class DeliveryChannel(str, Enum):
     CHAT = "chat"          # Show in chat interface
 
 
+@dataclass
+class DeliveryPolicy:
+    """Per-user delivery limits (backpressure)."""
+    max_per_hour: int = 6                   # Pushed (urgent/high) insights per rolling hour
+    quiet_hours_start: Optional[int] = 22   # 10 PM, user's timezone
+    quiet_hours_end: Optional[int] = 7      # 7 AM
+    timezone: Optional[str] = None          # Defaults to the configured timezone
+
+
 class InsightDeliveryService:
     """
     Service for delivering insights to users proactively.
@@ -54,6 +81,14 @@ class InsightDeliveryService:
     2. Score and prioritize insights for each user
     3. Deliver via appropriate channels
     4. Track delivery status and user engagement
+    
+    Delivery runs as a sharded pipeline: only users with pending insights are
+    visited (indexed Insight.delivered / queued_for_digest / user_id lookup),
+    users are partitioned into shards by user_id, shards run concurrently with
+    bounded per-shard concurrency and a per-user timeout, and every user is
+    subject to a rolling-hour rate limit and quiet hours (urgent insights
+    bypass quiet hours). Per-shard throughput and lag are kept in
+    shard_metrics.
     """
     
     # Scoring weights for insight prioritization
@@ -71,12 +106,34 @@ class InsightDeliveryService:
     # Time-sensitivity boost (insights about events happening soon)
     TIME_SENSITIVITY_BOOST = 0.3
     
-    def __init__(self, config: Config, graph_manager: KnowledgeGraphManager):
+    # Limit per check to avoid notification fatigue
+    MAX_INSIGHTS_PER_CHECK = 3
+    
+    # Sharded pipeline settings
+    SHARD_COUNT = 8
+    CONCURRENCY_PER_SHARD = 4
+    USER_TIMEOUT_SECONDS = 30
+    
+    def __init__(
+        self,
+        config: Config,
+        graph_manager: KnowledgeGraphManager,
+        shard_count: Optional[int] = None,
+        concurrency_per_shard: Optional[int] = None,
+    ):
         self.config = config
         self.graph = graph_manager
         self.is_running = False
         self._stop_event = asyncio.Event()
         
+        self.shard_count = max(1, shard_count or self.SHARD_COUNT)
+        self.concurrency_per_shard = max(1, concurrency_per_shard or self.CONCURRENCY_PER_SHARD)
+        self.shard_metrics: Dict[int, Dict[str, Any]] = {}
+        
+        self._default_policy = DeliveryPolicy()
+        self._user_policies: Dict[int, DeliveryPolicy] = {}
+        self._recent_deliveries: Dict[int, Deque[float]] = defaultdict(deque)
+        
     async def start(self):
         """Start the insight delivery loop."""
         if self.is_running:
@@ -110,49 +167,184 @@ class InsightDeliveryService:
                 logger.error(f"[InsightDelivery] Error in loop: {e}", exc_info=True)
                 await asyncio.sleep(60)
     
-    async def check_and_deliver_all_users(self) -> Dict[str, int]:
+    async def check_and_deliver_all_users(self, shards: Optional[Iterable[int]] = None) -> Dict[str, int]:
         """
-        Check for undelivered insights for all users and deliver them.
+        Deliver pending insights for every user that has any.
+        
+        Args:
+            shards: Only process these shard ids (e.g. one per worker); all by default
         
         Returns:
             Stats on insights processed and delivered
         """
-        stats = {"processed": 0, "delivered": 0, "skipped": 0}
+        stats = {
+            "users": 0, "processed": 0, "delivered": 0, "skipped": 0,
+            "deferred": 0, "rate_limited": 0, "errors": 0,
+        }
+        wanted = set(shards) if shards is not None else None
+        
+        by_shard: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for record in await self._get_pending_users():
+            user_id = record.get("user_id")
+            if not user_id:
+                continue
+            shard = self.shard_for(user_id)
+            if wanted is None or shard in wanted:
+                by_shard[shard].append(record)
+        
+        results = await asyncio.gather(
+            *(self._deliver_shard(shard, records) for shard, records in by_shard.items())
+        )
+        for shard_stats in results:
+            for key in stats:
+                stats[key] += shard_stats.get(key, 0)
+        
+        if stats["users"]:
+            logger.info(f"[InsightDelivery] Delivery run complete: {stats}")
+        return stats
+    
+    def shard_for(self, user_id: Any) -> int:
+        """Stable shard id for a user."""
+        try:
+            return int(user_id) % self.shard_count
+        except (TypeError, ValueError):
+            return zlib.crc32(str(user_id).encode("utf-8")) % self.shard_count
+    
+    async def _get_pending_users(self) -> List[Dict[str, Any]]:
+        """
+        Users with pending insights, oldest backlog first.
         
-        # Get all users with undelivered insights - AQL version
+        Uses the persistent index on Insight (delivered, queued_for_digest,
+        user_id) instead of scanning every insight.
+        """
         query = """
         FOR i IN Insight
-            FILTER i.delivered == null OR i.delivered == false
-            RETURN DISTINCT i.user_id
+            FILTER i.delivered IN [null, false]
+               AND i.queued_for_digest IN [null, false]
+            COLLECT user_id = i.user_id
+            AGGREGATE pending = COUNT(1), oldest = MIN(i.created_at)
+            SORT oldest ASC
+            RETURN { user_id: user_id, pending: pending, oldest: oldest }
         """
-        
         try:
-            users = await self.graph.execute_query(query)
-            
-            for user_record in (users or []):
-                user_id = user_record.get("user_id")
-                if user_id:
-                    user_stats = await self.check_and_deliver(user_id)
-                    stats["processed"] += user_stats.get("processed", 0)
-                    stats["delivered"] += user_stats.get("delivered", 0)
-                    stats["skipped"] += user_stats.get("skipped", 0)
-                    
+            return await self.graph.execute_query(query) or []
         except Exception as e:
             logger.error(f"[InsightDelivery] Error getting users: {e}")
-            
-        return stats
+            return []
+    
+    async def _deliver_shard(self, shard: int, records: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Process one shard's users with bounded concurrency and record shard metrics."""
+        stats = defaultdict(int)
+        semaphore = asyncio.Semaphore(self.concurrency_per_shard)
+        started = time.monotonic()
+        now = datetime.utcnow()
+        max_lag = 0.0
+        
+        for record in records:
+            oldest = _parse_timestamp(record.get("oldest"))
+            if oldest:
+                max_lag = max(max_lag, (now - oldest).total_seconds())
+        
+        async def _run_user(user_id: int):
+            async with semaphore:
+                try:
+                    user_stats = await asyncio.wait_for(
+                        self.check_and_deliver(user_id), timeout=self.USER_TIMEOUT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"[InsightDelivery] Delivery for user {user_id} timed out (shard {shard})")
+                    stats["errors"] += 1
+                    return
+                except Exception as e:
+                    logger.error(f"[InsightDelivery] Delivery for user {user_id} failed: {e}")
+                    stats["errors"] += 1
+                    return
+                stats["users"] += 1
+                for key, value in user_stats.items():
+                    stats[key] += value
+        
+        await asyncio.gather(*(_run_user(record["user_id"]) for record in records))
+        
+        duration = time.monotonic() - started
+        self.shard_metrics[shard] = {
+            **stats,
+            "pending_users": len(records),
+            "duration_seconds": round(duration, 3),
+            "users_per_second": round(stats["users"] / duration, 2) if duration > 0 else None,
+            "max_lag_seconds": round(max_lag, 1),
+            "last_run_at": datetime.utcnow().isoformat(),
+        }
+        return dict(stats)
+    
+    def get_delivery_metrics(self) -> Dict[str, Any]:
+        """Per-shard throughput and lag from the most recent runs."""
+        return {
+            "shard_count": self.shard_count,
+            "concurrency_per_shard": self.concurrency_per_shard,
+            "shards": dict(self.shard_metrics),
+        }
+    
+    # ===================================================================
+    # PER-USER BACKPRESSURE
+    # ===================================================================
+    
+    def get_policy(self, user_id: int) -> DeliveryPolicy:
+        """Delivery policy for a user (defaults if not set)."""
+        return self._user_policies.get(user_id, self._default_policy)
+    
+    def set_policy(self, user_id: int, policy: DeliveryPolicy) -> DeliveryPolicy:
+        """Override the delivery policy for a user."""
+        self._user_policies[user_id] = policy
+        return policy
+    
+    def _remaining_budget(self, user_id: int, policy: DeliveryPolicy) -> int:
+        """Deliveries left in the user's rolling one-hour window."""
+        window = self._recent_deliveries[user_id]
+        cutoff = time.time() - 3600
+        while window and window[0] < cutoff:
+            window.popleft()
+        return max(0, policy.max_per_hour - len(window))
+    
+    def _record_delivery(self, user_id: int) -> None:
+        self._recent_deliveries[user_id].append(time.time())
+    
+    def _is_quiet_hours(self, policy: DeliveryPolicy) -> bool:
+        """Check if the current time falls within the policy's quiet hours."""
+        if policy.quiet_hours_start is None or policy.quiet_hours_end is None:
+            return False
+        
+        try:
+            from src.core.calendar.utils import get_user_timezone
+            import pytz
+            
+            tz_name = policy.timezone or (get_user_timezone(self.config) if self.config else "UTC")
+            now_hour = datetime.now(pytz.timezone(tz_name)).hour
+            
+            start = policy.quiet_hours_start
+            end = policy.quiet_hours_end
+            if start <= end:
+                return start <= now_hour < end
+            # Wraps midnight (e.g., 22-7)
+            return now_hour >= start or now_hour < end
+        
+        except Exception:
+            return False
     
     async def check_and_deliver(self, user_id: int) -> Dict[str, int]:
         """
         Check for undelivered insights for a specific user.
         
+        Urgent/high insights are pushed subject to the user's hourly budget;
+        during quiet hours only urgent ones are. Anything held back stays
+        pending for a later run.
+        
         Args:
             user_id: User to check insights for
             
         Returns:
             Stats on insights processed
         """
-        stats = {"processed": 0, "delivered": 0, "skipped": 0}
+        stats = {"processed": 0, "delivered": 0, "skipped": 0, "deferred": 0, "rate_limited": 0}
         
         # Get undelivered insights for user
         insights = await self._get_pending_insights(user_id)
@@ -161,17 +353,29 @@ class InsightDeliveryService:
         if not insights:
             return stats
         
+        policy = self.get_policy(user_id)
+        quiet = self._is_quiet_hours(policy)
+        budget = self._remaining_budget(user_id, policy)
+        
         # Score and prioritize
         scored = self._score_for_delivery(insights)
         
-        # Get top insights (limit to 3 per check to avoid notification fatigue)
-        for insight in scored[:3]:
+        for insight in scored[:self.MAX_INSIGHTS_PER_CHECK]:
             priority = self._determine_priority(insight)
             
             if priority in [InsightPriority.URGENT, InsightPriority.HIGH]:
+                if quiet and priority != InsightPriority.URGENT:
+                    stats["deferred"] += 1
+                    continue
+                if budget <= 0:
+                    stats["rate_limited"] += 1
+                    continue
+                
                 delivered = await self._deliver(user_id, insight, priority)
                 if delivered:
                     stats["delivered"] += 1
+                    budget -= 1
+                    self._record_delivery(user_id)
                 else:
                     stats["skipped"] += 1
             else:
@@ -186,7 +390,8 @@ class InsightDeliveryService:
         query = """
         FOR i IN Insight
             FILTER (i.user_id == @user_id OR i.user_id == null)
-               AND (i.delivered == null OR i.delivered == false)
+               AND i.delivered IN [null, false]
+               AND i.queued_for_digest IN [null, false]
                AND i.confidence >= @min_confidence
             
             LET related_entities = (
@@ -7,10 +7,16 @@ from .notification_service import (
     NotificationType,
     NotificationPriority,
 )
+from .outbox import (
+    NotificationOutboxWorker,
+    get_notification_outbox,
+)
 
 __all__ = [
     "NotificationService",
     "NotificationRequest",
     "NotificationType",
     "NotificationPriority",
+    "NotificationOutboxWorker",
+    "get_notification_outbox",
 ]
@@ -5,6 +5,9 @@ Handles sending notifications across all channels:
 - Email
 - In-app notifications (stored in database)
 - Push notifications (via web push or mobile)
+
+Email and push are delivered asynchronously through the notification
+outbox (outbox.py), written in the caller's transaction.
 """
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
@@ -14,7 +17,9 @@ from dataclasses import dataclass
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, and_
 
-from src.database.models import InAppNotification, User, UserSettings
+from src.database.models import InAppNotification, NotificationOutbox, UserSettings
+from src.services.notifications.outbox import OUTBOX_CHANNELS, get_notification_outbox
+from src.services.user_cache import get_user_cache, snapshot_row
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -72,8 +77,8 @@ class NotificationService:
     
     Supports multiple channels:
     - In-app (stored in database, displayed in app UI)
-    - Email (via send_email task)
-    - Push (future: via Firebase/APNs)
+    - Email (via the notification outbox)
+    - Push (via the notification outbox, Firebase/APNs)
     """
     
     def __init__(self, db_session: AsyncSession):
@@ -82,18 +87,29 @@ class NotificationService:
     async def send_notification(
         self,
         request: NotificationRequest,
-        channels: Optional[List[str]] = None
+        channels: Optional[List[str]] = None,
+        commit: bool = True,
+        idempotency_key: Optional[str] = None,
     ) -> Dict[str, bool]:
         """
         Send notification to user across specified channels.
         
+        The in-app notification and an outbox row for email/push are added to
+        this service's session; the outbox worker delivers the external
+        channels (see outbox.py), so this never waits on SMTP or FCM.
+        
         Args:
             request: NotificationRequest with notification details
             channels: List of channels to send to. If None, uses user preferences.
                      Options: ['in_app', 'email', 'push']
+            commit: Commit the session. Pass False to send as part of the
+                    caller's own transaction (the notification then goes out
+                    only if that transaction commits).
+            idempotency_key: Optional key; a repeat send with the same key is
+                    dropped
         
         Returns:
-            Dict with channel -> success status
+            Dict with channel -> accepted status
         """
         results = {}
         
@@ -101,33 +117,64 @@ class NotificationService:
         if channels is None:
             channels = await self._get_user_notification_channels(request.user_id)
         
+        if idempotency_key and await self._already_sent(idempotency_key):
+            logger.debug(f"[Notifications] Duplicate notification dropped ({idempotency_key})")
+            return {channel: True for channel in channels}
+        
         # Always send in-app notification (unless explicitly excluded)
         if 'in_app' in channels:
-            results['in_app'] = await self._send_in_app(request)
+            results['in_app'] = self._stage_in_app(request)
         
-        # Send email if enabled
-        if 'email' in channels:
-            results['email'] = await self._send_email(request)
+        # Email and push go through the outbox
+        external = [channel for channel in channels if channel in OUTBOX_CHANNELS]
+        if external:
+            accepted = self._stage_outbox(request, external, idempotency_key)
+            results.update({channel: accepted for channel in external})
+        elif idempotency_key:
+            # Nothing to deliver, but record the key so in-app-only repeats
+            # are dropped too
+            self._stage_idempotency_marker(request.user_id, idempotency_key)
         
-        # Send push if enabled
-        if 'push' in channels:
-            results['push'] = await self._send_push(request)
+        if commit:
+            try:
+                await self.db.commit()
+            except Exception as e:
+                logger.error(f"[Notifications] Failed to store notification for user {request.user_id}: {e}")
+                await self.db.rollback()
+                return {channel: False for channel in results}
+            if external:
+                get_notification_outbox().notify()
         
         return results
     
+    async def _already_sent(self, idempotency_key: str) -> bool:
+        """Whether a notification with this key was already sent (outbox rows and markers)."""
+        try:
+            result = await self.db.execute(
+                select(NotificationOutbox.id).where(NotificationOutbox.idempotency_key == idempotency_key)
+            )
+            return result.first() is not None
+        except Exception as e:
+            logger.warning(f"[Notifications] Idempotency check failed: {e}")
+            return False
+    
     async def _get_user_notification_channels(self, user_id: int) -> List[str]:
         """Get user's preferred notification channels from settings."""
         channels = ['in_app']  # Always include in-app
         
-        try:
+        async def load_settings():
             stmt = select(UserSettings).where(UserSettings.user_id == user_id)
             result = await self.db.execute(stmt)
-            settings = result.scalar_one_or_none()
+            row = result.scalar_one_or_none()
+            return snapshot_row(row) if row else {}
+        
+        try:
+            settings = await get_user_cache('settings').get_or_load(user_id, load_settings)
             
             if settings:
-                if settings.email_notifications:
+                if settings.get('email_notifications'):
                     channels.append('email')
-                if settings.push_notifications:
+                if settings.get('push_notifications'):
                     channels.append('push')
             else:
                 # Default to email if no settings
@@ -139,8 +186,8 @@ class NotificationService:
         
         return channels
     
-    async def _send_in_app(self, request: NotificationRequest) -> bool:
-        """Store notification in database for in-app display."""
+    def _stage_in_app(self, request: NotificationRequest) -> bool:
+        """Add the in-app notification to the session."""
         try:
             expires_at = None
             if request.expires_in_hours:
@@ -160,64 +207,56 @@ class NotificationService:
             )
             
             self.db.add(notification)
-            await self.db.commit()
-            
-            logger.info(f"[Notifications] In-app notification created for user {request.user_id}")
             return True
             
         except Exception as e:
             logger.error(f"[Notifications] Failed to create in-app notification: {e}")
             return False
     
-    async def _send_email(self, request: NotificationRequest) -> bool:
-        """Send email notification."""
+    def _stage_outbox(
+        self,
+        request: NotificationRequest,
+        channels: List[str],
+        idempotency_key: Optional[str] = None,
+    ) -> bool:
+        """Add an outbox row for the external channels to the session."""
         try:
-            # Get user email
-            stmt = select(User.email).where(User.id == request.user_id)
-            result = await self.db.execute(stmt)
-            email = result.scalar_one_or_none()
-            
-            if not email:
-                logger.warning(f"[Notifications] No email for user {request.user_id}")
-                return False
-            
-            # Use Celery task for async email sending
-            from src.workers.tasks.email_tasks import send_email
-            
-            # Build HTML email body
-            html_body = self._build_email_html(request)
-            
-            send_email.delay(
-                to=email,
-                subject=request.title,
-                body=html_body,
-                user_id=str(request.user_id),
-                html=True,
-            )
-            
-            logger.info(f"[Notifications] Email queued for {email}")
+            self.db.add(NotificationOutbox(
+                user_id=request.user_id,
+                idempotency_key=idempotency_key,
+                payload={
+                    'title': request.title,
+                    'message': request.message,
+                    'notification_type': request.notification_type.value,
+                    'priority': request.priority.value,
+                    'action_url': request.action_url,
+                    'action_label': request.action_label,
+                },
+                channels=channels,
+                delivered_channels=[],
+            ))
             return True
             
         except Exception as e:
-            logger.error(f"[Notifications] Failed to send email: {e}")
+            logger.error(f"[Notifications] Failed to queue notification: {e}")
             return False
     
-    async def _send_push(self, request: NotificationRequest) -> bool:
-        """Send push notification (placeholder for future implementation)."""
-        # TODO: Implement push notifications via Firebase/APNs
-        # For now, log and return True to indicate it was "sent"
-        logger.info(f"[Notifications] Push notification queued for user {request.user_id}: {request.title}")
-        
-        # In production, this would:
-        # 1. Look up user's push tokens from database
-        # 2. Send via Firebase Cloud Messaging (FCM) for web/Android
-        # 3. Send via APNs for iOS
-        # 4. Handle failures and token cleanup
-        
-        return True
+    def _stage_idempotency_marker(self, user_id: int, idempotency_key: str) -> None:
+        """Add an already-delivered, channel-less outbox row holding the key."""
+        now = datetime.utcnow()
+        self.db.add(NotificationOutbox(
+            user_id=user_id,
+            idempotency_key=idempotency_key,
+            payload={},
+            channels=[],
+            delivered_channels=[],
+            status='delivered',
+            delivered_at=now,
+        ))
     
-    def _build_email_html(self, request: NotificationRequest) -> str:
-        """Build HTML email body for notification."""
+    @staticmethod
+    def build_email_html(payload: Dict[str, Any]) -> str:
+        """Build HTML email body from an outbox notification payload."""
         priority_colors = {
             'low': '#6b7280',
             'normal': '#3b82f6',
@@ -225,16 +264,16 @@ class NotificationService:
             'urgent': '#ef4444',
         }
         
-        color = priority_colors.get(request.priority.value, '#3b82f6')
+        color = priority_colors.get(payload.get('priority'), '#3b82f6')
         
         action_button = ""
-        if request.action_url and request.action_label:
+        if payload.get('action_url') and payload.get('action_label'):
             action_button = f'''
             <p style="margin: 20px 0;">
-                <a href="{request.action_url}" 
+                <a href="{payload['action_url']}" 
                    style="background: {color}; color: white; padding: 12px 24px; 
                           border-radius: 8px; text-decoration: none; font-weight: 500;">
-                    {request.action_label}
+                    {payload['action_label']}
                 </a>
             </p>
             '''
@@ -244,10 +283,10 @@ class NotificationService:
                     color: #1f2937; max-width: 600px; margin: 0 auto; padding: 20px;">
             <div style="border-left: 4px solid {color}; padding-left: 16px;">
                 <h2 style="color: {color}; margin: 0 0 12px 0; font-size: 20px;">
-                    {request.title}
+                    {payload.get('title', '')}
                 </h2>
                 <p style="margin: 0; line-height: 1.6; color: #4b5563;">
-                    {request.message}
+                    {payload.get('message', '')}
                 </p>
             </div>
             {action_button}
@@ -0,0 +1,470 @@
+"""
+Notification Outbox
+
+Transactional outbox between NotificationService and the external channels
+(email, push).
+
+- NotificationService.send_notification() writes the in-app notification and
+  one outbox row for the remaining channels in the caller's transaction, so
+  sending is a couple of inserts on the request path and a rolled-back
+  change never notifies anyone.
+- The outbox worker claims ready rows in batches (token-keyed conditional
+  update, so several workers never deliver the same row), groups them by
+  channel and runs the channel senders concurrently. Senders batch their
+  channel: one Gmail client per user for email, FCM send_each for push.
+- Channels that succeeded are recorded on the row and never re-sent;
+  failed channels are retried with exponential backoff and the row is
+  marked failed after NOTIFICATION_OUTBOX_MAX_ATTEMPTS. Rows held by a
+  worker that died are reclaimed after the claim timeout.
+- Delivered and failed rows, including the channel-less rows that only hold
+  an idempotency key, are deleted by cleanup_old() after the retention
+  period (daily Celery task), so keys deduplicate sends within that window.
+
+Exposes outbox depth, oldest pending age and enqueue-to-delivery lag
+through get_stats().
+"""
+import asyncio
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Optional
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from src.database.models import NotificationOutbox
+from src.services.service_constants import ServiceConstants
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Channels delivered through the outbox (in-app is written directly)
+OUTBOX_CHANNELS = ('email', 'push')
+
+# Recent enqueue-to-delivery lags kept for percentiles
+_LAG_SAMPLES = 1000
+
+
+@dataclass
+class OutboxDelivery:
+    """One outbox row as handed to a channel sender."""
+    id: int
+    user_id: int
+    payload: Dict[str, Any]
+    created_at: datetime
+    attempts: int
+    channels: List[str] = field(default_factory=list)
+    delivered_channels: List[str] = field(default_factory=list)
+
+
+# sender(deliveries) -> {outbox id: delivered}; missing ids count as failed
+ChannelSender = Callable[[List[OutboxDelivery]], Awaitable[Dict[int, bool]]]
+
+SessionFactory = Callable[[], Any]
+
+
+@contextmanager
+def _default_session() -> Iterator[Session]:
+    from src.database import get_db_context
+    with get_db_context() as session:
+        yield session
+
+
+class NotificationOutboxWorker:
+    """
+    Drains the notification outbox and fans rows out to channel senders.
+
+    Example:
+        worker = get_notification_outbox()
+        worker.register_sender('email', send_email_batch)
+        await worker.start()
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[SessionFactory] = None,
+        batch_size: int = ServiceConstants.NOTIFICATION_OUTBOX_BATCH_SIZE,
+        poll_seconds: float = ServiceConstants.NOTIFICATION_OUTBOX_POLL_SECONDS,
+        claim_timeout: float = ServiceConstants.NOTIFICATION_OUTBOX_CLAIM_TIMEOUT,
+        retry_seconds: float = ServiceConstants.NOTIFICATION_OUTBOX_RETRY_SECONDS,
+        max_attempts: int = ServiceConstants.NOTIFICATION_OUTBOX_MAX_ATTEMPTS,
+    ):
+        self.session_factory = session_factory or _default_session
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.claim_timeout = claim_timeout
+        self.retry_seconds = retry_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = uuid.uuid4().hex[:12]
+
+        self._senders: Dict[str, ChannelSender] = {}
+        self.is_running = False
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+        self._batches = 0
+        self._delivered = 0
+        self._failed = 0
+        self._channel_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"sent": 0, "failed": 0})
+        self._lags: Deque[float] = deque(maxlen=_LAG_SAMPLES)
+
+    def register_sender(self, channel: str, sender: ChannelSender) -> None:
+        """Register the batch sender for a channel."""
+        self._senders[channel] = sender
+
+    def notify(self) -> None:
+        """Wake the worker early (called after an in-process enqueue commits)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    # Queue operations (sync, run in a thread)
+    # ------------------------------------------------------------------
+
+    def claim_ready(self, now: Optional[datetime] = None) -> List[OutboxDelivery]:
+        """Claim up to batch_size rows that are ready for delivery."""
+        now = now or datetime.utcnow()
+        token = f"{self.worker_id}:{uuid.uuid4().hex}"
+        with self.session_factory() as session:
+            self._reclaim_expired(session, now)
+            candidates = session.execute(
+                select(NotificationOutbox.id)
+                .where(and_(NotificationOutbox.status == 'pending', NotificationOutbox.available_at <= now))
+                .order_by(NotificationOutbox.available_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+            if not candidates:
+                return []
+
+            session.execute(
+                update(NotificationOutbox)
+                .where(and_(NotificationOutbox.id.in_(candidates), NotificationOutbox.status == 'pending'))
+                .values(status='claimed', claim_token=token, claimed_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+
+            rows = session.execute(
+                select(NotificationOutbox).where(NotificationOutbox.claim_token == token)
+            ).scalars().all()
+            return [
+                OutboxDelivery(
+                    id=row.id,
+                    user_id=row.user_id,
+                    payload=row.payload or {},
+                    created_at=row.created_at,
+                    attempts=row.attempts or 0,
+                    channels=list(row.channels or []),
+                    delivered_channels=list(row.delivered_channels or []),
+                )
+                for row in rows
+            ]
+
+    def _reclaim_expired(self, session: Session, now: datetime) -> None:
+        """Return rows held past the claim timeout to the outbox."""
+        expired = now - timedelta(seconds=self.claim_timeout)
+        result = session.execute(
+            update(NotificationOutbox)
+            .where(and_(NotificationOutbox.status == 'claimed', NotificationOutbox.claimed_at < expired))
+            .values(status='pending', claim_token=None, claimed_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            logger.warning(f"[Outbox] Reclaimed {result.rowcount} notifications from an expired claim")
+
+    def _settle(self, deliveries: List[OutboxDelivery], errors: Dict[int, str], now: datetime) -> None:
+        """Record per-channel progress; finish, retry with backoff or fail each row."""
+        with self.session_factory() as session:
+            for delivery in deliveries:
+                remaining = [c for c in delivery.channels if c not in delivery.delivered_channels]
+                values: Dict[str, Any] = {
+                    'delivered_channels': delivery.delivered_channels,
+                    'claim_token': None,
+                    'claimed_at': None,
+                }
+                if not remaining:
+                    values.update(status='delivered', delivered_at=now)
+                else:
+                    attempts = delivery.attempts + 1
+                    values.update(attempts=attempts, last_error=errors.get(delivery.id, f"undelivered: {remaining}"))
+                    if attempts >= self.max_attempts:
+                        values['status'] = 'failed'
+                    else:
+                        backoff = self.retry_seconds * (2 ** (attempts - 1))
+                        values.update(status='pending', available_at=now + timedelta(seconds=backoff))
+                session.execute(
+                    update(NotificationOutbox)
+                    .where(NotificationOutbox.id == delivery.id)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    async def _run_sender(self, channel: str, deliveries: List[OutboxDelivery]) -> Dict[int, bool]:
+        sender = self._senders.get(channel)
+        if sender is None:
+            logger.warning(f"[Outbox] No sender registered for channel '{channel}'")
+            return {}
+        try:
+            return await sender(deliveries) or {}
+        except Exception as e:
+            logger.error(f"[Outbox] {channel} sender failed for {len(deliveries)} notifications: {e}")
+            return {}
+
+    async def process_ready(self) -> int:
+        """
+        Deliver every ready outbox row.
+
+        Returns:
+            Number of notifications fully delivered
+        """
+        delivered = 0
+        while True:
+            batch = await asyncio.to_thread(self.claim_ready)
+            if not batch:
+                return delivered
+
+            by_channel: Dict[str, List[OutboxDelivery]] = defaultdict(list)
+            for delivery in batch:
+                for channel in delivery.channels:
+                    if channel not in delivery.delivered_channels:
+                        by_channel[channel].append(delivery)
+
+            channels = list(by_channel)
+            outcomes = await asyncio.gather(*(self._run_sender(c, by_channel[c]) for c in channels))
+
+            errors: Dict[int, str] = {}
+            for channel, results in zip(channels, outcomes):
+                stats = self._channel_stats[channel]
+                for delivery in by_channel[channel]:
+                    if results.get(delivery.id):
+                        delivery.delivered_channels.append(channel)
+                        stats["sent"] += 1
+                    else:
+                        errors[delivery.id] = f"{channel} delivery failed"
+                        stats["failed"] += 1
+
+            now = datetime.utcnow()
+            await asyncio.to_thread(self._settle, batch, errors, now)
+
+            done = [d for d in batch if d.id not in errors]
+            self._lags.extend((now - d.created_at).total_seconds() for d in done if d.created_at)
+            self._batches += 1
+            self._delivered += len(done)
+            self._failed += len(errors)
+            delivered += len(done)
+            if len(batch) < self.batch_size:
+                return delivered
+
+    async def start(self) -> None:
+        """Start the background worker loop."""
+        if self.is_running:
+            logger.warning("Notification outbox worker already running")
+            return
+        self.is_running = True
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._worker_loop())
+        logger.info(f"Notification outbox worker started ({self.worker_id})")
+
+    async def stop(self) -> None:
+        """Stop the worker loop; undelivered rows stay in the outbox."""
+        if not self.is_running:
+            return
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        logger.info("Notification outbox worker stopped")
+
+    async def _worker_loop(self) -> None:
+        while self.is_running:
+            try:
+                await self.process_ready()
+            except Exception as e:
+                logger.error(f"Error in notification outbox loop: {e}", exc_info=True)
+
+            # Woken early by in-process sends; rows written by other
+            # processes (Celery workers) are picked up on the next poll.
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    # ------------------------------------------------------------------
+    # Retention
+    # ------------------------------------------------------------------
+
+    async def cleanup_old(self, max_age_hours: int = ServiceConstants.NOTIFICATION_OUTBOX_RETENTION_HOURS) -> int:
+        """Delete delivered and failed rows older than max_age_hours"""
+        return await asyncio.to_thread(self._cleanup_old, max_age_hours)
+
+    def _cleanup_old(self, max_age_hours: int) -> int:
+        cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+        with self.session_factory() as session:
+            result = session.execute(
+                delete(NotificationOutbox).where(or_(
+                    and_(NotificationOutbox.status == 'delivered', NotificationOutbox.delivered_at < cutoff),
+                    and_(NotificationOutbox.status == 'failed', NotificationOutbox.created_at < cutoff),
+                ))
+            )
+            session.commit()
+        logger.info(f"[Outbox] Cleaned up {result.rowcount} finished notifications")
+        return result.rowcount
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Outbox depth, oldest pending age and enqueue-to-delivery lag."""
+        with self.session_factory() as session:
+            depth = dict(session.execute(
+                select(NotificationOutbox.status, func.count()).group_by(NotificationOutbox.status)
+            ).all())
+            oldest = session.execute(
+                select(func.min(NotificationOutbox.created_at)).where(
+                    NotificationOutbox.status.in_(('pending', 'claimed'))
+                )
+            ).scalar()
+
+        lags = sorted(self._lags)
+
+        def percentile(p: float) -> Optional[float]:
+            if not lags:
+                return None
+            return round(lags[min(len(lags) - 1, int(len(lags) * p))], 3)
+
+        return {
+            "running": self.is_running,
+            "worker_id": self.worker_id,
+            "depth_by_status": depth,
+            "oldest_pending_seconds": round((datetime.utcnow() - oldest).total_seconds(), 1) if oldest else None,
+            "batches": self._batches,
+            "delivered": self._delivered,
+            "failed_attempts": self._failed,
+            "channels": {channel: dict(stats) for channel, stats in self._channel_stats.items()},
+            "delivery_lag_seconds": {
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(lags[-1], 3) if lags else None,
+                "samples": len(lags),
+            },
+        }
+
+
+# ----------------------------------------------------------------------
+# Channel senders
+# ----------------------------------------------------------------------
+
+async def send_email_batch(deliveries: List[OutboxDelivery]) -> Dict[int, bool]:
+    """
+    Send notification emails, building one Gmail client per user and reusing
+    it for all of that user's messages. Users are sent in parallel.
+    """
+    from src.core.credential_provider import CredentialFactory
+    from src.database import get_db_context
+    from src.database.models import User
+    from src.services.notifications.notification_service import NotificationService
+    from src.utils.config import load_config
+
+    by_user: Dict[int, List[OutboxDelivery]] = defaultdict(list)
+    for delivery in deliveries:
+        by_user[delivery.user_id].append(delivery)
+
+    def _lookup_emails() -> Dict[int, str]:
+        with get_db_context() as db:
+            return dict(db.execute(select(User.id, User.email).where(User.id.in_(list(by_user)))).all())
+
+    emails = await asyncio.to_thread(_lookup_emails)
+    config = load_config()
+    semaphore = asyncio.Semaphore(ServiceConstants.NOTIFICATION_EMAIL_CONCURRENCY)
+
+    def _send_user(user_id: int, items: List[OutboxDelivery]) -> Dict[int, bool]:
+        with get_db_context() as db:
+            email_service = CredentialFactory(config).create_service('email', user_id=str(user_id), db_session=db)
+        results = {}
+        for item in items:
+            try:
+                email_service.send_email(
+                    to=emails[user_id],
+                    subject=item.payload.get('title', ''),
+                    body=NotificationService.build_email_html(item.payload),
+                )
+                results[item.id] = True
+            except Exception as e:
+                logger.warning(f"[Outbox] Email {item.id} to user {user_id} failed: {e}")
+                results[item.id] = False
+        return results
+
+    async def _send(user_id: int, items: List[OutboxDelivery]) -> Dict[int, bool]:
+        if not emails.get(user_id):
+            logger.warning(f"[Outbox] No email for user {user_id}")
+            return {}
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(_send_user, user_id, items)
+            except Exception as e:
+                logger.warning(f"[Outbox] Email client for user {user_id} unavailable: {e}")
+                return {}
+
+    results: Dict[int, bool] = {}
+    for user_results in await asyncio.gather(*(_send(u, items) for u, items in by_user.items())):
+        results.update(user_results)
+    return results
+
+
+async def send_push_batch(deliveries: List[OutboxDelivery]) -> Dict[int, bool]:
+    """Send push notifications through FCM in as few batched calls as possible."""
+    from src.services.notifications.push_service import get_push_service
+
+    push_service = get_push_service()
+    if push_service is None or not push_service.fcm_client:
+        # No push provider configured: nothing to deliver, don't retry
+        return {delivery.id: True for delivery in deliveries}
+
+    return await push_service.send_batch([
+        (
+            delivery.id,
+            delivery.user_id,
+            delivery.payload.get('title', ''),
+            delivery.payload.get('message', ''),
+            {'notification_type': delivery.payload.get('notification_type', ''),
+             'action_url': delivery.payload.get('action_url') or ''},
+            'high' if delivery.payload.get('priority') in ('high', 'urgent') else 'normal',
+        )
+        for delivery in deliveries
+    ])
+
+
+_notification_outbox: Optional[NotificationOutboxWorker] = None
+
+
+def get_notification_outbox() -> NotificationOutboxWorker:
+    """Get or create the global outbox worker (with the default senders)."""
+    global _notification_outbox
+    if _notification_outbox is None:
+        _notification_outbox = NotificationOutboxWorker()
+        _notification_outbox.register_sender('email', send_email_batch)
+        _notification_outbox.register_sender('push', send_push_batch)
+    return _notification_outbox
+
+
+async def start_notification_outbox() -> None:
+    """Start the global outbox worker."""
+    await get_notification_outbox().start()
+
+
+async def stop_notification_outbox() -> None:
+    """Stop the global outbox worker."""
+    await get_notification_outbox().stop()
@@ -5,7 +5,9 @@ Handles delivery of notifications to mobile devices via Firebase Cloud Messaging
 This service is designed to be used with the InsightDeliveryService for real-time
 proactive notifications.
 """
-from typing import Dict, Any, Optional, List
+import asyncio
+from typing import Dict, Any, Optional, List, Set, Tuple
+from src.services.service_constants import ServiceConstants
 from src.utils.logger import setup_logger
 from src.utils.config import Config
 
@@ -133,6 +135,62 @@ class PushNotificationService:
             logger.error(f"[PushService] Push notification failed: {e}")
             return False
             
+    async def send_batch(
+        self,
+        notifications: List[Tuple[Any, int, str, str, Optional[Dict[str, Any]], str]]
+    ) -> Dict[Any, bool]:
+        """
+        Send many notifications with one token lookup and batched FCM calls.
+        
+        Args:
+            notifications: (key, user_id, title, body, data, priority) tuples
+            
+        Returns:
+            key -> True if at least one of the user's devices received it
+            (also True for users without registered devices)
+        """
+        if not self.fcm_client:
+            return {}
+            
+        tokens_by_user = await self._get_device_tokens_bulk({n[1] for n in notifications})
+        
+        messages = []
+        targets = []  # (key, token) per message
+        results: Dict[Any, bool] = {}
+        for key, user_id, title, body, data, priority in notifications:
+            tokens = tokens_by_user.get(user_id, [])
+            results[key] = not tokens
+            string_data = {k: v if isinstance(v, str) else str(v) for k, v in (data or {}).items()}
+            for token in tokens:
+                messages.append(self.fcm_client.Message(
+                    notification=self.fcm_client.Notification(title=title, body=body[:200]),
+                    data=string_data,
+                    token=token,
+                    android=self.fcm_client.AndroidConfig(priority=priority),
+                    apns=self.fcm_client.APNSConfig(
+                        payload=self.fcm_client.APNSPayload(aps=self.fcm_client.Aps(sound="default"))
+                    ),
+                ))
+                targets.append((key, token))
+                
+        send_each = getattr(self.fcm_client, 'send_each', None) or self.fcm_client.send_all
+        limit = ServiceConstants.FCM_BATCH_LIMIT
+        for start in range(0, len(messages), limit):
+            chunk = targets[start:start + limit]
+            try:
+                response = await asyncio.to_thread(send_each, messages[start:start + limit])
+            except Exception as e:
+                logger.error(f"[PushService] Batch send failed: {e}")
+                continue
+            for (key, _), resp in zip(chunk, response.responses):
+                if resp.success:
+                    results[key] = True
+            if response.failure_count > 0:
+                await self._handle_failed_tokens([token for _, token in chunk], response.responses)
+                
+        logger.info(f"[PushService] Batch sent {len(messages)} messages for {len(notifications)} notifications")
+        return results
+        
     async def send_insight_notification(
         self,
         user_id: int,
@@ -207,6 +265,35 @@ class PushNotificationService:
             logger.debug(f"[PushService] Failed to get device tokens: {e}")
             return []
             
+    async def _get_device_tokens_bulk(self, user_ids: Set[int]) -> Dict[int, List[str]]:
+        """Get active device tokens for several users in one query."""
+        try:
+            from src.database import get_db_context
+            from sqlalchemy import select
+            
+            try:
+                from src.database.models import DeviceToken
+            except ImportError:
+                logger.debug("[PushService] DeviceToken model not found")
+                return {}
+            
+            def _execute() -> Dict[int, List[str]]:
+                with get_db_context() as db:
+                    stmt = select(DeviceToken.user_id, DeviceToken.token).where(
+                        DeviceToken.user_id.in_(list(user_ids)),
+                        DeviceToken.is_active == True
+                    )
+                    tokens: Dict[int, List[str]] = {}
+                    for user_id, token in db.execute(stmt).all():
+                        tokens.setdefault(user_id, []).append(token)
+                    return tokens
+                    
+            return await asyncio.to_thread(_execute)
+                
+        except Exception as e:
+            logger.debug(f"[PushService] Failed to get device tokens: {e}")
+            return {}
+            
     async def _handle_failed_tokens(
         self,
         tokens: List[str],
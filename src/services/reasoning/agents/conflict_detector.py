@@ -18,6 +18,7 @@ from collections import defaultdict
 
 from src.utils.logger import setup_logger
 from src.utils.config import Config
+from src.core.calendar.intervals import build_intervals, sweep_overlaps
 from src.services.indexing.graph.manager import KnowledgeGraphManager
 from src.services.indexing.graph.schema import NodeType, RelationType
 from src.services.reasoning.interfaces import ReasoningAgent, ReasoningResult
@@ -118,72 +119,46 @@ class ConflictDetectorAgent(ReasoningAgent):
             if not events or len(events) < 2:
                 return results
                 
-            # Parse events into structured format
-            parsed_events = []
-            for event in events:
-                try:
-                    start_str = event.get("start")
-                    end_str = event.get("end")
-                    
-                    if not start_str or not end_str:
-                        continue
-                        
-                    if isinstance(start_str, str):
-                        start = datetime.fromisoformat(start_str.replace('Z', '+00:00'))
-                    else:
-                        start = start_str
-                        
-                    if isinstance(end_str, str):
-                        end = datetime.fromisoformat(end_str.replace('Z', '+00:00'))
-                    else:
-                        end = end_str
-                        
-                    parsed_events.append({
-                        "id": event.get("id"),
-                        "title": event.get("title", "Untitled"),
-                        "start": start,
-                        "end": end
-                    })
-                except (ValueError, AttributeError):
-                    continue
-                    
-            # Check for overlaps
-            for i, event_a in enumerate(parsed_events):
-                for event_b in parsed_events[i+1:]:
-                    # Check if events overlap
-                    if event_a["start"] < event_b["end"] and event_b["start"] < event_a["end"]:
-                        # Calculate overlap severity
-                        overlap_start = max(event_a["start"], event_b["start"])
-                        overlap_end = min(event_a["end"], event_b["end"])
-                        overlap_minutes = int((overlap_end - overlap_start).total_seconds() / 60)
-                        
-                        if overlap_minutes < 5:
-                            continue  # Minor overlap, skip
-                            
-                        # Higher confidence for longer overlaps
-                        base_conf = ServiceConstants.CONFLICT_CALENDAR_OVERLAP_CONFIDENCE_BASE
-                        max_conf = ServiceConstants.CONFLICT_CALENDAR_OVERLAP_CONFIDENCE_MAX
-                        max_minutes = ServiceConstants.CONFLICT_MAX_OVERLAP_MINUTES
-                        
-                        confidence = min(max_conf, base_conf + (overlap_minutes / max_minutes))
-                        
-                        content = {
-                            "content": f"Scheduling conflict: '{event_a['title']}' and '{event_b['title']}' overlap by {overlap_minutes} minutes",
-                            "type": "conflict",
-                            "conflict_type": "calendar_overlap",
-                            "event_a": {"id": event_a["id"], "title": event_a["title"]},
-                            "event_b": {"id": event_b["id"], "title": event_b["title"]},
-                            "overlap_minutes": overlap_minutes,
-                            "actionable": True,
-                            "related_ids": [event_a["id"], event_b["id"]]
-                        }
-                        
-                        results.append(ReasoningResult(
-                            type="insight",
-                            confidence=confidence,
-                            content=content,
-                            source_agent=self.name
-                        ))
+            # Normalize into UTC intervals and sweep once (O(n log n + k))
+            intervals = build_intervals(
+                {
+                    "id": event.get("id"),
+                    "title": event.get("title") or "Untitled",
+                    "start": {"dateTime": event.get("start")},
+                    "end": {"dateTime": event.get("end")},
+                }
+                for event in events
+                if event.get("start") and event.get("end")
+            )
+            
+            # Minor overlaps (< 5 minutes) are skipped
+            for event_a, event_b, overlap in sweep_overlaps(intervals, min_overlap=timedelta(minutes=5)):
+                overlap_minutes = int(overlap.total_seconds() / 60)
+                
+                # Higher confidence for longer overlaps
+                base_conf = ServiceConstants.CONFLICT_CALENDAR_OVERLAP_CONFIDENCE_BASE
+                max_conf = ServiceConstants.CONFLICT_CALENDAR_OVERLAP_CONFIDENCE_MAX
+                max_minutes = ServiceConstants.CONFLICT_MAX_OVERLAP_MINUTES
+                
+                confidence = min(max_conf, base_conf + (overlap_minutes / max_minutes))
+                
+                content = {
+                    "content": f"Scheduling conflict: '{event_a.title}' and '{event_b.title}' overlap by {overlap_minutes} minutes",
+                    "type": "conflict",
+                    "conflict_type": "calendar_overlap",
+                    "event_a": {"id": event_a.event_id, "title": event_a.title},
+                    "event_b": {"id": event_b.event_id, "title": event_b.title},
+                    "overlap_minutes": overlap_minutes,
+                    "actionable": True,
+                    "related_ids": [event_a.event_id, event_b.event_id]
+                }
+                
+                results.append(ReasoningResult(
+                    type="insight",
+                    confidence=confidence,
+                    content=content,
+                    source_agent=self.name
+                ))
                         
         except Exception as e:
             logger.error(f"[{self.name}] Calendar overlap detection failed: {e}")
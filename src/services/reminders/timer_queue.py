@@ -0,0 +1,546 @@
+"""
+Reminder Timer Queue
+
+Persistent, indexed queue of reminder fire times for actionable items.
+
+- When an ActionableItem is inserted, or its due date / type / status
+  changes, mapper hooks (see database/models.py) call sync_item_timers() to
+  write its reminder timers in the same transaction. Nothing scans the item
+  table to decide who needs a reminder.
+- The dispatcher sleeps until the earliest pending timer (capped at
+  REMINDER_MAX_SLEEP_SECONDS so timers written by other processes are
+  picked up), claims due timers in batches and hands them to notification
+  delivery. Claims are conditional updates on a unique token, so several
+  API workers can run dispatchers without firing a reminder twice; timers
+  held by a dispatcher that died are reclaimed after REMINDER_CLAIM_TIMEOUT.
+- Failed deliveries are retried with a delay and marked failed after
+  REMINDER_MAX_ATTEMPTS.
+
+Reminder policy (offsets before the due date):
+- bill: 3 days, 1 day
+- deadline: 2 days, 1 day
+- appointment: 1 day, 2 hours
+- anything else: 1 day
+
+Offsets that have already passed when the item is written collapse into one
+immediate reminder, as long as the item isn't overdue.
+"""
+import asyncio
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from src.database.models import ActionableItem, ReminderTimer
+from src.services.service_constants import ServiceConstants
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+REMINDER_OFFSETS: Dict[str, Tuple[timedelta, ...]] = {
+    'bill': (timedelta(days=3), timedelta(days=1)),
+    'deadline': (timedelta(days=2), timedelta(days=1)),
+    'appointment': (timedelta(days=1), timedelta(hours=2)),
+}
+DEFAULT_REMINDER_OFFSETS: Tuple[timedelta, ...] = (timedelta(days=1),)
+
+# Items in these states still get reminders; anything else cancels its timers
+ACTIVE_ITEM_STATUSES = frozenset({'pending', 'reminded'})
+
+IMMEDIATE_LABEL = 'now'
+
+
+def offset_label(offset: timedelta) -> str:
+    """Short label for an offset before the due date (3d, 2h, 30m)."""
+    seconds = int(offset.total_seconds())
+    if seconds % 86400 == 0:
+        return f"{seconds // 86400}d"
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600}h"
+    return f"{max(seconds // 60, 0)}m"
+
+
+def compute_fire_times(
+    item_type: Optional[str],
+    due_date: Optional[datetime],
+    now: Optional[datetime] = None,
+) -> List[Tuple[datetime, str]]:
+    """
+    Reminder (fire_at, offset_label) pairs for an item, earliest first.
+
+    Returns an empty list for items without a due date or already overdue.
+    """
+    now = now or datetime.utcnow()
+    if due_date is None or due_date <= now:
+        return []
+
+    offsets = REMINDER_OFFSETS.get((item_type or '').lower(), DEFAULT_REMINDER_OFFSETS)
+    fire_times = []
+    missed = False
+    for offset in sorted(offsets, reverse=True):
+        fire_at = due_date - offset
+        if fire_at > now:
+            fire_times.append((fire_at, offset_label(offset)))
+        else:
+            missed = True
+    if missed:
+        fire_times.insert(0, (now, IMMEDIATE_LABEL))
+    return fire_times
+
+
+def _changed(state: Any, attr: str) -> Tuple[bool, Any]:
+    """(changed, previous value) for an attribute in the current flush."""
+    history = state.attrs[attr].history
+    if not history.has_changes():
+        return False, None
+    previous = history.deleted[0] if history.deleted else None
+    current = history.added[0] if history.added else None
+    return previous != current, previous
+
+
+def sync_item_timers(connection: Any, item: ActionableItem, created: bool = False, now: Optional[datetime] = None) -> int:
+    """
+    Bring an item's reminder timers in line with its current state.
+
+    Called from the ActionableItem after_insert/after_update hooks with the
+    flush's connection. Re-merging an unchanged item (every crawler sync
+    does) is a no-op; status moves between pending and reminded keep the
+    remaining timers.
+
+    Returns:
+        Number of timers scheduled
+    """
+    timers = ReminderTimer.__table__
+    status = item.status or 'pending'
+
+    if not created:
+        state = inspect(item)
+        due_changed, _ = _changed(state, 'due_date')
+        type_changed, _ = _changed(state, 'item_type')
+        status_changed, previous_status = _changed(state, 'status')
+        reopened = status_changed and previous_status not in ACTIVE_ITEM_STATUSES
+        closed = status_changed and status not in ACTIVE_ITEM_STATUSES
+        if not (due_changed or type_changed or reopened or closed):
+            return 0
+
+    if status not in ACTIVE_ITEM_STATUSES:
+        connection.execute(
+            timers.update()
+            .where(and_(timers.c.item_id == item.id, timers.c.status == 'pending'))
+            .values(status='cancelled')
+        )
+        return 0
+
+    # Claimed timers are mid-delivery; their dispatcher settles them
+    connection.execute(
+        timers.delete().where(and_(timers.c.item_id == item.id, timers.c.status != 'claimed'))
+    )
+    rows = [
+        {
+            'item_id': item.id,
+            'user_id': item.user_id,
+            'fire_at': fire_at,
+            'offset_label': label,
+            'status': 'pending',
+            'attempts': 0,
+        }
+        for fire_at, label in compute_fire_times(item.item_type, item.due_date, now)
+    ]
+    if rows:
+        connection.execute(timers.insert(), rows)
+    return len(rows)
+
+
+@dataclass
+class DueReminder:
+    """A claimed timer together with the item it reminds about."""
+    timer_id: int
+    item_id: str
+    user_id: int
+    title: str
+    item_type: Optional[str]
+    due_date: datetime
+    amount: Optional[float]
+    urgency: Optional[str]
+    suggested_action: Optional[str]
+    offset_label: str
+    attempts: int
+
+
+# deliver(reminder) - raise to have the timer retried
+DeliveryHandler = Callable[[DueReminder], Awaitable[None]]
+
+SessionFactory = Callable[[], Any]
+
+
+@contextmanager
+def _default_session() -> Iterator[Session]:
+    from src.database import get_db_context
+    with get_db_context() as session:
+        yield session
+
+
+async def deliver_reminder(reminder: DueReminder) -> None:
+    """Send a reminder through the notification service (in-app, email, push)."""
+    from src.database import get_async_db_context
+    from src.services.notifications import (
+        NotificationPriority,
+        NotificationRequest,
+        NotificationService,
+        NotificationType,
+    )
+
+    message = f"Due {reminder.due_date.strftime('%b %d, %H:%M')} UTC"
+    if reminder.amount:
+        message = f"${reminder.amount:,.2f} {message[0].lower()}{message[1:]}"
+    if reminder.suggested_action:
+        message = f"{message}. Suggested action: {reminder.suggested_action}"
+
+    priority = NotificationPriority.HIGH if reminder.urgency == 'high' else NotificationPriority.NORMAL
+    async with get_async_db_context() as db:
+        results = await NotificationService(db).send_notification(NotificationRequest(
+            user_id=reminder.user_id,
+            title=f"Reminder: {reminder.title}",
+            message=message,
+            notification_type=NotificationType.REMINDER,
+            priority=priority,
+            icon="bell",
+        ), idempotency_key=f"reminder-timer:{reminder.timer_id}")
+    if results and not any(results.values()):
+        raise RuntimeError(f"no channel accepted reminder {reminder.timer_id}")
+
+
+class ReminderDispatcher:
+    """
+    Claims due reminder timers and hands them to notification delivery.
+
+    Example:
+        dispatcher = get_reminder_dispatcher()
+        await dispatcher.start()
+    """
+
+    def __init__(
+        self,
+        deliver: Optional[DeliveryHandler] = None,
+        session_factory: Optional[SessionFactory] = None,
+        batch_size: int = ServiceConstants.REMINDER_BATCH_SIZE,
+        max_sleep: float = ServiceConstants.REMINDER_MAX_SLEEP_SECONDS,
+        claim_timeout: float = ServiceConstants.REMINDER_CLAIM_TIMEOUT,
+        retry_seconds: float = ServiceConstants.REMINDER_RETRY_SECONDS,
+        max_attempts: int = ServiceConstants.REMINDER_MAX_ATTEMPTS,
+    ):
+        self.deliver = deliver or deliver_reminder
+        self.session_factory = session_factory or _default_session
+        self.batch_size = batch_size
+        self.max_sleep = max_sleep
+        self.claim_timeout = claim_timeout
+        self.retry_seconds = retry_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = uuid.uuid4().hex[:12]
+
+        self.is_running = False
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+        self._fired = 0
+        self._failures = 0
+        self._cancelled = 0
+        self._lateness: List[float] = []
+
+    # ------------------------------------------------------------------
+    # Queue operations (sync, run in a thread)
+    # ------------------------------------------------------------------
+
+    def next_fire_at(self) -> Optional[datetime]:
+        """Earliest pending fire time (an index lookup)."""
+        with self.session_factory() as session:
+            return session.execute(
+                select(func.min(ReminderTimer.fire_at)).where(ReminderTimer.status == 'pending')
+            ).scalar()
+
+    def claim_due(self, now: Optional[datetime] = None) -> List[DueReminder]:
+        """
+        Claim up to batch_size due timers for this dispatcher.
+
+        The claim is a conditional update (status still pending) keyed on a
+        fresh token, so a timer is only ever claimed by one dispatcher even
+        if several select the same candidates. Timers whose item was closed
+        are cancelled instead of returned.
+        """
+        now = now or datetime.utcnow()
+        token = f"{self.worker_id}:{uuid.uuid4().hex}"
+        with self.session_factory() as session:
+            self._reclaim_expired(session, now)
+            candidates = session.execute(
+                select(ReminderTimer.id)
+                .where(and_(ReminderTimer.status == 'pending', ReminderTimer.fire_at <= now))
+                .order_by(ReminderTimer.fire_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+            if not candidates:
+                return []
+
+            session.execute(
+                update(ReminderTimer)
+                .where(and_(ReminderTimer.id.in_(candidates), ReminderTimer.status == 'pending'))
+                .values(status='claimed', claim_token=token, claimed_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+
+            rows = session.execute(
+                select(ReminderTimer, ActionableItem)
+                .join(ActionableItem, ActionableItem.id == ReminderTimer.item_id)
+                .where(ReminderTimer.claim_token == token)
+                .order_by(ReminderTimer.fire_at)
+            ).all()
+
+            due = []
+            closed = []
+            for timer, item in rows:
+                if item.status not in ACTIVE_ITEM_STATUSES:
+                    closed.append(timer.id)
+                    continue
+                due.append(DueReminder(
+                    timer_id=timer.id,
+                    item_id=item.id,
+                    user_id=timer.user_id,
+                    title=item.title or '',
+                    item_type=item.item_type,
+                    due_date=item.due_date,
+                    amount=item.amount,
+                    urgency=item.urgency,
+                    suggested_action=item.suggested_action,
+                    offset_label=timer.offset_label,
+                    attempts=timer.attempts or 0,
+                ))
+                self._lateness.append(max((now - timer.fire_at).total_seconds(), 0.0))
+            if closed:
+                session.execute(
+                    update(ReminderTimer)
+                    .where(ReminderTimer.id.in_(closed))
+                    .values(status='cancelled', claim_token=None)
+                    .execution_options(synchronize_session=False)
+                )
+                self._cancelled += len(closed)
+            self._lateness = self._lateness[-1000:]
+            return due
+
+    def _reclaim_expired(self, session: Session, now: datetime) -> None:
+        """Return timers held past the claim timeout to the queue."""
+        expired = now - timedelta(seconds=self.claim_timeout)
+        result = session.execute(
+            update(ReminderTimer)
+            .where(and_(ReminderTimer.status == 'claimed', ReminderTimer.claimed_at < expired))
+            .values(status='pending', claim_token=None, claimed_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            logger.warning(f"[Reminders] Reclaimed {result.rowcount} timers from an expired claim")
+
+    def _settle(self, fired: List[DueReminder], failed: List[DueReminder], now: datetime) -> None:
+        """Mark delivered timers fired (and their items reminded); retry or fail the rest."""
+        with self.session_factory() as session:
+            if fired:
+                session.execute(
+                    update(ReminderTimer)
+                    .where(ReminderTimer.id.in_([r.timer_id for r in fired]))
+                    .values(status='fired', fired_at=now, claim_token=None)
+                    .execution_options(synchronize_session=False)
+                )
+                # Core update: no mapper hooks, so remaining timers are kept
+                session.execute(
+                    update(ActionableItem)
+                    .where(ActionableItem.id.in_({r.item_id for r in fired}))
+                    .values(
+                        reminder_sent_at=now,
+                        status=case(
+                            (ActionableItem.status == 'pending', 'reminded'),
+                            else_=ActionableItem.status,
+                        ),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            for reminder in failed:
+                attempts = reminder.attempts + 1
+                values: Dict[str, Any] = {'attempts': attempts, 'claim_token': None, 'claimed_at': None}
+                if attempts >= self.max_attempts:
+                    values['status'] = 'failed'
+                else:
+                    values['status'] = 'pending'
+                    values['fire_at'] = now + timedelta(seconds=self.retry_seconds)
+                session.execute(
+                    update(ReminderTimer)
+                    .where(ReminderTimer.id == reminder.timer_id)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    async def process_due(self) -> int:
+        """
+        Deliver every timer that is due now.
+
+        Returns:
+            Number of reminders delivered
+        """
+        delivered = 0
+        while True:
+            batch = await asyncio.to_thread(self.claim_due)
+            if not batch:
+                return delivered
+
+            fired: List[DueReminder] = []
+            failed: List[DueReminder] = []
+            for reminder in batch:
+                try:
+                    await self.deliver(reminder)
+                    fired.append(reminder)
+                except Exception as e:
+                    logger.error(f"[Reminders] Delivery failed for timer {reminder.timer_id}: {e}")
+                    failed.append(reminder)
+
+            await asyncio.to_thread(self._settle, fired, failed, datetime.utcnow())
+            delivered += len(fired)
+            self._fired += len(fired)
+            self._failures += len(failed)
+            if fired:
+                logger.info(f"[Reminders] Sent {len(fired)} reminders")
+            if len(batch) < self.batch_size:
+                return delivered
+
+    def _seconds_until_next(self) -> float:
+        next_fire = self.next_fire_at()
+        if next_fire is None:
+            return self.max_sleep
+        delay = (next_fire - datetime.utcnow()).total_seconds()
+        return min(max(delay, 0.0), self.max_sleep)
+
+    def notify(self) -> None:
+        """Wake the dispatcher early (e.g. after scheduling a near timer in-process)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        """Start the background dispatch loop."""
+        if self.is_running:
+            logger.warning("Reminder dispatcher already running")
+            return
+        self.is_running = True
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._dispatch_loop())
+        logger.info(f"Reminder dispatcher started ({self.worker_id})")
+
+    async def stop(self) -> None:
+        """Stop the dispatch loop; pending timers stay in the database."""
+        if not self.is_running:
+            return
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        logger.info("Reminder dispatcher stopped")
+
+    async def _dispatch_loop(self) -> None:
+        while self.is_running:
+            delay = self.max_sleep
+            try:
+                await self.process_due()
+                delay = await asyncio.to_thread(self._seconds_until_next)
+            except Exception as e:
+                logger.error(f"Error in reminder dispatch loop: {e}", exc_info=True)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth by status, next fire time and delivery lateness."""
+        with self.session_factory() as session:
+            depth = dict(session.execute(
+                select(ReminderTimer.status, func.count()).group_by(ReminderTimer.status)
+            ).all())
+        next_fire = self.next_fire_at()
+        lateness = sorted(self._lateness)
+        return {
+            "running": self.is_running,
+            "worker_id": self.worker_id,
+            "depth_by_status": depth,
+            "next_fire_at": next_fire.isoformat() if next_fire else None,
+            "fired": self._fired,
+            "failures": self._failures,
+            "cancelled": self._cancelled,
+            "lateness_seconds": {
+                "p50": round(lateness[len(lateness) // 2], 3) if lateness else None,
+                "max": round(lateness[-1], 3) if lateness else None,
+                "samples": len(lateness),
+            },
+        }
+
+
+def backfill_timers(session_factory: Optional[SessionFactory] = None, now: Optional[datetime] = None) -> int:
+    """
+    Schedule timers for active items that have none (items written before
+    the timer queue existed). Only reads items that are not yet overdue.
+    """
+    now = now or datetime.utcnow()
+    session_factory = session_factory or _default_session
+    scheduled = 0
+    with session_factory() as session:
+        has_timers = select(ReminderTimer.id).where(ReminderTimer.item_id == ActionableItem.id).exists()
+        items = session.execute(
+            select(ActionableItem).where(and_(
+                ActionableItem.status.in_(ACTIVE_ITEM_STATUSES),
+                ActionableItem.due_date > now,
+                ~has_timers,
+            ))
+        ).scalars().all()
+        connection = session.connection()
+        for item in items:
+            scheduled += sync_item_timers(connection, item, created=True, now=now)
+    if scheduled:
+        logger.info(f"[Reminders] Backfilled {scheduled} timers for {len(items)} items")
+    return scheduled
+
+
+_reminder_dispatcher: Optional[ReminderDispatcher] = None
+
+
+def get_reminder_dispatcher() -> ReminderDispatcher:
+    """Get or create the global reminder dispatcher."""
+    global _reminder_dispatcher
+    if _reminder_dispatcher is None:
+        _reminder_dispatcher = ReminderDispatcher()
+    return _reminder_dispatcher
+
+
+async def start_reminder_dispatcher() -> None:
+    """Backfill timers for existing items and start the global dispatcher."""
+    try:
+        await asyncio.to_thread(backfill_timers)
+    except Exception as e:
+        logger.warning(f"[Reminders] Timer backfill failed: {e}")
+    await get_reminder_dispatcher().start()
+
+
+async def stop_reminder_dispatcher() -> None:
+    """Stop the global reminder dispatcher."""
+    await get_reminder_dispatcher().stop()
@@ -67,21 +67,9 @@ class UnifiedSearchService:
     async def _search_graph(self, query: str, limit: int) -> List[Dict[str, Any]]:
         """Search structured entities in the graph"""
         try:
-            # Look for Receipts or categorized nodes
-            aql = """
-            FOR doc IN KnowledgeNode
-            FILTER doc.user_id == @user_id
-            AND (doc.name =~ @query OR doc.content =~ @query OR doc.merchant =~ @query)
-            SORT doc.date DESC
-            LIMIT @limit
-            RETURN doc
-            """
-            bind_vars = {
-                'user_id': self.user_id,
-                'query': f"(?i){query}",
-                'limit': limit
-            }
-            results = await self.graph_manager.query(aql, bind_vars)
+            # Ranked, per-user lookup on the graph text search view (names,
+            # subjects, merchants, content); the query is never used as a regex
+            results = await self.graph_manager.search_text(query, user_id=self.user_id, limit=limit)
             for r in results: r['_platform'] = 'graph'
             return results
         except Exception as e:
@@ -91,7 +79,7 @@ class UnifiedSearchService:
     async def _search_email(self, query: str, limit: int) -> List[Dict[str, Any]]:
         """Search Gmail messages"""
         try:
-            results = self.email_service.search_emails(query=query, limit=limit)
+            results = await self.email_service.search_emails_async(query=query, limit=limit)
             for r in results: r['_platform'] = 'email'
             return results
         except Exception as e:
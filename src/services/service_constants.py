@@ -76,6 +76,13 @@ class ServiceConstants:
     PROFILE_CACHE_MAX_SIZE = 1000
     PROFILE_CACHE_TTL_SECONDS = 3600  # 1 hour
     PROFILE_CACHE_CLEANUP_INTERVAL = 300  # 5 minutes
+
+    # Two-tier user data cache (see user_cache.py)
+    USER_CACHE_NEAR_MAX_SIZE = 10000        # Entries per namespace kept in each process
+    USER_CACHE_NEAR_TTL_SECONDS = 30        # Bounds staleness if an invalidation message is missed
+    USER_CACHE_TTL_SECONDS = 600            # Shared tier: user rows, integrations, settings
+    USER_CACHE_SESSION_TTL_SECONDS = 300    # Shared tier: sessions
+    USER_CACHE_LOCK_SECONDS = 5             # Cross-process load lock; waiters then load themselves
     
     # ===================================================================
     # GRAPH/RAG CONSTANTS
@@ -131,6 +138,38 @@ class ServiceConstants:
     
     # Event stream
     EVENT_TTL_SECONDS = 300  # 5 minute dedup window for event stream
+
+    # Push ingestion queue (durable, coalescing - see ingestion/push_queue.py)
+    PUSH_QUEUE_PATH = os.getenv('PUSH_QUEUE_PATH', './data/push_queue.db')
+    PUSH_QUEUE_DEBOUNCE_SECONDS = float(os.getenv('PUSH_QUEUE_DEBOUNCE_SECONDS', '3'))
+    PUSH_QUEUE_MAX_DELAY_SECONDS = 15.0     # Flush a continuous burst at least this often
+    PUSH_QUEUE_POLL_SECONDS = 1.0
+    PUSH_QUEUE_CONCURRENCY = 4              # Batches processed in parallel
+    PUSH_QUEUE_VISIBILITY_TIMEOUT = 300     # Reclaim batches from a crashed worker
+    PUSH_QUEUE_MAX_ATTEMPTS = 5             # Then the events are dead-lettered
+
+    # Reminder timer queue (see reminders/timer_queue.py)
+    REMINDER_BATCH_SIZE = 100               # Timers claimed per dispatcher round
+    REMINDER_MAX_SLEEP_SECONDS = float(os.getenv('REMINDER_MAX_SLEEP_SECONDS', '60'))  # Picks up timers written by other processes
+    REMINDER_CLAIM_TIMEOUT = 300            # Reclaim timers from a crashed dispatcher
+    REMINDER_RETRY_SECONDS = 120            # Delay before retrying a failed delivery
+    REMINDER_MAX_ATTEMPTS = 5               # Then the timer is marked failed
+
+    # Notification outbox (see notifications/outbox.py)
+    NOTIFICATION_OUTBOX_BATCH_SIZE = 200    # Outbox rows claimed per round
+    NOTIFICATION_OUTBOX_POLL_SECONDS = float(os.getenv('NOTIFICATION_OUTBOX_POLL_SECONDS', '2'))
+    NOTIFICATION_OUTBOX_CLAIM_TIMEOUT = 300 # Reclaim rows from a crashed worker
+    NOTIFICATION_OUTBOX_RETRY_SECONDS = 30  # Base backoff, doubled per attempt
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS = 6    # Then the row is marked failed
+    NOTIFICATION_OUTBOX_RETENTION_HOURS = 24 * 7  # Finished rows (and their idempotency keys) deleted after this
+    NOTIFICATION_EMAIL_CONCURRENCY = 8      # Users whose email batches send in parallel
+    FCM_BATCH_LIMIT = 500                   # Messages per FCM send_each call
+
+    # Durable workflow state (see workflows/engine/store.py)
+    WORKFLOW_LEASE_SECONDS = 60             # Run is orphaned if its owner stops renewing
+    WORKFLOW_RECOVERY_BATCH_SIZE = 20       # Orphaned runs resumed per recovery pass
+    WORKFLOW_MAX_ATTEMPTS = 5               # Then an orphaned run is marked failed
+    WORKFLOW_RETENTION_HOURS = 24 * 7       # Completed runs deleted after this
     
     # Initial lookback for first-time sync
     INITIAL_LOOKBACK_DAYS = 7           # Default lookback for most crawlers
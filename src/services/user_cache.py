@@ -0,0 +1,653 @@
+"""
+User Data Cache
+
+Two-tier read-through cache for the per-user data read on every
+authenticated request: sessions, user rows, active integrations, settings
+and writing profiles. Each kind of data is a namespace with its own
+UserDataCache (get_user_cache('session'), get_user_cache('providers'), ...).
+
+Tiers:
+- Near: per-process LRU with a short TTL, so steady-state lookups never
+  leave the process.
+- Shared: Redis, shared by all API workers and Celery. Sessions, users and
+  writing profiles hold encrypted columns (OAuth tokens, names, profile
+  data), so those namespaces are encrypted in Redis too. If Redis is
+  unreachable the cache runs on the near tier alone.
+
+Invalidation is write-through: ORM hooks (see database/models.py) drop the
+keys of changed rows from both tiers at flush and again after commit, and
+publish them so other processes drop their near copies. Every key has a
+generation counter in Redis; a value loaded before an invalidation is
+tagged with the old generation and never served.
+
+Redis calls are blocking, so async methods run them in a worker thread.
+ORM hooks firing on an event loop (AsyncSession flushes) drop the near copy
+at once and queue the shared-tier invalidation on a background thread;
+lookups of that key in this process wait for it to finish.
+
+Stampede protection: concurrent misses for a key in one process share a
+single load, and across processes a short Redis lock lets one worker load
+while the others wait for its result.
+
+Usage:
+    cache = get_user_cache('providers')
+    providers = await cache.get_or_load(user_id, load_providers)
+"""
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from itertools import chain
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import DateTime, inspect as sa_inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .service_constants import ServiceConstants
+from src.utils.logger import setup_logger
+from src.utils.urls import URLs
+
+logger = setup_logger(__name__)
+
+# namespace -> (shared tier TTL, encrypt in shared tier)
+NAMESPACES: Dict[str, Tuple[int, bool]] = {
+    'session': (ServiceConstants.USER_CACHE_SESSION_TTL_SECONDS, True),
+    'user': (ServiceConstants.USER_CACHE_TTL_SECONDS, True),
+    'providers': (ServiceConstants.USER_CACHE_TTL_SECONDS, False),
+    'settings': (ServiceConstants.USER_CACHE_TTL_SECONDS, False),
+    'profile': (ServiceConstants.PROFILE_CACHE_TTL_SECONDS, True),
+}
+
+_REDIS_RETRY_SECONDS = 60
+_VALUE_KEY = "ucache:{namespace}:{key}"
+_GEN_KEY = "ucache:gen:{namespace}:{key}"
+_LOCK_KEY = "ucache:lock:{namespace}:{key}"
+_INVALIDATION_CHANNEL = "ucache:invalidate"
+_LOCK_POLL_SECONDS = 0.05
+_PENDING_INFO_KEY = "user_cache_keys"
+
+# Tags this process's invalidation messages (it has already applied them)
+_PROCESS_ID = uuid.uuid4().hex
+
+# Shared-tier invalidations queued from the event loop thread, applied in order
+_invalidation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="user-cache-invalidate")
+
+
+class UserDataCache:
+    """
+    Near (in-process) + shared (Redis) cache for one namespace.
+
+    Example:
+        cache = get_user_cache('settings')
+        settings = await cache.get_or_load(user_id, load_settings)
+        await cache.invalidate(user_id)
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        redis_url: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        near_ttl_seconds: float = ServiceConstants.USER_CACHE_NEAR_TTL_SECONDS,
+        near_max_size: int = ServiceConstants.USER_CACHE_NEAR_MAX_SIZE,
+        encrypt: Optional[bool] = None,
+        lock_seconds: float = ServiceConstants.USER_CACHE_LOCK_SECONDS,
+    ):
+        default_ttl, default_encrypt = NAMESPACES.get(namespace, (ServiceConstants.USER_CACHE_TTL_SECONDS, True))
+        self.namespace = namespace
+        self.redis_url = redis_url or URLs.REDIS
+        self.ttl_seconds = ttl_seconds or default_ttl
+        self.near_ttl_seconds = near_ttl_seconds
+        self.near_max_size = near_max_size
+        self.encrypt = default_encrypt if encrypt is None else encrypt
+        self.lock_seconds = lock_seconds
+
+        self._client = None
+        self._retry_at = 0.0
+        self._near: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._stale: Set[str] = set()
+        self._invalidating: Dict[str, Future] = {}
+
+        self._stats = {
+            'near_hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'lock_waits': 0,
+            'invalidations': 0,
+            'evictions': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    async def get_or_load(self, key: Any, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Cached value for key, calling loader() on a miss.
+
+        A None result is returned but not cached.
+        """
+        key = str(key)
+        found, value = self._near_get(key)
+        if found:
+            self._count('near_hits')
+            return value
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            self._count('coalesced')
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await self._load(key, loader)
+            with self._lock:
+                stale = key in self._stale
+            if value is not None and not stale:
+                self._near_put(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Waiters re-raise it; don't warn when there are none
+            raise
+        finally:
+            self._loading.pop(key, None)
+            with self._lock:
+                self._stale.discard(key)
+
+    async def get(self, key: Any) -> Optional[Any]:
+        """Cached value for key from either tier, without loading."""
+        key = str(key)
+        found, value = self._near_get(key)
+        if found:
+            self._count('near_hits')
+            return value
+        await self._invalidated(key)
+        client = await self._shared_client()
+        if client is not None:
+            try:
+                raw, gen = await asyncio.to_thread(client.mget, self._value_key(key), self._gen_key(key))
+                found, value = self._decode(raw, int(gen or 0))
+                if found:
+                    self._count('shared_hits')
+                    self._near_put(key, value)
+                    return value
+            except Exception as e:
+                logger.warning(f"[UserCache] {self.namespace} read failed: {e}")
+        self._count('misses')
+        return None
+
+    async def set(self, key: Any, value: Any) -> None:
+        """Write-through: store value in both tiers (for data just written to the database)."""
+        key = str(key)
+        self._near_put(key, value)
+        await asyncio.to_thread(self._shared_set, key, value)
+
+    def _shared_set(self, key: str, value: Any) -> None:
+        client = self._redis()
+        if client is not None:
+            try:
+                raw = self._encode(int(client.get(self._gen_key(key)) or 0), value)
+                if raw is not None:
+                    client.set(self._value_key(key), raw, ex=self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"[UserCache] {self.namespace} write failed: {e}")
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        await self._invalidated(key)
+        client = await self._shared_client()
+        gen = 0
+        locked = False
+        if client is not None:
+            try:
+                raw, gen_raw = await asyncio.to_thread(client.mget, self._value_key(key), self._gen_key(key))
+                gen = int(gen_raw or 0)
+                found, value = self._decode(raw, gen)
+                if found:
+                    self._count('shared_hits')
+                    return value
+
+                # One loader per key across processes; the rest wait for its result
+                locked = bool(await asyncio.to_thread(
+                    client.set, self._lock_key(key), _PROCESS_ID, nx=True, px=int(self.lock_seconds * 1000)
+                ))
+                if not locked:
+                    self._count('lock_waits')
+                    found, value, gen = await self._wait_for_load(client, key)
+                    if found:
+                        return value
+            except Exception as e:
+                logger.warning(f"[UserCache] {self.namespace} shared tier unavailable: {e}")
+                client = None
+
+        self._count('misses')
+        try:
+            value = await loader()
+            if client is not None and value is not None:
+                raw = self._encode(gen, value)
+                if raw is not None:
+                    await asyncio.to_thread(client.set, self._value_key(key), raw, ex=self.ttl_seconds)
+            return value
+        finally:
+            if locked:
+                try:
+                    await asyncio.to_thread(client.delete, self._lock_key(key))
+                except Exception as e:
+                    logger.debug(f"[UserCache] Failed to release load lock: {e}")
+
+    async def _wait_for_load(self, client: Any, key: str) -> Tuple[bool, Any, int]:
+        """Poll until the lock holder stores the value, gives up, or the lock expires."""
+        gen = 0
+        deadline = time.monotonic() + self.lock_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_LOCK_POLL_SECONDS)
+            raw, gen_raw, holder = await asyncio.to_thread(
+                client.mget, self._value_key(key), self._gen_key(key), self._lock_key(key)
+            )
+            gen = int(gen_raw or 0)
+            found, value = self._decode(raw, gen)
+            if found:
+                return True, value, gen
+            if holder is None:
+                break
+        return False, None, gen
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def invalidate_key(self, key: Any) -> bool:
+        """
+        Drop key from both tiers and tell other processes to drop it.
+
+        Blocks on Redis: async code uses invalidate(), sync code running on
+        the event loop (ORM hooks) uses invalidate_soon().
+
+        Returns:
+            True if this process had the key cached
+        """
+        key = str(key)
+        removed = self.drop_near(key)
+        self._count('invalidations')
+        self._invalidate_shared(key)
+        return removed
+
+    async def invalidate(self, key: Any) -> bool:
+        key = str(key)
+        removed = self.drop_near(key)
+        self._count('invalidations')
+        await asyncio.to_thread(self._invalidate_shared, key)
+        return removed
+
+    def invalidate_soon(self, key: Any) -> bool:
+        """
+        invalidate_key() without blocking the event loop: the near copy is
+        dropped now, the shared tier on the invalidation thread. Lookups of
+        the key in this process wait until it is done.
+        """
+        key = str(key)
+        removed = self.drop_near(key)
+        self._count('invalidations')
+        future = _invalidation_executor.submit(self._invalidate_shared, key)
+        with self._lock:
+            self._invalidating[key] = future
+        future.add_done_callback(lambda done: self._invalidation_done(key, done))
+        return removed
+
+    def _invalidation_done(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._invalidating.get(key) is future:
+                del self._invalidating[key]
+
+    async def _invalidated(self, key: str) -> None:
+        """Wait for a queued shared-tier invalidation of key (see invalidate_soon)."""
+        with self._lock:
+            pending = self._invalidating.get(key)
+        if pending is not None:
+            await asyncio.wrap_future(pending)
+
+    def _invalidate_shared(self, key: str) -> None:
+        client = self._redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                pipe.incr(self._gen_key(key))
+                pipe.expire(self._gen_key(key), self.ttl_seconds * 2)
+                pipe.delete(self._value_key(key))
+                pipe.publish(_INVALIDATION_CHANNEL, f"{self.namespace}|{_PROCESS_ID}|{key}")
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"[UserCache] {self.namespace} invalidation of {key} failed: {e}")
+
+    def drop_near(self, key: str) -> bool:
+        """Drop key from this process only (a load in flight is not cached)."""
+        with self._lock:
+            if key in self._loading:
+                self._stale.add(key)
+            return self._near.pop(key, None) is not None
+
+    async def clear(self) -> int:
+        """Clear the namespace; returns the number of entries dropped in this process."""
+        with self._lock:
+            count = len(self._near)
+            self._near.clear()
+            self._stale.update(self._loading)
+        await asyncio.to_thread(self._shared_clear)
+        return count
+
+    def _shared_clear(self) -> None:
+        client = self._redis()
+        if client is not None:
+            try:
+                keys = list(client.scan_iter(match=self._value_key("*")))
+                if keys:
+                    client.delete(*keys)
+            except Exception as e:
+                logger.warning(f"[UserCache] {self.namespace} clear failed: {e}")
+
+    async def cleanup_expired(self) -> int:
+        """Remove expired near-tier entries."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._near.items() if expires_at <= now]
+            for key in expired:
+                del self._near[key]
+        return len(expired)
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _value_key(self, key: str) -> str:
+        return _VALUE_KEY.format(namespace=self.namespace, key=key)
+
+    def _gen_key(self, key: str) -> str:
+        return _GEN_KEY.format(namespace=self.namespace, key=key)
+
+    def _lock_key(self, key: str) -> str:
+        return _LOCK_KEY.format(namespace=self.namespace, key=key)
+
+    def _near_get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._near.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] <= time.monotonic():
+                del self._near[key]
+                return False, None
+            self._near.move_to_end(key)
+            return True, entry[1]
+
+    def _near_put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._near[key] = (time.monotonic() + self.near_ttl_seconds, value)
+            self._near.move_to_end(key)
+            while len(self._near) > self.near_max_size:
+                self._near.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def _encode(self, gen: int, value: Any) -> Optional[str]:
+        """Shared-tier payload tagged with the key's generation (None if it cannot be stored)."""
+        try:
+            raw = json.dumps({'g': gen, 'v': value}, default=str)
+            if self.encrypt:
+                from src.utils.encryption import encrypt_token
+                raw = encrypt_token(raw)
+            return raw
+        except Exception as e:
+            logger.debug(f"[UserCache] Not storing {self.namespace} value in shared tier: {e}")
+            return None
+
+    def _decode(self, raw: Optional[str], gen: int) -> Tuple[bool, Any]:
+        if raw is None:
+            return False, None
+        try:
+            if self.encrypt:
+                from src.utils.encryption import decrypt_token
+                raw = decrypt_token(raw)
+            payload = json.loads(raw)
+        except Exception as e:
+            logger.debug(f"[UserCache] Unreadable {self.namespace} entry: {e}")
+            return False, None
+        # Loaded before the last invalidation
+        if payload.get('g') != gen:
+            return False, None
+        return True, payload.get('v')
+
+    async def _shared_client(self):
+        """Redis client, connecting (and pinging) off the event loop when needed."""
+        if self._client is not None and _listener is not None:
+            return self._client
+        return await asyncio.to_thread(self._redis)
+
+    def _redis(self):
+        if self._client is None and time.time() >= self._retry_at:
+            try:
+                import redis
+                client = redis.from_url(self.redis_url, decode_responses=True, socket_timeout=1)
+                client.ping()
+                self._client = client
+            except Exception as e:
+                logger.warning(f"[UserCache] Redis unavailable, {self.namespace} cache is per-process: {e}")
+                self._retry_at = time.time() + _REDIS_RETRY_SECONDS
+        if self._client is not None and _listener is None:
+            _start_listener(self._client)
+        return self._client
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            current_size = len(self._near)
+        lookups = stats['near_hits'] + stats['shared_hits'] + stats['misses'] + stats['coalesced']
+        hits = lookups - stats['misses']
+        return {
+            'namespace': self.namespace,
+            'backend': 'redis' if self._client is not None else 'local',
+            'max_size': self.near_max_size,
+            'current_size': current_size,
+            'ttl_seconds': self.ttl_seconds,
+            'total_requests': lookups,
+            'hits': hits,
+            'hit_rate': round(hits / lookups * 100, 2) if lookups else 0,
+            **stats,
+        }
+
+
+# ----------------------------------------------------------------------
+# Cross-process invalidation
+# ----------------------------------------------------------------------
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _start_listener(client: Any) -> None:
+    """Subscribe (once per process) to invalidations published by other processes."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{_INVALIDATION_CHANNEL: _on_invalidation})
+            _listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True, exception_handler=_on_listener_error)
+        except Exception as e:
+            logger.warning(f"[UserCache] Invalidation listener not started: {e}")
+
+
+def _on_invalidation(message: Dict[str, Any]) -> None:
+    try:
+        namespace, origin, key = message['data'].split('|', 2)
+    except (KeyError, ValueError, AttributeError):
+        return
+    if origin == _PROCESS_ID:
+        return
+    cache = _caches.get(namespace)
+    if cache is not None:
+        cache.drop_near(key)
+
+
+def _on_listener_error(error: Exception, pubsub: Any, thread: Any) -> None:
+    """Messages may have been missed: drop near tiers and resubscribe on next use."""
+    global _listener
+    logger.warning(f"[UserCache] Invalidation listener stopped: {error}")
+    thread.stop()
+    try:
+        pubsub.close()
+    except Exception:
+        pass
+    with _listener_lock:
+        _listener = None
+    for cache in list(_caches.values()):
+        with cache._lock:
+            cache._near.clear()
+
+
+# ----------------------------------------------------------------------
+# ORM rows and invalidation hooks
+# ----------------------------------------------------------------------
+
+_row_keys: Optional[Dict[type, Tuple[str, str]]] = None
+
+
+def _cached_rows() -> Dict[type, Tuple[str, str]]:
+    """Model -> (namespace, attribute holding the cache key)."""
+    global _row_keys
+    if _row_keys is None:
+        from src.database.models import Session, User, UserIntegration, UserSettings, UserWritingProfile
+        _row_keys = {
+            Session: ('session', 'session_token'),
+            User: ('user', 'id'),
+            UserIntegration: ('providers', 'user_id'),
+            UserSettings: ('settings', 'user_id'),
+            UserWritingProfile: ('profile', 'user_id'),
+        }
+    return _row_keys
+
+
+def _keys_for(rows: Iterable[Any]) -> Set[Tuple[str, str]]:
+    mapping = _cached_rows()
+    keys = set()
+    for row in rows:
+        entry = mapping.get(type(row))
+        if entry is None:
+            continue
+        namespace, attr = entry
+        # Read loaded state only: never trigger a lazy load inside a flush
+        value = sa_inspect(row).dict.get(attr)
+        if value is not None:
+            keys.add((namespace, str(value)))
+    return keys
+
+
+def _invalidate_all(keys: Iterable[Tuple[str, str]]) -> None:
+    try:
+        asyncio.get_running_loop()
+        on_loop = True  # AsyncSession (or a sync session used inside a coroutine)
+    except RuntimeError:
+        on_loop = False
+    for namespace, key in keys:
+        cache = get_user_cache(namespace)
+        if on_loop:
+            cache.invalidate_soon(key)
+        else:
+            cache.invalidate_key(key)
+
+
+def invalidate_flushed(session: Any) -> None:
+    """after_flush hook: invalidate cached copies of rows written in this flush."""
+    try:
+        keys = _keys_for(chain(session.new, session.dirty, session.deleted))
+        if keys:
+            session.info.setdefault(_PENDING_INFO_KEY, set()).update(keys)
+            _invalidate_all(keys)
+    except Exception as e:
+        logger.warning(f"[UserCache] Flush invalidation failed: {e}")
+
+
+def invalidate_committed(session: Any) -> None:
+    """after_commit hook: invalidate again, in case a reader cached pre-commit data."""
+    keys = session.info.pop(_PENDING_INFO_KEY, None)
+    if keys:
+        try:
+            _invalidate_all(keys)
+        except Exception as e:
+            logger.warning(f"[UserCache] Commit invalidation failed: {e}")
+
+
+def discard_pending(session: Any) -> None:
+    """after_rollback hook."""
+    session.info.pop(_PENDING_INFO_KEY, None)
+
+
+def snapshot_row(row: Any) -> Dict[str, Any]:
+    """Column values of an ORM row, JSON-safe (datetimes as ISO strings)."""
+    data = {}
+    for attr in sa_inspect(row).mapper.column_attrs:
+        value = getattr(row, attr.key)
+        data[attr.key] = value.isoformat() if isinstance(value, datetime) else value
+    return data
+
+
+def restore_row(model: type, data: Dict[str, Any]) -> Any:
+    """Detached instance of model rebuilt from snapshot_row() output."""
+    mapper = sa_inspect(model)
+    row = mapper.class_manager.new_instance()
+    for attr in mapper.column_attrs:
+        if attr.key not in data:
+            continue
+        value = data[attr.key]
+        if value is not None and isinstance(attr.columns[0].type, DateTime):
+            value = datetime.fromisoformat(value)
+        set_committed_value(row, attr.key, value)
+    make_transient_to_detached(row)
+    return row
+
+
+# Shared caches, one per namespace
+_caches: Dict[str, UserDataCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_user_cache(namespace: str, **kwargs: Any) -> UserDataCache:
+    """Get the process-wide cache for a namespace (kwargs apply on first use)."""
+    cache = _caches.get(namespace)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(namespace)
+            if cache is None:
+                cache = _caches[namespace] = UserDataCache(namespace, **kwargs)
+    return cache
+
+
+async def clear_user_caches() -> None:
+    """Clear every namespace used in this process (tests, admin tooling)."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        await cache.clear()
+
+
+def get_all_user_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every namespace used in this process."""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {namespace: cache.get_stats() for namespace, cache in caches.items()}
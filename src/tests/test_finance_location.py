@@ -22,10 +22,17 @@ async def test_finance_location_query():
         nonlocal captured_query, captured_bind_vars
         captured_query = query
         captured_bind_vars = bind_vars
+        if "RETURN r.id" in query:
+            return ['Receipt/2']
         return [{'total_spend': 100.0, 'count': 1, 'merchant': 'Chipotle', 'date': '2025-01-01'}]
         
     graph_manager.query = mock_query
     
+    async def mock_get_node(node_id):
+        return {'merchant': 'Amazon', 'location': 'Seattle, WA', 'date': '2025-01-01', 'total': 42.0}
+        
+    graph_manager.get_node = mock_get_node
+    
     # Initialize tool
     tool = FinanceTool(graph_manager=graph_manager)
     tool._get_graph_manager = lambda: graph_manager # Inject mock
@@ -41,8 +48,9 @@ async def test_finance_location_query():
     print(f"DEBUG: Captured AQL: {captured_query}")
     print(f"DEBUG: Captured Bind Vars: {captured_bind_vars}")
     
-    assert "r.location =~ @location" in captured_query
-    assert captured_bind_vars['location'] == "(?i)New York"
+    assert "CONTAINS(LOWER(r.location), @location)" in captured_query
+    assert "=~" not in captured_query
+    assert captured_bind_vars['location'] == "new york"
     print("Test 1 SUCCESS.")
     
     # Test 2: Get last transaction with location
@@ -51,13 +59,15 @@ async def test_finance_location_query():
         "merchant": "Amazon", 
         "location": "Seattle"
     }
-    await tool._handle_get_last_transaction(params2)
+    response = await tool._handle_get_last_transaction(params2)
     
     print(f"DEBUG: Captured AQL: {captured_query}")
     print(f"DEBUG: Captured Bind Vars: {captured_bind_vars}")
     
-    assert "AND r.location =~ @location" in captured_query
-    assert captured_bind_vars['location'] == "(?i)Seattle"
+    assert "CONTAINS(LOWER(r.location), @location)" in captured_query
+    assert "SORT r.date DESC" in captured_query
+    assert captured_bind_vars['location'] == "seattle"
+    assert "$42.00" in response
     print("Test 2 SUCCESS.")
 
 if __name__ == "__main__":
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 
 from ...utils.logger import setup_logger
 from ...utils.config import Config
+from ...services.indexing.graph.schema import NodeType
+from ...services.indexing.graph.text_search import user_id_values
 
 logger = setup_logger(__name__)
 
@@ -88,13 +90,15 @@ class FinanceTool(BaseTool):
             start_dt = datetime.now() - timedelta(days=days)
             start_date = start_dt.strftime('%Y-%m-%d')
 
+        # Case-insensitive literal matching: user input is never compiled as a
+        # regex, and the date range narrows the scan through the date index
         filters = []
         if merchant:
-            filters.append("r.merchant =~ @merchant")
+            filters.append("CONTAINS(LOWER(r.merchant), @merchant)")
         if category:
             filters.append("r.category == @category")
         if location:
-            filters.append("r.location =~ @location")
+            filters.append("CONTAINS(LOWER(r.location), @location)")
         
         filter_str = " AND ".join(filters)
         if filter_str:
@@ -103,6 +107,7 @@ class FinanceTool(BaseTool):
         query = f"""
         FOR r IN Receipt
         FILTER r.date >= @start_date AND r.date <= @end_date
+        AND r.user_id IN @user_ids
         {filter_str}
         COLLECT AGGREGATE total_spend = SUM(r.total), count = COUNT(r)
         RETURN {{ total_spend, count }}
@@ -111,10 +116,14 @@ class FinanceTool(BaseTool):
         bind_vars = {
             'start_date': start_date,
             'end_date': end_date,
-            'merchant': f"(?i){merchant}" if merchant else None,
-            'category': category,
-            'location': f"(?i){location}" if location else None
+            'user_ids': user_id_values(self.user_id),
         }
+        if merchant:
+            bind_vars['merchant'] = merchant.lower()
+        if category:
+            bind_vars['category'] = category
+        if location:
+            bind_vars['location'] = location.lower()
         
         results = await self.graph_manager.query(query, bind_vars)
         
@@ -137,28 +146,27 @@ class FinanceTool(BaseTool):
         if not merchant:
             return "Please specify a merchant name to find your last purchase."
 
-        bind_vars = {
-            'merchant': f"(?i){merchant}",
-            'location': f"(?i){params.get('location')}" if params.get('location') else None
-        }
-        
-        filter_clause = "FILTER r.merchant =~ @merchant"
-        if params.get('location'):
-            filter_clause += " AND r.location =~ @location"
-
-        query = f"""
-        FOR r IN Receipt
-        {filter_clause}
-        SORT r.date DESC, r.time DESC
-        LIMIT 1
-        RETURN r
-        """
-        results = await self.graph_manager.query(query, bind_vars)
+        location = params.get('location')
+        if location:
+            receipt = await self._find_last_receipt(merchant, location)
+        else:
+            # Merchant lookup on the graph text search view, newest first.
+            # Tokens match whole words only ("amazon" is not "amazonfresh"),
+            # so a miss falls back to the literal substring query.
+            results = await self.graph_manager.search_text(
+                merchant,
+                user_id=self.user_id,
+                node_types=[NodeType.RECEIPT],
+                fields=["merchants"],
+                limit=1,
+                min_match=1.0,
+                sort="date",
+            )
+            receipt = results[0] if results else await self._find_last_receipt(merchant, None)
         
-        if not results:
+        if not receipt:
             return f"I couldn't find any recent purchases at {merchant}."
 
-        receipt = results[0]
         total = receipt.get('total', 0.0)
         date = receipt.get('date', 'Unknown date')
         items = receipt.get('items', [])
@@ -173,6 +181,35 @@ class FinanceTool(BaseTool):
 
         return f"Your last purchase at **{receipt.get('merchant', merchant)}** was on **{date}** for **${total:.2f}**{item_str}."
 
+    async def _find_last_receipt(self, merchant: str, location: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Newest receipt whose merchant (and location, if given) contains the
+        search terms, case-insensitively.
+        
+        Both filters run in the query, walked newest-first through the date
+        index, so older matches are found however many newer receipts from
+        other locations precede them.
+        """
+        location_filter = "AND CONTAINS(LOWER(r.location), @location)" if location else ""
+        query = f"""
+        FOR r IN Receipt
+        FILTER r.user_id IN @user_ids
+        AND CONTAINS(LOWER(r.merchant), @merchant)
+        {location_filter}
+        SORT r.date DESC
+        LIMIT 1
+        RETURN r.id
+        """
+        bind_vars = {'user_ids': user_id_values(self.user_id), 'merchant': merchant.lower()}
+        if location:
+            bind_vars['location'] = location.lower()
+        
+        ids = await self.graph_manager.query(query, bind_vars)
+        if not ids or not ids[0]:
+            return None
+        # Fetched through the manager so encrypted properties (items) are decrypted
+        return await self.graph_manager.get_node(ids[0])
+
     async def _arun(self, action: str, **kwargs) -> str:
         """Async execution"""
         return await asyncio.to_thread(self._run, action=action, **kwargs)
@@ -47,7 +47,8 @@ from .resilience import (
     gmail_list_fallback,
     tasks_list_fallback,
     ServiceUnavailableError,
-    CircuitBreaker
+    CircuitBreaker,
+    get_circuit_breaker
 )
 from .api import (
     get_api_url_with_fallback,
@@ -122,6 +123,7 @@ __all__ = [
     'tasks_list_fallback',
     'ServiceUnavailableError',
     'CircuitBreaker',
+    'get_circuit_breaker',
     # API utilities
     'get_api_url_with_fallback',
     'get_api_base_url',
@@ -78,8 +78,8 @@ class CircuitBreaker:
 _circuit_breakers: Dict[str, CircuitBreaker] = {}
 
 
-def _get_circuit_breaker(name: str, **kwargs) -> CircuitBreaker:
-    """Get or create a circuit breaker"""
+def get_circuit_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Get or create the shared circuit breaker registered under name"""
     if name not in _circuit_breakers:
         _circuit_breakers[name] = CircuitBreaker(name=name, **kwargs)
     return _circuit_breakers[name]
@@ -92,7 +92,7 @@ def with_service_circuit_breaker(
     recovery_timeout: float = ConfigDefaults.CIRCUIT_BREAKER_RECOVERY_TIMEOUT
 ) -> Callable:
     """Generic circuit breaker decorator factory for service API calls"""
-    cb = _get_circuit_breaker(service_name, failure_threshold=failure_threshold, recovery_timeout=recovery_timeout)
+    cb = get_circuit_breaker(service_name, failure_threshold=failure_threshold, recovery_timeout=recovery_timeout)
     
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
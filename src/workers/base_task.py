@@ -8,6 +8,7 @@ import time
 
 from ..utils.logger import setup_logger
 from ..utils import PerformanceContext
+from ..ai.llm_gateway import llm_call_context, PRIORITY_BACKGROUND
 
 logger = setup_logger(__name__)
 
@@ -34,7 +35,9 @@ class BaseTask(Task):
         """Task execution with performance tracking"""
         task_name = self.name.split('.')[-1]
         
-        with PerformanceContext(f"celery_task_{task_name}"):
+        # LLM calls made by tasks are background work for the LLM gateway
+        with PerformanceContext(f"celery_task_{task_name}"), \
+                llm_call_context(caller=task_name, priority=PRIORITY_BACKGROUND):
             logger.info(f"Starting task: {self.name} (ID: {self.request.id})")
             start_time = time.time()
             
@@ -53,6 +53,7 @@ celery_app = Celery(
         'src.workers.tasks.integration_tasks',
         'src.workers.tasks.ghost_tasks',
         'src.workers.tasks.classification_tasks',
+        'src.workers.tasks.brief_tasks',
     ]
 )
 
@@ -151,12 +152,24 @@ celery_app.conf.update(
             }
         },
         
+        # Search tokens for graph nodes written before text search existed
+        'reindex-graph-search-tokens-nightly': {
+            'task': 'src.workers.tasks.indexing_tasks.reindex_graph_search_tokens',
+            'schedule': crontab(hour=2, minute=30),  # 2:30 AM UTC daily
+            'options': {'queue': 'indexing'}
+        },
+        
         # System maintenance tasks
         'cleanup-expired-sessions-hourly': {
             'task': 'src.workers.tasks.maintenance_tasks.cleanup_expired_sessions',
             'schedule': 3600.0,  # 1 hour
             'options': {'queue': 'default'}
         },
+        'tier-conversation-history-nightly': {
+            'task': 'src.workers.tasks.maintenance_tasks.tier_conversation_history',
+            'schedule': crontab(hour=3, minute=0),  # 3:00 AM UTC daily
+            'options': {'queue': 'default'}
+        },
         'update-cache-stats-hourly': {
             'task': 'src.workers.tasks.maintenance_tasks.update_cache_statistics',
             'schedule': 3600.0,  # 1 hour
@@ -198,6 +211,32 @@ celery_app.conf.update(
             'options': {'queue': 'default'}
         },
         
+        # Ghost: Apply buffered relationship interactions (write-combined)
+        'ghost-flush-relationship-interactions': {
+            'task': 'src.workers.tasks.ghost_tasks.flush_relationship_interactions',
+            'schedule': 30.0,  # RELATIONSHIP_FLUSH_SECONDS
+            'options': {'queue': 'default', 'expires': 25}
+        },
+        
+        # Workflows: resume runs orphaned by a dead worker (lease expired)
+        'resume-orphaned-workflows-every-minute': {
+            'task': 'src.workers.tasks.workflow_tasks.resume_orphaned_workflows',
+            'schedule': 60.0,  # WORKFLOW_LEASE_SECONDS
+            'options': {'queue': 'default', 'expires': 55}
+        },
+        'cleanup-workflow-runs-daily': {
+            'task': 'src.workers.tasks.workflow_tasks.cleanup_workflow_runs',
+            'schedule': crontab(hour=3, minute=30),  # 3:30 AM UTC daily
+            'options': {'queue': 'default'}
+        },
+        
+        # Notifications: delete finished outbox rows and expired idempotency keys
+        'cleanup-notification-outbox-daily': {
+            'task': 'src.workers.tasks.notification_tasks.cleanup_notification_outbox',
+            'schedule': crontab(hour=3, minute=45),  # 3:45 AM UTC daily
+            'options': {'queue': 'notifications'}
+        },
+        
         # Ghost: Relationship Reconnect (Weekly on Mondays)
         'ghost-reconnect-weekly': {
             'task': 'src.workers.tasks.ghost_tasks.send_reconnect_suggestions',
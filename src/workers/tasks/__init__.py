@@ -90,6 +90,7 @@ from .notification_tasks import (
     send_task_reminder,
     send_digest_email,
     send_alert,
+    cleanup_notification_outbox,
 )
 
 # Maintenance tasks
@@ -125,6 +126,8 @@ from .webhook_tasks import (
 # Workflow tasks
 from .workflow_tasks import (
     run_workflow,
+    resume_orphaned_workflows,
+    cleanup_workflow_runs,
 )
 
 __all__ = [
@@ -159,6 +162,7 @@ __all__ = [
     'send_task_reminder',
     'send_digest_email',
     'send_alert',
+    'cleanup_notification_outbox',
     # Maintenance
     'cleanup_expired_sessions',
     'update_cache_statistics',
@@ -181,4 +185,6 @@ __all__ = [
     'trigger_indexing_completed_webhook',
     'trigger_export_completed_webhook',
     'run_workflow',
+    'resume_orphaned_workflows',
+    'cleanup_workflow_runs',
 ]
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Dashboard Brief Celery Tasks
+Background materialization of dashboard briefs (see services/dashboard/brief_cache.py)
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from ..celery_app import celery_app
+from ..base_task import IdempotentTask
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@celery_app.task(base=IdempotentTask, bind=True)
+def refresh_dashboard_briefs(self, user_id: int, sections: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Rebuild the stale sections of a user's dashboard briefs snapshot.
+
+    Scheduled (debounced) by schedule_brief_refresh() when mail, calendar
+    or task data changes; the dashboard then serves the snapshot directly.
+
+    Args:
+        user_id: User ID
+        sections: Extra sections to force-refresh
+
+    Returns:
+        Refresh results
+    """
+    from src.services.dashboard.brief_cache import get_brief_store, schedule_brief_refresh
+    from src.services.dashboard.brief_service import BriefService
+    from src.core.credential_provider import CredentialFactory
+    from src.database import get_db_context
+    from src.database.models import User
+    from src.utils.config import load_config
+
+    store = get_brief_store()
+    refreshed = False
+
+    try:
+        started = time.monotonic()
+        config = load_config()
+
+        with get_db_context() as db:
+            user = db.query(User).filter(User.id == user_id).first()
+            if not user:
+                return {'status': 'skipped', 'reason': 'user_not_found', 'user_id': user_id}
+            user_name = user.name or (user.email.split('@')[0] if user.email else "there")
+
+            factory = CredentialFactory(config)
+            services = {}
+            for service_type in ('email', 'task', 'calendar'):
+                try:
+                    services[service_type] = factory.create_service(service_type, user_id=user_id, db_session=db)
+                except Exception as e:
+                    logger.warning(f"[BriefTasks] {service_type} service unavailable for user {user_id}: {e}")
+                    services[service_type] = None
+
+        brief_service = BriefService(
+            config=config,
+            email_service=services['email'],
+            task_service=services['task'],
+            calendar_service=services['calendar']
+        )
+        briefs = asyncio.run(brief_service.refresh_briefs(user_id, user_name=user_name, sections=sections))
+        refreshed = True
+
+        return {
+            'status': 'completed',
+            'user_id': user_id,
+            'sections_refreshed_at': briefs['meta']['sections_refreshed_at'],
+            'duration_seconds': round(time.monotonic() - started, 2),
+        }
+
+    except Exception as exc:
+        logger.error(f"[BriefTasks] Brief refresh failed for user {user_id}: {exc}")
+        raise
+
+    finally:
+        # Changes that arrived mid-refresh were marked stale but could not
+        # claim a refresh while this one held it; pick them up now.
+        store.release_refresh(user_id)
+        if refreshed and store.stale_sections(user_id):
+            schedule_brief_refresh(user_id)
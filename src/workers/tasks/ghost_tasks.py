@@ -6,6 +6,8 @@ Celery tasks for the Ghost Service (Deep Work Shield).
 from typing import Dict, Any
 from datetime import datetime
 
+from celery.signals import worker_process_shutdown
+
 from ..celery_app import celery_app
 from ..base_task import IdempotentTask
 from src.utils.logger import setup_logger
@@ -98,6 +100,50 @@ def send_daily_email_digest(self) -> Dict[str, Any]:
         raise
 
 
+@celery_app.task(base=IdempotentTask, bind=True)
+def flush_relationship_interactions(self) -> Dict[str, Any]:
+    """
+    Periodic task to apply buffered relationship interactions to the graph.
+    """
+    try:
+        import asyncio
+        from src.features.ghost.interaction_aggregator import get_interaction_aggregator
+        from src.services.indexing.graph import KnowledgeGraphManager
+        
+        aggregator = get_interaction_aggregator()
+        applied = asyncio.run(aggregator.flush(KnowledgeGraphManager(load_config())))
+        stats = aggregator.get_stats()
+        return {
+            "applied": applied,
+            "edges": stats["last_flush_edges"] if applied else 0,
+            "lag_seconds": stats["last_flush_lag_seconds"] if applied else None,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Relationship interaction flush failed: {e}")
+        raise
+
+
+@worker_process_shutdown.connect
+def flush_local_interactions_on_shutdown(**kwargs) -> None:
+    """
+    Apply relationship interactions this worker process buffered in memory
+    (Redis unavailable) before it exits; the beat task only reaches the
+    process that happens to run it.
+    """
+    try:
+        import asyncio
+        from src.features.ghost.interaction_aggregator import get_interaction_aggregator
+        from src.services.indexing.graph import KnowledgeGraphManager
+
+        aggregator = get_interaction_aggregator()
+        if aggregator.get_stats()["local_pending"]:
+            asyncio.run(aggregator.flush_local(KnowledgeGraphManager(load_config())))
+    except Exception as e:
+        logger.error(f"Shutdown interaction flush failed: {e}")
+
+
 @celery_app.task(base=IdempotentTask, bind=True)
 def send_reconnect_suggestions(self) -> Dict[str, Any]:
     """
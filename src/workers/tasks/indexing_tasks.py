@@ -691,6 +691,38 @@ def optimize_vector_store(self) -> Dict[str, Any]:
         raise
 
 
+@celery_app.task(base=IdempotentTask, bind=True)
+def reindex_graph_search_tokens(self) -> Dict[str, Any]:
+    """
+    Add search tokens to graph nodes stored before text search existed
+    
+    Batched and resumable (see KnowledgeGraphManager.reindex_search_tokens);
+    once every node has tokens a run finds nothing to do.
+    
+    Returns:
+        Reindex results
+    """
+    logger.info("Starting graph search token reindex")
+    
+    try:
+        from ...services.indexing.graph.manager import KnowledgeGraphManager
+        
+        graph_manager = KnowledgeGraphManager(config=load_config())
+        reindexed = asyncio.run(graph_manager.reindex_search_tokens())
+        
+        logger.info(f"Graph search token reindex complete: {reindexed} nodes")
+        
+        return {
+            'reindexed_nodes': reindexed,
+            'status': 'completed',
+            'completion_time': datetime.utcnow().isoformat()
+        }
+        
+    except Exception as exc:
+        logger.error(f"Graph search token reindex failed: {exc}")
+        raise
+
+
 @celery_app.task(base=IdempotentTask, bind=True)
 def index_new_email_notification(
     self,
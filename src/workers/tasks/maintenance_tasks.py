@@ -2,6 +2,7 @@
 Maintenance-related Celery Tasks
 Background tasks for system maintenance
 """
+import asyncio
 import os
 import time
 from typing import Dict, Any
@@ -65,6 +66,104 @@ def cleanup_expired_sessions(self) -> Dict[str, Any]:
         raise
 
 
+@celery_app.task(base=IdempotentTask, bind=True)
+def tier_conversation_history(self, hot_days: int = 30, warm_days: int = 180) -> Dict[str, Any]:
+    """
+    Nightly conversation retention: hot → warm (summarize + delete) → cold.
+    
+    Set-based and batched (see ConversationMemory.clear_old_messages); an
+    interrupted run resumes from its pending summaries on the next run.
+    
+    Args:
+        hot_days: Messages older than this are summarized and deleted
+        warm_days: Summaries older than this are dropped
+        
+    Returns:
+        Tiering results
+    """
+    logger.info("Starting conversation history tiering")
+    
+    async def _async_tier():
+        from src.database.async_database import get_async_db_context
+        from src.ai.conversation_memory import ConversationMemory
+        
+        async with get_async_db_context() as db:
+            memory = ConversationMemory(db, auto_init_rag=False)
+            deleted_messages = await memory.clear_old_messages(days=hot_days)
+            expired_summaries = await memory.clear_warm_tier(max_age_days=warm_days)
+            return deleted_messages, expired_summaries
+    
+    try:
+        started = time.monotonic()
+        deleted_messages, expired_summaries = asyncio.run(_async_tier())
+        
+        return {
+            'deleted_messages': deleted_messages,
+            'expired_summaries': expired_summaries,
+            'duration_seconds': round(time.monotonic() - started, 2),
+            'status': 'completed',
+            'cleanup_time': datetime.utcnow().isoformat()
+        }
+        
+    except Exception as exc:
+        logger.error(f"Conversation tiering failed: {exc}")
+        raise
+
+
+@celery_app.task(base=IdempotentTask, bind=True)
+def backfill_activity_rollups(self, days: int = 90) -> Dict[str, Any]:
+    """
+    Build activity rollups from content indexed before rollups existed.
+    
+    One-off: queued by ActivityRollupStore when it first creates its
+    collection. Safe to re-run; nodes already counted are skipped.
+    
+    Args:
+        days: How far back to count activity
+        
+    Returns:
+        Backfill results
+    """
+    logger.info("Starting activity rollup backfill")
+    
+    async def _async_backfill():
+        from src.database import get_db_context
+        from src.database.models import User
+        from src.services.indexing.graph.manager import KnowledgeGraphManager
+        from src.services.analytics.activity_rollups import get_activity_rollups
+        from src.utils.config import load_config
+        
+        with get_db_context() as db:
+            user_ids = [row.id for row in db.query(User.id).all()]
+        
+        rollups = get_activity_rollups(KnowledgeGraphManager(config=load_config()))
+        recorded = 0
+        for user_id in user_ids:
+            try:
+                recorded += await rollups.backfill(user_id, days=days)
+            except Exception as e:
+                logger.warning(f"Activity rollup backfill failed for user {user_id}: {e}")
+        return len(user_ids), recorded
+    
+    try:
+        started = time.monotonic()
+        users, recorded = asyncio.run(_async_backfill())
+        
+        logger.info(f"Activity rollup backfill complete: {recorded} activities for {users} users")
+        
+        return {
+            'users': users,
+            'recorded_activities': recorded,
+            'duration_seconds': round(time.monotonic() - started, 2),
+            'status': 'completed',
+            'completion_time': datetime.utcnow().isoformat()
+        }
+        
+    except Exception as exc:
+        logger.error(f"Activity rollup backfill failed: {exc}")
+        raise
+
+
 @celery_app.task(base=BaseTask, bind=True)
 def update_cache_statistics(self) -> Dict[str, Any]:
     """
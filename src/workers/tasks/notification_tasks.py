@@ -2,11 +2,12 @@
 Notification-related Celery Tasks
 Background tasks for sending notifications
 """
+import asyncio
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 from ..celery_app import celery_app
-from ..base_task import BaseTask, PriorityTask
+from ..base_task import BaseTask, IdempotentTask, PriorityTask
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -373,4 +374,19 @@ def send_alert(
         
     except Exception as exc:
         logger.error(f"Failed to send alert to user {user_id}: {exc}")
-        raise
\ No newline at end of file
+        raise
+
+
+@celery_app.task(base=IdempotentTask, bind=True)
+def cleanup_notification_outbox(self) -> Dict[str, Any]:
+    """
+    Periodic task to delete finished outbox rows and expired idempotency keys.
+    """
+    try:
+        from src.services.notifications import get_notification_outbox
+        
+        deleted = asyncio.run(get_notification_outbox().cleanup_old())
+        return {'deleted': deleted, 'timestamp': datetime.utcnow().isoformat()}
+    except Exception as exc:
+        logger.error(f"Notification outbox cleanup failed: {exc}")
+        raise
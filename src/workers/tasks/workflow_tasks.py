@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import json
 from typing import Dict, Any, Optional
 from datetime import datetime
@@ -7,7 +8,6 @@ from ..celery_app import celery_app
 from ..base_task import IdempotentTask
 from src.utils.logger import setup_logger
 from src.utils.config import load_config
-from src.workflows.base import WorkflowContext
 
 logger = setup_logger(__name__)
 
@@ -30,65 +30,102 @@ def _get_workflow_map():
         "batch_email_processor": BatchEmailProcessorWorkflow,
     }, AppState
 
+# Per-process executor backed by the durable workflow store
+_executor = None
+
+
+async def _create_workflow(workflow_name: str, user_id: int, params: Optional[Dict[str, Any]] = None):
+    """Executor factory: build a workflow with the user's tools (no Request needed)."""
+    _, AppState = _get_workflow_map()
+    
+    # These AppState methods handle credential retrieval from DB internally
+    email_tool = await AppState.get_email_tool(user_id)
+    calendar_tool = await AppState.get_calendar_tool(user_id)
+    task_tool = await AppState.get_task_tool(user_id)
+    
+    from src.workflows.factory import WorkflowFactory
+    workflow = WorkflowFactory.create_workflow(
+        workflow_name=workflow_name,
+        email_tool=email_tool,
+        calendar_tool=calendar_tool,
+        task_tool=task_tool,
+        params=params or {}
+    )
+    if not workflow:
+        raise ValueError(f"Unknown workflow or initialization failed: {workflow_name}")
+    return workflow
+
+
+def _get_executor():
+    """Executor shared by the workflow tasks in this worker process."""
+    global _executor
+    if _executor is None:
+        from src.workflows.engine import WorkflowExecutor, PersistentStateManager
+        
+        WORKFLOW_MAP, _ = _get_workflow_map()
+        _executor = WorkflowExecutor(state_manager=PersistentStateManager())
+        for name, workflow_cls in WORKFLOW_MAP.items():
+            _executor.register(workflow_cls, functools.partial(_create_workflow, name))
+    return _executor
+
+
 @celery_app.task(base=IdempotentTask, bind=True, name='src.workers.tasks.workflow_tasks.run_workflow')
 def run_workflow(self, user_id: int, workflow_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
     """
     Background task to execute a workflow.
+    
+    The run is checkpointed under the Celery task ID, so a redelivered task
+    (worker lost mid-run) resumes it instead of repeating completed steps.
     """
     logger.info(f"[WORKFLOW] Starting background workflow {workflow_name} for user {user_id}")
+    workflow_id = self.request.id
     
     async def _execute():
-        # Lazy import to avoid circular dependency
-        WORKFLOW_MAP, AppState = _get_workflow_map()
-
-        # 1. Get workflow class
-        workflow_cls = WORKFLOW_MAP.get(workflow_name)
-        if not workflow_cls:
+        WORKFLOW_MAP, _ = _get_workflow_map()
+        if workflow_name not in WORKFLOW_MAP:
             return {"status": "failed", "error": f"Unknown workflow: {workflow_name}"}
-            
-        # 2. Initialize tools/services (without requiring a real Request)
-        # These AppState methods handle credential retrieval from DB internally
-        email_tool = await AppState.get_email_tool(user_id)
-        calendar_tool = await AppState.get_calendar_tool(user_id)
-        task_tool = await AppState.get_task_tool(user_id)
         
-        # 3. Instantiate specific workflow via Factory
-        from src.workflows.factory import WorkflowFactory
         try:
-            workflow = WorkflowFactory.create_workflow(
-                workflow_name=workflow_name,
-                email_tool=email_tool,
-                calendar_tool=calendar_tool,
-                task_tool=task_tool,
-                params=params
+            outcome = await _get_executor().run(
+                workflow_name,
+                user_id=user_id,
+                params=params,
+                workflow_id=workflow_id
             )
-            
-            if not workflow:
-                return {"status": "failed", "error": f"Unknown workflow or initialization failed: {workflow_name}"}
-                
-        except Exception as e:
-            logger.error(f"Workflow {workflow_name} factory creation failed: {e}")
-            return {"status": "failed", "error": f"Initialization failed: {str(e)}"}
-
-        # 4. Create Context and Execute
-        context = WorkflowContext.create(
-            workflow_name=workflow_name,
-            user_id=user_id,
-            params=params
-        )
-        
-        context.start()
-        try:
-            result = await workflow.execute(context)
-            context.complete(result)
             return {
-                "status": "completed",
-                "workflow_id": context.workflow_id,
-                "result": result,
-                "duration": (context.completed_at - context.started_at).total_seconds() if context.completed_at else 0
+                "status": outcome["status"],
+                "workflow_id": outcome["workflow_id"],
+                "result": outcome["result"],
+                "duration": outcome["duration_seconds"]
             }
         except Exception as e:
             logger.error(f"Workflow {workflow_name} execution failed: {e}")
-            return {"status": "failed", "error": str(e), "workflow_id": context.workflow_id}
+            return {"status": "failed", "error": str(e), "workflow_id": workflow_id}
 
     return asyncio.run(_execute())
+
+
+@celery_app.task(base=IdempotentTask, bind=True, name='src.workers.tasks.workflow_tasks.resume_orphaned_workflows')
+def resume_orphaned_workflows(self) -> Dict[str, Any]:
+    """
+    Periodic task to resume workflow runs whose worker died mid-run.
+    """
+    try:
+        recovered = asyncio.run(_get_executor().recover_orphaned())
+        return {"recovered": recovered, "timestamp": datetime.utcnow().isoformat()}
+    except Exception as e:
+        logger.error(f"Workflow recovery failed: {e}")
+        raise
+
+
+@celery_app.task(base=IdempotentTask, bind=True, name='src.workers.tasks.workflow_tasks.cleanup_workflow_runs')
+def cleanup_workflow_runs(self) -> Dict[str, Any]:
+    """
+    Periodic task to delete finished workflow runs past retention.
+    """
+    try:
+        deleted = asyncio.run(_get_executor().state_manager.cleanup_old())
+        return {"deleted": deleted, "timestamp": datetime.utcnow().isoformat()}
+    except Exception as e:
+        logger.error(f"Workflow run cleanup failed: {e}")
+        raise
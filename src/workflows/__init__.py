@@ -5,7 +5,8 @@ Automated productivity workflows that combine multiple tools.
 
 Architecture (v2.0):
 - base/: Core abstractions (Workflow, WorkflowContext, WorkflowStep)
-- engine/: Execution infrastructure (WorkflowExecutor, StateManager, EventEmitter)
+- engine/: Execution infrastructure (WorkflowExecutor, StateManager,
+  PersistentStateManager, EventEmitter)
 - definitions/: Workflow implementations
 
 Example usage:
@@ -41,6 +42,8 @@ from .base import (
 from .engine import (
     WorkflowExecutor,
     StateManager,
+    PersistentStateManager,
+    WorkflowLeaseLost,
     EventEmitter
 )
 
@@ -63,6 +66,8 @@ __all__ = [
     # Engine
     'WorkflowExecutor',
     'StateManager',
+    'PersistentStateManager',
+    'WorkflowLeaseLost',
     'EventEmitter',
     # Definitions
     'MorningBriefingWorkflow',
@@ -8,11 +8,16 @@ Provides abstract base classes for workflow definitions:
 """
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Callable
+from typing import Any, Awaitable, Dict, List, Optional, Callable
 from datetime import datetime
 from enum import Enum
+import inspect
 import uuid
 
+from ...utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
 
 class WorkflowStatus(str, Enum):
     """Workflow execution status"""
@@ -57,16 +62,26 @@ class WorkflowContext:
     total_steps: int = 0
     step_history: List[Dict[str, Any]] = field(default_factory=list)
     
+    # Step checkpoints (name -> {status, result, idempotency_key}); a resumed
+    # run skips every step checkpointed as completed
+    checkpoints: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    
+    # Persists the context after each checkpoint (set by the executor)
+    checkpoint_hook: Optional[Callable[['WorkflowContext'], Awaitable[None]]] = field(
+        default=None, repr=False, compare=False
+    )
+    
     @classmethod
     def create(
         cls,
         workflow_name: str,
         user_id: int,
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        workflow_id: Optional[str] = None
     ) -> 'WorkflowContext':
         """Create a new workflow context"""
         return cls(
-            workflow_id=str(uuid.uuid4()),
+            workflow_id=workflow_id or str(uuid.uuid4()),
             workflow_name=workflow_name,
             user_id=user_id,
             params=params or {}
@@ -90,6 +105,63 @@ class WorkflowContext:
         self.error = error
         self.error_step = step
     
+    def idempotency_key(self, step_name: str) -> str:
+        """Stable key for a side-effecting step, identical across resumes."""
+        return f"{self.workflow_id}:{step_name}"
+    
+    def is_checkpointed(self, step_name: str) -> bool:
+        """Whether a step already completed in this run (possibly on another worker)."""
+        return self.checkpoints.get(step_name, {}).get("status") == "completed"
+    
+    async def checkpoint(
+        self,
+        step_name: str,
+        step: Callable[[], Any],
+        side_effect: bool = False
+    ) -> Any:
+        """
+        Run a step at most once per workflow run and checkpoint its result.
+        
+        Completed steps return their recorded result without running again.
+        Side-effecting steps are marked started before they run; if a worker
+        dies mid-step the step is re-run on resume, so it should pass
+        idempotency_key(step_name) to the service it calls.
+        
+        Args:
+            step_name: Unique step name within the workflow
+            step: Zero-argument callable (sync or async) performing the step
+            side_effect: Record the step as started before running it
+            
+        Returns:
+            Step result (must be JSON-serializable to survive a resume)
+        """
+        if self.is_checkpointed(step_name):
+            return self.checkpoints[step_name].get("result")
+        
+        if step_name in self.checkpoints:
+            logger.warning(
+                f"[WORKFLOWS] Re-running interrupted step {step_name} "
+                f"(id={self.workflow_id}, key={self.idempotency_key(step_name)})"
+            )
+        if side_effect:
+            self.checkpoints[step_name] = {
+                "status": "started",
+                "idempotency_key": self.idempotency_key(step_name),
+            }
+            await self._persist_checkpoint()
+        
+        result = step()
+        if inspect.isawaitable(result):
+            result = await result
+        
+        self.checkpoints[step_name] = {"status": "completed", "result": result}
+        await self._persist_checkpoint()
+        return result
+    
+    async def _persist_checkpoint(self):
+        if self.checkpoint_hook is not None:
+            await self.checkpoint_hook(self)
+    
     def record_step(self, step_name: str, result: Any, duration_ms: int):
         """Record a completed step"""
         self.step_history.append({
@@ -116,8 +188,33 @@ class WorkflowContext:
             "error_step": self.error_step,
             "current_step": self.current_step,
             "total_steps": self.total_steps,
-            "step_history": self.step_history
+            "step_history": self.step_history,
+            "checkpoints": self.checkpoints
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'WorkflowContext':
+        """Rebuild a context serialized with to_dict()"""
+        def _dt(value: Optional[str]) -> Optional[datetime]:
+            return datetime.fromisoformat(value) if value else None
+        
+        return cls(
+            workflow_id=data["workflow_id"],
+            workflow_name=data["workflow_name"],
+            user_id=data["user_id"],
+            status=WorkflowStatus(data.get("status", WorkflowStatus.PENDING.value)),
+            started_at=_dt(data.get("started_at")),
+            completed_at=_dt(data.get("completed_at")),
+            params=data.get("params") or {},
+            state=data.get("state") or {},
+            result=data.get("result"),
+            error=data.get("error"),
+            error_step=data.get("error_step"),
+            current_step=data.get("current_step", 0),
+            total_steps=data.get("total_steps", 0),
+            step_history=data.get("step_history") or [],
+            checkpoints=data.get("checkpoints") or {},
+        )
 
 
 class Workflow(ABC):
@@ -212,7 +309,8 @@ class WorkflowStep:
         func: Callable,
         description: str = "",
         required: bool = True,
-        retry_count: int = 0
+        retry_count: int = 0,
+        side_effect: bool = False
     ):
         """
         Initialize a workflow step.
@@ -223,12 +321,15 @@ class WorkflowStep:
             description: Human-readable description
             required: If False, errors won't fail the workflow
             retry_count: Number of retries on failure
+            side_effect: Step changes external state (sends, creates, archives);
+                         it is checkpointed as started before it runs
         """
         self.name = name
         self.func = func
         self.description = description
         self.required = required
         self.retry_count = retry_count
+        self.side_effect = side_effect
     
     async def execute(self, context: WorkflowContext) -> Any:
         """Execute the step function"""
@@ -250,31 +351,39 @@ class StepBasedWorkflow(Workflow):
         name: str,
         func: Callable,
         description: str = "",
-        required: bool = True
+        required: bool = True,
+        side_effect: bool = False
     ):
         """Add a step to the workflow"""
         self.steps.append(WorkflowStep(
             name=name,
             func=func,
             description=description,
-            required=required
+            required=required,
+            side_effect=side_effect
         ))
     
     async def execute(self, context: WorkflowContext) -> Dict[str, Any]:
-        """Execute all steps in sequence"""
+        """Execute all steps in sequence, skipping steps checkpointed by an earlier attempt"""
         context.total_steps = len(self.steps)
         results = {}
         
         for step in self.steps:
             start_time = datetime.utcnow()
+            resumed = context.is_checkpointed(step.name)
             
             try:
-                result = await step.execute(context)
+                result = await context.checkpoint(
+                    step.name,
+                    lambda step=step: step.execute(context),
+                    side_effect=step.side_effect
+                )
                 results[step.name] = result
                 context.state[step.name] = result
                 
-                duration_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
-                context.record_step(step.name, result, duration_ms)
+                if not resumed:
+                    duration_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+                    context.record_step(step.name, result, duration_ms)
                 
             except Exception as e:
                 if step.required:
@@ -5,6 +5,9 @@ Processes an email and automatically:
 - Extracts action items → creates tasks
 - Detects meeting requests → creates calendar events
 - Classifies and categorizes the email
+
+LLM extractions and every created task/event are checkpointed, so a run
+resumed on another worker does not create them twice.
 """
 import asyncio
 from typing import Dict, Any, List, Optional
@@ -110,12 +113,16 @@ class EmailToActionWorkflow(Workflow):
         context.state['email_subject'] = email.get('subject', 'No subject')
         context.state['email_from'] = email.get('from', 'Unknown')
         
-        # Step 2: Extract action items
-        action_items = await asyncio.to_thread(
-            self.email_ai_analyzer.extract_action_items,
-            email_data=email,
-            context={},
-            auto_categorize=True
+        # Step 2: Extract action items (checkpointed so a resumed run creates
+        # tasks from the same list rather than a fresh LLM extraction)
+        action_items = await context.checkpoint(
+            "extract_action_items",
+            lambda: asyncio.to_thread(
+                self.email_ai_analyzer.extract_action_items,
+                email_data=email,
+                context={},
+                auto_categorize=True
+            )
         )
         
         result['action_items_found'] = action_items
@@ -123,32 +130,26 @@ class EmailToActionWorkflow(Workflow):
         
         # Step 3: Create tasks if enabled
         if auto_create_tasks and action_items:
-            for task_data in action_items:
+            for index, task_data in enumerate(action_items):
                 try:
-                    task = await asyncio.to_thread(
-                        self.task_service.create_task,
-                        title=task_data.get('title', 'Task from email'),
-                        due_date=task_data.get('due_date'),
-                        priority=task_data.get('priority', 'medium'),
-                        category=task_data.get('category', 'work'),
-                        notes=f"From email: {email.get('subject', 'No subject')}\nEmail ID: {email_id}",
-                        tags=['email', 'auto-created']
+                    created = await context.checkpoint(
+                        f"create_task:{index}",
+                        lambda task_data=task_data: self._create_task(task_data, email, email_id),
+                        side_effect=True
                     )
-                    result['tasks_created'].append({
-                        "id": task.get('id'),
-                        "title": task_data.get('title'),
-                        "source": "email_action_item"
-                    })
-                    logger.info(f"[WORKFLOW] Created task: {task_data.get('title')}")
+                    result['tasks_created'].append(created)
                 except Exception as e:
                     error_msg = f"Failed to create task '{task_data.get('title')}': {e}"
                     result['errors'].append(error_msg)
                     logger.error(f"[WORKFLOW] {error_msg}")
         
         # Step 4: Detect calendar events
-        event_suggestions = await asyncio.to_thread(
-            self.email_ai_analyzer.suggest_calendar_events,
-            email
+        event_suggestions = await context.checkpoint(
+            "suggest_calendar_events",
+            lambda: asyncio.to_thread(
+                self.email_ai_analyzer.suggest_calendar_events,
+                email
+            )
         )
         
         result['events_suggested'] = event_suggestions
@@ -156,37 +157,28 @@ class EmailToActionWorkflow(Workflow):
         
         # Step 5: Create events if enabled
         if auto_create_events and event_suggestions:
-            for event_data in event_suggestions:
+            for index, event_data in enumerate(event_suggestions):
                 try:
-                    event = await asyncio.to_thread(
-                        self.calendar_service.create_event,
-                        title=event_data.get('title', 'Event from email'),
-                        start_time=event_data.get('start_time'),
-                        duration_minutes=event_data.get('duration_minutes', 60),
-                        description=f"From email: {email.get('subject', '')}\nEmail ID: {email_id}",
-                        attendees=event_data.get('attendees', [])
+                    created = await context.checkpoint(
+                        f"create_event:{index}",
+                        lambda event_data=event_data: self._create_event(event_data, email, email_id),
+                        side_effect=True
                     )
-                    result['events_created'].append({
-                        "id": event.get('id'),
-                        "title": event_data.get('title'),
-                        "start_time": event_data.get('start_time'),
-                        "source": "email_meeting_request"
-                    })
-                    logger.info(f"[WORKFLOW] Created event: {event_data.get('title')}")
+                    result['events_created'].append(created)
                 except Exception as e:
                     error_msg = f"Failed to create event '{event_data.get('title')}': {e}"
                     result['errors'].append(error_msg)
                     logger.error(f"[WORKFLOW] {error_msg}")
         
         # Step 6: Classify email
-        urgency = await asyncio.to_thread(
-            self.email_ai_analyzer.classify_urgency,
-            email
+        urgency = await context.checkpoint(
+            "classify_urgency",
+            lambda: asyncio.to_thread(self.email_ai_analyzer.classify_urgency, email)
         )
         
-        category = await asyncio.to_thread(
-            self.email_ai_analyzer.suggest_email_category,
-            email
+        category = await context.checkpoint(
+            "suggest_email_category",
+            lambda: asyncio.to_thread(self.email_ai_analyzer.suggest_email_category, email)
         )
         
         result['email_classification'] = {
@@ -199,9 +191,10 @@ class EmailToActionWorkflow(Workflow):
         # Step 7: Archive if requested
         if auto_archive:
             try:
-                await asyncio.to_thread(
-                    self.email_service.archive_email,
-                    email_id
+                await context.checkpoint(
+                    "archive_email",
+                    lambda: asyncio.to_thread(self.email_service.archive_email, email_id),
+                    side_effect=True
                 )
                 result['archived'] = True
                 logger.info(f"[WORKFLOW] Archived email: {email_id}")
@@ -221,6 +214,52 @@ class EmailToActionWorkflow(Workflow):
         }
         
         return result
+    
+    async def _create_task(
+        self,
+        task_data: Dict[str, Any],
+        email: Dict[str, Any],
+        email_id: str
+    ) -> Dict[str, Any]:
+        """Create one task from an action item"""
+        task = await asyncio.to_thread(
+            self.task_service.create_task,
+            title=task_data.get('title', 'Task from email'),
+            due_date=task_data.get('due_date'),
+            priority=task_data.get('priority', 'medium'),
+            category=task_data.get('category', 'work'),
+            notes=f"From email: {email.get('subject', 'No subject')}\nEmail ID: {email_id}",
+            tags=['email', 'auto-created']
+        )
+        logger.info(f"[WORKFLOW] Created task: {task_data.get('title')}")
+        return {
+            "id": task.get('id'),
+            "title": task_data.get('title'),
+            "source": "email_action_item"
+        }
+    
+    async def _create_event(
+        self,
+        event_data: Dict[str, Any],
+        email: Dict[str, Any],
+        email_id: str
+    ) -> Dict[str, Any]:
+        """Create one calendar event from a meeting suggestion"""
+        event = await asyncio.to_thread(
+            self.calendar_service.create_event,
+            title=event_data.get('title', 'Event from email'),
+            start_time=event_data.get('start_time'),
+            duration_minutes=event_data.get('duration_minutes', 60),
+            description=f"From email: {email.get('subject', '')}\nEmail ID: {email_id}",
+            attendees=event_data.get('attendees', [])
+        )
+        logger.info(f"[WORKFLOW] Created event: {event_data.get('title')}")
+        return {
+            "id": event.get('id'),
+            "title": event_data.get('title'),
+            "start_time": event_data.get('start_time'),
+            "source": "email_meeting_request"
+        }
 
 
 class BatchEmailProcessorWorkflow(Workflow):
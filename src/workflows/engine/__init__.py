@@ -8,9 +8,15 @@ from .executor import (
     EventEmitter,
     StateManager
 )
+from .store import (
+    PersistentStateManager,
+    WorkflowLeaseLost
+)
 
 __all__ = [
     'WorkflowExecutor',
     'EventEmitter',
-    'StateManager'
+    'StateManager',
+    'PersistentStateManager',
+    'WorkflowLeaseLost'
 ]
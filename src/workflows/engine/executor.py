@@ -2,16 +2,23 @@
 Workflow Executor
 
 Runs workflows with:
-- State management
+- State management (in-memory here; durable, resumable runs via
+  store.PersistentStateManager)
 - Event emission
 - Error handling
 - Logging
 """
 import asyncio
+import inspect
+import os
+import socket
+import uuid
 from typing import Dict, Any, Type, Optional, List
 from datetime import datetime
 
 from ..base.workflow import Workflow, WorkflowContext, WorkflowStatus
+from .store import WorkflowLeaseLost
+from ...services.service_constants import ServiceConstants
 from ...utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -24,6 +31,8 @@ class WorkflowExecutor:
     Features:
     - Async execution with timeout support
     - State persistence via StateManager
+    - Step checkpoints and lease-based ownership, so a run orphaned by a
+      dead worker is resumed elsewhere without repeating completed steps
     - Event emission for monitoring
     - Comprehensive logging
     """
@@ -32,7 +41,8 @@ class WorkflowExecutor:
         self,
         state_manager: Optional['StateManager'] = None,
         event_emitter: Optional['EventEmitter'] = None,
-        default_timeout: int = 300  # 5 minutes
+        default_timeout: int = 300,  # 5 minutes
+        worker_id: Optional[str] = None
     ):
         """
         Initialize the workflow executor.
@@ -41,12 +51,14 @@ class WorkflowExecutor:
             state_manager: Optional state persistence manager
             event_emitter: Optional event emitter for workflow events
             default_timeout: Default execution timeout in seconds
+            worker_id: Lease owner name for runs executed here (random if omitted)
         """
         self._workflows: Dict[str, Type[Workflow]] = {}
         self._workflow_factories: Dict[str, callable] = {}
         self.state_manager = state_manager
         self.event_emitter = event_emitter
         self.default_timeout = default_timeout
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
         
         logger.info("[WORKFLOWS] WorkflowExecutor initialized")
     
@@ -60,8 +72,8 @@ class WorkflowExecutor:
         
         Args:
             workflow_class: Workflow class to register
-            factory: Optional factory function to create instances
-                     Factory receives (user_id, **kwargs) and returns Workflow
+            factory: Optional factory function (sync or async) to create instances
+                     Factory receives (user_id, params, **kwargs) and returns Workflow
         """
         name = workflow_class.name
         self._workflows[name] = workflow_class
@@ -82,12 +94,37 @@ class WorkflowExecutor:
             for cls in self._workflows.values()
         ]
     
+    async def _create_workflow(
+        self,
+        workflow_name: str,
+        user_id: int,
+        params: Dict[str, Any],
+        factory_kwargs: Dict[str, Any]
+    ) -> Workflow:
+        """Instantiate a registered workflow"""
+        workflow_class = self._workflows.get(workflow_name)
+        if not workflow_class:
+            raise ValueError(f"Unknown workflow: {workflow_name}")
+        
+        if workflow_name not in self._workflow_factories:
+            return workflow_class()
+        
+        workflow = self._workflow_factories[workflow_name](
+            user_id=user_id,
+            params=params,
+            **factory_kwargs
+        )
+        if inspect.isawaitable(workflow):
+            workflow = await workflow
+        return workflow
+    
     async def run(
         self,
         workflow_name: str,
         user_id: int,
         params: Optional[Dict[str, Any]] = None,
         timeout: Optional[int] = None,
+        workflow_id: Optional[str] = None,
         **factory_kwargs
     ) -> Dict[str, Any]:
         """
@@ -98,6 +135,9 @@ class WorkflowExecutor:
             user_id: User ID for the workflow
             params: Workflow parameters
             timeout: Execution timeout in seconds
+            workflow_id: Optional run ID; if a run with this ID already
+                         exists (e.g. a redelivered task) it is resumed
+                         or its outcome returned instead of starting over
             **factory_kwargs: Additional kwargs for workflow factory
             
         Returns:
@@ -106,25 +146,20 @@ class WorkflowExecutor:
         Raises:
             ValueError: If workflow not registered
             TimeoutError: If execution exceeds timeout
+            WorkflowLeaseLost: If another worker took the run over
             Exception: Workflow execution errors
         """
-        # Get workflow class
-        workflow_class = self._workflows.get(workflow_name)
-        if not workflow_class:
-            raise ValueError(f"Unknown workflow: {workflow_name}")
+        if workflow_id and self.state_manager:
+            existing = await self.state_manager.get(workflow_id)
+            if existing:
+                resumed = await self.resume(workflow_id, timeout=timeout, **factory_kwargs)
+                return resumed or self._summarize(existing)
         
-        # Create workflow instance
-        if workflow_name in self._workflow_factories:
-            workflow = self._workflow_factories[workflow_name](
-                user_id=user_id,
-                **factory_kwargs
-            )
-        else:
-            workflow = workflow_class()
+        params = params or {}
+        workflow = await self._create_workflow(workflow_name, user_id, params, factory_kwargs)
         
         # Validate parameters
         required_params = workflow.get_required_params()
-        params = params or {}
         
         for param in required_params:
             if param not in params:
@@ -137,12 +172,13 @@ class WorkflowExecutor:
         context = WorkflowContext.create(
             workflow_name=workflow_name,
             user_id=user_id,
-            params=params
+            params=params,
+            workflow_id=workflow_id
         )
         
-        # Persist initial state
+        # Persist initial state (and take the lease on the new run)
         if self.state_manager:
-            await self.state_manager.save(context)
+            await self.state_manager.save(context, owner=self.worker_id)
         
         # Emit start event
         await self._emit_event(
@@ -159,17 +195,156 @@ class WorkflowExecutor:
             f"(id={context.workflow_id}, user={user_id})"
         )
         
+        context.start()
+        return await self._execute(workflow, context, timeout)
+    
+    async def resume(
+        self,
+        workflow_id: str,
+        timeout: Optional[int] = None,
+        **factory_kwargs
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Resume a run from its last checkpoint.
+        
+        Steps checkpointed as completed are not executed again.
+        
+        Args:
+            workflow_id: ID of the run to resume
+            timeout: Execution timeout in seconds
+            **factory_kwargs: Additional kwargs for workflow factory
+            
+        Returns:
+            Workflow result dictionary, or None if the run is finished or
+            another worker holds its lease
+        """
+        if not self.state_manager:
+            return None
+        
+        context = await self.state_manager.acquire(workflow_id, self.worker_id)
+        if context is None:
+            return None
+        
+        try:
+            workflow = await self._create_workflow(
+                context.workflow_name, context.user_id, context.params, factory_kwargs
+            )
+        except Exception:
+            await self.state_manager.release(workflow_id, self.worker_id)
+            raise
+        
+        completed = [name for name in context.checkpoints if context.is_checkpointed(name)]
+        await self._emit_event(
+            f"workflow.{context.workflow_name}.resumed",
+            {
+                "workflow_id": workflow_id,
+                "user_id": context.user_id,
+                "completed_steps": completed
+            }
+        )
+        
+        logger.info(
+            f"[WORKFLOWS] Resuming {context.workflow_name} "
+            f"(id={workflow_id}, skipping {len(completed)} completed steps)"
+        )
+        
+        context.status = WorkflowStatus.RUNNING
+        if context.started_at is None:
+            context.started_at = datetime.utcnow()
+        return await self._execute(workflow, context, timeout)
+    
+    async def recover_orphaned(
+        self,
+        max_attempts: int = ServiceConstants.WORKFLOW_MAX_ATTEMPTS,
+        **factory_kwargs
+    ) -> int:
+        """
+        Resume runs whose worker stopped renewing its lease.
+        
+        Runs already started max_attempts times are marked failed instead.
+        
+        Args:
+            max_attempts: Starts allowed before an orphaned run is failed
+            **factory_kwargs: Additional kwargs for workflow factories
+            
+        Returns:
+            Number of runs resumed to completion
+        """
+        if not self.state_manager:
+            return 0
+        
+        recovered = 0
+        for orphan in await self.state_manager.find_orphaned():
+            workflow_id = orphan["workflow_id"]
+            try:
+                if orphan["attempts"] >= max_attempts:
+                    await self._abandon(workflow_id, orphan["attempts"])
+                    continue
+                result = await self.resume(workflow_id, **factory_kwargs)
+                if result and result["status"] == WorkflowStatus.COMPLETED.value:
+                    recovered += 1
+            except WorkflowLeaseLost:
+                logger.warning(f"[WORKFLOWS] Lost lease on recovered run {workflow_id}")
+            except Exception as e:
+                logger.error(f"[WORKFLOWS] Failed to recover {workflow_id}: {e}")
+        
+        return recovered
+    
+    async def _abandon(self, workflow_id: str, attempts: int):
+        """Fail an orphaned run that keeps dying mid-execution"""
+        context = await self.state_manager.acquire(workflow_id, self.worker_id)
+        if context is None:
+            return
+        context.fail(f"Abandoned after {attempts} interrupted attempts")
+        await self.state_manager.save(context, owner=self.worker_id)
+        await self.state_manager.release(workflow_id, self.worker_id)
+        
+        await self._emit_event(
+            f"workflow.{context.workflow_name}.failed",
+            {"workflow_id": workflow_id, "error": context.error, "error_step": None}
+        )
+        logger.error(f"[WORKFLOWS] Abandoned {workflow_id} after {attempts} attempts")
+    
+    async def _execute(
+        self,
+        workflow: Workflow,
+        context: WorkflowContext,
+        timeout: Optional[int]
+    ) -> Dict[str, Any]:
+        """Run a workflow under this worker's lease and persist its outcome"""
+        workflow_name = context.workflow_name
+        
+        if self.state_manager:
+            async def persist(ctx: WorkflowContext):
+                await self.state_manager.save(ctx, owner=self.worker_id)
+            context.checkpoint_hook = persist
+        
+        lease_lost = asyncio.Event()
+        heartbeat = None
+        
         try:
-            # Start workflow
-            context.start()
             await workflow.on_start(context)
             
-            # Execute with timeout
+            # Execute with timeout, renewing the lease meanwhile
             timeout = timeout or self.default_timeout
-            result = await asyncio.wait_for(
-                workflow.execute(context),
-                timeout=timeout
+            execution = asyncio.ensure_future(
+                asyncio.wait_for(workflow.execute(context), timeout=timeout)
             )
+            if self.state_manager:
+                heartbeat = asyncio.create_task(
+                    self._heartbeat(context.workflow_id, execution, lease_lost)
+                )
+            try:
+                result = await execution
+            except asyncio.CancelledError:
+                if lease_lost.is_set():
+                    raise WorkflowLeaseLost(
+                        f"Workflow {context.workflow_id} lease lost mid-run"
+                    )
+                raise
+            finally:
+                if heartbeat:
+                    heartbeat.cancel()
             
             # Complete workflow
             context.complete(result)
@@ -177,14 +352,15 @@ class WorkflowExecutor:
             
             # Persist final state
             if self.state_manager:
-                await self.state_manager.save(context)
+                await self.state_manager.save(context, owner=self.worker_id)
+                await self.state_manager.release(context.workflow_id, self.worker_id)
             
             # Emit completion event
             await self._emit_event(
                 f"workflow.{workflow_name}.completed",
                 {
                     "workflow_id": context.workflow_id,
-                    "user_id": user_id,
+                    "user_id": context.user_id,
                     "duration_seconds": (
                         context.completed_at - context.started_at
                     ).total_seconds() if context.completed_at and context.started_at else 0,
@@ -197,21 +373,25 @@ class WorkflowExecutor:
                 f"(id={context.workflow_id})"
             )
             
-            return {
-                "workflow_id": context.workflow_id,
-                "status": context.status.value,
-                "result": result,
-                "duration_seconds": (
-                    context.completed_at - context.started_at
-                ).total_seconds() if context.completed_at and context.started_at else 0
-            }
+            return self._summarize(context)
+            
+        except WorkflowLeaseLost:
+            # Another worker owns the run now; its state is authoritative
+            await self._emit_event(
+                f"workflow.{workflow_name}.lease_lost",
+                {"workflow_id": context.workflow_id, "worker_id": self.worker_id}
+            )
+            logger.warning(
+                f"[WORKFLOWS] Lease lost for {workflow_name} "
+                f"(id={context.workflow_id}); stopping here"
+            )
+            raise
             
         except asyncio.TimeoutError:
             context.fail(f"Workflow timed out after {timeout} seconds")
             await workflow.on_error(context, TimeoutError())
             
-            if self.state_manager:
-                await self.state_manager.save(context)
+            await self._save_failure(context)
             
             await self._emit_event(
                 f"workflow.{workflow_name}.timeout",
@@ -228,8 +408,7 @@ class WorkflowExecutor:
             context.fail(str(e))
             await workflow.on_error(context, e)
             
-            if self.state_manager:
-                await self.state_manager.save(context)
+            await self._save_failure(context)
             
             await self._emit_event(
                 f"workflow.{workflow_name}.failed",
@@ -246,6 +425,48 @@ class WorkflowExecutor:
             )
             raise
     
+    @staticmethod
+    def _summarize(context: WorkflowContext) -> Dict[str, Any]:
+        """Result dictionary returned by run() and resume()"""
+        return {
+            "workflow_id": context.workflow_id,
+            "status": context.status.value,
+            "result": context.result,
+            "duration_seconds": (
+                context.completed_at - context.started_at
+            ).total_seconds() if context.completed_at and context.started_at else 0
+        }
+    
+    async def _save_failure(self, context: WorkflowContext):
+        """Persist a failed run and give up its lease"""
+        if not self.state_manager:
+            return
+        try:
+            await self.state_manager.save(context, owner=self.worker_id)
+            await self.state_manager.release(context.workflow_id, self.worker_id)
+        except WorkflowLeaseLost:
+            logger.warning(f"[WORKFLOWS] Not recording failure of {context.workflow_id}: lease lost")
+    
+    async def _heartbeat(
+        self,
+        workflow_id: str,
+        execution: asyncio.Future,
+        lease_lost: asyncio.Event
+    ):
+        """Renew the lease until execution ends; cancel it if the lease is lost"""
+        interval = max(getattr(self.state_manager, 'lease_seconds', 60) / 3, 0.01)
+        while not execution.done():
+            await asyncio.sleep(interval)
+            try:
+                renewed = await self.state_manager.renew(workflow_id, self.worker_id)
+            except Exception as e:
+                logger.warning(f"[WORKFLOWS] Lease renewal failed for {workflow_id}: {e}")
+                continue
+            if not renewed:
+                lease_lost.set()
+                execution.cancel()
+                return
+    
     async def cancel(self, workflow_id: str, reason: str = "User cancelled"):
         """
         Cancel a running workflow.
@@ -343,16 +564,42 @@ class StateManager:
     """
     In-memory state manager for workflow contexts.
     
-    For production, replace with database-backed implementation.
+    State dies with the process, so runs cannot be resumed elsewhere; use
+    store.PersistentStateManager for that.
     """
     
     def __init__(self):
         self._states: Dict[str, WorkflowContext] = {}
+        self._leases: Dict[str, str] = {}
     
-    async def save(self, context: WorkflowContext):
+    async def save(self, context: WorkflowContext, owner: Optional[str] = None):
         """Save workflow context"""
+        if owner and self._leases.setdefault(context.workflow_id, owner) != owner:
+            raise WorkflowLeaseLost(f"Workflow {context.workflow_id} is owned by another worker")
         self._states[context.workflow_id] = context
     
+    async def acquire(self, workflow_id: str, owner: str) -> Optional[WorkflowContext]:
+        """Take over an active run nobody else holds"""
+        context = self._states.get(workflow_id)
+        if not context or context.status not in (WorkflowStatus.PENDING, WorkflowStatus.RUNNING):
+            return None
+        if self._leases.setdefault(workflow_id, owner) != owner:
+            return None
+        return context
+    
+    async def renew(self, workflow_id: str, owner: str) -> bool:
+        """Check the lease is still held by owner"""
+        return self._leases.get(workflow_id) == owner
+    
+    async def release(self, workflow_id: str, owner: str):
+        """Give up the lease"""
+        if self._leases.get(workflow_id) == owner:
+            del self._leases[workflow_id]
+    
+    async def find_orphaned(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """In-process runs cannot outlive their worker"""
+        return []
+    
     async def get(self, workflow_id: str) -> Optional[WorkflowContext]:
         """Get workflow context by ID"""
         return self._states.get(workflow_id)
@@ -361,6 +608,7 @@ class StateManager:
         """Delete workflow context"""
         if workflow_id in self._states:
             del self._states[workflow_id]
+        self._leases.pop(workflow_id, None)
     
     async def get_by_user(
         self,
@@ -399,5 +647,6 @@ class StateManager:
         
         for workflow_id in to_delete:
             del self._states[workflow_id]
+            self._leases.pop(workflow_id, None)
         
         logger.info(f"[WORKFLOWS] Cleaned up {len(to_delete)} old workflows")
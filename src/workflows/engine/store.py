@@ -0,0 +1,317 @@
+"""
+Persistent Workflow State
+
+Database-backed replacement for the in-memory StateManager:
+
+- Each run is a workflow_runs row holding the serialized WorkflowContext,
+  rewritten after every checkpointed step, so a run survives the worker
+  that started it.
+- A worker owns a run through a lease (owner + expiry) that it renews while
+  executing. Writes are fenced on the owner, so a worker that lost its lease
+  (e.g. paused past the expiry while another worker resumed the run) gets
+  WorkflowLeaseLost instead of overwriting newer state.
+- Runs still pending/running with an expired lease are orphaned;
+  WorkflowExecutor.recover_orphaned() acquires and resumes them from their
+  last checkpoint.
+- Finished runs are compacted (step checkpoints dropped, result kept) and
+  deleted by cleanup_old() after the retention period.
+"""
+import asyncio
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..base.workflow import WorkflowContext, WorkflowStatus
+from ...database.models import WorkflowRun
+from ...services.service_constants import ServiceConstants
+from ...utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+ACTIVE_STATUSES = (WorkflowStatus.PENDING.value, WorkflowStatus.RUNNING.value)
+TERMINAL_STATUSES = (
+    WorkflowStatus.COMPLETED.value,
+    WorkflowStatus.FAILED.value,
+    WorkflowStatus.CANCELLED.value,
+)
+
+SessionFactory = Callable[[], Any]
+
+
+class WorkflowLeaseLost(Exception):
+    """Raised when a worker writes to a run it no longer owns."""
+
+
+@contextmanager
+def _default_session() -> Iterator[Session]:
+    from src.database import get_db_context
+    with get_db_context() as session:
+        yield session
+
+
+def _serialize(context: WorkflowContext) -> Dict[str, Any]:
+    """JSON-safe context dict; finished runs drop their step checkpoints."""
+    data = json.loads(json.dumps(context.to_dict(), default=str))
+    if data["status"] in TERMINAL_STATUSES:
+        data["checkpoints"] = {}
+    return data
+
+
+class PersistentStateManager:
+    """
+    Durable, lease-aware workflow state store.
+
+    Drop-in for StateManager (save/get/delete/get_by_user/cleanup_old) plus
+    the lease operations WorkflowExecutor uses to resume orphaned runs.
+
+    Example:
+        store = PersistentStateManager()
+        executor = WorkflowExecutor(state_manager=store)
+        await executor.recover_orphaned()
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[SessionFactory] = None,
+        lease_seconds: float = ServiceConstants.WORKFLOW_LEASE_SECONDS,
+    ):
+        self.session_factory = session_factory or _default_session
+        self.lease_seconds = lease_seconds
+
+    # ------------------------------------------------------------------
+    # StateManager interface
+    # ------------------------------------------------------------------
+
+    async def save(self, context: WorkflowContext, owner: Optional[str] = None):
+        """
+        Save workflow context.
+
+        A new run is inserted with its lease held by owner. Updates by an
+        owner are fenced: WorkflowLeaseLost is raised if another worker has
+        taken the run over or it was finished elsewhere.
+        """
+        await asyncio.to_thread(self._save, context, owner)
+
+    def _save(self, context: WorkflowContext, owner: Optional[str]) -> None:
+        now = datetime.utcnow()
+        data = _serialize(context)
+        values: Dict[str, Any] = {
+            'status': data["status"],
+            'context': data,
+            'updated_at': now,
+            'completed_at': context.completed_at,
+            'compacted': data["status"] in TERMINAL_STATUSES,
+        }
+        with self.session_factory() as session:
+            condition = WorkflowRun.workflow_id == context.workflow_id
+            if owner is not None:
+                # Fenced: the owner must still hold the lease and the run must
+                # not have been finished elsewhere (e.g. cancelled)
+                condition = and_(
+                    condition,
+                    WorkflowRun.lease_owner == owner,
+                    WorkflowRun.status.in_(ACTIVE_STATUSES),
+                )
+            result = session.execute(
+                update(WorkflowRun)
+                .where(condition)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                session.commit()
+                return
+
+            exists = session.execute(
+                select(WorkflowRun.workflow_id).where(WorkflowRun.workflow_id == context.workflow_id)
+            ).scalar()
+            if exists:
+                raise WorkflowLeaseLost(f"Workflow {context.workflow_id} is no longer owned by {owner}")
+
+            session.add(WorkflowRun(
+                workflow_id=context.workflow_id,
+                workflow_name=context.workflow_name,
+                user_id=context.user_id,
+                lease_owner=owner,
+                lease_expires_at=now + timedelta(seconds=self.lease_seconds) if owner else None,
+                attempts=1 if owner else 0,
+                created_at=now,
+                **values,
+            ))
+            session.commit()
+
+    async def get(self, workflow_id: str) -> Optional[WorkflowContext]:
+        """Get workflow context by ID"""
+        return await asyncio.to_thread(self._get, workflow_id)
+
+    def _get(self, workflow_id: str) -> Optional[WorkflowContext]:
+        with self.session_factory() as session:
+            data = session.execute(
+                select(WorkflowRun.context).where(WorkflowRun.workflow_id == workflow_id)
+            ).scalar()
+            return WorkflowContext.from_dict(data) if data else None
+
+    async def delete(self, workflow_id: str):
+        """Delete workflow context"""
+        await asyncio.to_thread(self._delete, workflow_id)
+
+    def _delete(self, workflow_id: str) -> None:
+        with self.session_factory() as session:
+            session.execute(delete(WorkflowRun).where(WorkflowRun.workflow_id == workflow_id))
+            session.commit()
+
+    async def get_by_user(
+        self,
+        user_id: int,
+        status: Optional[WorkflowStatus] = None,
+        limit: int = 20
+    ) -> List[WorkflowContext]:
+        """Get workflow contexts for a user, newest first"""
+        return await asyncio.to_thread(self._get_by_user, user_id, status, limit)
+
+    def _get_by_user(
+        self,
+        user_id: int,
+        status: Optional[WorkflowStatus],
+        limit: int
+    ) -> List[WorkflowContext]:
+        query = select(WorkflowRun.context).where(WorkflowRun.user_id == user_id)
+        if status:
+            query = query.where(WorkflowRun.status == status.value)
+        query = query.order_by(WorkflowRun.created_at.desc()).limit(limit)
+        with self.session_factory() as session:
+            return [WorkflowContext.from_dict(data) for data in session.execute(query).scalars()]
+
+    async def cleanup_old(self, max_age_hours: int = ServiceConstants.WORKFLOW_RETENTION_HOURS) -> int:
+        """Delete finished runs older than max_age_hours"""
+        return await asyncio.to_thread(self._cleanup_old, max_age_hours)
+
+    def _cleanup_old(self, max_age_hours: int) -> int:
+        cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+        with self.session_factory() as session:
+            result = session.execute(
+                delete(WorkflowRun).where(and_(
+                    WorkflowRun.status.in_(TERMINAL_STATUSES),
+                    WorkflowRun.completed_at < cutoff,
+                ))
+            )
+            session.commit()
+        logger.info(f"[WORKFLOWS] Cleaned up {result.rowcount} old workflows")
+        return result.rowcount
+
+    # ------------------------------------------------------------------
+    # Leases
+    # ------------------------------------------------------------------
+
+    async def acquire(self, workflow_id: str, owner: str) -> Optional[WorkflowContext]:
+        """
+        Take over an active run whose lease is free or expired.
+
+        Returns:
+            The run's last checkpointed context, or None if the run is
+            finished or another worker holds a live lease
+        """
+        return await asyncio.to_thread(self._acquire, workflow_id, owner)
+
+    def _acquire(self, workflow_id: str, owner: str) -> Optional[WorkflowContext]:
+        now = datetime.utcnow()
+        with self.session_factory() as session:
+            result = session.execute(
+                update(WorkflowRun)
+                .where(and_(
+                    WorkflowRun.workflow_id == workflow_id,
+                    WorkflowRun.status.in_(ACTIVE_STATUSES),
+                    or_(
+                        WorkflowRun.lease_owner.is_(None),
+                        WorkflowRun.lease_owner == owner,
+                        WorkflowRun.lease_expires_at < now,
+                    ),
+                ))
+                .values(
+                    lease_owner=owner,
+                    lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                    attempts=WorkflowRun.attempts + 1,
+                    updated_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+            if not result.rowcount:
+                return None
+            data = session.execute(
+                select(WorkflowRun.context).where(WorkflowRun.workflow_id == workflow_id)
+            ).scalar()
+            return WorkflowContext.from_dict(data)
+
+    async def renew(self, workflow_id: str, owner: str) -> bool:
+        """Extend the lease; False if owner no longer holds it."""
+        return await asyncio.to_thread(self._renew, workflow_id, owner)
+
+    def _renew(self, workflow_id: str, owner: str) -> bool:
+        now = datetime.utcnow()
+        with self.session_factory() as session:
+            result = session.execute(
+                update(WorkflowRun)
+                .where(and_(WorkflowRun.workflow_id == workflow_id, WorkflowRun.lease_owner == owner))
+                .values(lease_expires_at=now + timedelta(seconds=self.lease_seconds))
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+            return bool(result.rowcount)
+
+    async def release(self, workflow_id: str, owner: str):
+        """Give up the lease (the run is finished or handed back)."""
+        await asyncio.to_thread(self._release, workflow_id, owner)
+
+    def _release(self, workflow_id: str, owner: str) -> None:
+        with self.session_factory() as session:
+            session.execute(
+                update(WorkflowRun)
+                .where(and_(WorkflowRun.workflow_id == workflow_id, WorkflowRun.lease_owner == owner))
+                .values(lease_owner=None, lease_expires_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+
+    async def find_orphaned(
+        self,
+        limit: int = ServiceConstants.WORKFLOW_RECOVERY_BATCH_SIZE
+    ) -> List[Dict[str, Any]]:
+        """
+        List active runs nobody holds a live lease on.
+
+        Returns:
+            Dicts with workflow_id, workflow_name, user_id and attempts
+        """
+        return await asyncio.to_thread(self._find_orphaned, limit)
+
+    def _find_orphaned(self, limit: int) -> List[Dict[str, Any]]:
+        now = datetime.utcnow()
+        with self.session_factory() as session:
+            rows = session.execute(
+                select(
+                    WorkflowRun.workflow_id,
+                    WorkflowRun.workflow_name,
+                    WorkflowRun.user_id,
+                    WorkflowRun.attempts,
+                )
+                .where(and_(
+                    WorkflowRun.status.in_(ACTIVE_STATUSES),
+                    or_(WorkflowRun.lease_expires_at.is_(None), WorkflowRun.lease_expires_at < now),
+                ))
+                .order_by(WorkflowRun.updated_at)
+                .limit(limit)
+            ).all()
+            return [
+                {
+                    "workflow_id": row.workflow_id,
+                    "workflow_name": row.workflow_name,
+                    "user_id": row.user_id,
+                    "attempts": row.attempts,
+                }
+                for row in rows
+            ]
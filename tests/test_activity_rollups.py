@@ -0,0 +1,236 @@
+"""
+Tests for incrementally maintained activity rollups and the analytics built on them.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.analytics.activity_rollups import (
+    ActivityRollupStore,
+    activity_from_node,
+    bucket_for,
+)
+from src.services.analytics.memory_analytics import MemoryGraphAnalytics
+from src.services.indexing.graph import text_search
+
+
+@pytest.fixture(autouse=True)
+def search_key(monkeypatch):
+    monkeypatch.setenv("GRAPH_SEARCH_KEY", "test-graph-search-key")
+    monkeypatch.setattr(text_search, "_INDEX_KEY", None)
+
+
+class FakeRedis:
+    """GET/INCR over a dict shared by the 'processes' in a test."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+
+def _node(node_type, **props):
+    return SimpleNamespace(node_type=node_type, properties=props)
+
+
+def test_buckets_and_activity_extraction():
+    ts = datetime(2026, 3, 2, 14, 5)
+    assert bucket_for(ts, "hour") == "2026-03-02T14"
+    assert bucket_for(ts, "day") == "2026-03-02"
+    assert bucket_for(ts, "week") == "2026-W10"
+
+    email = _node("Email", timestamp="2026-03-02T14:05:00Z", source="gmail", sender_email="Bob@Acme.com")
+    assert activity_from_node(email) == (ts, "gmail", "bob@acme.com")
+    assert activity_from_node(_node("Receipt", timestamp="2026-03-02T14:05:00")) is None
+    assert activity_from_node(_node("Email", subject="no timestamp")) is None
+    assert activity_from_node({"node_type": "Message", "timestamp": "2026-03-02T09:00:00"})[1] == "message"
+
+
+@pytest.mark.asyncio
+async def test_rollups_are_incremental_and_per_user():
+    store = ActivityRollupStore(redis_url="redis://invalid")
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    ts = now.isoformat()
+
+    recorded = await store.record_nodes(1, [
+        _node("Email", timestamp=ts, source="gmail", sender_email="bob@acme.com"),
+        _node("Email", timestamp=ts, source="gmail", sender_email="bob@acme.com"),
+        _node("Message", timestamp=ts, source="slack"),
+        _node("Receipt", timestamp=ts),
+    ])
+    await store.record_nodes(2, [_node("Email", timestamp=ts, source="gmail")])
+    await store.record_nodes(1, [_node("Email", timestamp=ts, source="gmail")])
+
+    assert recorded == 3
+    assert await store.version(1) == 2
+    since = now - timedelta(days=1)
+    sources = {r["value"]: r["count"] for r in await store.get_buckets(1, "day", "source", since)}
+    assert sources == {"gmail": 3, "slack": 1}
+    contacts = await store.get_buckets(1, "week", "contact", since)
+    assert [(c["label"], c["count"]) for c in contacts] == [("bob@acme.com", 2)]
+    assert "bob" not in str(store._rows)
+    assert await store.get_buckets(1, "day", "source", now + timedelta(days=1)) == []
+
+
+@pytest.mark.asyncio
+async def test_temporal_patterns_read_rollups_not_the_graph():
+    graph = MagicMock()
+    graph.execute_query = AsyncMock(return_value=[])
+    store = ActivityRollupStore(redis_url="redis://invalid")
+    analytics = MemoryGraphAnalytics(config=None, graph_manager=graph, rollups=store)
+
+    day = (datetime.utcnow() - timedelta(days=1)).replace(hour=9, minute=30, second=0, microsecond=0)
+    await store.record(7, [
+        (day, "gmail", "ann@x.io"),
+        (day, "gmail", "ann@x.io"),
+        (day.replace(hour=15), "slack", None),
+    ])
+
+    report = await analytics.get_temporal_activity_patterns(7, time_range_days=30)
+
+    graph.execute_query.assert_not_awaited()
+    assert report["daily_pattern"] == {"09:00": 2, "15:00": 1}
+    assert report["peak_hours"][0] == "09:00"
+    assert report["weekly_pattern"] == {day.strftime("%A"): 3}
+    assert report["activity_trend"] == [{"date": day.strftime("%Y-%m-%d"), "activity": 3}]
+    assert report["source_activity"] == {"gmail": 2, "slack": 1}
+    assert report["contact_activity"][0]["contact"] == "ann@x.io"
+    assert report["contact_activity"][0]["interactions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_full_report_runs_sections_concurrently_and_caches():
+    store = ActivityRollupStore(redis_url="redis://invalid")
+    analytics = MemoryGraphAnalytics(config=None, graph_manager=MagicMock(), rollups=store)
+    running = 0
+    peak = 0
+    calls = []
+
+    def section(name):
+        async def compute(user_id, days):
+            nonlocal running, peak
+            calls.append(name)
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            return {"section": name}
+        return compute
+
+    for name in ("relationship_analytics", "topic_analytics", "temporal_activity_patterns", "cross_app_insights"):
+        setattr(analytics, f"get_{name}", section(name))
+
+    first, second = await asyncio.gather(
+        analytics.get_full_analytics_report(1), analytics.get_full_analytics_report(1)
+    )
+    await analytics.get_full_analytics_report(1)
+
+    assert peak == 4
+    assert len(calls) == 4
+    assert first["temporal"] == second["temporal"] == {"section": "temporal_activity_patterns"}
+
+    # New activity invalidates only the temporal section
+    await store.record(1, [(datetime.utcnow(), "gmail", None)])
+    await analytics.get_full_analytics_report(1)
+    assert calls[4:] == ["temporal_activity_patterns"]
+
+    assert analytics.invalidate_cache(1) == 5
+    await analytics.get_full_analytics_report(1)
+    assert len(calls) == 9
+
+
+@pytest.mark.asyncio
+async def test_resynced_nodes_are_counted_once():
+    store = ActivityRollupStore(redis_url="redis://invalid")
+    ts = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+
+    def email(node_id):
+        return SimpleNamespace(node_id=node_id, node_type="Email", properties={"timestamp": ts.isoformat(), "source": "gmail"})
+
+    assert await store.record_nodes(1, [email("e1"), email("e2")]) == 2
+    # Next sync cycle re-processes e2 alongside a new e3
+    assert await store.record_nodes(1, [email("e2"), email("e3"), email("e3")]) == 1
+
+    sources = await store.get_buckets(1, "day", "source", ts - timedelta(days=1))
+    assert [(r["value"], r["count"]) for r in sources] == [("gmail", 3)]
+
+
+@pytest.mark.asyncio
+async def test_version_is_shared_across_processes_through_redis():
+    shared = {}
+    indexer, api = ActivityRollupStore(), ActivityRollupStore()
+    indexer._client, api._client = FakeRedis(shared), FakeRedis(shared)
+    analytics = MemoryGraphAnalytics(config=None, graph_manager=MagicMock(), rollups=api)
+    calls = []
+
+    async def temporal(user_id, days):
+        calls.append(await api.version(user_id))
+        return {"version": calls[-1]}
+
+    await analytics._cached("temporal", 1, 30, temporal)
+    await analytics._cached("temporal", 1, 30, temporal)
+
+    # A write in the worker process is visible to the API's cache key
+    await indexer.record(1, [(datetime.utcnow(), "gmail", None)])
+    assert await api.version(1) == 1
+    assert await analytics._cached("temporal", 1, 30, temporal) == {"version": 1}
+    assert calls == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_markers_expire_and_older_activity_is_skipped():
+    store = ActivityRollupStore(redis_url="redis://invalid")
+    recent = datetime.utcnow() - timedelta(days=1)
+    stale = datetime.utcnow() - timedelta(days=120)
+
+    def email(node_id, ts):
+        return SimpleNamespace(node_id=node_id, node_type="Email", properties={"timestamp": ts.isoformat(), "source": "gmail"})
+
+    assert await store.record_nodes(1, [email("e1", recent), email("e2", stale)]) == 1
+    assert len(store._seen) == 1
+
+    store._seen[next(iter(store._seen))] = 0.0
+    store._seen_pruned_at = 0.0
+    store._prune_seen()
+    assert store._seen == {}
+
+
+@pytest.mark.asyncio
+async def test_backfill_pages_reads_and_keeps_existing_rollups():
+    from src.services.indexing.graph.manager import GraphBackend
+
+    ts = (datetime.utcnow() - timedelta(days=2)).isoformat()
+    emails = [{"_key": f"e{n}", "node_type": "Email", "timestamp": ts, "source": "gmail"} for n in range(5)]
+    seen = set()
+    queries = []
+
+    async def execute_query(query, bind_vars=None):
+        queries.append((query, bind_vars))
+        if "UPSERT" in query and "ActivityRollupSeen" in query:
+            results = [{"key": m["_key"], "fresh": m["_key"] not in seen} for m in bind_vars["markers"]]
+            seen.update(m["_key"] for m in bind_vars["markers"])
+            return results
+        if "FOR d IN Email" in query:
+            page = [d for d in emails if d["_key"] > bind_vars["after"]]
+            return page[:bind_vars["batch"]]
+        return []
+
+    graph = MagicMock(backend_type=GraphBackend.ARANGODB, execute_query=execute_query)
+    store = ActivityRollupStore(graph, redis_url="redis://invalid")
+    store._collection_ready = True
+    # e0 was already counted by a live indexer
+    await store.record_nodes(1, emails[:1])
+
+    assert await store.backfill(1, batch_size=2) == 4
+    assert await store.backfill(1, batch_size=2) == 0
+    assert not any("REMOVE" in q for q, _ in queries)
+    email_pages = [v["after"] for q, v in queries if "FOR d IN Email" in q]
+    assert email_pages[:3] == ["", "e1", "e3"]
@@ -0,0 +1,106 @@
+"""
+Tests for materialized dashboard briefs (brief cache + incremental refresh).
+"""
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.services.dashboard import brief_cache
+from src.services.dashboard.brief_cache import BriefStore, load_cached_briefs, sections_for_sources
+from src.services.dashboard.brief_service import BriefService
+
+
+@pytest.fixture
+def store():
+    # In-process backend only (never try Redis during tests)
+    store = BriefStore(redis_url="redis://invalid")
+    store._retry_at = time.time() + 3600
+    with patch.object(brief_cache, "_brief_store", store), \
+         patch("src.services.dashboard.brief_service.get_brief_store", return_value=store):
+        yield store
+
+
+@pytest.fixture
+def service():
+    service = BriefService(MagicMock())
+    service._get_emails = AsyncMock(return_value=[{"id": "m1", "subject": "Invoice", "from": "a@b.com"}])
+    service._get_recent_important_emails = AsyncMock(return_value=[])
+    service._get_todos = AsyncMock(return_value=[{"id": "t1", "title": "Ship it"}])
+    service._get_meetings = AsyncMock(return_value=[])
+    service._get_documents = AsyncMock(return_value=[])
+    service._get_ghost_drafts = AsyncMock(return_value=[])
+    service._get_people = AsyncMock(return_value={})
+    service._get_llm_classified_reminders = AsyncMock(return_value=[])
+    service._generate_smart_reminders = AsyncMock(return_value={"summary": "Hi", "items": []})
+    return service
+
+
+def test_sections_for_sources():
+    assert sections_for_sources(["email"]) == {"emails", "urgent_emails"}
+    assert sections_for_sources(["calendar", "unknown"]) == {"meetings"}
+
+
+@pytest.mark.asyncio
+async def test_first_refresh_builds_everything(store, service):
+    briefs = await service.refresh_briefs(1, "Sam")
+
+    service._get_emails.assert_awaited_once()
+    service._get_meetings.assert_awaited_once()
+    service._generate_smart_reminders.assert_awaited_once()
+    assert briefs["todos"][0]["title"] == "Ship it"
+    assert briefs["reminders"]["summary"] == "Hi"
+    assert briefs["meta"]["stale"] is False
+
+
+@pytest.mark.asyncio
+async def test_stale_section_only_refetches_that_section(store, service):
+    await service.refresh_briefs(1, "Sam")
+    store.mark_stale(1, sections_for_sources(["calendar"]))
+
+    await service.refresh_briefs(1, "Sam")
+
+    assert service._get_meetings.await_count == 2
+    assert service._get_emails.await_count == 1
+    assert service._get_todos.await_count == 1
+    # Meetings unchanged -> reminder inputs unchanged -> no LLM regeneration
+    assert service._generate_smart_reminders.await_count == 1
+    assert store.stale_sections(1) == set()
+
+
+@pytest.mark.asyncio
+async def test_changed_inputs_regenerate_reminders(store, service):
+    await service.refresh_briefs(1, "Sam")
+    service._get_todos.return_value = [{"id": "t2", "title": "New task"}]
+
+    briefs = await service.refresh_briefs(1, "Sam", sections=["todos"])
+
+    assert service._generate_smart_reminders.await_count == 2
+    assert briefs["todos"][0]["title"] == "New task"
+
+
+@pytest.mark.asyncio
+async def test_cached_briefs_carry_staleness_marker(store, service):
+    assert load_cached_briefs(1) is None
+    await service.refresh_briefs(1, "Sam")
+
+    cached = load_cached_briefs(1)
+    assert cached["meta"]["stale"] is False
+    assert cached["emails"][0]["subject"] == "Invoice"
+
+    store.mark_stale(1, ["todos"])
+    cached = load_cached_briefs(1)
+    assert cached["meta"]["stale"] is True
+    assert cached["meta"]["stale_sections"] == ["todos"]
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_sections_stale(store, service):
+    await service.refresh_briefs(1, "Sam")
+    store.mark_stale(1, ["meetings"])
+    service._fetch_sections = AsyncMock(side_effect=RuntimeError("boom"))
+
+    with pytest.raises(RuntimeError):
+        await service.refresh_briefs(1, "Sam")
+
+    assert store.stale_sections(1) == {"meetings"}
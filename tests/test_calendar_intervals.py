@@ -0,0 +1,160 @@
+"""
+Tests for the calendar interval engine (sweep-line, interval tree, cache).
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytz
+
+from src.core.calendar.intervals import (
+    CalendarIndexCache,
+    IntervalTree,
+    build_intervals,
+    event_intervals,
+    sweep_overlaps,
+)
+from src.core.calendar.utils import find_conflicts
+
+
+def _event(event_id, start, end, **extra):
+    event = {
+        'id': event_id,
+        'summary': f'Event {event_id}',
+        'start': {'dateTime': start.isoformat()},
+        'end': {'dateTime': end.isoformat()},
+    }
+    event.update(extra)
+    return event
+
+
+def _random_events(count, seed=7):
+    rng = random.Random(seed)
+    base = datetime(2026, 1, 5, 8, tzinfo=pytz.UTC)
+    events = []
+    for i in range(count):
+        start = base + timedelta(days=rng.randrange(90), minutes=15 * rng.randrange(48))
+        events.append(_event(str(i), start, start + timedelta(minutes=15 * rng.randint(1, 8))))
+    return events
+
+
+def _brute_force_pairs(intervals):
+    pairs = set()
+    for i, a in enumerate(intervals):
+        for b in intervals[i + 1:]:
+            if a.start < b.end and b.start < a.end:
+                pairs.add(frozenset((a.event_id, b.event_id)))
+    return pairs
+
+
+class TestSweepOverlaps:
+    def test_matches_brute_force(self):
+        intervals = build_intervals(_random_events(400))
+        swept = {frozenset((a.event_id, b.event_id)) for a, b, _ in sweep_overlaps(intervals)}
+        assert swept == _brute_force_pairs(intervals)
+
+    def test_back_to_back_is_not_overlap(self):
+        t = datetime(2026, 3, 1, 9, tzinfo=pytz.UTC)
+        intervals = build_intervals([
+            _event('a', t, t + timedelta(hours=1)),
+            _event('b', t + timedelta(hours=1), t + timedelta(hours=2)),
+        ])
+        assert sweep_overlaps(intervals) == []
+
+    def test_min_overlap(self):
+        t = datetime(2026, 3, 1, 9, tzinfo=pytz.UTC)
+        intervals = build_intervals([
+            _event('a', t, t + timedelta(minutes=62)),
+            _event('b', t + timedelta(hours=1), t + timedelta(hours=2)),
+        ])
+        assert sweep_overlaps(intervals, min_overlap=timedelta(minutes=5)) == []
+        assert len(sweep_overlaps(intervals)) == 1
+
+
+class TestIntervalTree:
+    def test_overlapping_matches_linear_scan(self):
+        intervals = build_intervals(_random_events(500))
+        tree = IntervalTree(intervals)
+        start = datetime(2026, 2, 1, 10, tzinfo=pytz.UTC)
+        end = start + timedelta(hours=6)
+        expected = {iv.event_id for iv in intervals if iv.start < end and start < iv.end}
+        assert {iv.event_id for iv in tree.overlapping(start, end)} == expected
+
+    def test_transparent_events_do_not_block(self):
+        t = datetime(2026, 3, 1, 9, tzinfo=pytz.UTC)
+        tree = IntervalTree(build_intervals([
+            _event('free', t, t + timedelta(hours=2), transparency='transparent'),
+        ]))
+        assert tree.overlapping(t, t + timedelta(hours=1), include_transparent=False) == []
+        assert len(tree.overlapping(t, t + timedelta(hours=1))) == 1
+
+    def test_latest_ending_before(self):
+        t = datetime(2026, 3, 1, 9, tzinfo=pytz.UTC)
+        tree = IntervalTree(build_intervals([
+            _event('early', t, t + timedelta(hours=1)),
+            _event('late', t + timedelta(hours=1), t + timedelta(hours=2)),
+        ]))
+        assert tree.latest_ending_before(t + timedelta(hours=3)).event_id == 'late'
+        assert tree.latest_ending_before(t + timedelta(hours=3), exclude_event_id='late').event_id == 'early'
+        assert tree.latest_ending_before(t) is None
+
+    def test_free_slots_skip_nested_events(self):
+        t = datetime(2026, 3, 1, 9, tzinfo=pytz.UTC)
+        tree = IntervalTree(build_intervals([
+            _event('long', t, t + timedelta(hours=4)),
+            _event('short', t + timedelta(minutes=30), t + timedelta(hours=1)),
+            _event('after', t + timedelta(hours=5), t + timedelta(hours=6)),
+        ]))
+        slots = tree.free_slots(timedelta(minutes=30))
+        assert slots == [(t + timedelta(hours=4), t + timedelta(hours=4, minutes=30))]
+
+
+class TestNormalization:
+    def test_all_day_event_uses_local_midnight(self):
+        event = {'id': 'x', 'start': {'date': '2026-03-10'}, 'end': {'date': '2026-03-11'}}
+        [interval] = event_intervals(event, default_tz='America/Los_Angeles')
+        assert interval.all_day
+        assert interval.start == datetime(2026, 3, 10, 7, tzinfo=pytz.UTC)
+        assert interval.end == datetime(2026, 3, 11, 7, tzinfo=pytz.UTC)
+
+    def test_weekly_rrule_keeps_wall_clock_across_dst(self):
+        event = {
+            'id': 'standup',
+            'start': {'dateTime': '2026-03-02T09:00:00', 'timeZone': 'America/New_York'},
+            'end': {'dateTime': '2026-03-02T09:30:00', 'timeZone': 'America/New_York'},
+            'recurrence': ['RRULE:FREQ=WEEKLY;COUNT=3'],
+        }
+        window = (datetime(2026, 3, 1, tzinfo=pytz.UTC), datetime(2026, 3, 31, tzinfo=pytz.UTC))
+        starts = [iv.start for iv in event_intervals(event, window=window)]
+        assert starts == [
+            datetime(2026, 3, 2, 14, tzinfo=pytz.UTC),
+            datetime(2026, 3, 9, 13, tzinfo=pytz.UTC),
+            datetime(2026, 3, 16, 13, tzinfo=pytz.UTC),
+        ]
+
+
+class TestFindConflicts:
+    def test_result_format_unchanged(self):
+        t = datetime(2026, 3, 1, 9, tzinfo=pytz.UTC)
+        events = [_event('a', t, t + timedelta(hours=1)), _event('b', t + timedelta(hours=2), t + timedelta(hours=3))]
+        conflicts = find_conflicts(t + timedelta(minutes=30), t + timedelta(minutes=90), events)
+        assert [c['title'] for c in conflicts] == ['Event a']
+        assert set(conflicts[0]) == {'title', 'start_time', 'end_time'}
+
+
+class TestCalendarIndexCache:
+    def test_hit_and_invalidate(self):
+        cache = CalendarIndexCache()
+        events = _random_events(50)
+        first = cache.get_or_build(1, events)
+        assert cache.get_or_build(1, events) is first
+        assert cache.hits == 1
+
+        cache.invalidate(1)
+        assert cache.get_or_build(1, events) is not first
+
+    def test_changed_events_rebuild(self):
+        cache = CalendarIndexCache()
+        events = _random_events(10)
+        first = cache.get_or_build(1, events)
+        changed = events[:-1]
+        assert cache.get_or_build(1, changed) is not first
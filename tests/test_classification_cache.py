@@ -0,0 +1,136 @@
+"""
+Tests for the shared intent classification cache.
+"""
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.ai.classification_cache import ClassificationCache, normalize_query
+
+
+class TopicEmbedder:
+    """Maps queries onto fixed topic directions by keyword."""
+
+    TOPICS = ["email", "calendar", "task"]
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text):
+        self.calls += 1
+        vec = np.full(len(self.TOPICS), 0.01)
+        for i, topic in enumerate(self.TOPICS):
+            if topic in text:
+                vec[i] = 1.0
+        return vec.tolist()
+
+
+def _cache(**kwargs):
+    return ClassificationCache("v1", redis_url="redis://invalid", **kwargs)
+
+
+def _classification(intent="list", confidence=0.9, entities=None):
+    return {"intent": intent, "confidence": confidence, "entities": entities or {}}
+
+
+def test_normalize_query_folds_trivial_differences():
+    assert normalize_query("  Show my   EMAILS?? ") == "show my emails"
+    assert normalize_query("What’s due today.") == "what's due today"
+
+
+def test_exact_hits_on_normalized_text():
+    cache = _cache()
+    cache.put("Show my emails", _classification())
+
+    assert cache.get("show my emails!")["intent"] == "list"
+    assert cache.get("show my inbox") is None
+
+    stats = cache.get_stats()
+    assert stats["exact_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_local_fallback_is_bounded():
+    cache = _cache(local_size=2)
+    for n in range(3):
+        cache.put(f"query {n}", _classification())
+
+    assert cache.get_stats()["local_entries"] == 2
+    assert cache.get("query 0") is None
+
+
+def test_versions_do_not_share_entries():
+    assert _cache()._key("show my emails") != ClassificationCache("v2")._key("show my emails")
+
+
+def test_near_hit_reuses_confident_classification():
+    cache = _cache(embedder_factory=TopicEmbedder)
+    cache.put("list my unread email", _classification(intent="list"))
+
+    hit = cache.get("could you list unread email for me")
+
+    assert hit["intent"] == "list"
+    assert cache.get_stats()["near_hits"] == 1
+
+
+def test_near_hit_skips_low_confidence_and_mismatched_entities():
+    cache = _cache(embedder_factory=TopicEmbedder)
+    cache.put("find email from john", _classification(intent="search", entities={"senders": ["John"]}))
+    cache.put("what is on my calendar", _classification(intent="list", confidence=0.5))
+
+    assert cache.get("find email from jane") is None
+    assert cache.get("show my calendar") is None
+    assert cache.get("any email from john") is not None
+
+    stats = cache.get_stats()
+    assert stats["near_rejected"] == 1
+    assert stats["indexed_queries"] == 1
+
+
+def test_near_hit_rejects_extra_entities_and_different_filters():
+    cache = _cache(embedder_factory=TopicEmbedder)
+    cache.put("find email from john", _classification(intent="search", entities={"senders": ["John"]}))
+    cache.put("list unread email", {**_classification(), "filters": ["unread"]})
+
+    assert cache.get("find email from john and jane") is None
+    assert cache.get("list email") is None
+    assert cache.get("find important email from john") is None
+    assert cache.get("could you find email from john") is not None
+
+
+def test_missed_query_is_embedded_once():
+    cache = _cache(embedder_factory=TopicEmbedder)
+    cache.put("list my unread email", _classification())
+    embedder = cache._embedder
+    before = embedder.calls
+
+    assert cache.get("read the email from bob") is None
+    cache.put("read the email from bob", _classification(intent="read"))
+
+    assert embedder.calls == before + 1
+    assert cache.get_stats()["indexed_queries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_classifier_skips_llm_for_repeat_queries():
+    from src.ai.query_classifier import QueryClassifier
+
+    structured = MagicMock()
+    structured.invoke.return_value = {"intent": "search", "confidence": 0.95, "entities": {}}
+    llm = MagicMock()
+    llm.with_structured_outputs.return_value = structured
+
+    config = MagicMock()
+    config.ai.provider = "gemini"
+    config.ai.model = "gemini-test"
+    with patch("src.ai.query_classifier.LLMFactory.get_llm_for_provider", return_value=llm):
+        classifier = QueryClassifier(config, cache=_cache())
+    classifier._build_classification_prompt = lambda query: f"classify: {query}"
+
+    first = await classifier.classify_query("Find invoices from Acme")
+    second = await classifier.classify_query("find invoices from acme?")
+
+    assert structured.invoke.call_count == 1
+    assert second == first
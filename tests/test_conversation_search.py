@@ -0,0 +1,136 @@
+"""
+Tests for conversation full-text search (blind-token FTS index).
+"""
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.ai import conversation_search
+from src.ai.conversation_search import (
+    SQLITE_SEARCH_TABLE,
+    _SQLITE_DDL,
+    SearchKeyMissing,
+    blind_document,
+    blind_token,
+    build_fts5_query,
+    build_tsquery,
+    parse_query,
+    recency_weight,
+    tokenize,
+)
+
+
+@pytest.fixture(autouse=True)
+def search_key(monkeypatch):
+    monkeypatch.setenv("CONVERSATION_SEARCH_KEY", "test-search-key")
+    monkeypatch.setattr(conversation_search, "_INDEX_KEY", None)
+
+
+class TestQueryParsing:
+    def test_terms_drop_stopwords(self):
+        parsed = parse_query("what did I say about the budget")
+        assert "budget" in parsed.terms
+        assert "the" not in parsed.terms
+        assert parsed.phrases == []
+
+    def test_quoted_phrase(self):
+        parsed = parse_query('"quarterly budget" review')
+        assert parsed.phrases == [["quarterly", "budget"]]
+        assert parsed.terms == ["review"]
+
+    def test_all_stopwords_kept(self):
+        parsed = parse_query("the and")
+        assert parsed.terms == ["the", "and"]
+
+    def test_empty(self):
+        assert parse_query("   !!! ").is_empty
+
+
+class TestBlindTokens:
+    def test_tokens_are_per_user(self):
+        assert blind_token(1, "budget") != blind_token(2, "budget")
+        assert blind_token(1, "budget") == blind_token(1, "budget")
+
+    def test_missing_secret_disables_index(self, monkeypatch):
+        for name in ("CONVERSATION_SEARCH_KEY", "ENCRYPTION_KEY", "SECRET_KEY"):
+            monkeypatch.delenv(name, raising=False)
+        with pytest.raises(SearchKeyMissing):
+            blind_token(1, "budget")
+
+    def test_tokens_are_letters_only(self):
+        token = blind_token(7, "2024")
+        assert token.isalpha() and token.islower()
+
+    def test_document_preserves_order(self):
+        doc = blind_document(1, "Budget review, budget!")
+        parts = doc.split()
+        assert len(parts) == 3
+        assert parts[0] == parts[2]
+        assert "budget" not in doc
+
+    def test_tsquery_compiles_phrases(self):
+        parsed = parse_query('"budget review" cfo')
+        tsquery = build_tsquery(1, parsed)
+        assert "<->" in tsquery
+        assert " | " in tsquery
+        assert "budget" not in tsquery
+
+    def test_tokenize_lowercases(self):
+        assert tokenize("Hello, World") == ["hello", "world"]
+
+
+class TestRecency:
+    def test_half_life(self):
+        from src.ai.memory_constants import KEYWORD_SEARCH_RECENCY_HALF_LIFE_DAYS
+
+        now = datetime(2026, 1, 1)
+        assert recency_weight(now, now) == 1.0
+        old = now - timedelta(days=KEYWORD_SEARCH_RECENCY_HALF_LIFE_DAYS)
+        assert recency_weight(old, now) == pytest.approx(0.5)
+
+
+class TestSqliteFts5:
+    """Exercise the FTS5 schema and query compilation against stdlib sqlite3."""
+
+    @pytest.fixture
+    def conn(self):
+        conn = sqlite3.connect(":memory:")
+        for statement in _SQLITE_DDL:
+            conn.execute(statement)
+        rows = [
+            (1, 1, "We need to finish the quarterly budget review"),
+            (2, 1, "The budget is fine, review it next quarter"),
+            (3, 1, "Lunch with Sam on Friday"),
+            (4, 2, "quarterly budget review for another user"),
+        ]
+        for message_id, user_id, content in rows:
+            conn.execute(
+                f"INSERT INTO {SQLITE_SEARCH_TABLE} "
+                "(tokens, message_id, user_id, session_id, role, timestamp) "
+                "VALUES (?, ?, ?, 's', 'user', ?)",
+                (blind_document(user_id, content), message_id, user_id,
+                 datetime.utcnow().isoformat()),
+            )
+        yield conn
+        conn.close()
+
+    def _search(self, conn, user_id, query):
+        match = build_fts5_query(user_id, parse_query(query))
+        rows = conn.execute(
+            f"SELECT message_id FROM {SQLITE_SEARCH_TABLE} "
+            f"WHERE {SQLITE_SEARCH_TABLE} MATCH ? AND user_id = ? "
+            f"ORDER BY bm25({SQLITE_SEARCH_TABLE})",
+            (match, user_id),
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def test_terms_match_any(self, conn):
+        assert sorted(self._search(conn, 1, "budget lunch")) == [1, 2, 3]
+
+    def test_phrase_requires_adjacency(self, conn):
+        assert self._search(conn, 1, '"quarterly budget"') == [1]
+
+    def test_other_users_never_match(self, conn):
+        assert 4 not in self._search(conn, 1, "quarterly budget review")
+        assert self._search(conn, 2, '"budget review"') == [4]
@@ -0,0 +1,76 @@
+"""
+Tests for the batched warm-tier conversation summarizer.
+"""
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from src.ai.conversation_summarizer import ConversationSummarizer, build_extractive_summary
+
+
+def _msg(role, content, intent=None, agent=None):
+    return SimpleNamespace(role=role, content=content, intent=intent, active_agent=agent)
+
+
+def _row(row_id, user_id, session_id):
+    return SimpleNamespace(id=row_id, user_id=user_id, session_id=session_id)
+
+
+class FakeLLM:
+    """Answers for every conversation except the last one in each request."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        ids = [int(i) for i in re.findall(r"### Conversation (\d+)", messages[-1].content)]
+        payload = {"summaries": [
+            {"id": i, "summary": f"summary {i}", "topic": "planning", "key_facts": ["likes mornings"]}
+            for i in ids[:-1]
+        ]}
+        return SimpleNamespace(content=f"```json\n{json.dumps(payload)}\n```")
+
+
+class TestExtractiveSummary:
+    def test_collects_intents_and_excerpt(self):
+        summary = build_extractive_summary([
+            _msg("user", "book a flight", intent="travel"),
+            _msg("assistant", "done", intent="travel"),
+        ])
+        assert summary["key_facts"] == ["Intent: travel"]
+        assert "User: book a flight" in summary["summary"]
+        assert summary["summary"].startswith("Conversation with 2 messages")
+
+
+class TestBatchedSummarization:
+    @pytest.mark.asyncio
+    async def test_packs_sessions_into_one_request(self):
+        llm = FakeLLM()
+        summarizer = ConversationSummarizer(llm=llm, sessions_per_request=3)
+        rows = [_row(1, 7, "a"), _row(2, 7, "b"), _row(3, 8, "a")]
+        messages = {(r.user_id, r.session_id): [_msg("user", f"hello {r.id}")] for r in rows}
+
+        summaries = await summarizer._summarize_chunk(rows, messages)
+
+        assert llm.calls == 1
+        assert set(summaries) == {1, 2}  # session 3 omitted -> extractive fallback
+        assert summaries[1]["summary"] == "summary 1"
+
+    @pytest.mark.asyncio
+    async def test_without_llm_returns_nothing(self):
+        summarizer = ConversationSummarizer(use_llm=False)
+        rows = [_row(1, 7, "a")]
+        assert await summarizer._summarize_chunk(rows, {(7, "a"): [_msg("user", "hi")]}) == {}
+
+    @pytest.mark.asyncio
+    async def test_ignores_unknown_ids(self):
+        class RogueLLM:
+            def invoke(self, messages):
+                return SimpleNamespace(content='{"summaries": [{"id": 99, "summary": "x"}]}')
+
+        summarizer = ConversationSummarizer(llm=RogueLLM())
+        rows = [_row(1, 7, "a")]
+        assert await summarizer._summarize_chunk(rows, {(7, "a"): [_msg("user", "hi")]}) == {}
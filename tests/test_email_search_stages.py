@@ -0,0 +1,156 @@
+"""
+Tests for the concurrently staged email search pipeline.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.integrations.gmail.exceptions import EmailSearchException
+from src.integrations.gmail.search_service import EmailSearchService
+
+
+def _email(n, subject="Weekly update", sender="team@example.com"):
+    return {'id': f"m{n}", 'subject': subject, 'sender': sender, 'from': sender, 'date': f"2026-01-{n:02d}"}
+
+
+class FakeGmail:
+    def __init__(self, results=None, delay=0.0, error=None):
+        self.results = results or []
+        self.delay = delay
+        self.error = error
+        self.queries = []
+
+    def search_emails(self, query, folder, limit):
+        self.queries.append(query)
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return list(self.results)
+
+
+class FakeCoordinator:
+    def __init__(self, results=None, delay=0.0):
+        self.graph = None
+        self.results = results or []
+        self.delay = delay
+
+    async def query(self, text_query, use_graph, vector_limit, filters):
+        await asyncio.sleep(self.delay)
+        return {'results': [
+            {'id': e['id'], 'content': 'body', 'metadata': {
+                'email_id': e['id'], 'subject': e['subject'], 'sender': e['sender'], 'timestamp': e['date'],
+            }} for e in self.results
+        ]}
+
+
+class FakeRag:
+    def __init__(self, results=None, delay=0.0):
+        self.results = results or []
+        self.delay = delay
+
+    def search(self, query, k, filters):
+        time.sleep(self.delay)
+        return [{'content': 'attachment text', 'metadata': {'email_id': e['id'], 'subject': e['subject']}}
+                for e in self.results]
+
+
+def _service(gmail=None, coordinator=None, rag=None):
+    parent = SimpleNamespace(
+        config=None, rag_engine=rag, hybrid_coordinator=coordinator, user_id=1,
+        date_parser=None, llm_client=None, gmail_client=gmail or FakeGmail(),
+        _ensure_available=lambda: None,
+    )
+    return EmailSearchService(parent)
+
+
+@pytest.mark.asyncio
+async def test_stages_run_concurrently():
+    service = _service(
+        gmail=FakeGmail(results=[], delay=0.2),
+        coordinator=FakeCoordinator(results=[_email(1)], delay=0.2),
+        rag=FakeRag(results=[], delay=0.2),
+    )
+
+    started = time.monotonic()
+    results, report = await service.search_emails_with_report(query="weekly update", limit=5)
+    elapsed = time.monotonic() - started
+
+    # Hybrid has fewer than `limit` results, so it is merged with the (empty) Gmail result
+    assert [e['id'] for e in results] == ["m1"]
+    assert elapsed < 0.5
+    assert set(report['stages']) >= {'hybrid', 'gmail', 'semantic'}
+
+
+@pytest.mark.asyncio
+async def test_sufficient_higher_priority_stage_wins_and_cancels_rest():
+    service = _service(
+        gmail=FakeGmail(results=[_email(9)], delay=0.0),
+        coordinator=FakeCoordinator(results=[_email(n) for n in range(1, 4)], delay=0.05),
+        rag=FakeRag(results=[_email(7)], delay=0.5),
+    )
+
+    started = time.monotonic()
+    results, report = await service.search_emails_with_report(query="weekly update", limit=3)
+
+    # Gmail finished first but hybrid outranks it and is sufficient
+    assert report['answered_by'] == 'hybrid'
+    assert [e['_source'] for e in results] == ['hybrid'] * 3
+    assert time.monotonic() - started < 0.4
+
+
+@pytest.mark.asyncio
+async def test_hybrid_results_not_matching_sender_fall_through_to_gmail():
+    service = _service(
+        gmail=FakeGmail(results=[_email(5, sender="Alice <alice@example.com>")]),
+        coordinator=FakeCoordinator(results=[_email(n) for n in range(1, 4)]),
+    )
+
+    results, report = await service.search_emails_with_report(query="notes", from_email="Alice", limit=3)
+
+    assert report['answered_by'] == 'gmail'
+    assert [e['id'] for e in results] == ['m5']
+
+
+@pytest.mark.asyncio
+async def test_deadline_returns_best_finished_stage():
+    service = _service(
+        gmail=FakeGmail(results=[_email(2)], delay=0.0),
+        coordinator=FakeCoordinator(results=[_email(1)], delay=5.0),
+    )
+
+    results, report = await service.search_emails_with_report(query="weekly update", limit=3, deadline_seconds=0.2)
+
+    assert report['deadline_hit'] is True
+    assert report['answered_by'] == 'gmail'
+    assert [e['id'] for e in results] == ['m2']
+
+
+@pytest.mark.asyncio
+async def test_gmail_failure_surfaces_when_nothing_else_answers():
+    service = _service(gmail=FakeGmail(error=RuntimeError("quota")))
+
+    with pytest.raises(EmailSearchException):
+        await service.search_emails_async(query="weekly update")
+
+
+def test_sync_entry_point_runs_its_own_loop():
+    gmail = FakeGmail(results=[_email(1)])
+    service = _service(gmail=gmail)
+
+    results = service.search_emails(query="weekly update", subject="Weekly", limit=5)
+
+    assert [e['id'] for e in results] == ['m1']
+    assert 'subject:(Weekly)' in gmail.queries[0]
+
+
+@pytest.mark.asyncio
+async def test_sync_entry_point_refuses_to_block_a_running_loop():
+    service = _service(gmail=FakeGmail(results=[_email(1)]))
+
+    with pytest.raises(RuntimeError):
+        service.search_emails(query="weekly update")
+
+    results = await asyncio.to_thread(service.search_emails, query="weekly update")
+    assert [e['id'] for e in results] == ['m1']
@@ -16,6 +16,7 @@ class TestFinanceIntelligence(unittest.IsolatedAsyncioTestCase):
         self.config = MagicMock(spec=Config)
         self.graph_manager = MagicMock()
         self.graph_manager.query = AsyncMock()
+        self.graph_manager.search_text = AsyncMock()
         
         # Initialize tool and agent
         self.tool = FinanceTool(
@@ -50,8 +51,9 @@ class TestFinanceIntelligence(unittest.IsolatedAsyncioTestCase):
             call_args = self.graph_manager.query.call_args[0]
             bind_vars = self.graph_manager.query.call_args[0][1]
             
-            self.assertIn("Spotify", bind_vars['merchant'])
-            self.assertEqual(bind_vars['merchant'], "(?i)Spotify")
+            self.assertEqual(bind_vars['merchant'], "spotify")
+            self.assertEqual(bind_vars['user_ids'], ["1", 1])
+            self.assertNotIn("=~", call_args[0])
             
             # Verify response content
             self.assertIn("$250.75", response)
@@ -61,7 +63,7 @@ class TestFinanceIntelligence(unittest.IsolatedAsyncioTestCase):
     async def test_last_transaction_query(self):
         """Test that the agent correctly handles 'last purchase' queries."""
         # Mock graph response
-        self.graph_manager.query.return_value = [{
+        self.graph_manager.search_text.return_value = [{
             "merchant": "Amazon",
             "total": 42.99,
             "date": "2025-12-20",
@@ -75,12 +77,50 @@ class TestFinanceIntelligence(unittest.IsolatedAsyncioTestCase):
         }):
             response = await self.agent.run(query, {"user_id": 1})
             
+            # Verify the merchant is looked up on the text search view
+            search_kwargs = self.graph_manager.search_text.call_args[1]
+            self.assertEqual(self.graph_manager.search_text.call_args[0][0], "Amazon")
+            self.assertEqual(search_kwargs['fields'], ["merchants"])
+            self.assertEqual(search_kwargs['sort'], "date")
+            
             # Verify response content
             self.assertIn("Amazon", response)
             self.assertIn("$42.99", response)
             self.assertIn("2025-12-20", response)
             self.assertIn("Book", response)
 
+    async def test_last_transaction_with_location_filters_in_query(self):
+        """Location and merchant are both filtered by the query, newest first."""
+        self.graph_manager.query.return_value = ["Receipt/9"]
+        self.graph_manager.get_node = AsyncMock(return_value={
+            "merchant": "Amazon", "location": "Seattle, WA", "total": 42.0, "date": "2024-03-01"
+        })
+        
+        response = await self.tool._handle_get_last_transaction({"merchant": "Amazon", "location": "Seattle"})
+        
+        aql, bind_vars = self.graph_manager.query.call_args[0]
+        self.assertIn("CONTAINS(LOWER(r.location), @location)", aql)
+        self.assertIn("SORT r.date DESC", aql)
+        self.assertEqual(bind_vars["location"], "seattle")
+        self.graph_manager.search_text.assert_not_awaited()
+        self.graph_manager.get_node.assert_awaited_once_with("Receipt/9")
+        self.assertIn("$42.00", response)
+
+    async def test_last_transaction_falls_back_to_substring_match(self):
+        """A merchant word inside a longer name ("amazon" in "AmazonFresh") is still found."""
+        self.graph_manager.search_text.return_value = []
+        self.graph_manager.query.return_value = ["Receipt/3"]
+        self.graph_manager.get_node = AsyncMock(return_value={
+            "merchant": "AmazonFresh", "total": 18.5, "date": "2025-11-02"
+        })
+        
+        response = await self.tool._handle_get_last_transaction({"merchant": "amazon"})
+        
+        aql, bind_vars = self.graph_manager.query.call_args[0]
+        self.assertNotIn("@location", aql)
+        self.assertEqual(bind_vars["merchant"], "amazon")
+        self.assertIn("AmazonFresh", response)
+
     async def test_no_results_handling(self):
         """Test handling when no receipts are found."""
         self.graph_manager.query.return_value = [{"total_spend": None, "count": 0}]
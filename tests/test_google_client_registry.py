@@ -0,0 +1,169 @@
+"""
+Tests for the per-user Google client registry.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from google.oauth2.credentials import Credentials
+
+from src.core.client_registry import GoogleClientRegistry
+
+
+def _creds(expiry=None, token="tok"):
+    creds = Credentials(token=token, refresh_token="refresh", client_id="id", client_secret="secret",
+                        token_uri="https://oauth2.googleapis.com/token")
+    creds.expiry = expiry or datetime.utcnow() + timedelta(hours=1)
+    return creds
+
+
+class Loader:
+    def __init__(self, delay=0.0, expiry=None):
+        self.calls = 0
+        self.delay = delay
+        self.expiry = expiry
+
+    def __call__(self, user_id, provider, db_session=None, auto_refresh=True):
+        self.calls += 1
+        time.sleep(self.delay)
+        return _creds(expiry=self.expiry, token=f"tok-{self.calls}")
+
+
+def _patch_loader(loader):
+    return patch("src.core.credential_provider.CredentialProvider.get_integration_credentials", side_effect=loader)
+
+
+def test_credentials_are_cached_per_user_and_provider():
+    registry = GoogleClientRegistry()
+    loader = Loader()
+    with _patch_loader(loader):
+        first = registry.get_credentials(1, "gmail")
+        assert registry.get_credentials(1, "gmail") is first
+        registry.get_credentials(1, "google_calendar")
+        registry.get_credentials(2, "gmail")
+
+    assert loader.calls == 3
+    stats = registry.get_stats()
+    assert stats["credential_hits"] == 1
+    assert stats["credential_misses"] == 3
+
+
+def test_concurrent_misses_load_once():
+    registry = GoogleClientRegistry()
+    loader = Loader(delay=0.1)
+    with _patch_loader(loader):
+        threads = [threading.Thread(target=registry.get_credentials, args=(1, "gmail")) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert loader.calls == 1
+
+
+def test_expiring_credentials_are_reloaded():
+    registry = GoogleClientRegistry()
+    loader = Loader(expiry=datetime.utcnow() + timedelta(minutes=1))
+    with _patch_loader(loader):
+        first = registry.get_credentials(1, "gmail")
+        second = registry.get_credentials(1, "gmail")
+
+    # Within google-auth's refresh threshold: treated as expired
+    assert first is not second
+    assert registry.get_stats()["credential_reloads"] == 1
+
+
+def test_invalidate_drops_credentials_and_services():
+    registry = GoogleClientRegistry()
+    with _patch_loader(Loader()):
+        creds = registry.get_credentials(1, "gmail")
+        registry.get_service("gmail", "v1", creds, builder=object)
+        registry.invalidate(1, "gmail")
+        assert registry.get_credentials(1, "gmail") is not creds
+
+    stats = registry.get_stats()
+    assert stats["invalidations"] == 1
+    assert stats["cached_services"] == 0
+
+
+def test_services_are_reused_per_thread_only():
+    registry = GoogleClientRegistry()
+    creds = _creds()
+    built = []
+
+    def builder():
+        built.append(object())
+        return built[-1]
+
+    first = registry.get_service("gmail", "v1", creds, builder)
+    assert registry.get_service("gmail", "v1", creds, builder) is first
+
+    other = []
+    worker = threading.Thread(target=lambda: other.append(registry.get_service("gmail", "v1", creds, builder)))
+    worker.start()
+    worker.join()
+
+    assert other[0] is not first
+    assert len(built) == 2
+
+
+def test_service_cache_is_bounded():
+    registry = GoogleClientRegistry(max_services=2)
+    for n in range(3):
+        registry.get_service("gmail", "v1", _creds(token=str(n)), builder=object)
+
+    stats = registry.get_stats()
+    assert stats["cached_services"] == 2
+    assert stats["service_evictions"] == 1
+
+
+def test_concurrent_token_refresh_is_single_flight():
+    registry = GoogleClientRegistry()
+    refreshes = []
+
+    def slow_refresh(request):
+        refreshes.append(1)
+        time.sleep(0.05)
+        creds.token = f"new-{len(refreshes)}"
+        creds.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    creds = _creds(expiry=datetime.utcnow() - timedelta(minutes=1))
+    creds.refresh = slow_refresh
+    saved = []
+    registry.set_token_saver(1, "gmail", lambda c: saved.append(c.token))
+    registry._install_single_flight_refresh(creds, (1, "gmail"))
+
+    threads = [threading.Thread(target=creds.refresh, args=(None,)) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(refreshes) == 1
+    assert registry.get_stats()["token_refreshes"] == 1
+    # Persisted once, by the saver for this user and provider only
+    assert saved == ["new-1"]
+
+
+def test_refresh_persists_with_saver_for_its_own_key():
+    registry = GoogleClientRegistry()
+    saved = []
+    registry.set_token_saver(1, "gmail", lambda c: saved.append(("user-1", c.token)))
+    registry.set_token_saver(2, "gmail", lambda c: saved.append(("user-2", c.token)))
+
+    clients = {}
+    for user_id in (1, 2):
+        creds = _creds(token=f"old-{user_id}", expiry=datetime.utcnow() - timedelta(minutes=1))
+
+        def refresh(request, creds=creds, user_id=user_id):
+            creds.token = f"new-{user_id}"
+            creds.expiry = datetime.utcnow() + timedelta(hours=1)
+
+        creds.refresh = refresh
+        registry._install_single_flight_refresh(creds, (user_id, "gmail"))
+        clients[user_id] = creds
+
+    clients[2].refresh(None)
+    assert saved == [("user-2", "new-2")]
+    assert clients[2]._registry_key == (2, "gmail")
@@ -0,0 +1,216 @@
+"""
+Tests for per-user, field-weighted graph text search.
+"""
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.indexing.graph import text_search
+from src.services.indexing.graph.graph_constants import GRAPH_SEARCH_PROPERTY, GRAPH_SEARCH_VIEW
+from src.services.indexing.graph.text_search import (
+    GraphTextIndex,
+    SearchKeyMissing,
+    blind_token,
+    build_search_aql,
+    build_search_tokens,
+    build_view_links,
+    match_fraction,
+    query_tokens,
+    resolve_fields,
+    tokenize,
+)
+
+
+@pytest.fixture(autouse=True)
+def search_key(monkeypatch):
+    monkeypatch.setenv("GRAPH_SEARCH_KEY", "test-graph-search-key")
+    monkeypatch.setattr(text_search, "_INDEX_KEY", None)
+
+
+def _index(*nodes):
+    index = GraphTextIndex()
+    for node_id, user_id, node_type, props in nodes:
+        index.add(node_id, user_id, node_type, build_search_tokens(user_id, props))
+    return index
+
+
+def test_tokens_are_blinded_per_user_and_grouped_by_field():
+    tokens = build_search_tokens(7, {"title": "Login Bug", "merchant": "Blue Bottle", "total": 4.5})
+
+    assert set(tokens) == {"names", "merchants"}
+    assert tokens["names"] == [blind_token(7, "login"), blind_token(7, "bug")]
+    assert blind_token(7, "bug") != blind_token(8, "bug")
+    assert "bug" not in str(tokens).lower()
+    assert build_search_tokens(None, {"title": "Login Bug"}) == {}
+    assert tokenize("Café-Racer  #42") == ["café", "racer", "42"]
+
+
+def test_query_drops_stopwords_unless_nothing_is_left():
+    assert query_tokens(1, "the receipts from Acme") == [blind_token(1, "receipts"), blind_token(1, "acme")]
+    assert query_tokens(1, "who is") == [blind_token(1, "who"), blind_token(1, "is")]
+
+
+def test_search_is_scoped_to_the_user_and_node_type():
+    index = _index(
+        ("a", 1, "Receipt", {"merchant": "Acme Coffee"}),
+        ("b", 2, "Receipt", {"merchant": "Acme Coffee"}),
+        ("c", 1, "Email", {"subject": "Acme Coffee order"}),
+    )
+
+    assert [n for n, _ in index.search(query_tokens(1, "acme"), 1)] == ["a", "c"]
+    assert [n for n, _ in index.search(query_tokens(2, "acme"), 2)] == ["b"]
+    assert [n for n, _ in index.search(query_tokens(1, "acme"), 1, node_types=["Email"])] == ["c"]
+    assert index.search(query_tokens(2, "acme"), 1) == []
+
+
+def test_field_weights_rank_names_above_content():
+    index = _index(
+        ("body", 1, "Document", {"content": "notes on the quarterly roadmap"}),
+        ("title", 1, "Document", {"title": "Roadmap"}),
+    )
+
+    ranked = index.search(query_tokens(1, "roadmap"), 1)
+    assert [n for n, _ in ranked] == ["title", "body"]
+    assert [n for n, _ in index.search(query_tokens(1, "roadmap"), 1, fields=["content"])] == ["body"]
+    with pytest.raises(ValueError):
+        resolve_fields(["password"])
+
+
+def test_min_match_and_reindexing():
+    index = _index(
+        ("i1", 1, "LinearIssue", {"title": "Login page crashes on Safari"}),
+        ("i2", 1, "LinearIssue", {"title": "Safari font rendering"}),
+    )
+    tokens = query_tokens(1, "login crashes in safari")
+
+    assert [n for n, _ in index.search(tokens, 1, min_match=0.5)] == ["i1"]
+
+    index.add("i1", 1, "LinearIssue", build_search_tokens(1, {"title": "Checkout timeout"}))
+    assert index.search(tokens, 1, min_match=0.5) == []
+    index.remove("i2")
+    assert len(index) == 1
+    assert index.search(query_tokens(1, "safari"), 1) == []
+
+
+def test_match_fraction_reads_stored_tokens():
+    stored = build_search_tokens(1, {"merchant": "Whole Foods Market"})
+
+    assert match_fraction(stored, query_tokens(1, "whole foods"), ["merchants"]) == 1.0
+    assert match_fraction(stored, query_tokens(1, "whole paycheck"), ["merchants"]) == 0.5
+    assert match_fraction(stored, query_tokens(1, "whole foods"), ["names"]) == 0.0
+
+
+def test_aql_searches_the_view_with_field_boosts_and_bind_vars():
+    aql = build_search_aql(["names", "content"], filter_types=True, sort="date")
+
+    assert f"FOR doc IN {GRAPH_SEARCH_VIEW}" in aql
+    assert "BOOST(doc.search_tokens.names IN @tokens, 3.0)" in aql
+    assert "BOOST(doc.search_tokens.content IN @tokens, 1.0)" in aql
+    assert "merchants" not in aql
+    assert "doc.node_type IN @node_types" in aql
+    assert "SORT doc.@sort DESC" in aql
+    assert "=~" not in aql and "LIKE" not in aql
+
+    links = build_view_links(["Receipt"])
+    assert links["Receipt"]["fields"]["search_tokens"]["fields"]["merchants"] == {"analyzers": ["identity"]}
+
+
+@pytest.mark.asyncio
+async def test_thread_analyzer_checks_user_issues_via_text_search():
+    from src.features.ghost.thread_analyzer import ThreadAnalyzerAgent
+    from src.services.indexing.graph.schema import NodeType
+
+    analyzer = object.__new__(ThreadAnalyzerAgent)
+    analyzer.graph = MagicMock()
+    analyzer.graph.search_text = AsyncMock(return_value=[{"id": "LIN-1"}])
+
+    assert await analyzer._is_already_ticketed("Login (crash) [urgent]", 5)
+    analyzer.graph.search_text.assert_awaited_once_with(
+        "Login (crash) [urgent]", user_id=5, node_types=[NodeType.LINEAR_ISSUE],
+        fields=["names"], limit=1, min_match=0.5,
+    )
+
+
+@pytest.mark.asyncio
+async def test_networkx_manager_search_round_trip():
+    pytest.importorskip("networkx")
+    from src.services.indexing.graph.manager import KnowledgeGraphManager
+    from src.services.indexing.graph.schema import NodeType
+
+    graph = KnowledgeGraphManager(backend="networkx", validation_mode="warn")
+    await graph.add_node("p1", NodeType.PERSON, {"name": "Ada Lovelace", "user_id": 1})
+    await graph.add_node("p2", NodeType.PERSON, {"name": "Ada Byron", "user_id": 2})
+
+    results = await graph.search_text("ada", user_id=1)
+    assert [r["id"] for r in results] == ["p1"]
+    assert results[0]["name"] == "Ada Lovelace"
+    assert "search_tokens" not in results[0]
+
+    await graph.delete_node("p1")
+    assert await graph.search_text("ada", user_id=1) == []
+
+
+@pytest.mark.asyncio
+async def test_reindex_backfills_nodes_stored_without_tokens():
+    pytest.importorskip("networkx")
+    from src.services.indexing.graph.manager import KnowledgeGraphManager
+    from src.services.indexing.graph.schema import NodeType
+
+    graph = KnowledgeGraphManager(backend="networkx", validation_mode="warn")
+    await graph.add_node("p1", NodeType.PERSON, {"name": "Ada Lovelace", "user_id": 1})
+    # A node written before search tokens existed: encrypted, no tokens, not indexed
+    legacy = graph._encrypt_graph_properties({"name": "Ada Byron", "user_id": 1})
+    graph.graph.add_node("p2", **legacy, node_type=NodeType.PERSON.value)
+    assert [r["id"] for r in await graph.search_text("ada", user_id=1)] == ["p1"]
+
+    assert await graph.reindex_search_tokens() == 1
+    assert {r["id"] for r in await graph.search_text("byron", user_id=1)} == {"p2"}
+    assert await graph.reindex_search_tokens() == 0
+
+
+@pytest.mark.asyncio
+async def test_missing_secret_disables_search(monkeypatch):
+    pytest.importorskip("networkx")
+    from src.services.indexing.graph.manager import KnowledgeGraphManager
+    from src.services.indexing.graph.schema import NodeType
+
+    for name in ("GRAPH_SEARCH_KEY", "ENCRYPTION_KEY", "SECRET_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    with pytest.raises(SearchKeyMissing):
+        blind_token(1, "ada")
+
+    graph = KnowledgeGraphManager(backend="networkx", validation_mode="warn")
+    await graph.add_node("p1", NodeType.PERSON, {"name": "Ada Lovelace", "user_id": 1})
+    assert GRAPH_SEARCH_PROPERTY not in graph.graph.nodes["p1"]
+    assert await graph.search_text("ada", user_id=1) == []
+    assert await graph.reindex_search_tokens() == 0
+
+    # Once a key is configured the nightly reindex backfills the node
+    monkeypatch.setenv("GRAPH_SEARCH_KEY", "test-graph-search-key")
+    assert await graph.reindex_search_tokens() == 1
+    assert [r["id"] for r in await graph.search_text("ada", user_id=1)] == ["p1"]
+
+
+@pytest.mark.asyncio
+async def test_arangodb_reindex_updates_in_batches():
+    from src.services.indexing.graph.manager import GraphBackend, KnowledgeGraphManager
+
+    pending = [{"_key": str(n), "user_id": 1, "merchant": f"Shop {n}"} for n in range(5)]
+    updated = []
+
+    def execute(query, bind_vars):
+        if "UPDATE" in query:
+            updated.append([u["key"] for u in bind_vars["updates"]])
+            done = {u["key"] for u in bind_vars["updates"]}
+            pending[:] = [d for d in pending if d["_key"] not in done]
+            return iter([])
+        return iter(pending[:bind_vars["batch"]] if "FOR doc IN Receipt" in query else [])
+
+    graph = object.__new__(KnowledgeGraphManager)
+    graph.backend_type = GraphBackend.ARANGODB
+    graph.db = MagicMock()
+    graph.db.collections.return_value = [{"name": "Receipt", "system": False}]
+    graph.db.aql.execute.side_effect = execute
+
+    assert await graph.reindex_search_tokens(batch_size=2) == 5
+    assert updated == [["0", "1"], ["2", "3"], ["4"]]
@@ -0,0 +1,122 @@
+"""
+Tests for sharded insight delivery with per-user backpressure.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.services.insights.delivery import DeliveryPolicy, InsightDeliveryService
+
+NO_QUIET_HOURS = DeliveryPolicy(quiet_hours_start=None, quiet_hours_end=None)
+
+
+class FakeGraph:
+    """Returns pending users / insights based on which query is executed."""
+
+    def __init__(self, insights_by_user):
+        self.insights_by_user = insights_by_user
+        self.pending_insight_queries = []
+
+    async def execute_query(self, query, bind_vars=None):
+        if "COLLECT user_id" in query:
+            oldest = (datetime.utcnow() - timedelta(minutes=10)).isoformat()
+            return [
+                {"user_id": uid, "pending": len(items), "oldest": oldest}
+                for uid, items in self.insights_by_user.items() if items
+            ]
+        if "related_entities" in query:
+            self.pending_insight_queries.append(bind_vars["user_id"])
+            return [dict(i) for i in self.insights_by_user.get(bind_vars["user_id"], [])]
+        return []
+
+
+def _warnings(count):
+    return [
+        {"id": f"w{i}", "type": "warning", "confidence": 0.9, "content": "heads up",
+         "created_at": datetime.utcnow().isoformat()}
+        for i in range(count)
+    ]
+
+
+def _service(graph, **kwargs):
+    service = InsightDeliveryService(MagicMock(), graph, **kwargs)
+    service._default_policy = NO_QUIET_HOURS
+    service._deliver = AsyncMock(return_value=True)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_only_users_with_pending_insights_are_visited():
+    graph = FakeGraph({1: _warnings(1), 2: [], 3: _warnings(2)})
+    service = _service(graph)
+
+    stats = await service.check_and_deliver_all_users()
+
+    assert sorted(graph.pending_insight_queries) == [1, 3]
+    assert stats["users"] == 2
+    assert stats["delivered"] == 3
+
+
+@pytest.mark.asyncio
+async def test_shard_filter_and_metrics():
+    graph = FakeGraph({uid: _warnings(1) for uid in range(1, 9)})
+    service = _service(graph, shard_count=4)
+
+    await service.check_and_deliver_all_users(shards=[1])
+
+    assert sorted(graph.pending_insight_queries) == [1, 5]
+    metrics = service.get_delivery_metrics()["shards"]
+    assert set(metrics) == {1}
+    assert metrics[1]["users"] == 2
+    assert metrics[1]["max_lag_seconds"] >= 600
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_leaves_insights_pending():
+    graph = FakeGraph({1: _warnings(3)})
+    service = _service(graph)
+    service.set_policy(1, DeliveryPolicy(max_per_hour=2, quiet_hours_start=None, quiet_hours_end=None))
+
+    first = await service.check_and_deliver(1)
+    second = await service.check_and_deliver(1)
+
+    assert first["delivered"] == 2 and first["rate_limited"] == 1
+    assert second["delivered"] == 0 and second["rate_limited"] == 3
+
+
+@pytest.mark.asyncio
+async def test_quiet_hours_defer_all_but_urgent():
+    insights = [
+        {"id": "n1", "type": "connection", "confidence": 0.7, "content": "you both know Sam"},  # high
+        {"id": "c1", "type": "conflict", "confidence": 0.9, "content": "clash"},  # urgent
+    ]
+    service = _service(FakeGraph({1: insights}))
+
+    with patch.object(service, "_is_quiet_hours", return_value=True):
+        stats = await service.check_and_deliver(1)
+
+    assert stats["delivered"] == 1
+    assert stats["deferred"] == 1
+    delivered_insight = service._deliver.await_args.args[1]
+    assert delivered_insight["type"] == "conflict"
+
+
+@pytest.mark.asyncio
+async def test_slow_user_does_not_block_shard():
+    graph = FakeGraph({1: _warnings(1), 2: _warnings(1)})
+    service = _service(graph, shard_count=1)
+    service.USER_TIMEOUT_SECONDS = 0.05
+    original = service.check_and_deliver
+
+    async def slow_for_user_one(user_id):
+        if user_id == 1:
+            await asyncio.sleep(1)
+        return await original(user_id)
+
+    service.check_and_deliver = slow_for_user_one
+    stats = await service.check_and_deliver_all_users()
+
+    assert stats["errors"] == 1
+    assert stats["delivered"] == 1
@@ -0,0 +1,158 @@
+"""
+Tests for write-combined relationship interaction counters.
+"""
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+import fakeredis
+import pytest
+
+from src.features.ghost.interaction_aggregator import _FLUSH_LOCK_KEY, InteractionAggregator, combine_increments
+
+
+def _local_aggregator(**kwargs):
+    aggregator = InteractionAggregator(**kwargs)
+    aggregator._redis = lambda: None
+    return aggregator
+
+
+def test_increments_combine_per_contact_with_summed_weights():
+    rows = combine_increments(
+        {"1|bob@x.io|email": 3, "1|bob@x.io|meeting": 1, "1|ann@x.io|slack": 2, "2|bob@x.io|email": 1},
+        {"1|bob@x.io|email": 100.0, "1|bob@x.io|meeting": 200.0, "1|ann@x.io|slack": 50.0, "2|bob@x.io|email": 10.0},
+    )
+    by_key = {(r["user_id"], r["email"]): r for r in rows}
+
+    bob = by_key[("1", "bob@x.io")]
+    assert (bob["count"], bob["email_count"], bob["meeting_count"], bob["slack_count"]) == (4, 3, 1, 0)
+    assert bob["weight"] == pytest.approx(0.5)
+    assert bob["last_source"] == "meeting"
+    assert bob["first_seen"] < bob["last_interaction"]
+    assert bob["last_interaction"].endswith("Z")
+    assert by_key[("1", "ann@x.io")]["weight"] == pytest.approx(0.1)
+    assert len(rows) == 3
+
+
+@pytest.mark.asyncio
+async def test_flush_applies_one_bulk_upsert_and_reports_lag():
+    aggregator = _local_aggregator(chunk_size=2)
+    for _ in range(5):
+        aggregator.record(1, "Bob@X.io", "slack")
+    aggregator.record(1, "ann@x.io", "email")
+    aggregator.record(2, "ann@x.io", "meeting")
+
+    graph = MagicMock()
+    graph.execute_query = AsyncMock(return_value=[])
+    assert await aggregator.flush(graph) == 7
+
+    # 3 edges in chunks of 2 -> 2 statements instead of 7 per-interaction writes
+    assert graph.execute_query.await_count == 2
+    rows = [r for call in graph.execute_query.await_args_list for r in call.args[1]["rows"]]
+    assert sorted((r["user_id"], r["email"], r["count"]) for r in rows) == [
+        ("1", "ann@x.io", 1), ("1", "bob@x.io", 5), ("2", "ann@x.io", 1),
+    ]
+    stats = aggregator.get_stats()
+    assert (stats["last_flush_size"], stats["last_flush_edges"], stats["local_pending"]) == (7, 3, 0)
+    assert stats["last_flush_lag_seconds"] is not None
+    assert await aggregator.flush(graph) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_increments_for_retry():
+    aggregator = _local_aggregator(local_max_pending=3)
+    aggregator.record(1, "bob@x.io", "email")
+    aggregator.record(1, "bob@x.io", "email")
+    assert not aggregator.local_flush_due()
+    aggregator.record(1, "bob@x.io", "meeting")
+    assert aggregator.local_flush_due()
+
+    graph = MagicMock()
+    graph.execute_query = AsyncMock(side_effect=RuntimeError("arango down"))
+    assert await aggregator.flush(graph) == 0
+    assert aggregator.get_stats()["local_pending"] == 3
+
+    graph.execute_query = AsyncMock(return_value=[])
+    assert await aggregator.flush(graph) == 3
+    row = graph.execute_query.await_args.args[1]["rows"][0]
+    assert (row["email_count"], row["meeting_count"]) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_redis_batch_left_by_crashed_flush_is_applied_first():
+    aggregator = InteractionAggregator()
+    aggregator._client = fakeredis.FakeRedis(decode_responses=True)
+
+    aggregator.record(1, "bob@x.io", "email")
+    graph = MagicMock()
+    graph.execute_query = AsyncMock(side_effect=RuntimeError("arango down"))
+    assert await aggregator.flush(graph) == 0
+
+    aggregator.record(1, "bob@x.io", "email")
+    graph.execute_query = AsyncMock(return_value=[])
+    assert await aggregator.flush(graph) == 1
+    assert await aggregator.flush(graph) == 1
+    assert aggregator.get_stats()["inflight_keys"] == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_process_flushes_on_interval_and_at_shutdown():
+    aggregator = _local_aggregator(flush_seconds=0.05)
+    graph = MagicMock()
+    graph.execute_query = AsyncMock(return_value=[])
+    await aggregator.start(graph)
+
+    # No further record() calls: the interval flusher still drains the buffer
+    aggregator.record(1, "bob@x.io", "email")
+    await asyncio.sleep(0.15)
+    assert graph.execute_query.await_count == 1
+    assert aggregator.get_stats()["local_pending"] == 0
+
+    aggregator.flush_seconds = 60
+    await asyncio.sleep(0.06)
+    aggregator.record(1, "ann@x.io", "slack")
+    await aggregator.stop()
+    assert graph.execute_query.await_count == 2
+    assert aggregator.get_stats()["local_pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_does_not_release_a_lock_taken_by_another_process():
+    aggregator = InteractionAggregator()
+    client = aggregator._client = fakeredis.FakeRedis(decode_responses=True)
+    aggregator.record(1, "bob@x.io", "email")
+
+    async def slow_write(query, params):
+        # Our lock expired mid-flush and another process took it over
+        client.set(_FLUSH_LOCK_KEY, "other-process")
+        return []
+
+    graph = MagicMock()
+    graph.execute_query = AsyncMock(side_effect=slow_write)
+    assert await aggregator.flush(graph) == 1
+    assert client.get(_FLUSH_LOCK_KEY) == "other-process"
+
+    client.delete(_FLUSH_LOCK_KEY)
+    aggregator.record(1, "bob@x.io", "email")
+    graph.execute_query = AsyncMock(return_value=[])
+    assert await aggregator.flush(graph) == 1
+    assert not client.exists(_FLUSH_LOCK_KEY)
+
+
+@pytest.mark.asyncio
+async def test_async_callers_keep_redis_off_the_event_loop():
+    aggregator = InteractionAggregator()
+    callers = []
+
+    def redis():
+        callers.append(threading.get_ident())
+        return None
+
+    aggregator._redis = redis
+    await aggregator.record_async(1, "bob@x.io", "email")
+    graph = MagicMock()
+    graph.execute_query = AsyncMock(return_value=[])
+    assert await aggregator.flush(graph) == 1
+
+    assert len(callers) == 2
+    assert threading.get_ident() not in callers
@@ -0,0 +1,226 @@
+"""
+Tests for the LLM gateway against a local fake chat model.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, List
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.ai.llm_gateway import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    GatewayChatModelMixin,
+    LLMGateway,
+    LLMRequest,
+    LLMCallContext,
+    ResponseCache,
+    llm_call_context,
+    set_llm_gateway,
+)
+
+
+class FakeChatModel(BaseChatModel):
+    """Echoes the last message after a delay and counts real invocations."""
+    temperature: float = 0.0
+    delay: float = 0.05
+    calls: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls.append(messages[-1].content)
+        time.sleep(self.delay)
+        message = AIMessage(
+            content=f"echo: {messages[-1].content}",
+            usage_metadata={'input_tokens': 10, 'output_tokens': 5, 'total_tokens': 15},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class GatewayFakeChatModel(GatewayChatModelMixin, FakeChatModel):
+    pass
+
+
+@pytest.fixture
+def gateway():
+    gw = LLMGateway(cache=ResponseCache(redis_url="redis://invalid"))
+    set_llm_gateway(gw)
+    yield gw
+    set_llm_gateway(None)
+
+
+def test_identical_concurrent_prompts_are_coalesced(gateway):
+    model = GatewayFakeChatModel(temperature=0.7, delay=0.2, calls=[])
+    results = []
+
+    def ask():
+        results.append(model.invoke([HumanMessage(content="summarize")]).content)
+
+    threads = [threading.Thread(target=ask) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert model.calls == ["summarize"]
+    assert results == ["echo: summarize"] * 5
+    assert gateway.get_stats()['totals']['coalesced'] == 4
+
+
+def test_deterministic_responses_are_cached(gateway):
+    model = GatewayFakeChatModel(temperature=0.0, calls=[])
+
+    first = model.invoke([HumanMessage(content="classify: hello")])
+    second = model.invoke([HumanMessage(content="classify: hello")])
+
+    assert model.calls == ["classify: hello"]
+    assert second.content == first.content
+    assert gateway.get_stats()['totals']['cache_hits'] == 1
+
+
+def test_non_deterministic_and_opted_out_calls_are_not_cached(gateway):
+    creative = GatewayFakeChatModel(temperature=0.9, delay=0, calls=[])
+    creative.invoke([HumanMessage(content="poem")])
+    creative.invoke([HumanMessage(content="poem")])
+
+    model = GatewayFakeChatModel(temperature=0.0, delay=0, calls=[])
+    with llm_call_context(cache=False):
+        model.invoke([HumanMessage(content="now")])
+        model.invoke([HumanMessage(content="now")])
+
+    assert len(creative.calls) == 2
+    assert len(model.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_calls_share_limits_and_accounting(gateway):
+    model = GatewayFakeChatModel(temperature=0.5, delay=0.01, calls=[])
+
+    with llm_call_context(caller="briefs", tenant=7):
+        await asyncio.gather(*(model.ainvoke([HumanMessage(content=f"q{n}")]) for n in range(3)))
+
+    stats = gateway.get_stats()['callers']['briefs']
+    assert stats['calls'] == 3
+    assert stats['prompt_tokens'] == 30
+    assert stats['completion_tokens'] == 15
+
+
+def test_tenant_concurrency_limit_serializes_one_user(gateway):
+    gateway.admission.tenant_concurrency = 1
+    model = GatewayFakeChatModel(temperature=0.5, delay=0.1, calls=[])
+
+    def ask(tenant, text):
+        with llm_call_context(tenant=tenant):
+            model.invoke([HumanMessage(content=text)])
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=ask, args=(1, "a")), threading.Thread(target=ask, args=(1, "b"))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    same_tenant = time.monotonic() - started
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=ask, args=(1, "c")), threading.Thread(target=ask, args=(2, "d"))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    different_tenants = time.monotonic() - started
+
+    assert same_tenant >= 0.2
+    assert different_tenants < 0.18
+
+
+def test_interactive_lane_is_admitted_before_background():
+    gateway = LLMGateway(provider_concurrency=1, background_share=1.0,
+                         cache=ResponseCache(redis_url="redis://invalid"))
+    admission = gateway.admission
+    holder = admission.acquire("gemini", None, PRIORITY_BACKGROUND, 0, timeout=1)
+    order = []
+
+    def wait(priority, name):
+        waiter = admission.acquire("gemini", None, priority, 0, timeout=5)
+        order.append(name)
+        admission.release(waiter)
+
+    background = threading.Thread(target=wait, args=(PRIORITY_BACKGROUND, "background"))
+    background.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=wait, args=(PRIORITY_INTERACTIVE, "interactive"))
+    interactive.start()
+    time.sleep(0.05)
+
+    admission.release(holder)
+    background.join()
+    interactive.join()
+
+    assert order == ["interactive", "background"]
+
+
+def test_background_cannot_take_every_provider_slot():
+    gateway = LLMGateway(provider_concurrency=4, background_share=0.5,
+                         cache=ResponseCache(redis_url="redis://invalid"))
+    admission = gateway.admission
+    held = [admission.acquire("gemini", None, PRIORITY_BACKGROUND, 0, timeout=1) for _ in range(2)]
+
+    with pytest.raises(TimeoutError):
+        admission.acquire("gemini", None, PRIORITY_BACKGROUND, 0, timeout=0.1)
+    interactive = admission.acquire("gemini", None, PRIORITY_INTERACTIVE, 0, timeout=0.1)
+
+    for waiter in held + [interactive]:
+        admission.release(waiter)
+
+
+def test_token_rate_limit_delays_calls_until_refill():
+    # 600 tokens/minute refills 10 tokens per second
+    gateway = LLMGateway(provider_tokens_per_minute=600, cache=ResponseCache(redis_url="redis://invalid"))
+    calls = []
+    # Overdraw the bucket by 3 tokens: the next call waits ~0.3s for refill
+    request = LLMRequest(provider="gemini", model="fake", estimated_tokens=603,
+                         context=LLMCallContext(caller="bulk"))
+
+    gateway.run_sync(request, lambda: calls.append(time.monotonic()))
+    started = time.monotonic()
+    gateway.run_sync(LLMRequest(provider="gemini", model="fake", estimated_tokens=1), lambda: calls.append(1))
+
+    assert time.monotonic() - started >= 0.2
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_follower_does_not_break_leader_or_other_followers(gateway):
+    release = asyncio.Event()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await release.wait()
+        return {"text": "done"}
+
+    def request():
+        return LLMRequest(provider="gemini", model="fake", key="same-prompt")
+
+    leader = asyncio.create_task(gateway.run(request(), call))
+    await asyncio.sleep(0.01)
+    followers = [asyncio.create_task(gateway.run(request(), call)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+
+    followers[0].cancel()
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await leader == {"text": "done"}
+    assert await followers[1] == {"text": "done"}
+    with pytest.raises(asyncio.CancelledError):
+        await followers[0]
+    assert len(calls) == 1
+    assert gateway.get_stats()['totals']['coalesced'] == 1
@@ -0,0 +1,105 @@
+"""
+Tests for the compiled multi-pattern matcher and the routing code built on it.
+"""
+import random
+
+from src.ai.intent.domain_detector import DomainDetector
+from src.ai.intent.multi_matcher import MultiPatternMatcher
+
+
+QUERIES = [
+    "what meetings do I have tomorrow?",
+    "Show my unread emails from Bob",
+    "add a task to email the budget report before the deadline",
+    "remind me to check my calendar events",
+    "who have i been emailing the most this week",
+    "multitasking tips",
+    "schedule a task for the appointment",
+    "",
+    "hello there",
+]
+
+
+def _legacy_matches(query, domain):
+    """Per-pattern scan the detector used before the matcher existed."""
+    query_lower = query.lower()
+    keywords = {
+        'task': DomainDetector.TASK_KEYWORDS,
+        'calendar': DomainDetector.CALENDAR_KEYWORDS,
+        'email': DomainDetector.EMAIL_KEYWORDS,
+    }[domain]
+    patterns = {
+        'task': DomainDetector.TASK_PATTERNS,
+        'calendar': DomainDetector.CALENDAR_ALL_PATTERNS,
+        'email': DomainDetector.EMAIL_ALL_PATTERNS,
+    }[domain]
+    matches = [kw for kw in keywords if kw in query_lower]
+    for pattern in patterns:
+        if pattern in query_lower and pattern not in matches:
+            matches.append(pattern)
+    return matches
+
+
+def test_literals_match_like_substring_checks():
+    rng = random.Random(3)
+    terms = ["he", "she", "his", "hers", "her", "s", "ushers", "ash", "shell"]
+    matcher = MultiPatternMatcher({"a": terms[:5], "b": terms[3:]})
+
+    for _ in range(300):
+        text = "".join(rng.choice("ahersu ") for _ in range(rng.randint(0, 20)))
+        matches = matcher.match(text)
+        for label, vocab in (("a", terms[:5]), ("b", terms[3:])):
+            assert matches.get(label, []) == [t for t in vocab if t in text]
+
+
+def test_terms_are_case_insensitive_and_deduplicated():
+    matcher = MultiPatternMatcher({"email": ["Inbox", "inbox", "mail"], "task": ["todo"]})
+
+    assert matcher.match("My INBOX has mail") == {"email": ["inbox", "mail"]}
+    assert matcher.scores("My INBOX has mail") == {"email": 2}
+    assert len(matcher) == 3
+
+
+def test_detector_matches_legacy_scan():
+    detector = DomainDetector()
+
+    for query in QUERIES:
+        result = detector.detect(query)
+        legacy = {d: _legacy_matches(query, d) for d in DomainDetector.DOMAINS}
+        legacy = {d: m for d, m in legacy.items() if m}
+
+        assert result.domains == list(legacy)
+        assert {d: sorted(m) for d, m in result.keyword_matches.items()} == {
+            d: sorted(m) for d, m in legacy.items()
+        }
+
+
+def test_detector_result_reuses_wider_scan():
+    detector = DomainDetector()
+    matcher = MultiPatternMatcher({**DomainDetector.vocabularies(), ("email", "send"): ["reply"]})
+    query = "reply to the email about my meeting"
+
+    result = detector.detect_from_matches(matcher.match(query))
+
+    assert result == detector.detect(query)
+    assert result.is_cross_domain
+
+
+def test_classifier_intent_scoring_matches_keyword_scan():
+    from src.agents.constants import INTENT_KEYWORDS
+    from src.ai.intent.core.classifier import _determine_intent, get_routing_matcher
+
+    assert get_routing_matcher() is get_routing_matcher()
+    for query in QUERIES + ["reschedule my meeting", "find file in google drive", "how much did I spend"]:
+        query_lower = query.lower()
+        matches = get_routing_matcher().match(query_lower)
+        for domain, categories in INTENT_KEYWORDS.items():
+            expected = sum(1 for kws in categories.values() for kw in kws if kw in query_lower)
+            assert sum(len(m) for label, m in matches.items() if label[:1] == (domain,)) == expected
+
+            legacy_intent = next(
+                (name for name, kws in categories.items() if any(k in query_lower for k in kws)), None
+            )
+            assert _determine_intent(query_lower, domain) == (
+                legacy_intent or _determine_intent(query_lower, "general")
+            )
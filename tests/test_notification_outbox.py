@@ -0,0 +1,212 @@
+"""
+Tests for the transactional notification outbox and its worker.
+"""
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, InAppNotification, NotificationOutbox, User
+from src.services.notifications import (
+    NotificationOutboxWorker,
+    NotificationPriority,
+    NotificationRequest,
+    NotificationService,
+    NotificationType,
+)
+
+TABLES = [User.__table__, InAppNotification.__table__, NotificationOutbox.__table__]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "outbox.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=TABLES)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": 1, "google_id": "g1", "email": "a@example.com"},
+            {"id": 2, "google_id": "g2", "email": "b@example.com"},
+        ])
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def session_factory(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    SessionLocal = sessionmaker(bind=engine)
+
+    @contextmanager
+    def factory():
+        session = SessionLocal()
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    yield factory
+    engine.dispose()
+
+
+async def _send(db_path, user_id, channels, commit=True, key=None, rollback=False):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with AsyncSession(engine) as db:
+        results = await NotificationService(db).send_notification(
+            NotificationRequest(
+                user_id=user_id,
+                title="Invoice due",
+                message="Pay by Friday",
+                notification_type=NotificationType.REMINDER,
+                priority=NotificationPriority.HIGH,
+            ),
+            channels=channels,
+            commit=commit,
+            idempotency_key=key,
+        )
+        if rollback:
+            await db.rollback()
+        elif not commit:
+            await db.commit()
+    await engine.dispose()
+    return results
+
+
+def _rows(factory):
+    with factory() as session:
+        return [
+            (r.user_id, r.status, r.channels, r.delivered_channels, r.attempts)
+            for r in session.execute(select(NotificationOutbox).order_by(NotificationOutbox.id)).scalars()
+        ]
+
+
+@pytest.mark.asyncio
+async def test_send_writes_in_app_and_outbox_in_callers_transaction(db_path, session_factory):
+    assert await _send(db_path, 1, ["in_app", "email", "push"]) == {"in_app": True, "email": True, "push": True}
+    assert await _send(db_path, 1, ["in_app", "email"], key="k1") == {"in_app": True, "email": True}
+    await _send(db_path, 1, ["in_app", "email"], key="k1")
+    await _send(db_path, 2, ["in_app", "push"], commit=False, rollback=True)
+    await _send(db_path, 2, ["in_app"])
+
+    assert _rows(session_factory) == [
+        (1, "pending", ["email", "push"], [], 0),
+        (1, "pending", ["email"], [], 0),
+    ]
+    with session_factory() as session:
+        assert session.execute(select(InAppNotification.user_id)).scalars().all() == [1, 1, 2]
+        # Payload is encrypted at rest
+        raw = session.connection().exec_driver_sql("SELECT payload FROM notification_outbox").scalar()
+        assert "Invoice" not in raw
+
+
+@pytest.mark.asyncio
+async def test_in_app_only_sends_are_deduplicated(db_path, session_factory):
+    await _send(db_path, 1, ["in_app"], key="nudge-7")
+    await _send(db_path, 1, ["in_app"], key="nudge-7")
+
+    # The key is kept on a delivered, channel-less marker the worker ignores
+    assert _rows(session_factory) == [(1, "delivered", [], [], 0)]
+    with session_factory() as session:
+        assert session.execute(select(InAppNotification.user_id)).scalars().all() == [1]
+
+
+@pytest.mark.asyncio
+async def test_worker_fans_out_channels_concurrently_and_batches(db_path, session_factory):
+    for user_id in (1, 2, 1):
+        await _send(db_path, user_id, ["email", "push"])
+
+    calls = []
+    running = 0
+    peak = 0
+
+    def sender(channel):
+        async def send(deliveries):
+            nonlocal running, peak
+            calls.append((channel, sorted(d.id for d in deliveries)))
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return {d.id: True for d in deliveries}
+        return send
+
+    worker = NotificationOutboxWorker(session_factory=session_factory)
+    worker.register_sender("email", sender("email"))
+    worker.register_sender("push", sender("push"))
+
+    assert await worker.process_ready() == 3
+    assert sorted(calls) == [("email", [1, 2, 3]), ("push", [1, 2, 3])]
+    assert peak == 2
+    assert {row[1] for row in _rows(session_factory)} == {"delivered"}
+
+    stats = worker.get_stats()
+    assert stats["channels"]["email"] == {"sent": 3, "failed": 0}
+    assert stats["delivery_lag_seconds"]["samples"] == 3
+    assert stats["depth_by_status"] == {"delivered": 3}
+
+
+@pytest.mark.asyncio
+async def test_retries_only_undelivered_channels(db_path, session_factory):
+    await _send(db_path, 1, ["email", "push"])
+    sent = []
+
+    async def email(deliveries):
+        sent.append("email")
+        return {d.id: True for d in deliveries}
+
+    async def flaky_push(deliveries):
+        sent.append("push")
+        raise RuntimeError("fcm unavailable")
+
+    worker = NotificationOutboxWorker(session_factory=session_factory, retry_seconds=0, max_attempts=2)
+    worker.register_sender("email", email)
+    worker.register_sender("push", flaky_push)
+
+    assert await worker.process_ready() == 0
+    assert _rows(session_factory) == [(1, "pending", ["email", "push"], ["email"], 1)]
+    assert await worker.process_ready() == 0
+    assert sent == ["email", "push", "push"]
+    assert _rows(session_factory) == [(1, "failed", ["email", "push"], ["email"], 2)]
+
+
+def test_concurrent_workers_never_claim_the_same_row(db_path, session_factory):
+    asyncio.run(_send(db_path, 1, ["email"]))
+    asyncio.run(_send(db_path, 2, ["email"]))
+    asyncio.run(_send(db_path, 1, ["push"]))
+
+    first = NotificationOutboxWorker(session_factory=session_factory, batch_size=2)
+    second = NotificationOutboxWorker(session_factory=session_factory, batch_size=2)
+    claimed_a = first.claim_ready()
+    claimed_b = second.claim_ready()
+
+    assert len(claimed_a) == 2 and len(claimed_b) == 1
+    assert {d.id for d in claimed_a}.isdisjoint(d.id for d in claimed_b)
+    assert second.claim_ready() == []
+    assert claimed_a[0].payload["title"] == "Invoice due"
+
+
+@pytest.mark.asyncio
+async def test_cleanup_deletes_finished_rows_and_idempotency_keys(db_path, session_factory):
+    await _send(db_path, 1, ["in_app"], key="nudge-7")
+    await _send(db_path, 1, ["email"])
+    await _send(db_path, 2, ["email"], key="invoice-2")
+    worker = NotificationOutboxWorker(session_factory=session_factory)
+
+    long_ago = datetime.utcnow() - timedelta(days=30)
+    with session_factory() as session:
+        session.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.user_id == 1)
+            .values(created_at=long_ago, delivered_at=long_ago)
+        )
+
+    # Pending rows are kept however old; delivered ones go with their key
+    assert await worker.cleanup_old() == 1
+    assert [(r[0], r[1]) for r in _rows(session_factory)] == [(1, "pending"), (2, "pending")]
+    await _send(db_path, 1, ["in_app"], key="nudge-7")
+    assert len(_rows(session_factory)) == 3
@@ -0,0 +1,119 @@
+"""
+Tests for DAG execution of supervisor multi-step plans.
+"""
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.agents.plan_scheduler import PlanScheduler, find_cycle_members, parse_dependencies
+from src.agents.state import StepResult
+from src.agents.supervisor import SupervisorAgent
+
+
+def _step(n, domain, depends_on=(), delay=0.1, fail=False):
+    return {"step": n, "domain": domain, "query": f"q{n}", "depends_on": list(depends_on),
+            "delay": delay, "fail": fail}
+
+
+def _runner(log):
+    async def run_step(step, step_num, context_text):
+        log.append(("start", step_num, context_text, time.monotonic()))
+        await asyncio.sleep(step["delay"])
+        return StepResult(step_id=f"step_{step_num}", domain=step["domain"], success=not step["fail"],
+                          result=f"r{step_num}", execution_time=step["delay"])
+    return run_step
+
+
+def test_dependencies_accept_planner_formats_and_detect_cycles():
+    steps = [_step(1, "email"), _step(2, "calendar", [1, "step_1"]), _step(3, "tasks", ["2", 3, 9])]
+    assert parse_dependencies(steps) == [[], [0], [1]]
+    assert find_cycle_members([[1], [0], [], [0]]) == [0, 1, 3]
+
+
+@pytest.mark.asyncio
+async def test_independent_chains_run_side_by_side_and_trace_critical_path():
+    log = []
+    steps = [
+        _step(1, "email", delay=0.1),
+        _step(2, "calendar", delay=0.2),
+        _step(3, "tasks", [1], delay=0.1),
+        _step(4, "notion", [2], delay=0.1),
+    ]
+    scheduler = PlanScheduler(_runner(log), step_timeout=5, budget_seconds=10,
+                              format_result=lambda sr: f"[{sr['step_id']}]")
+    results, trace = await scheduler.run(steps)
+
+    assert [r["success"] for r in results] == [True] * 4
+    # Latency is the longer chain (0.3s), not a first wave plus the dependents in sequence (0.4s)
+    assert trace.total_seconds < 0.42
+    # Step 3 starts as soon as step 1 finishes, before step 2 does, and only sees its own chain
+    starts = {n: (ctx, ts) for _, n, ctx, ts in log}
+    assert starts[3][0] == "[step_1]"
+    assert starts[3][1] < starts[4][1]
+
+    assert [t.index + 1 for t in trace.critical_path()] == [2, 4]
+    summary = trace.to_dict()
+    assert summary["dominant_domain"] == "calendar"
+    assert summary["steps"][3]["depends_on"] == [2]
+    assert "step_2 (calendar" in trace.format()
+
+
+@pytest.mark.asyncio
+async def test_failure_skips_downstream_and_steps_time_out_individually():
+    log = []
+    steps = [
+        _step(1, "email", fail=True, delay=0.01),
+        _step(2, "calendar", [1]),
+        _step(3, "tasks", [2]),
+        _step(4, "research", delay=1.0),
+        _step(5, "notes", delay=0.01),
+    ]
+    scheduler = PlanScheduler(_runner(log), step_timeout=0.2, budget_seconds=10)
+    results, trace = await scheduler.run(steps)
+
+    assert [n for _, n, _, _ in log] == [1, 4, 5]
+    assert [r["error"] for r in results[1:4]] == ["upstream_failed", "upstream_failed", "timeout"]
+    assert results[4]["success"] is True
+    assert trace.total_seconds < 0.5
+
+
+@pytest.mark.asyncio
+async def test_domain_concurrency_is_bounded():
+    running = {"email": 0}
+    peak = {"email": 0}
+
+    async def run_step(step, step_num, context_text):
+        running["email"] += 1
+        peak["email"] = max(peak["email"], running["email"])
+        await asyncio.sleep(0.05)
+        running["email"] -= 1
+        return StepResult(step_id=f"step_{step_num}", domain="email", success=True, result="ok")
+
+    scheduler = PlanScheduler(run_step, step_timeout=5, budget_seconds=10, domain_concurrency={"email": 2})
+    _, trace = await scheduler.run([_step(n, "email") for n in range(1, 6)])
+
+    assert peak["email"] == 2
+    assert max(t.queued for t in trace.steps) > 0.04
+
+
+@pytest.mark.asyncio
+async def test_supervisor_plan_uses_dag_and_keeps_plan_order():
+    supervisor = object.__new__(SupervisorAgent)
+    supervisor.event_emitter = None
+    supervisor._evaluate_execution = AsyncMock(return_value=None)
+    log = []
+    runner = _runner(log)
+
+    async def execute_single_step(step, step_num, context_str, *args):
+        return await runner(step, step_num, context_str)
+
+    supervisor._execute_single_step = execute_single_step
+    steps = [_step(1, "gmail", delay=0.05), _step(2, "calendar", [1], delay=0.05), _step(3, "tasks", delay=0.05)]
+
+    text = await supervisor._execute_multi_step_plan(steps, 1, "Ann", None, {"gmail"})
+
+    assert text.index("step_1") < text.index("step_2") < text.index("step_3")
+    assert "[Step step_1 — gmail OK]: r1" in {n: ctx for _, n, ctx, _ in log}[2]
+    supervisor._evaluate_execution.assert_not_awaited()
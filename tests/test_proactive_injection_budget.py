@@ -0,0 +1,133 @@
+"""
+Tests for budgeted, batched and cached proactive memory injection.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.memory.proactive_injector import InjectionContext, ProactiveInjector
+
+
+class FakeSemanticMemory:
+    """Batched fact search that records every call."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.cancelled = False
+
+    async def search_facts_batch(self, queries, user_id, limit):
+        self.calls.append(list(queries))
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {
+            q: [{"id": n, "content": f"{q} prefers mornings", "confidence": 0.9}]
+            for n, q in enumerate(queries)
+        }
+
+
+def _context(entities=("Bob", "Alice"), agent="email"):
+    return InjectionContext(user_id=1, agent_name=agent, current_query="hi", active_entities=list(entities))
+
+
+@pytest.mark.asyncio
+async def test_each_finder_issues_one_batched_query():
+    memory = FakeSemanticMemory()
+    injector = ProactiveInjector(semantic_memory=memory)
+
+    result = await injector.get_proactive_memories(_context(), max_memories=5)
+
+    # Entity finder + opportunity finder, each one call covering all entities
+    assert sorted(memory.calls) == [["Bob", "Alice"], ["communication Bob", "communication Alice"]]
+    assert {m.memory_id for m in result} >= {"fact_0", "fact_1"}
+    assert "{" not in result[0].content
+
+
+@pytest.mark.asyncio
+async def test_stragglers_are_cancelled_at_the_deadline():
+    memory = FakeSemanticMemory(delay=0.3)
+    injector = ProactiveInjector(semantic_memory=memory, turn_budget_seconds=0.1)
+
+    started = time.monotonic()
+    result = await injector.get_proactive_memories(_context())
+
+    assert time.monotonic() - started < 0.25
+    assert result == []
+    # Nothing keeps using the shared session after the turn moved on
+    assert memory.cancelled
+    finders = injector.get_stats()["finders"]
+    assert finders["entity"]["timeouts"] == 1
+    assert finders["opportunity"]["timeouts"] == 1
+    assert finders["entity"]["runs"] == 0
+
+
+@pytest.mark.asyncio
+async def test_results_are_cached_per_user_and_entity_set():
+    memory = FakeSemanticMemory()
+    injector = ProactiveInjector(semantic_memory=memory)
+
+    await injector.get_proactive_memories(_context())
+    await injector.get_proactive_memories(_context(entities=("Alice", "Bob")))
+    assert len(memory.calls) == 2
+
+    await injector.get_proactive_memories(_context(entities=("Carol",)))
+    assert len(memory.calls) == 4
+    assert injector.get_stats()["finders"]["entity"]["cache_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_track_contributing_finders():
+    injector = ProactiveInjector(semantic_memory=FakeSemanticMemory())
+
+    await injector.get_proactive_memories(_context(), max_memories=2)
+
+    finders = injector.get_stats()["finders"]
+    assert finders["entity"]["injected"] == 2
+    assert finders["entity"]["candidates"] == 2
+    assert finders["workload"]["injected"] == 0
+    assert finders["entity"]["contribution_rate"] == 2.0
+
+
+@pytest.mark.asyncio
+async def test_conflict_finder_queries_all_entities_at_once():
+    graph = MagicMock()
+    graph.query = AsyncMock(side_effect=lambda query, params: (
+        [
+            {"name": "Bob Smith", "type": "OOO", "entity": "Bob"},
+            {"name": "Bobby Jones", "type": "Busy", "entity": "Bob"},
+        ]
+        if "HAS_STATUS" in query else []
+    ))
+    injector = ProactiveInjector(graph_manager=graph)
+
+    memories = await injector._find_conflict_memories(_context(agent="calendar"))
+
+    conflict_calls = [c for c in graph.query.await_args_list if "HAS_STATUS" in c.args[0]]
+    assert len(conflict_calls) == 1
+    assert conflict_calls[0].args[1]["entities"] == ["Bob", "Alice"]
+    assert [m.content for m in memories] == ["Bob Smith is currently OOO"]
+
+
+@pytest.mark.asyncio
+async def test_semantic_memory_keyword_batch_uses_one_query():
+    from src.ai.memory.semantic_memory import SemanticMemory
+
+    facts = [
+        SimpleNamespace(id=1, content="Bob likes tea", category="pref", confidence=0.9, source="chat"),
+        SimpleNamespace(id=2, content="Alice works remotely", category="work", confidence=0.8, source="chat"),
+    ]
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock(scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=facts)))))
+    memory = SemanticMemory(db=db, rag_engine=None, llm=None)
+
+    results = await memory.search_facts_batch(["about alice", "tea with Bobby"], user_id=1, limit=2, use_semantic=False)
+
+    assert db.execute.await_count == 1
+    assert [f["id"] for f in results["about alice"]] == [2]
+    assert results["tea with Bobby"] == []
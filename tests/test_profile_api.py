@@ -68,15 +68,11 @@ async def cleanup_db():
 
 @pytest.fixture(autouse=True)
 async def clear_cache():
-    """Clear the profile cache and session middleware cache between tests to avoid state leakage"""
-    # Clear profile cache
+    """Clear the profile, session and user caches between tests to avoid state leakage"""
     from src.services.profile_cache import get_profile_cache
-    cache = get_profile_cache()
-    await cache.clear()
-    
-    # Clear session middleware cache (class variable)
-    from api.middleware import SessionMiddleware
-    SessionMiddleware._session_cache.clear()
+    from src.services.user_cache import clear_user_caches
+    get_profile_cache()
+    await clear_user_caches()
     
     yield
 
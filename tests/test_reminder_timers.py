@@ -0,0 +1,148 @@
+"""
+Tests for the persistent reminder timer queue and its dispatcher.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.database.models import ActionableItem, Base, ReminderTimer, User
+from src.services.reminders.timer_queue import (
+    ReminderDispatcher,
+    backfill_timers,
+    compute_fire_times,
+)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[User.__table__, ActionableItem.__table__, ReminderTimer.__table__])
+    SessionLocal = sessionmaker(bind=engine)
+
+    @contextmanager
+    def factory():
+        session = SessionLocal()
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    with factory() as session:
+        session.add(User(id=1, google_id="g1", email="a@example.com"))
+    return factory
+
+
+def _timers(factory, item_id):
+    with factory() as session:
+        rows = session.execute(
+            select(ReminderTimer).where(ReminderTimer.item_id == item_id).order_by(ReminderTimer.fire_at)
+        ).scalars().all()
+        return [(t.offset_label, t.status) for t in rows]
+
+
+def test_fire_times_follow_item_policy():
+    now = datetime(2026, 3, 1, 12, 0)
+    due = now + timedelta(days=5)
+    assert compute_fire_times("bill", due, now) == [(due - timedelta(days=3), "3d"), (due - timedelta(days=1), "1d")]
+    assert [label for _, label in compute_fire_times("appointment", due, now)] == ["1d", "2h"]
+    assert [label for _, label in compute_fire_times("task", due, now)] == ["1d"]
+
+    # Passed offsets collapse into one immediate reminder; overdue items get none
+    soon = now + timedelta(hours=30)
+    assert compute_fire_times("bill", soon, now) == [(now, "now"), (soon - timedelta(days=1), "1d")]
+    assert compute_fire_times("bill", now - timedelta(hours=1), now) == []
+
+
+def test_item_writes_schedule_and_cancel_timers(session_factory):
+    due = datetime.utcnow() + timedelta(days=10)
+    with session_factory() as session:
+        session.merge(ActionableItem(id="bill-1", user_id=1, title="Power bill", item_type="bill", due_date=due))
+    assert _timers(session_factory, "bill-1") == [("3d", "pending"), ("1d", "pending")]
+
+    # Re-merging the same item (every crawler sync) leaves timers alone
+    with session_factory() as session:
+        session.merge(ActionableItem(id="bill-1", user_id=1, title="Power bill", item_type="bill", due_date=due))
+        first_id = session.execute(select(ReminderTimer.id).order_by(ReminderTimer.id)).scalars().first()
+    with session_factory() as session:
+        assert session.execute(select(ReminderTimer.id).order_by(ReminderTimer.id)).scalars().first() == first_id
+
+    # Moving the due date reschedules
+    with session_factory() as session:
+        item = session.get(ActionableItem, "bill-1")
+        item.due_date = datetime.utcnow() + timedelta(hours=12)
+    assert _timers(session_factory, "bill-1") == [("now", "pending")]
+
+    # Completing the item cancels what's left
+    with session_factory() as session:
+        session.get(ActionableItem, "bill-1").status = "completed"
+    assert _timers(session_factory, "bill-1") == [("now", "cancelled")]
+
+
+@pytest.mark.asyncio
+async def test_dispatchers_never_double_fire(session_factory):
+    now = datetime.utcnow()
+    with session_factory() as session:
+        for i in range(5):
+            session.add(ActionableItem(
+                id=f"d-{i}", user_id=1, title=f"Deadline {i}", item_type="deadline",
+                due_date=now + timedelta(hours=6),
+            ))
+        session.add(ActionableItem(id="later", user_id=1, title="Later", item_type="task", due_date=now + timedelta(days=4)))
+
+    delivered = []
+
+    async def deliver(reminder):
+        delivered.append(reminder.item_id)
+
+    first = ReminderDispatcher(deliver=deliver, session_factory=session_factory, batch_size=2)
+    second = ReminderDispatcher(deliver=deliver, session_factory=session_factory, batch_size=2)
+
+    claimed_a = first.claim_due()
+    claimed_b = second.claim_due()
+    assert {r.timer_id for r in claimed_a}.isdisjoint(r.timer_id for r in claimed_b)
+    first._settle(claimed_a, [], now)
+    second._settle(claimed_b, [], now)
+    delivered.extend(r.item_id for r in claimed_a + claimed_b)
+
+    assert await first.process_due() + await second.process_due() == 1
+    assert sorted(delivered) == [f"d-{i}" for i in range(5)]
+    assert first.next_fire_at() == now + timedelta(days=3)
+
+    with session_factory() as session:
+        item = session.get(ActionableItem, "d-0")
+        assert item.status == "reminded" and item.reminder_sent_at is not None
+    # Reminding an item keeps its later timers
+    assert _timers(session_factory, "later") == [("1d", "pending")]
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_is_retried_then_failed(session_factory):
+    with session_factory() as session:
+        session.add(ActionableItem(id="x", user_id=1, title="X", item_type="task", due_date=datetime.utcnow() + timedelta(hours=3)))
+
+    async def deliver(reminder):
+        raise RuntimeError("smtp down")
+
+    dispatcher = ReminderDispatcher(deliver=deliver, session_factory=session_factory, retry_seconds=0, max_attempts=2)
+    assert await dispatcher.process_due() == 0
+    assert _timers(session_factory, "x") == [("now", "pending")]
+    assert await dispatcher.process_due() == 0
+    assert _timers(session_factory, "x") == [("now", "failed")]
+    assert dispatcher.get_stats()["failures"] == 2
+
+
+def test_backfill_schedules_items_without_timers(session_factory):
+    with session_factory() as session:
+        session.add(ActionableItem(id="old", user_id=1, title="Old", item_type="appointment",
+                                   due_date=datetime.utcnow() + timedelta(days=2)))
+    with session_factory() as session:
+        session.execute(ReminderTimer.__table__.delete())
+
+    assert backfill_timers(session_factory) == 2
+    assert backfill_timers(session_factory) == 0
+    assert _timers(session_factory, "old") == [("1d", "pending"), ("2h", "pending")]
@@ -0,0 +1,132 @@
+"""
+Tests for vectorized batch salience scoring.
+"""
+import random
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.memory.salience_scorer import SalienceScorer
+
+
+class HashEmbedder:
+    """Deterministic bag-of-words embedder that counts encode calls."""
+
+    dim = 32
+
+    def __init__(self):
+        self.single_calls = []
+        self.batch_calls = []
+
+    def _vector(self, text):
+        vec = np.zeros(self.dim)
+        for word in text.lower().split():
+            vec[hash(word) % self.dim] += 1.0
+        return vec.tolist()
+
+    def encode(self, text):
+        self.single_calls.append(text)
+        return self._vector(text)
+
+    def encode_batch(self, texts):
+        self.batch_calls.append(list(texts))
+        return [self._vector(t) for t in texts]
+
+
+NOW = datetime(2026, 10, 1, 12, 0, 0)
+
+
+def _memories(n, seed=7):
+    rng = random.Random(seed)
+    words = ["project", "deadline", "budget", "bob", "alice", "report", "launch", "meeting", "invoice"]
+    memories = []
+    for i in range(n):
+        memories.append({
+            "content": " ".join(rng.choice(words) for _ in range(8)) + f" item{i}",
+            "timestamp": NOW - timedelta(hours=rng.uniform(-2, 500)) if i % 10 else None,
+            "access_count": rng.randint(0, 50),
+            "importance": rng.random(),
+            "entities": rng.sample(["Bob", "Alice", "Project X", "Budget"], 2),
+            "source": "semantic",
+        })
+    return memories
+
+
+def test_batch_matches_single_scoring():
+    scorer = SalienceScorer(embedder=HashEmbedder())
+    memories = _memories(40)
+    memories[3]["timestamp"] = (NOW - timedelta(hours=5)).isoformat() + "Z"
+    memories[4]["content"] = ""
+    args = ("project deadline for bob", ["Finish project launch"], ["bob", "Project X"])
+
+    batch = scorer.score_batch(memories, *args, now=NOW)
+    single = sorted(
+        (scorer.score(m, *args, now=NOW) for m in memories), key=lambda s: s.score, reverse=True
+    )
+
+    assert [s.content for s in batch] == [s.content for s in single]
+    for b, s in zip(batch, single):
+        assert b.score == pytest.approx(s.score)
+        assert b.recency_score == pytest.approx(s.recency_score)
+        assert b.frequency_score == pytest.approx(s.frequency_score)
+        assert b.relevance_score == pytest.approx(s.relevance_score)
+        assert b.goal_alignment_score == pytest.approx(s.goal_alignment_score)
+        assert b.entity_overlap_score == pytest.approx(s.entity_overlap_score)
+
+
+def test_keyword_fallback_matches_single_scoring():
+    scorer = SalienceScorer()
+    memories = _memories(25)
+
+    batch = scorer.score_batch(memories, "budget report", now=NOW)
+    expected = {m["content"]: scorer.score(m, "budget report", now=NOW).score for m in memories}
+
+    for scored in batch:
+        assert scored.score == pytest.approx(expected[scored.content])
+
+
+def test_query_embedded_once_and_stored_embeddings_reused():
+    embedder = HashEmbedder()
+    scorer = SalienceScorer(embedder=embedder)
+    memories = _memories(10)
+    for m in memories[:6]:
+        m["embedding"] = embedder._vector(m["content"])
+
+    scorer.score_batch(memories, "project deadline", now=NOW)
+    scorer.score_batch(memories, "project deadline", now=NOW)
+
+    assert embedder.single_calls == ["project deadline"]
+    assert embedder.batch_calls == [[m["content"] for m in memories[6:]]] * 2
+
+
+def test_top_k_selection_is_ordered_and_stable():
+    scorer = SalienceScorer()
+    memories = [{"content": "same", "importance": 0.5, "timestamp": NOW, "source": str(i)} for i in range(6)]
+    memories[4]["importance"] = 1.0
+
+    top = scorer.score_batch(memories, "", top_k=3, now=NOW)
+
+    assert [m.source for m in top] == ["4", "0", "1"]
+    assert scorer.score_batch(memories, "", top_k=0, now=NOW) == []
+    assert len(scorer.score_batch(memories, "", top_k=50, now=NOW)) == 6
+
+
+def test_scoring_5000_memories_fits_budget():
+    embedder = HashEmbedder()
+    scorer = SalienceScorer(embedder=embedder)
+    memories = _memories(5000)
+    for m in memories:
+        m["embedding"] = embedder._vector(m["content"])
+    args = ("project deadline for bob", ["Finish project launch"], ["bob", "Project X"])
+    scorer.score_batch(memories, *args, top_k=20, now=NOW)
+
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        scorer.score_batch(memories, *args, top_k=20, now=NOW)
+        best = min(best, time.perf_counter() - started)
+
+    # Generous bound for shared CI machines; the target is 20 ms
+    assert best < 0.1
@@ -0,0 +1,89 @@
+"""
+Tests for single-pass and streaming output redaction.
+"""
+import random
+from unittest.mock import patch
+
+import pytest
+
+from src.security.cor_layer import CORLayer
+from src.security.detectors.data_guard import DataGuard
+
+
+RESPONSE = (
+    "Card 4111 1111 1111 1111, SSN 123-45-6789, key sk-proj-abcdefghijklmnopqrstuvwxyz12. "
+    "Mail bob.smith@example.com or call 555-123-4567. Three tasks, 2 done. "
+)
+
+
+def _stream(guard, chunks):
+    stream = guard.stream()
+    return [stream.feed(chunk) for chunk in chunks] + [stream.close()], stream
+
+
+@pytest.mark.parametrize("config", [{}, {"mode": "paranoid"}])
+def test_any_chunking_matches_buffered_redaction(config):
+    guard = DataGuard(config)
+    expected = guard.sanitize_output(RESPONSE * 3)
+    assert "4111" not in expected and "abcdefghij" not in expected
+    assert ("bob.smith" in expected) is (config == {})
+
+    for seed in range(50):
+        rng = random.Random(seed)
+        text, chunks = RESPONSE * 3, []
+        while text:
+            n = rng.randint(1, 7)
+            chunks.append(text[:n])
+            text = text[n:]
+        outputs, stream = _stream(guard, chunks)
+        assert "".join(outputs) == expected
+        assert stream.redactor.counts == guard.engine.redact(RESPONSE * 3).counts
+
+
+def test_only_a_possible_partial_match_is_held_back():
+    stream = DataGuard({}).stream()
+    assert stream.feed("Hello there, ") == "Hello there, "
+    assert stream.feed("your card is 4111 1111") == "your card is "
+    assert stream.feed(" 1111 1111.") == "[REDACTED_CC]."
+    assert stream.feed(" Use sk") == " Use "
+    assert stream.feed("y blue and ask") == "sky blue and a"
+    assert stream.close() == "sk"
+
+
+@pytest.mark.parametrize("config", [{}, {"mode": "paranoid"}])
+def test_counted_emails_never_hide_a_card(config):
+    guard = DataGuard(config)
+    text = "ref-4111111111111111@pay.example.com"
+
+    if config:
+        assert guard.sanitize_output(text) == "[REDACTED_EMAIL]"
+    else:
+        assert guard.sanitize_output(text) == "ref-[REDACTED_CC]@pay.example.com"
+        assert guard.engine.redact(text).counts == {"EMAIL": 1, "CREDIT_CARD": 1}
+        outputs, stream = _stream(guard, list(text))
+        assert "".join(outputs) == "ref-[REDACTED_CC]@pay.example.com"
+        assert stream.redactor.counts == {"EMAIL": 1, "CREDIT_CARD": 1}
+
+
+def test_prefilter_skips_scan_for_plain_text():
+    guard = DataGuard({})
+    assert not guard.engine.may_match("Your meeting with the design team moved to Thursday.")
+    assert guard.engine.matches("Your meeting with the design team moved to Thursday.") == []
+    assert guard.engine.may_match("call me at 5")
+
+
+def test_leak_density_blocks_stream_and_buffered_output():
+    dump = "".join(f"user{i}@example.com, some padding text to make it long. " * 4 for i in range(40))
+    layer = CORLayer.__new__(CORLayer)
+    layer.data_guard = DataGuard({})
+
+    with patch("src.security.detectors.data_guard.SecurityAudit") as audit:
+        assert layer.sanitize_output(dump) == DataGuard.BLOCK_MESSAGE
+        audit.log_leak_prevention.assert_called_once()
+
+        stream = layer.open_output_stream(user_id=1)
+        outputs = [stream.feed(dump[i:i + 5]) for i in range(0, len(dump), 5)] + [stream.close()]
+    assert stream.blocked
+    assert outputs.count(DataGuard.BLOCK_MESSAGE) == 1
+    assert outputs[-1] == ""
+    assert len("".join(outputs)) < len(dump)
@@ -0,0 +1,244 @@
+"""
+Tests for the supervisor's concurrent, speculative pre-routing pipeline.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.agents.base import BaseAgent
+from src.agents.supervisor import SupervisorAgent
+from src.ai.llm_gateway import current_call_context
+
+
+class SlowAgent:
+    """Agent stub that records when it started and whether it was cancelled."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.started_at = None
+        self.cancelled = False
+
+    async def run(self, query, context=None):
+        self.started_at = time.monotonic()
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return f"calendar: {query}"
+
+
+class StubClassifier:
+    def __init__(self, domain="calendar", confidence=0.95):
+        self.domain = domain
+        self.confidence = confidence
+
+    def classify(self, query, active_providers, user_id=None):
+        return SimpleNamespace(
+            domain=self.domain, needs_llm=False, confidence=self.confidence,
+            skill_name=f"{self.domain}_skill", reason="stub", is_ambiguous=False, skill_matches=[],
+        )
+
+
+class RecordingTool:
+    name = "email_tool"
+
+    def __init__(self):
+        self.calls = []
+
+    async def arun(self, tool_input):
+        self.calls.append((tool_input["action"], time.monotonic()))
+        return f"{tool_input['action']} done"
+
+
+class ToolAgent(BaseAgent):
+    """Real BaseAgent tool execution: a read, then a send."""
+
+    def __init__(self, tool):
+        self.tools = {tool.name: tool}
+        self.event_emitter = None
+        self.memory_orchestrator = None
+        self.name = "EmailAgent"
+        self._current_session_id = None
+
+    async def run(self, query, context=None):
+        await self._safe_tool_execute(["email"], {"action": "search", "query": "john"}, "searching")
+        return await self._safe_tool_execute(["email"], {"action": "send", "to": "john"}, "sending")
+
+
+def _supervisor(agent, guard_delay=0.2, guard_verdict=True, domain="calendar"):
+    """Build a supervisor without its heavyweight __init__ dependencies."""
+    supervisor = object.__new__(SupervisorAgent)
+    supervisor.config = {}
+    supervisor.memory = None
+    supervisor.db = None
+    supervisor._db_lock = asyncio.Lock()
+    supervisor.event_emitter = None
+    supervisor.agents = {domain: agent}
+    supervisor.fast_classifier = StubClassifier(domain)
+    supervisor.nlp = None
+    supervisor.entity_extractor = None
+    supervisor.skill_tracker = None
+    supervisor.patterns = None
+    supervisor.guard_resolved_at = None
+
+    async def check_security(query, user_id):
+        await asyncio.sleep(guard_delay)
+        supervisor.guard_resolved_at = time.monotonic()
+        return guard_verdict
+
+    supervisor._check_security = check_security
+    supervisor._get_active_providers = AsyncMock(return_value={"google_calendar", "gmail"})
+    supervisor._resolve_followup_references = AsyncMock(side_effect=lambda q, u, s: q)
+    supervisor._enhance_response_stream = AsyncMock(return_value=None)
+    supervisor._inject_urgent_insights = AsyncMock(side_effect=lambda r, u, query=None: r)
+    supervisor._inject_advocacy_context = AsyncMock(side_effect=lambda r, u: r)
+    supervisor._record_interaction = AsyncMock()
+    supervisor._sanitize_response = MagicMock(side_effect=lambda r, u: r)
+    return supervisor
+
+
+@pytest.mark.asyncio
+async def test_read_only_route_starts_before_guard_verdict():
+    agent = SlowAgent()
+    supervisor = _supervisor(agent)
+
+    result = await supervisor.route_and_execute("what's on my calendar today", user_id=1)
+
+    assert result == "calendar: what's on my calendar today"
+    assert agent.started_at < supervisor.guard_resolved_at
+    metrics = supervisor._obs_metrics[-1]
+    assert metrics["speculative"]
+    assert metrics["first_agent_start_ms"] < 150
+    assert metrics["followup_skipped"]
+    supervisor._resolve_followup_references.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_guard_veto_cancels_speculative_agent():
+    agent = SlowAgent(delay=2.0)
+    supervisor = _supervisor(agent, guard_delay=0.05, guard_verdict=False)
+
+    started = time.monotonic()
+    result = await supervisor.route_and_execute("show my calendar", user_id=1)
+
+    assert "security restrictions" in result
+    assert time.monotonic() - started < 1.0
+    assert agent.cancelled
+    report = supervisor.get_observability_report()
+    assert report["speculative_starts"] == 1
+    assert report["speculation_waste_rate"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_speculative_write_tools_wait_for_guard_verdict():
+    query = "email John that I will be late"
+    # The keyword check misses this send, so the agent does start speculatively
+    assert not SupervisorAgent._has_side_effects(query, "email")
+
+    tool = RecordingTool()
+    supervisor = _supervisor(ToolAgent(tool), guard_delay=0.2, domain="email")
+    result = await supervisor.route_and_execute(query, user_id=1)
+
+    assert supervisor._obs_metrics[-1]["speculative"]
+    assert result == "send done"
+    (_, read_at), (_, send_at) = tool.calls
+    assert read_at < supervisor.guard_resolved_at <= send_at
+
+
+@pytest.mark.asyncio
+async def test_guard_veto_blocks_speculative_write_tools():
+    tool = RecordingTool()
+    supervisor = _supervisor(ToolAgent(tool), guard_delay=0.2, guard_verdict=False, domain="email")
+
+    result = await supervisor.route_and_execute("email John that I will be late", user_id=1)
+
+    assert "security restrictions" in result
+    assert [action for action, _ in tool.calls] == ["search"]
+
+
+@pytest.mark.asyncio
+async def test_side_effecting_route_waits_for_guard():
+    agent = SlowAgent()
+    supervisor = _supervisor(agent, domain="email")
+    supervisor._get_active_providers.return_value = {"gmail"}
+
+    await supervisor.route_and_execute("send a note to the team about friday", user_id=1)
+
+    assert agent.started_at >= supervisor.guard_resolved_at
+    assert "speculative" not in supervisor._obs_metrics[-1]
+
+
+@pytest.mark.asyncio
+async def test_low_confidence_route_is_not_speculative():
+    agent = SlowAgent()
+    supervisor = _supervisor(agent)
+    supervisor.fast_classifier = StubClassifier(confidence=0.6)
+
+    await supervisor.route_and_execute("calendar today", user_id=1)
+
+    assert agent.started_at >= supervisor.guard_resolved_at
+
+
+@pytest.mark.asyncio
+async def test_keyword_route_speculates_without_fast_classifier():
+    agent = SlowAgent()
+    supervisor = _supervisor(agent)
+    supervisor.fast_classifier = None
+
+    result = await supervisor.route_and_execute("what meetings are on my calendar today", user_id=1)
+
+    assert result == "calendar: what meetings are on my calendar today"
+    assert agent.started_at < supervisor.guard_resolved_at
+    metrics = supervisor._obs_metrics[-1]
+    assert metrics["keyword_route"] == "calendar"
+    assert metrics["speculative"]
+
+
+def test_weak_keyword_match_is_left_to_planner():
+    supervisor = _supervisor(SlowAgent())
+    supervisor.fast_classifier = None
+
+    assert supervisor._keyword_route("show my calendar") is None
+    assert supervisor._keyword_route("send a note to the team about friday") is None
+
+
+@pytest.mark.asyncio
+async def test_agent_llm_calls_carry_the_users_tenant():
+    seen = []
+
+    class ContextAgent(SlowAgent):
+        name = "CalendarAgent"
+
+        async def run(self, query, context=None):
+            seen.append(current_call_context())
+            return await super().run(query, context)
+
+    supervisor = _supervisor(ContextAgent(), guard_delay=0)
+
+    await supervisor.route_and_execute("what's on my calendar today", user_id=42)
+
+    assert (seen[0].tenant, seen[0].caller) == (42, "CalendarAgent")
+    assert current_call_context().tenant is None
+
+
+@pytest.mark.asyncio
+async def test_followup_resolution_runs_only_for_anaphora():
+    supervisor = _supervisor(SlowAgent(), guard_delay=0)
+
+    await supervisor.route_and_execute("move it to friday", user_id=1, session_id="s")
+
+    supervisor._resolve_followup_references.assert_awaited_once_with("move it to friday", 1, "s")
+    assert "followup_skipped" not in supervisor._obs_metrics[-1]
+
+
+def test_anaphora_detection():
+    supervisor = object.__new__(SupervisorAgent)
+
+    for query in ["reply to it", "what about that?", "yes please", "his email is bob@acme.com", "tell me more"]:
+        assert supervisor._has_followup_reference(query), query
+    for query in ["what's on my calendar this week", "show unread emails", "list my tasks"]:
+        assert not supervisor._has_followup_reference(query), query
@@ -0,0 +1,119 @@
+"""
+Tests for local calibrated token counting and context budget packing.
+"""
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.ai.context_assembler import AssembledContext, ContextAssembler, ContextPruner
+from src.ai.token_counter import TokenCounter, TokenLedger, heuristic_token_count
+
+
+class WordEncoder:
+    """One token per whitespace-separated word; counts invocations."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return len(text.split())
+
+
+def test_counts_are_cached_by_content():
+    encoder = WordEncoder()
+    counter = TokenCounter("gemini-2.5-flash", encoder=encoder)
+
+    assert counter.count("one two three") == 3
+    assert counter.count("one two three") == 3
+    assert counter.count("") == 0
+
+    assert encoder.calls == 1
+    assert counter.get_stats()["hits"] == 1
+
+
+def test_cache_is_bounded():
+    counter = TokenCounter(encoder=WordEncoder(), cache_size=2)
+    for text in ("a", "b c", "d e f"):
+        counter.count(text)
+
+    assert counter.get_stats()["cached"] == 2
+
+
+def test_calibration_converges_and_tracks_error():
+    counter = TokenCounter("gemini-2.5-flash", encoder=WordEncoder())
+    text = " ".join(["word"] * 100)
+
+    # Provider consistently reports 30% more tokens than the local encoding
+    for _ in range(30):
+        counter.calibrate(text, 130)
+
+    assert abs(counter.count(text) - 130) <= 130 * counter.error_bound
+    stats = counter.get_stats()
+    assert stats["samples"] == 30
+    assert stats["max_error"] > counter.error_bound
+    assert stats["samples_out_of_bound"] >= 1
+
+
+def test_sampling_is_periodic():
+    counter = TokenCounter(encoder=WordEncoder())
+    sampled = [counter.should_sample() for _ in range(100)]
+
+    assert sampled.count(True) == 2
+    assert sampled[0]
+
+
+def test_heuristic_tracks_word_count():
+    assert heuristic_token_count("") == 0
+    assert heuristic_token_count("hi you.") == 3
+    assert heuristic_token_count("internationalization") == 5
+
+
+def test_ledger_adds_and_removes_sections():
+    ledger = TokenLedger(TokenCounter(encoder=WordEncoder()), separator_tokens=1)
+
+    ledger.add("base", "a b c")
+    ledger.add("fact", "d e")
+    assert ledger.total == 7
+
+    ledger.add("fact", "d")
+    assert ledger.total == 6
+    ledger.remove("fact")
+    assert ledger.total == 4
+    assert "fact" not in ledger
+    assert ledger.cost("x y") == 3
+
+
+def test_pruner_counts_each_item_once():
+    pruner = ContextPruner(model="gemini-2.5-flash", counter=TokenCounter(encoder=WordEncoder()))
+    context = AssembledContext(
+        semantic_facts=[{"content": " ".join([f"fact{n}"] * 10), "confidence": 0.9} for n in range(3)]
+    )
+
+    base = pruner._count_tokens(AssembledContext().to_prompt_context())
+    # Room for all three facts plus separators, but not if they were counted twice
+    context = pruner.prune(context, budget=base + 1 + 3 * 11)
+
+    assert len(context.semantic_facts) == 3
+
+
+@pytest.mark.asyncio
+async def test_assembly_counts_locally_and_calibrates_in_background():
+    config = MagicMock()
+    config.ai.model = "gemini-2.5-flash"
+    config.ai.api_key = "key"
+    assembler = ContextAssembler(config=config)
+    assembler._count_tokens_exact = AsyncMock(return_value=42)
+
+    counter = TokenCounter("gemini-2.5-flash", encoder=WordEncoder())
+    context = AssembledContext(semantic_facts=[{"content": "likes tea", "confidence": 0.9}])
+    pruner = ContextPruner(model=config.ai.model, counter=counter)
+    prompt = pruner.prune(context, budget=1000).to_prompt_context()
+
+    assembler._calibrate_in_background(counter, prompt)
+    for task in list(assembler._calibration_tasks):
+        await task
+
+    assembler._count_tokens_exact.assert_awaited_once_with(prompt)
+    assert counter.get_stats()["samples"] == 1
+    assert not assembler._calibration_tasks
@@ -0,0 +1,242 @@
+"""
+Tests for the two-tier user data cache.
+"""
+import asyncio
+import fnmatch
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, Session as SessionModel, User, UserIntegration
+from src.services import user_cache
+from src.services.user_cache import UserDataCache, get_user_cache, restore_row, snapshot_row
+
+
+class FakeRedis:
+    """The Redis commands the cache uses, over a dict shared by all 'workers'."""
+
+    def __init__(self, data):
+        self.data = data
+        self.published = []
+
+    def ping(self):
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, nx=False, ex=None, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    def expire(self, key, seconds):
+        return True
+
+    def publish(self, channel, message):
+        self.published.append(message)
+
+    def scan_iter(self, match):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, match)]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+@pytest.fixture(autouse=True)
+def isolated_registry(monkeypatch):
+    monkeypatch.setattr(user_cache, "_caches", {})
+    monkeypatch.setattr(user_cache, "_listener", object())  # No pub/sub thread in tests
+
+
+def _worker(shared, namespace="providers", **kwargs):
+    """A cache as one API worker would have it, on the shared fake Redis."""
+    cache = UserDataCache(namespace, **kwargs)
+    cache._client = FakeRedis(shared)
+    return cache
+
+
+def _loader(calls, value, delay=0.0):
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return value
+    return load
+
+
+@pytest.mark.asyncio
+async def test_steady_state_reads_never_reach_the_database():
+    shared, calls = {}, []
+    worker_a, worker_b = _worker(shared), _worker(shared)
+
+    assert await worker_a.get_or_load(7, _loader(calls, ["gmail", "notion"])) == ["gmail", "notion"]
+    # Another worker gets it from the shared tier, then both serve from memory
+    for _ in range(5):
+        assert await worker_b.get_or_load(7, _loader(calls, None)) == ["gmail", "notion"]
+        assert await worker_a.get_or_load(7, _loader(calls, None)) == ["gmail", "notion"]
+
+    assert len(calls) == 1
+    stats = worker_b.get_stats()
+    assert (stats["shared_hits"], stats["near_hits"], stats["misses"]) == (1, 4, 0)
+    assert stats["backend"] == "redis"
+
+
+@pytest.mark.asyncio
+async def test_invalidation_rejects_values_loaded_before_it():
+    shared, calls = {}, []
+    worker_a, worker_b = _worker(shared), _worker(shared)
+
+    # Worker A reads the old row, then a write invalidates before A stores it
+    load = asyncio.create_task(worker_a.get_or_load(7, _loader(calls, ["gmail"], delay=0.05)))
+    await asyncio.sleep(0.01)
+    worker_a.invalidate_key(7)
+    assert await load == ["gmail"]
+
+    assert await worker_a.get_or_load(7, _loader(calls, ["gmail", "asana"])) == ["gmail", "asana"]
+    assert await worker_b.get_or_load(7, _loader(calls, None)) == ["gmail", "asana"]
+    assert len(calls) == 2
+    assert worker_a._client.published == [f"providers|{user_cache._PROCESS_ID}|7"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_load_once_across_workers():
+    shared, calls = {}, []
+    worker_a, worker_b = _worker(shared), _worker(shared)
+
+    results = await asyncio.gather(
+        *[worker_a.get_or_load(7, _loader(calls, ["gmail"], delay=0.1)) for _ in range(10)],
+        *[worker_b.get_or_load(7, _loader(calls, ["gmail"], delay=0.1)) for _ in range(10)],
+    )
+
+    assert results == [["gmail"]] * 20
+    assert len(calls) == 1
+    assert worker_a.get_stats()["coalesced"] + worker_b.get_stats()["coalesced"] == 18
+    assert worker_b.get_stats()["lock_waits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidation_from_another_process_drops_near_copy():
+    shared, calls = {}, []
+    cache = get_user_cache("settings")
+    cache._client = FakeRedis(shared)
+    await cache.get_or_load(7, _loader(calls, {"email_notifications": True}))
+
+    user_cache._on_invalidation({"data": f"settings|{user_cache._PROCESS_ID}|7"})
+    assert await cache.get_or_load(7, _loader(calls, None)) == {"email_notifications": True}
+
+    user_cache._on_invalidation({"data": "settings|other-process|7"})
+    shared.clear()
+    assert await cache.get_or_load(7, _loader(calls, {"email_notifications": False})) == {"email_notifications": False}
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_encrypted_in_shared_tier_and_none_is_not_cached():
+    shared, calls = {}, []
+    cache = _worker(shared, "session")
+    await cache.get_or_load("hash", _loader(calls, {"gmail_access_token": "ya29.secret"}))
+
+    assert "ya29.secret" not in shared["ucache:session:hash"]
+    assert await _worker(shared, "session").get("hash") == {"gmail_access_token": "ya29.secret"}
+    profiles = _worker(shared, "profile")
+    await profiles.set(7, {"profile_data": {"greeting": "Hi team"}})
+    assert "Hi team" not in shared["ucache:profile:7"]
+
+    assert await cache.get_or_load("missing", _loader(calls, None)) is None
+    assert await cache.get_or_load("missing", _loader(calls, None)) is None
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_redis_calls_stay_off_the_event_loop():
+    shared, calls, threads = {}, [], []
+    cache = get_user_cache("providers")
+    client = cache._client = FakeRedis(shared)
+    for name in ("mget", "set", "incr", "publish"):
+        def traced(*args, _call=getattr(client, name), **kwargs):
+            threads.append(threading.get_ident())
+            return _call(*args, **kwargs)
+        setattr(client, name, traced)
+
+    assert await cache.get_or_load(7, _loader(calls, ["gmail"])) == ["gmail"]
+    # What the ORM flush hook does inside an AsyncSession: the near copy is
+    # dropped at once, the shared tier on the invalidation thread
+    user_cache._invalidate_all({("providers", "7")})
+    assert await cache.get_or_load(7, _loader(calls, ["gmail", "asana"])) == ["gmail", "asana"]
+
+    assert len(calls) == 2
+    assert client.published == [f"providers|{user_cache._PROCESS_ID}|7"]
+    assert threads and threading.get_ident() not in threads
+
+
+@pytest.mark.asyncio
+async def test_without_redis_cache_is_per_process():
+    calls = []
+    cache = UserDataCache("providers", redis_url="redis://invalid")
+    assert await cache.get_or_load(7, _loader(calls, ["gmail"])) == ["gmail"]
+    assert await cache.get_or_load(7, _loader(calls, None)) == ["gmail"]
+    assert cache.invalidate_key(7) is True
+    assert len(calls) == 1
+    assert cache.get_stats()["backend"] == "local"
+
+
+@pytest.mark.asyncio
+async def test_orm_writes_invalidate_cached_rows(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    Base.metadata.create_all(engine, tables=[User.__table__, SessionModel.__table__, UserIntegration.__table__])
+    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+    shared = {}
+    for namespace in ("user", "session", "providers"):
+        get_user_cache(namespace)._client = FakeRedis(shared)
+
+    with SessionLocal() as db:
+        user = User(id=1, google_id="g1", email="a@example.com", name="Ann")
+        db.add_all([user, SessionModel(user_id=1, session_token="hash", gmail_access_token="tok")])
+        db.commit()
+
+    # Cached snapshots round-trip to detached rows
+    users, calls = get_user_cache("user"), []
+    snapshot = await users.get_or_load(1, _loader(calls, snapshot_row(user)))
+    restored = restore_row(User, snapshot)
+    assert (restored.id, restored.name, restored.created_at) == (1, "Ann", user.created_at)
+    await get_user_cache("providers").get_or_load(1, _loader(calls, []))
+
+    with SessionLocal() as db:
+        db.add(UserIntegration(user_id=1, provider="asana", access_token="tok", is_active=True))
+        db.get(User, 1).name = "Ann B"
+        db.rollback()
+        assert await users.get_or_load(1, _loader(calls, None)) == snapshot
+
+        db.add(UserIntegration(user_id=1, provider="asana", access_token="tok", is_active=True))
+        db.get(User, 1).name = "Ann B"
+        db.commit()
+
+    assert await get_user_cache("providers").get_or_load(1, _loader(calls, ["asana"])) == ["asana"]
+    assert await users.get_or_load(1, _loader(calls, {"name": "Ann B"})) == {"name": "Ann B"}
+    assert len(calls) == 4
+    engine.dispose()
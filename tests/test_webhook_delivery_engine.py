@@ -0,0 +1,170 @@
+"""
+Tests for the concurrent webhook delivery engine
+(indexed subscription lookup, pooled dispatch, per-host limits, circuit breaking).
+"""
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base
+from src.database.webhook_models import (
+    WebhookDelivery,
+    WebhookDeliveryStatus,
+    WebhookEventType,
+    WebhookSubscription,
+    WebhookSubscriptionEvent,
+)
+from src.features import webhook_service as webhook_module
+from src.features.webhook_service import WebhookService
+from src.utils import resilience
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        WebhookSubscription.__table__,
+        WebhookSubscriptionEvent.__table__,
+        WebhookDelivery.__table__,
+    ])
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    yield session
+    session.close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    with patch.dict(resilience._circuit_breakers, clear=True):
+        yield
+
+
+class FakeClient:
+    """Records concurrency per host; responds with a per-host status code."""
+
+    def __init__(self, status_by_host=None, delay=0.01):
+        self.status_by_host = status_by_host or {}
+        self.delay = delay
+        self.calls = []
+        self.in_flight = {}
+        self.peak = {}
+        self.peak_total = 0
+
+    async def post(self, url, content=None, headers=None, timeout=None):
+        host = url.split("/")[2]
+        self.calls.append(url)
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        self.peak[host] = max(self.peak.get(host, 0), self.in_flight[host])
+        self.peak_total = max(self.peak_total, sum(self.in_flight.values()))
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight[host] -= 1
+        response = Mock()
+        response.status_code = self.status_by_host.get(host, 200)
+        response.text = "ok"
+        return response
+
+
+def _subscribe(service, user_id, host, event_types=("email.received",)):
+    return service.create_subscription(
+        user_id=user_id,
+        url=f"https://{host}/hook",
+        event_types=list(event_types),
+        secret="s3cret",
+    )
+
+
+def test_indexed_lookup_filters_event_type_user_and_active(db):
+    service = WebhookService(db)
+    wanted = _subscribe(service, 1, "a.example")
+    _subscribe(service, 2, "b.example")
+    _subscribe(service, 1, "c.example", event_types=["task.completed"])
+    inactive = _subscribe(service, 1, "d.example")
+    service.update_subscription(inactive.id, is_active=False)
+
+    found = service.get_active_subscriptions_for_event(WebhookEventType.EMAIL_RECEIVED, user_id=1)
+    assert [s.id for s in found] == [wanted.id]
+
+    service.update_subscription(wanted.id, event_types=["task.completed"])
+    assert service.get_active_subscriptions_for_event(WebhookEventType.EMAIL_RECEIVED, user_id=1) == []
+    assert db.query(WebhookSubscriptionEvent).filter_by(subscription_id=wanted.id).count() == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_respects_global_and_per_host_limits(db):
+    service = WebhookService(db, max_concurrency=6, max_per_host=2)
+    for i in range(12):
+        _subscribe(service, i, "slow.example" if i % 2 else f"host{i}.example")
+    client = FakeClient()
+
+    deliveries = await service.trigger_webhook_event(
+        WebhookEventType.EMAIL_RECEIVED, "msg-1", {"subject": "hi"}, http_client=client
+    )
+
+    assert len(deliveries) == 12
+    assert all(d.status == WebhookDeliveryStatus.SUCCESS for d in deliveries)
+    assert client.peak["slow.example"] == 2
+    assert 2 < client.peak_total <= 6
+
+
+@pytest.mark.asyncio
+async def test_batch_commits_once_after_persisting(db):
+    service = WebhookService(db)
+    for i in range(5):
+        _subscribe(service, i, f"h{i}.example")
+
+    with patch.object(db, "commit", wraps=db.commit) as commit:
+        await service.trigger_webhook_event(
+            WebhookEventType.EMAIL_RECEIVED, "msg-1", {}, http_client=FakeClient(delay=0)
+        )
+
+    # One commit to persist PENDING rows, one for all results
+    assert commit.call_count == 2
+    assert db.query(WebhookDelivery).filter_by(status=WebhookDeliveryStatus.SUCCESS).count() == 5
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_defers_without_spending_attempts(db):
+    service = WebhookService(db, max_per_host=1)
+    for i in range(8):
+        _subscribe(service, i, "down.example")
+    client = FakeClient(status_by_host={"down.example": 503}, delay=0)
+
+    with patch.object(webhook_module, "HOST_FAILURE_THRESHOLD", 3):
+        deliveries = await service.trigger_webhook_event(
+            WebhookEventType.EMAIL_RECEIVED, "msg-1", {}, http_client=client
+        )
+
+    assert len(client.calls) == 3
+    deferred = [d for d in deliveries if d.attempt_count == 0]
+    assert len(deferred) == 5
+    assert all(d.status == WebhookDeliveryStatus.RETRYING for d in deferred)
+    assert all("Circuit open" in d.error_message for d in deferred)
+
+
+@pytest.mark.asyncio
+async def test_retry_batch_loads_subscriptions_in_one_query(db):
+    service = WebhookService(db)
+    for i in range(4):
+        _subscribe(service, i, f"h{i}.example")
+    await service.trigger_webhook_event(
+        WebhookEventType.EMAIL_RECEIVED, "msg-1", {},
+        http_client=FakeClient(status_by_host={f"h{i}.example": 500 for i in range(4)}, delay=0),
+    )
+    db.query(WebhookDelivery).update(
+        {WebhookDelivery.next_retry_at: WebhookDelivery.created_at}, synchronize_session=False
+    )
+    db.commit()
+    db.expunge_all()
+
+    statements = []
+    event.listen(db.bind, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    retried = await service.retry_pending_webhooks(http_client=FakeClient(delay=0))
+
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert retried == 4
+    assert len(selects) == 2  # due deliveries + their subscriptions
+    assert db.query(WebhookDelivery).filter_by(status=WebhookDeliveryStatus.SUCCESS).count() == 4
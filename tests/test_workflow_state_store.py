@@ -0,0 +1,160 @@
+"""
+Tests for durable, resumable workflow runs (checkpoints, leases, recovery).
+"""
+import asyncio
+from collections import Counter
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.database.models import Base, User, WorkflowRun
+from src.workflows.base.workflow import StepBasedWorkflow, WorkflowContext, WorkflowStatus
+from src.workflows.engine.executor import WorkflowExecutor
+from src.workflows.engine.store import PersistentStateManager, WorkflowLeaseLost
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[User.__table__, WorkflowRun.__table__])
+    SessionLocal = sessionmaker(bind=engine)
+
+    @contextmanager
+    def factory():
+        session = SessionLocal()
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    with factory() as session:
+        session.add(User(id=1, google_id="g1", email="a@example.com"))
+    return factory
+
+
+class ImportWorkflow(StepBasedWorkflow):
+    name = "import"
+    description = "fetch, write, notify"
+
+    def __init__(self, calls: Counter, hang_on_write: bool = False):
+        super().__init__()
+        self.calls = calls
+        self.hang_on_write = hang_on_write
+        self.writing = asyncio.Event()
+        self.add_step("fetch", self.fetch)
+        self.add_step("write", self.write, side_effect=True)
+        self.add_step("notify", self.notify, side_effect=True)
+
+    async def fetch(self, context):
+        self.calls["fetch"] += 1
+        return {"rows": [1, 2, 3]}
+
+    async def write(self, context):
+        self.calls["write"] += 1
+        self.writing.set()
+        if self.hang_on_write:
+            await asyncio.Event().wait()
+        return {"written": len(context.state["fetch"]["rows"])}
+
+    async def notify(self, context):
+        self.calls["notify"] += 1
+        return {"sent": True}
+
+
+@pytest.mark.asyncio
+async def test_run_killed_mid_step_finishes_on_another_worker(session_factory):
+    calls = Counter()
+    store = PersistentStateManager(session_factory, lease_seconds=0.3)
+
+    worker_a = WorkflowExecutor(store, worker_id="worker-a")
+    doomed = ImportWorkflow(calls, hang_on_write=True)
+    worker_a.register(ImportWorkflow, lambda user_id, params: doomed)
+
+    worker_b = WorkflowExecutor(store, worker_id="worker-b")
+    worker_b.register(ImportWorkflow, lambda user_id, params: ImportWorkflow(calls))
+
+    # Worker A dies (no cleanup, no lease release) while writing
+    run_a = asyncio.create_task(worker_a.run("import", user_id=1, workflow_id="run-1"))
+    await asyncio.wait_for(doomed.writing.wait(), timeout=2)
+    run_a.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run_a
+
+    # Still leased to the dead worker until the lease runs out
+    assert await worker_b.recover_orphaned() == 0
+    await asyncio.sleep(0.4)
+    assert await worker_b.recover_orphaned() == 1
+
+    # fetch ran once; the interrupted write was re-run under the same idempotency key
+    assert calls == Counter(fetch=1, write=2, notify=1)
+
+    context = await store.get("run-1")
+    assert context.status == WorkflowStatus.COMPLETED
+    assert context.result["write"] == {"written": 3}
+    assert context.checkpoints == {}  # compacted
+    with session_factory() as session:
+        run = session.execute(select(WorkflowRun)).scalar_one()
+        assert (run.attempts, run.lease_owner, run.compacted) == (2, None, True)
+
+    # A redelivered task for the same run returns the outcome without re-running
+    again = await worker_b.run("import", user_id=1, workflow_id="run-1")
+    assert again["status"] == "completed"
+    assert calls["fetch"] == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_are_fenced_to_the_lease_owner(session_factory):
+    store = PersistentStateManager(session_factory, lease_seconds=0.1)
+    context = WorkflowContext.create("import", user_id=1)
+    context.start()
+    await store.save(context, owner="worker-a")
+
+    assert await store.acquire(context.workflow_id, "worker-b") is None
+    await asyncio.sleep(0.15)
+    taken = await store.acquire(context.workflow_id, "worker-b")
+    assert taken.workflow_id == context.workflow_id
+    assert taken.status == WorkflowStatus.RUNNING
+
+    # The paused worker comes back: renewals and checkpoints are refused
+    assert await store.renew(context.workflow_id, "worker-a") is False
+    context.checkpoint_hook = lambda ctx: store.save(ctx, owner="worker-a")
+    with pytest.raises(WorkflowLeaseLost):
+        await context.checkpoint("late", lambda: 1, side_effect=True)
+    await store.save(taken, owner="worker-b")
+
+
+@pytest.mark.asyncio
+async def test_checkpointed_steps_are_skipped_and_cleanup_removes_old_runs(session_factory):
+    store = PersistentStateManager(session_factory)
+    saved = []
+
+    async def hook(ctx):
+        saved.append(dict(ctx.checkpoints))
+
+    context = WorkflowContext.create("import", user_id=1, workflow_id="run-2")
+    context.checkpoint_hook = hook
+    calls = Counter()
+
+    def step():
+        calls["step"] += 1
+        return {"n": calls["step"]}
+
+    assert await context.checkpoint("create", step, side_effect=True) == {"n": 1}
+    assert await context.checkpoint("create", step, side_effect=True) == {"n": 1}
+    assert calls["step"] == 1
+    assert saved[0] == {"create": {"status": "started", "idempotency_key": "run-2:create"}}
+    assert saved[1]["create"]["status"] == "completed"
+
+    restored = WorkflowContext.from_dict(context.to_dict())
+    assert restored.is_checkpointed("create")
+
+    context.complete({"ok": True})
+    context.completed_at = context.completed_at.replace(year=2000)
+    await store.save(context)
+    assert len(await store.get_by_user(1)) == 1
+    assert await store.cleanup_old(max_age_hours=24) == 1
+    assert await store.get("run-2") is None